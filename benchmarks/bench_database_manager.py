@@ -0,0 +1,93 @@
+"""
+Benchmarks for the DatabaseManager hot paths: paginated reads at shallow
+and deep offsets, filters and sorts, schema lookups, query fetch and
+export throughput. Generated databases are kept in benchmarks/.data and
+reused between runs.
+
+    python -m benchmarks.bench_database_manager --rows 10000 --output report.json
+    python -m benchmarks.bench_database_manager --rows 10000 1000000 --repeat 3
+    python -m benchmarks.report compare baseline.json report.json
+
+Generating 1M rows takes a couple of minutes, 10M rows much longer and
+about 1 GB of disk.
+"""
+from src.core.database_manager import DatabaseManager
+from .report import measure, write_report, print_results
+from .data import get_database, TABLE_NAME
+from src.core.export import write_csv
+from typing import Dict, Any
+import argparse
+import io
+
+
+class _NullWriter(io.TextIOBase):
+    """Text sink for export benchmarks, only counts characters"""
+
+    def __init__(self):
+        self.size = 0
+
+    def write(self, text: str) -> int:
+        self.size += len(text)
+        return len(text)
+
+
+def run_benchmarks(db_manager: DatabaseManager, rows: int, repeat: int, page_size: int) -> Dict[str, Any]:
+    last_page = max(1, (rows + page_size - 1) // page_size)
+    search = {'columns': [{'condition': ('name', 'Delta'), 'type': 'CONTAINS'}]}
+    sort = {'sorting': {'column': 'score', 'order': 'DESC'}}
+
+    def export_csv():
+        write_csv(db_manager.iter_query(f"SELECT * FROM {TABLE_NAME}"), _NullWriter())
+
+    cases = {
+        'paginate_shallow': lambda: db_manager.get_table_data_paginated(TABLE_NAME, 1, page_size),
+        'paginate_deep': lambda: db_manager.get_table_data_paginated(TABLE_NAME, last_page, page_size),
+        'paginate_filter': lambda: db_manager.get_table_data_paginated(TABLE_NAME, 1, page_size, search),
+        'paginate_sort': lambda: db_manager.get_table_data_paginated(TABLE_NAME, 1, page_size, sort),
+        'paginate_filter_sort': lambda: db_manager.get_table_data_paginated(
+            TABLE_NAME, 1, page_size, {**search, **sort}
+        ),
+        # two of eight columns, like a table viewer with columns hidden
+        'paginate_projected': lambda: db_manager.get_table_data_paginated(
+            TABLE_NAME, 1, page_size, sort, columns=['id', 'name']
+        ),
+        'paginate_preview': lambda: db_manager.get_table_data_paginated(TABLE_NAME, 1, page_size, preview_chars=20),
+        'table_schema': lambda: db_manager.get_table_schema(TABLE_NAME),
+        'sample': lambda: db_manager.get_table_sample(TABLE_NAME, page_size, seed=0),
+    }
+
+    results = {name: measure(fn, repeat) for name, fn in cases.items()}
+    results['execute_query_fetch'] = measure(
+        lambda: db_manager.execute_query(f"SELECT * FROM {TABLE_NAME}", max_rows=0), repeat, items=rows
+    )
+    results['export_csv'] = measure(export_csv, repeat, items=rows)
+
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="DatabaseManager benchmarks")
+    parser.add_argument('--rows', type=int, nargs='+', default=[10000], help="Table sizes to benchmark")
+    parser.add_argument('--repeat', type=int, default=5, help="Timed runs per benchmark")
+    parser.add_argument('--page-size', type=int, default=100)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help="Write a JSON report")
+    args = parser.parse_args()
+
+    results: Dict[str, Any] = {}
+    for rows in args.rows:
+        print(f"Preparing {rows} rows...", flush=True)
+        db_manager = DatabaseManager(get_database(rows, args.seed))
+
+        for name, result in run_benchmarks(db_manager, rows, args.repeat, args.page_size).items():
+            results[f"{name}[{rows}]"] = result
+
+    print_results(results)
+
+    if args.output:
+        write_report(args.output, 'database_manager', results, vars(args))
+        print(f"Report written to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
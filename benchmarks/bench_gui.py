@@ -0,0 +1,361 @@
+"""
+Offscreen benchmarks for the UI side: DatabaseTableModel reads and
+resets, scrolling a large QTableView, paging and sorting in the
+QueryResultViewer and SQLHighlighter on a long script. Operations run
+inside the Qt event loop, a fast timer alongside them measures how long
+the loop was blocked.
+
+    python -m benchmarks.bench_gui --rows 100000 --lines 10000 --output gui.json
+    python -m benchmarks.report compare baseline_gui.json gui.json
+"""
+import os
+
+# must be set before the QApplication is created
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from PySide6.QtWidgets import QApplication, QTableView, QPlainTextEdit
+from PySide6.QtCore import Qt, QObject, QTimer, QEventLoop
+from PySide6.QtGui import QTextCursor
+from src.ui.query_table_viewer import QueryResultViewer
+from src.utils.sql_highlighter import SQLHighlighter
+from src.models import DatabaseTableModel
+from .report import measure, summarize, write_report, print_results
+from .data import generate_rows, COLUMNS, WORDS
+from typing import Dict, Any, List, Callable
+import argparse
+import random
+import time
+import sys
+
+# a 60 Hz frame, operations taking longer are visible as stutter
+FRAME_BUDGET_MS = 1000 / 60
+
+VIEW_SIZE = (1280, 800)
+
+
+class StallMonitor(QObject):
+    """
+    Records the gaps between ticks of a precise timer. The timer can only
+    fire when the event loop is free, so a long gap is time the loop spent
+    blocked by an operation or by the painting it caused
+    """
+
+    def __init__(self, interval_ms: int = 1):
+        super().__init__()
+        self.interval_ms = interval_ms
+        self.gaps: List[float] = []
+        self._last = 0
+
+        self._timer = QTimer(self)
+        self._timer.setTimerType(Qt.TimerType.PreciseTimer)
+        self._timer.setInterval(interval_ms)
+        self._timer.timeout.connect(self._tick)
+
+    def start(self):
+        self.gaps = []
+        self._last = time.perf_counter_ns()
+        self._timer.start()
+
+    def stop(self):
+        self._tick()
+        self._timer.stop()
+
+    def _tick(self):
+        now = time.perf_counter_ns()
+        self.gaps.append((now - self._last) / 1e6)
+        self._last = now
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Stall statistics
+        :return: Dict[str, Any] - Longest stall, number of stalls over a
+        frame and the total time spent in them, in ms
+        """
+        stalls = [gap for gap in self.gaps if gap > FRAME_BUDGET_MS]
+        return {
+            'max_stall_ms': max(self.gaps, default=0.0),
+            'stalls': len(stalls),
+            'stalled_ms': sum(stalls),
+        }
+
+
+def run_in_event_loop(steps: List[Callable[[], Any]], items: int = None) -> Dict[str, Any]:
+    """
+    Run each step from the event loop, one per iteration, and time it
+    :param steps: Operations, each counted as one frame
+    :param items: Rows handled per step, adds a rows_per_s throughput
+    :return: Dict[str, Any] - Step latencies, frames over budget and stalls
+    """
+    loop = QEventLoop()
+    monitor = StallMonitor()
+    pending = iter(steps)
+    times: List[float] = []
+
+    def next_step():
+        step = next(pending, None)
+        if step is None:
+            loop.quit()
+            return
+
+        start = time.perf_counter_ns()
+        step()
+        times.append((time.perf_counter_ns() - start) / 1e6)
+
+        # a small delay lets the monitor and posted events run in between
+        QTimer.singleShot(2, next_step)
+
+    monitor.start()
+    QTimer.singleShot(0, next_step)
+    loop.exec()
+    monitor.stop()
+
+    result = summarize(times, items)
+    result['frames_over_budget'] = sum(1 for t in times if t > FRAME_BUDGET_MS)
+    result.update(monitor.stats())
+    return result
+
+
+def generate_script(lines: int, seed: int = 0) -> str:
+    """
+    A SQL script mixing statements, strings, numbers and comments, including
+    block comments and strings spanning lines
+    """
+    rng = random.Random(seed)
+    templates = [
+        lambda: [f"SELECT id, name, COUNT(score) FROM bench WHERE age > {rng.randint(18, 90)} GROUP BY name;"],
+        lambda: [f"INSERT INTO bench (name, note) VALUES ('{rng.choice(WORDS)} -- not a comment', '{rng.choice(WORDS)}');"],
+        lambda: [f"UPDATE bench SET score = {rng.uniform(0, 1000):.3f} WHERE name LIKE '%{rng.choice(WORDS)}%';"],
+        lambda: [f"-- {' '.join(rng.choice(WORDS) for _ in range(rng.randint(2, 8)))}"],
+        lambda: [f"    AND active = {rng.randint(0, 1)} ORDER BY created_at DESC LIMIT {rng.randint(1, 500)}"],
+        lambda: [f"/* {rng.choice(WORDS)}", f"   SELECT {rng.randint(0, 99)} FROM bench", "*/"],
+        lambda: [f"INSERT INTO bench (note) VALUES ('{rng.choice(WORDS)}", f"{rng.choice(WORDS)} SELECT');"],
+        lambda: [""],
+    ]
+
+    script: List[str] = []
+    while len(script) < lines:
+        script.extend(rng.choice(templates)())
+
+    return '\n'.join(script[:lines])
+
+
+def highlight_to_completion(editor: QPlainTextEdit, highlighter: SQLHighlighter, script: str) -> Dict[str, Any]:
+    """
+    Load a script into the editor and run the event loop until deferred
+    highlighting has finished
+    :return: Dict[str, Any] - blocking_ms (the synchronous load), complete_ms
+    (until every line is highlighted) and the stalls after the load
+    """
+    loop = QEventLoop()
+    monitor = StallMonitor()
+    poll = QTimer()
+    poll.setInterval(1)
+    poll.timeout.connect(lambda: highlighter.is_pending() or loop.quit())
+
+    start = time.perf_counter_ns()
+    editor.setPlainText(script)
+    editor.repaint()
+    blocking = time.perf_counter_ns()
+
+    # stalls while the deferred highlighting runs, the load itself is blocking_ms
+    monitor.start()
+    if highlighter.is_pending():
+        poll.start()
+        loop.exec()
+        poll.stop()
+
+    complete = time.perf_counter_ns()
+    monitor.stop()
+
+    return {
+        'blocking_ms': (blocking - start) / 1e6,
+        'complete_ms': (complete - start) / 1e6,
+        **monitor.stats(),
+    }
+
+
+def _show(widget):
+    widget.resize(*VIEW_SIZE)
+    widget.show()
+    QApplication.processEvents()
+
+
+def bench_model(rows: List[tuple], repeat: int, page_size: int) -> Dict[str, Any]:
+    results = {}
+    model = DatabaseTableModel()
+    page = {'columns': COLUMNS, 'rows': rows[:page_size]}
+    model.set_data(page)
+
+    # every role the view asks for, for every cell of a page
+    indexes = [model.index(row, column) for row in range(model.rowCount()) for column in range(model.columnCount())]
+    roles = [Qt.ItemDataRole.DisplayRole, Qt.ItemDataRole.ForegroundRole, Qt.ItemDataRole.TextAlignmentRole]
+
+    def read_page():
+        for index in indexes:
+            for role in roles:
+                model.data(index, role)
+
+    results['model_data_page'] = measure(read_page, repeat, items=len(indexes))
+
+    view = QTableView()
+    view.setModel(model)
+    _show(view)
+
+    full = {'columns': COLUMNS, 'rows': rows}
+    results['model_reset_page'] = run_in_event_loop(
+        [lambda: (model.set_data(page), view.repaint())] * repeat, items=len(page['rows'])
+    )
+    results['model_reset_all'] = run_in_event_loop(
+        [lambda: (model.set_data(full), view.repaint())] * repeat, items=len(rows)
+    )
+
+    view.close()
+    return results
+
+
+def bench_scroll(rows: List[tuple], frames: int) -> Dict[str, Any]:
+    model = DatabaseTableModel()
+    model.set_data({'columns': COLUMNS, 'rows': rows})
+    view = QTableView()
+    view.setModel(model)
+    view.setVerticalScrollMode(QTableView.ScrollMode.ScrollPerPixel)
+    _show(view)
+
+    scroll_bar = view.verticalScrollBar()
+    step = max(1, scroll_bar.maximum() // frames)
+
+    def scroll(value: int):
+        scroll_bar.setValue(value)
+        view.viewport().repaint()
+
+    result = run_in_event_loop([lambda v=i * step: scroll(v) for i in range(1, frames + 1)])
+    view.close()
+    return {'view_scroll': result}
+
+
+def bench_viewer(rows: List[tuple], repeat: int, page_size: int, frames: int) -> Dict[str, Any]:
+    results = {}
+    viewer = QueryResultViewer()
+    viewer.pagination.page_size_combo.setCurrentText(str(page_size))
+    _show(viewer)
+
+    def display():
+        viewer.display_results({'columns': COLUMNS, 'rows': list(rows)})
+        viewer.repaint()
+
+    results['viewer_display'] = run_in_event_loop([display] * repeat, items=len(rows))
+
+    pages = viewer.pagination.total_pages
+    targets = [1 + (i * (pages - 1)) // max(1, frames - 1) for i in range(frames)]
+
+    def go_to(page: int):
+        viewer.pagination.go_to_page(page)
+        viewer.repaint()
+
+    results['viewer_page'] = run_in_event_loop([lambda p=p: go_to(p) for p in targets])
+
+    def sort(column: int, order: Qt.SortOrder):
+        viewer.on_sort_changed(column, order)
+        viewer.repaint()
+
+    # a numeric and a text column, both directions
+    sorts = [
+        (COLUMNS.index('score'), Qt.SortOrder.AscendingOrder),
+        (COLUMNS.index('score'), Qt.SortOrder.DescendingOrder),
+        (COLUMNS.index('name'), Qt.SortOrder.AscendingOrder),
+        (COLUMNS.index('name'), Qt.SortOrder.DescendingOrder),
+    ]
+    results['viewer_sort'] = run_in_event_loop(
+        [lambda c=c, o=o: sort(c, o) for c, o in sorts] * max(1, repeat // 2), items=len(rows)
+    )
+
+    viewer.close()
+    return results
+
+
+def bench_highlighter(lines: int, repeat: int, frames: int, seed: int) -> Dict[str, Any]:
+    results = {}
+    script = generate_script(lines, seed)
+
+    editor = QPlainTextEdit()
+    highlighter = SQLHighlighter(editor.document())
+    _show(editor)
+
+    runs = [highlight_to_completion(editor, highlighter, script) for _ in range(repeat)]
+    results['highlight_load'] = {
+        **summarize([run['blocking_ms'] for run in runs], items=lines),
+        'frames_over_budget': sum(1 for run in runs if run['blocking_ms'] > FRAME_BUDGET_MS),
+        'max_stall_ms': max(run['max_stall_ms'] for run in runs),
+    }
+    results['highlight_complete'] = summarize([run['complete_ms'] for run in runs], items=lines)
+
+    # typing in the middle of the script, one keystroke per frame
+    cursor = QTextCursor(editor.document().findBlockByNumber(lines // 2))
+    cursor.movePosition(QTextCursor.MoveOperation.EndOfBlock)
+    editor.setTextCursor(cursor)
+
+    def type_character(character: str):
+        editor.insertPlainText(character)
+        editor.viewport().repaint()
+
+    results['highlight_typing'] = run_in_event_loop(
+        [lambda c=c: type_character(c) for c in (" AND name = 'x'" * frames)[:frames]]
+    )
+
+    editor.close()
+    return results
+
+
+def run_benchmarks(rows: int, lines: int, repeat: int, page_size: int, frames: int, seed: int) -> Dict[str, Any]:
+    data = generate_rows(rows, seed)
+
+    results = {}
+    for name, result in bench_model(data, repeat, page_size).items():
+        results[f"{name}[{rows}]"] = result
+    for name, result in bench_scroll(data, frames).items():
+        results[f"{name}[{rows}]"] = result
+    for name, result in bench_viewer(data, repeat, page_size, frames).items():
+        results[f"{name}[{rows}]"] = result
+    for name, result in bench_highlighter(lines, repeat, frames, seed).items():
+        results[f"{name}[{lines} lines]"] = result
+
+    return results
+
+
+def print_stalls(results: Dict[str, Any], file=sys.stdout):
+    width = max((len(name) for name in results), default=0)
+    for name, result in results.items():
+        if 'max_stall_ms' in result:
+            file.write(
+                f"{name.ljust(width)}  p95 {result['p95_ms']:10.2f} ms  "
+                f"over budget {result['frames_over_budget']:4d}/{result['runs']:<4d}  "
+                f"max stall {result['max_stall_ms']:10.2f} ms\n"
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offscreen GUI benchmarks")
+    parser.add_argument('--rows', type=int, default=100000, help="Rows of synthetic result data")
+    parser.add_argument('--lines', type=int, default=10000, help="Lines of the highlighted script")
+    parser.add_argument('--repeat', type=int, default=5, help="Timed runs of whole-data operations")
+    parser.add_argument('--frames', type=int, default=100, help="Frames of scrolling, paging and typing")
+    parser.add_argument('--page-size', type=int, default=500, choices=[25, 50, 100, 200, 500])
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help="Write a JSON report")
+    args = parser.parse_args()
+
+    app = QApplication.instance() or QApplication(sys.argv)
+    results = run_benchmarks(args.rows, args.lines, args.repeat, args.page_size, args.frames, args.seed)
+
+    print_results(results)
+    print()
+    print_stalls(results)
+
+    if args.output:
+        report_args = {**vars(args), 'platform': app.platformName()}
+        write_report(args.output, 'gui', results, report_args)
+        print(f"Report written to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
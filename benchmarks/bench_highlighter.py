@@ -0,0 +1,93 @@
+"""
+SQL highlighter benchmark: lexer throughput, loading a long script into an
+offscreen editor until every line is highlighted, and typing latency in
+it. The load reports how long the editor was blocked, highlighting past
+the first PASS_BUDGET_MS runs in chunks from the event loop.
+
+    python -m benchmarks.bench_highlighter --lines 50000 --output highlighter.json
+"""
+from .bench_gui import highlight_to_completion, run_in_event_loop, generate_script, FRAME_BUDGET_MS, _show
+from src.core.sql_lexer import tokenize_line, STATE_NORMAL
+from .report import measure, summarize, write_report, print_results
+from src.utils.sql_highlighter import SQLHighlighter
+from PySide6.QtWidgets import QApplication, QPlainTextEdit
+from PySide6.QtGui import QTextCursor
+from typing import Dict, Any, List
+import argparse
+import sys
+
+
+def tokenize_script(lines: List[str]):
+    state = STATE_NORMAL
+    for line in lines:
+        _, state = tokenize_line(line, state)
+
+
+def run_benchmarks(lines: int, repeat: int, frames: int, seed: int) -> Dict[str, Any]:
+    results = {}
+    script = generate_script(lines, seed)
+
+    results['lexer'] = measure(lambda: tokenize_script(script.split('\n')), repeat, items=lines)
+
+    editor = QPlainTextEdit()
+    highlighter = SQLHighlighter(editor.document())
+    _show(editor)
+
+    runs = [highlight_to_completion(editor, highlighter, script) for _ in range(repeat)]
+    results['load_blocking'] = {
+        **summarize([run['blocking_ms'] for run in runs], items=lines),
+        'frames_over_budget': sum(1 for run in runs if run['blocking_ms'] > FRAME_BUDGET_MS),
+    }
+    results['load_complete'] = {
+        **summarize([run['complete_ms'] for run in runs], items=lines),
+        'max_stall_ms': max(run['max_stall_ms'] for run in runs),
+        'stalls': max(run['stalls'] for run in runs),
+    }
+
+    for name, block_number in (('typing_start', 0), ('typing_middle', lines // 2), ('typing_end', lines - 1)):
+        cursor = QTextCursor(editor.document().findBlockByNumber(block_number))
+        cursor.movePosition(QTextCursor.MoveOperation.EndOfBlock)
+        editor.setTextCursor(cursor)
+
+        def type_character(character: str):
+            editor.insertPlainText(character)
+            editor.viewport().repaint()
+
+        results[name] = run_in_event_loop([lambda c=c: type_character(c) for c in ("x" * frames)])
+
+    # opening a block comment at the top restyles every following line
+    def toggle_comment():
+        cursor = QTextCursor(editor.document())
+        cursor.insertText("/* ")
+        editor.viewport().repaint()
+
+    results['open_block_comment'] = run_in_event_loop([toggle_comment])
+
+    editor.close()
+    return {f"{name}[{lines} lines]": result for name, result in results.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SQL highlighter benchmarks")
+    parser.add_argument('--lines', type=int, default=50000, help="Lines of the generated script")
+    parser.add_argument('--repeat', type=int, default=3, help="Timed runs of the lexer and load")
+    parser.add_argument('--frames', type=int, default=50, help="Keystrokes per typing benchmark")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help="Write a JSON report")
+    args = parser.parse_args()
+
+    QApplication.instance() or QApplication(sys.argv)
+    results = run_benchmarks(args.lines, args.repeat, args.frames, args.seed)
+    print_results(results)
+
+    for name, result in results.items():
+        if 'max_stall_ms' in result:
+            print(f"{name}: max stall {result['max_stall_ms']:.2f} ms")
+
+    if args.output:
+        write_report(args.output, 'highlighter', results, vars(args))
+        print(f"Report written to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
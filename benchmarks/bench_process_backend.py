@@ -0,0 +1,82 @@
+"""
+Benchmarks for running queries in worker processes. A full scan over
+copies of the benchmark table is run on all copies at once, on threads in
+this process and through a ProcessBackend, then one copy is streamed
+through each to show the cost of moving rows between processes.
+
+    python -m benchmarks.bench_process_backend --rows 100000 --databases 4
+    python -m benchmarks.bench_process_backend --rows 10000 --processes 2 --output report.json
+"""
+from src.core.process_backend import ProcessBackend
+from src.core.database_manager import DatabaseManager
+from src.core.fan_out import run_on_all
+from .report import measure, write_report, print_results
+from .data import get_database, TABLE_NAME
+from typing import Dict, Any, Optional
+from pathlib import Path
+import argparse
+import tempfile
+import shutil
+import os
+
+QUERY = f"SELECT * FROM {TABLE_NAME} WHERE age > 30"
+
+
+def bench_fan_out(rows: int, databases: int, repeat: int, processes: Optional[int] = None, seed: int = 0) -> Dict[str, Any]:
+    """Time run_on_all over copies of the benchmark database, with and without worker processes"""
+    path = get_database(rows, seed)
+    results = {}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_managers = []
+        for idx in range(databases):
+            target = Path(tmp) / f"shard_{idx}.rbx"
+            shutil.copyfile(path, target)
+            db_managers.append(DatabaseManager(str(target)))
+
+        def run(backend=None):
+            run_on_all(db_managers, QUERY, max_workers=databases, max_rows=0, keep_rows=False, backend=backend)
+
+        results[f"fan_out_threads[{databases}x{rows}]"] = measure(run, repeat, items=rows * databases)
+
+        backend = ProcessBackend(processes or databases)
+        try:
+            results[f"fan_out_processes[{databases}x{rows}]"] = measure(lambda: run(backend), repeat, items=rows * databases)
+            results[f"stream_process[{rows}]"] = measure(
+                lambda: sum(len(batch) for _, batch in backend.iter_query(path, QUERY)), repeat, items=rows
+            )
+        finally:
+            backend.close()
+
+    db_manager = DatabaseManager(path)
+    results[f"stream_in_process[{rows}]"] = measure(
+        lambda: sum(len(batch) for _, batch in db_manager.iter_query(QUERY)), repeat, items=rows
+    )
+
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Worker process benchmarks")
+    parser.add_argument('--rows', type=int, nargs='+', default=[100000], help="Table sizes to benchmark")
+    parser.add_argument('--databases', type=int, default=min(4, os.cpu_count() or 1), help="Copies queried at once")
+    parser.add_argument('--processes', type=int, help="Worker processes, one per database by default")
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help="Write a JSON report")
+    args = parser.parse_args()
+
+    results: Dict[str, Any] = {}
+    for rows in args.rows:
+        print(f"Querying {args.databases} x {rows} rows...", flush=True)
+        results.update(bench_fan_out(rows, args.databases, args.repeat, args.processes, args.seed))
+
+    print_results(results)
+
+    if args.output:
+        write_report(args.output, 'process_backend', results, vars(args))
+        print(f"Report written to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
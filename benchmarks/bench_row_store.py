@@ -0,0 +1,111 @@
+"""
+Benchmarks for result spilling. Rows shaped like the benchmark table are
+appended to a RowStore in fetch sized batches with a small memory budget,
+then paged at random, sorted on disk and read back like an export.
+--memory reports the peak traced memory of each step (tracing slows the
+runs down), it should stay near the budget whatever the row count.
+
+    python -m benchmarks.bench_row_store --rows 1000000 --budget-mb 16
+    python -m benchmarks.bench_row_store --rows 100000 --memory --output report.json
+"""
+from src.core.row_store import RowStore, sorted_by_column
+from .report import measure, write_report, print_results
+from .data import make_row
+from typing import Dict, Any, Iterator, List
+import tracemalloc
+import argparse
+import random
+
+# rows per append, like "Fetch more"
+FETCH_SIZE = 5000
+
+# rows per page read
+PAGE_SIZE = 50
+
+# page reads timed per run
+PAGE_READS = 200
+
+
+def stream_batches(rows: int, seed: int = 0) -> Iterator[List[tuple]]:
+    rng = random.Random(seed)
+    for start in range(1, rows + 1, FETCH_SIZE):
+        yield [make_row(rng, row_id) for row_id in range(start, min(start + FETCH_SIZE, rows + 1))]
+
+
+def traced(fn, track_memory: bool, items: int) -> Dict[str, Any]:
+    """Run fn once, with its peak memory when tracked"""
+    if track_memory:
+        tracemalloc.start()
+    result = measure(fn, repeat=1, warmup=0, items=items)
+    if track_memory:
+        result['peak_memory_mb'] = tracemalloc.get_traced_memory()[1] / 1e6
+        tracemalloc.stop()
+    return result
+
+
+def bench_row_store(rows: int, budget_mb: int, seed: int = 0, track_memory: bool = False) -> Dict[str, Any]:
+    """Time filling, paging, sorting and exporting a store that spills past budget_mb"""
+    store = RowStore(spill_bytes=budget_mb * 1024 * 1024)
+    sorted_store = None
+    results = {}
+
+    def fill():
+        for batch in stream_batches(rows, seed):
+            store.extend(batch)
+
+    def read_pages():
+        rng = random.Random(seed)
+        for _ in range(PAGE_READS):
+            start = rng.randrange(max(1, len(store) - PAGE_SIZE))
+            store[start:start + PAGE_SIZE]
+
+    def sort():
+        nonlocal sorted_store
+        # the score column, a float
+        sorted_store = sorted_by_column(store, 4)
+
+    def export():
+        for _ in store.iter_batches():
+            pass
+
+    try:
+        results[f"fill[{rows}]"] = {**traced(fill, track_memory, rows), 'disk_mb': store.disk_bytes / 1e6}
+        results[f"page_reads[{rows}]"] = measure(read_pages, repeat=3, items=PAGE_READS * PAGE_SIZE)
+        results[f"sort[{rows}]"] = traced(sort, track_memory, rows)
+        results[f"export[{rows}]"] = traced(export, track_memory, rows)
+    finally:
+        store.close()
+        if sorted_store is not None:
+            sorted_store.close()
+
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Result spill benchmarks")
+    parser.add_argument('--rows', type=int, nargs='+', default=[100000], help="Result sizes to benchmark")
+    parser.add_argument('--budget-mb', type=int, default=16, help="Memory budget before rows spill")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--memory', action='store_true', help="Report the peak memory of each step")
+    parser.add_argument('--output', help="Write a JSON report")
+    args = parser.parse_args()
+
+    results: Dict[str, Any] = {}
+    for rows in args.rows:
+        print(f"Spilling {rows} rows...", flush=True)
+        results.update(bench_row_store(rows, args.budget_mb, args.seed, args.memory))
+
+    print_results(results)
+    for name, result in results.items():
+        if 'peak_memory_mb' in result:
+            print(f"{name} peak memory {result['peak_memory_mb']:.2f} MB")
+        if 'disk_mb' in result:
+            print(f"{name} spill file {result['disk_mb']:.2f} MB")
+
+    if args.output:
+        write_report(args.output, 'row_store', results, vars(args))
+        print(f"Report written to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
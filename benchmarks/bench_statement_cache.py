@@ -0,0 +1,70 @@
+"""
+Micro-benchmark for the statement cache. Parses the statements the viewer
+repeats most (page loads, schema lookups, history inserts) with and without
+the cache and reports the parse time saved.
+
+    python -m benchmarks.bench_statement_cache --iterations 2000
+"""
+from src.core.statement_cache import StatementCache
+from ribbitxdb.query.parser import SQLParser
+from ribbitxdb.cursor import Cursor
+import argparse
+import time
+
+STATEMENTS = [
+    (
+        "SELECT * FROM users WHERE (name LIKE ?) ORDER BY name DESC LIMIT ? OFFSET ?",
+        lambda i: ('%Test%', 100, i * 100)
+    ),
+    (
+        "PRAGMA table_info(?)",
+        lambda i: ('users',)
+    ),
+    (
+        "INSERT INTO history (database, query, row_count, execution_time, execution_timestamp, timings) VALUES (?, ?, ?, ?, ?, ?)",
+        lambda i: ('data.rbx', f'SELECT * FROM users WHERE id = {i}', i, 0.001 * i, '2025-01-01 00:00:00', '{}')
+    ),
+]
+
+
+def bench_uncached(iterations: int) -> float:
+    parser = SQLParser()
+    start = time.perf_counter_ns()
+
+    for i in range(iterations):
+        for sql, make_params in STATEMENTS:
+            parser.parse(Cursor._bind_parameters(None, sql, make_params(i)))
+
+    return (time.perf_counter_ns() - start) / 1e6
+
+
+def bench_cached(iterations: int) -> tuple:
+    parser = SQLParser()
+    cache = StatementCache()
+    start = time.perf_counter_ns()
+
+    for i in range(iterations):
+        for sql, make_params in STATEMENTS:
+            cache.get(parser, sql, make_params(i))
+
+    return (time.perf_counter_ns() - start) / 1e6, cache.stats()
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Statement cache micro-benchmark")
+    arg_parser.add_argument('--iterations', type=int, default=1000)
+    args = arg_parser.parse_args()
+
+    uncached_ms = bench_uncached(args.iterations)
+    cached_ms, stats = bench_cached(args.iterations)
+    statements = args.iterations * len(STATEMENTS)
+
+    print(f"statements:      {statements}")
+    print(f"parse every run: {uncached_ms:.1f} ms ({uncached_ms * 1000 / statements:.1f} us/statement)")
+    print(f"statement cache: {cached_ms:.1f} ms ({cached_ms * 1000 / statements:.1f} us/statement)")
+    print(f"cache hits:      {stats['hits']}, misses: {stats['misses']}")
+    print(f"estimated parse time saved (cache metric): {stats['saved_ms']:.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
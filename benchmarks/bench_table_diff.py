@@ -0,0 +1,144 @@
+"""
+Benchmarks for the table diff. The merge benchmark diffs two generated
+row streams without a database, rows are made on the fly so memory stays
+flat at any size, --memory reports the peak (tracing slows the run down).
+The end-to-end benchmark diffs the benchmark table against a modified
+copy, including the ORDER BY reads on both sides.
+
+    python -m benchmarks.bench_table_diff --rows 1000000
+    python -m benchmarks.bench_table_diff --rows 10000000 --skip-database --memory
+    python -m benchmarks.bench_table_diff --rows 10000 --output report.json
+"""
+from src.core.table_diff import TableDiff, merge_diff, ADDED, REMOVED, CHANGED
+from src.core.database_manager import DatabaseManager
+from .report import measure, write_report, print_results
+from .data import get_database, make_row, TABLE_NAME
+from typing import Dict, Any, Iterator
+from pathlib import Path
+import tracemalloc
+import argparse
+import tempfile
+import ribbitxdb
+import random
+import shutil
+
+# one row in CHANGE_EVERY differs between the sides, as many are added and removed
+CHANGE_EVERY = 100
+
+
+def stream_rows(rows: int, seed: int = 0, modified: bool = False) -> Iterator[tuple]:
+    """
+    Rows in id order, cheap to make so the merge dominates the timing. The
+    modified stream drops, changes and appends one row per CHANGE_EVERY
+    """
+    for row_id in range(1, rows + 1):
+        if modified and row_id % CHANGE_EVERY == 0:
+            continue
+        age = (row_id * 7 + seed) % 73 + (modified and row_id % CHANGE_EVERY == 1)
+        yield row_id, f"user{row_id}@example.com", age, row_id % 2
+
+    if modified:
+        for row_id in range(rows + 1, rows + 1 + rows // CHANGE_EVERY):
+            yield row_id, f"user{row_id}@example.com", 0, 0
+
+
+def bench_merge(rows: int, seed: int = 0, track_memory: bool = False) -> Dict[str, Any]:
+    """Time one merge of the generated streams, optionally with its peak memory"""
+    counts = {ADDED: 0, REMOVED: 0, CHANGED: 0}
+
+    def run():
+        counts.update({ADDED: 0, REMOVED: 0, CHANGED: 0})
+        for status, _, _, _ in merge_diff(stream_rows(rows, seed), stream_rows(rows, seed, True), 1):
+            counts[status] += 1
+
+    if track_memory:
+        tracemalloc.start()
+    result = measure(run, repeat=1, warmup=0, items=rows)
+    if track_memory:
+        result['peak_memory_mb'] = tracemalloc.get_traced_memory()[1] / 1e6
+        tracemalloc.stop()
+
+    return {**result, **counts}
+
+
+def modified_copy(path: str, target: str, rows: int) -> str:
+    """Copy of a benchmark database with rows deleted, updated and inserted"""
+    shutil.copyfile(path, target)
+    step = max(1, rows // 100)
+
+    connection = ribbitxdb.connect(target)
+    cursor = connection.cursor()
+    try:
+        for row_id in range(step, rows + 1, step):
+            cursor.execute(f"DELETE FROM {TABLE_NAME} WHERE id = ?", (row_id,))
+        for row_id in range(1, rows + 1, step):
+            cursor.execute(f"UPDATE {TABLE_NAME} SET age = ? WHERE id = ?", (0, row_id))
+        rng = random.Random(1)
+        for row_id in range(rows + 1, rows + 1 + rows // step):
+            cursor.execute(
+                f"INSERT INTO {TABLE_NAME} (id, name, email, age, score, active, created_at, note) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                make_row(rng, row_id)
+            )
+        connection.commit()
+    finally:
+        cursor.close()
+        connection.close()
+
+    return target
+
+
+def bench_database(rows: int, repeat: int, seed: int = 0) -> Dict[str, Any]:
+    """Time TableDiff on the benchmark table against a modified copy"""
+    left = DatabaseManager(get_database(rows, seed))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        right = DatabaseManager(modified_copy(left.db_path, str(Path(tmp) / 'right.rbx'), rows))
+        diff = TableDiff(left, right, TABLE_NAME)
+        result = measure(lambda: diff.run(max_rows=0), repeat, items=rows)
+        summary = diff.summary()
+
+    return {**result, **{key: summary[key] for key in (ADDED, REMOVED, CHANGED)}}
+
+
+def run_benchmarks(
+        rows: int,
+        repeat: int,
+        seed: int = 0,
+        database: bool = True,
+        track_memory: bool = False
+) -> Dict[str, Any]:
+    results = {f"merge[{rows}]": bench_merge(rows, seed, track_memory)}
+    if database:
+        results[f"table_diff[{rows}]"] = bench_database(rows, repeat, seed)
+
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Table diff benchmarks")
+    parser.add_argument('--rows', type=int, nargs='+', default=[100000], help="Table sizes to benchmark")
+    parser.add_argument('--repeat', type=int, default=3, help="Timed runs of the database diff")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--skip-database', action='store_true', help="Only benchmark the merge")
+    parser.add_argument('--memory', action='store_true', help="Report the peak memory of the merge")
+    parser.add_argument('--output', help="Write a JSON report")
+    args = parser.parse_args()
+
+    results: Dict[str, Any] = {}
+    for rows in args.rows:
+        print(f"Diffing {rows} rows...", flush=True)
+        results.update(run_benchmarks(rows, args.repeat, args.seed, not args.skip_database, args.memory))
+
+    print_results(results)
+    for name, result in results.items():
+        if 'peak_memory_mb' in result:
+            print(f"{name} peak memory {result['peak_memory_mb']:.2f} MB")
+
+    if args.output:
+        write_report(args.output, 'table_diff', results, vars(args))
+        print(f"Report written to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,130 @@
+"""
+Synthetic data for the benchmarks. Creates a .rbx file with one table of
+mixed column types, generated from a fixed seed so runs are comparable.
+
+    python -m benchmarks.data --rows 10000 --output bench.rbx
+"""
+from src.core.statement_cache import StatementCache
+from typing import Optional, Callable, List
+from pathlib import Path
+import argparse
+import ribbitxdb
+import random
+
+TABLE_NAME = 'bench'
+DEFAULT_DATA_DIR = Path(__file__).parent / '.data'
+
+CREATE_TABLE = f"""
+    CREATE TABLE {TABLE_NAME}(
+        id INTEGER PRIMARY KEY,
+        name TEXT NOT NULL,
+        email TEXT,
+        age INTEGER,
+        score REAL,
+        active INTEGER,
+        created_at TEXT,
+        note TEXT
+    )
+"""
+
+COLUMNS = ['id', 'name', 'email', 'age', 'score', 'active', 'created_at', 'note']
+
+INSERT = (
+    f"INSERT INTO {TABLE_NAME} (id, name, email, age, score, active, created_at, note) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?, ?)"
+)
+
+WORDS = ['alpha', 'bravo', 'charlie', 'delta', 'echo', 'foxtrot', 'golf', 'hotel', 'india', 'juliet']
+
+
+def make_row(rng: random.Random, row_id: int) -> tuple:
+    name = f"{rng.choice(WORDS).title()} {rng.choice(WORDS).title()} {row_id}"
+    note = None if rng.random() < 0.2 else ' '.join(rng.choice(WORDS) for _ in range(rng.randint(3, 12)))
+
+    return (
+        row_id,
+        name,
+        f"user{row_id}@example.com",
+        rng.randint(18, 90),
+        round(rng.uniform(0, 1000), 3),
+        rng.randint(0, 1),
+        f"20{rng.randint(10, 25)}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}T00:00:00",
+        note,
+    )
+
+
+def generate_rows(rows: int, seed: int = 0) -> List[tuple]:
+    """In-memory rows with the same shape as the benchmark table"""
+    rng = random.Random(seed)
+    return [make_row(rng, row_id) for row_id in range(1, rows + 1)]
+
+
+def generate_database(
+        path: str,
+        rows: int,
+        seed: int = 0,
+        batch_size: int = 10000,
+        progress_callback: Optional[Callable[[int], None]] = None
+) -> str:
+    """
+    Create a benchmark database with the given number of rows. Ids are
+    given explicitly, ribbitxdb's AUTOINCREMENT scans the whole table for
+    every insert
+    :param path: Database path, replaced if it exists
+    :param rows: Number of rows
+    :param seed: Random seed
+    :param batch_size: Rows inserted per commit
+    :param progress_callback: Called with the rows inserted so far
+    :return: str - Database path
+    """
+    Path(path).unlink(missing_ok=True)
+    rng = random.Random(seed)
+    statement_cache = StatementCache()
+
+    connection = ribbitxdb.connect(path)
+    cursor = connection.cursor()
+    try:
+        cursor.execute(CREATE_TABLE)
+
+        for row_id in range(1, rows + 1):
+            statement_cache.execute(cursor, INSERT, make_row(rng, row_id))
+
+            if row_id % batch_size == 0:
+                connection.commit()
+                if progress_callback:
+                    progress_callback(row_id)
+
+        connection.commit()
+    finally:
+        cursor.close()
+        connection.close()
+
+    return path
+
+
+def get_database(rows: int, seed: int = 0, data_dir: Path = DEFAULT_DATA_DIR) -> str:
+    """Path of a generated database, generating it on first use"""
+    data_dir.mkdir(parents=True, exist_ok=True)
+    path = data_dir / f"{TABLE_NAME}_{rows}_{seed}.rbx"
+
+    if not path.exists():
+        # generate under a temporary name so an interrupted run isn't reused
+        tmp_path = path.with_suffix('.tmp')
+        generate_database(str(tmp_path), rows, seed)
+        tmp_path.replace(path)
+
+    return str(path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a benchmark database")
+    parser.add_argument('--rows', type=int, default=10000)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', required=True, help="Database path")
+    args = parser.parse_args()
+
+    generate_database(args.output, args.rows, args.seed, progress_callback=lambda n: print(f"{n} rows", flush=True))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,168 @@
+"""
+Timing and JSON reports shared by the benchmark scripts. Reports from
+different commits can be compared:
+
+    python -m benchmarks.report compare old.json new.json --threshold 0.1
+"""
+from typing import Dict, Any, Callable, Optional, List
+from datetime import datetime, timezone
+from pathlib import Path
+import statistics
+import subprocess
+import platform
+import argparse
+import json
+import time
+import sys
+
+REPORT_VERSION = 1
+
+
+def measure(fn: Callable[[], Any], repeat: int = 5, warmup: int = 1, items: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Time fn with perf_counter_ns
+    :param fn: Benchmarked call
+    :param repeat: Timed runs
+    :param warmup: Untimed runs before timing
+    :param items: Rows handled per run, adds a rows_per_s throughput
+    :return: Dict[str, Any] - Times in ms
+    """
+    for _ in range(warmup):
+        fn()
+
+    times: List[float] = []
+    for _ in range(repeat):
+        start = time.perf_counter_ns()
+        fn()
+        times.append((time.perf_counter_ns() - start) / 1e6)
+
+    return summarize(times, items)
+
+
+def summarize(times: List[float], items: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Statistics of a list of timings
+    :param times: Times in ms
+    :param items: Rows handled per run, adds a rows_per_s throughput
+    :return: Dict[str, Any] - Times in ms
+    """
+    ordered = sorted(times)
+    result = {
+        'runs': len(times),
+        'min_ms': ordered[0],
+        'median_ms': statistics.median(ordered),
+        'p95_ms': ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))],
+        'mean_ms': statistics.fmean(ordered),
+        'max_ms': ordered[-1],
+    }
+
+    if items is not None:
+        result['rows'] = items
+        result['rows_per_s'] = items / (result['median_ms'] / 1000) if result['median_ms'] else 0.0
+
+    return result
+
+
+def environment() -> Dict[str, Any]:
+    """Commit and platform details stored with every report"""
+    try:
+        commit = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, cwd=Path(__file__).parent
+        ).stdout.strip() or None
+    except OSError:
+        commit = None
+
+    try:
+        from importlib.metadata import version
+        ribbitxdb_version = version('ribbitxdb')
+    except Exception:
+        ribbitxdb_version = None
+
+    return {
+        'commit': commit,
+        'created_at': datetime.now(timezone.utc).isoformat(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'ribbitxdb': ribbitxdb_version,
+    }
+
+
+def write_report(path: str, suite: str, results: Dict[str, Any], parameters: Dict[str, Any]):
+    report = {
+        'version': REPORT_VERSION,
+        'suite': suite,
+        'environment': environment(),
+        'parameters': parameters,
+        'results': results,
+    }
+
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+
+
+def load_report(path: str) -> Dict[str, Any]:
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def compare_reports(old: Dict[str, Any], new: Dict[str, Any], threshold: float = 0.1) -> List[Dict[str, Any]]:
+    """
+    Compare median times of the benchmarks found in both reports
+    :param old: Baseline report
+    :param new: New report
+    :param threshold: Relative slowdown counted as a regression
+    :return: List[Dict[str, Any]] - One entry per benchmark
+    """
+    rows = []
+    for name, new_result in new['results'].items():
+        old_result = old['results'].get(name)
+        if not old_result:
+            continue
+
+        change = new_result['median_ms'] / old_result['median_ms'] - 1 if old_result['median_ms'] else 0.0
+        rows.append({
+            'name': name,
+            'old_ms': old_result['median_ms'],
+            'new_ms': new_result['median_ms'],
+            'change': change,
+            'regression': change > threshold,
+        })
+
+    return rows
+
+
+def print_results(results: Dict[str, Any], file=sys.stdout):
+    width = max((len(name) for name in results), default=0)
+    for name, result in results.items():
+        line = f"{name.ljust(width)}  median {result['median_ms']:10.2f} ms  min {result['min_ms']:10.2f} ms"
+        if 'rows_per_s' in result:
+            line += f"  {result['rows_per_s']:12,.0f} rows/s"
+        file.write(line + '\n')
+
+
+def print_comparison(rows: List[Dict[str, Any]], file=sys.stdout):
+    width = max((len(row['name']) for row in rows), default=0)
+    for row in rows:
+        flag = '  REGRESSION' if row['regression'] else ''
+        file.write(
+            f"{row['name'].ljust(width)}  {row['old_ms']:10.2f} ms -> {row['new_ms']:10.2f} ms  "
+            f"{row['change']:+7.1%}{flag}\n"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark reports")
+    commands = parser.add_subparsers(dest='command', required=True)
+    compare = commands.add_parser('compare', help="Compare two reports")
+    compare.add_argument('old')
+    compare.add_argument('new')
+    compare.add_argument('--threshold', type=float, default=0.1, help="Slowdown reported as a regression")
+    args = parser.parse_args()
+
+    rows = compare_reports(load_report(args.old), load_report(args.new), args.threshold)
+    print_comparison(rows)
+    sys.exit(1 if any(row['regression'] for row in rows) else 0)
+
+
+if __name__ == '__main__':
+    main()
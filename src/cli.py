@@ -0,0 +1,211 @@
+"""
+Command line access to .rbx files without starting the GUI. Only the Qt-free
+core is imported, so it starts fast and runs on servers without a display.
+
+    python -m src.cli data.rbx tables
+    python -m src.cli data.rbx describe users
+    python -m src.cli data.rbx query "SELECT * FROM users" --format jsonl -o users.jsonl
+    python -m src.cli data.rbx script migration.sql --transaction
+    python -m src.cli before.rbx diff after.rbx users -f csv -o users_diff.csv
+    python -m src.cli data.rbx query "SELECT * FROM events" -f csv -o events.csv --processes 2
+"""
+from src.core.export import EXPORT_FORMATS, write_rows
+from src.core.database_manager import DatabaseManager
+from src.core.sql_script import returns_rows
+from src.core.table_diff import TableDiff, diff_batches
+from src.core.process_backend import ProcessBackend
+from typing import List, Optional, TextIO
+from pathlib import Path
+import argparse
+import sys
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog='ribbitxdb-viewer', description="Query and export RibbitXDB databases")
+    parser.add_argument('database', help="Path to the .rbx database")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    commands.add_parser('tables', help="List tables")
+    commands.add_parser('views', help="List views")
+
+    describe = commands.add_parser('describe', help="Show the columns of a table or the SQL of a view")
+    describe.add_argument('name', help="Table or view name")
+
+    query = commands.add_parser('query', help="Run a statement and stream the result")
+    query.add_argument('sql', help="SQL statement")
+    _add_output_arguments(query)
+
+    script = commands.add_parser('script', help="Run a script file of statements")
+    script.add_argument('file', help="SQL script file")
+    script.add_argument('--transaction', action='store_true', help="Run the script inside one transaction")
+    script.add_argument('--continue-on-error', action='store_true', help="Keep going after a failing statement")
+    script.add_argument(
+        '--max-rows', type=int, default=0, help="Maximum rows fetched per statement, 0 fetches everything"
+    )
+    _add_output_arguments(script)
+
+    diff = commands.add_parser('diff', help="Compare a table with the same table in another database")
+    diff.add_argument('other', help="Database to compare with, rows only there are reported as added")
+    diff.add_argument('table', help="Table name")
+    diff.add_argument('--key', nargs='+', help="Columns to match rows by, defaults to the primary key")
+    _add_output_arguments(diff)
+
+    return parser
+
+
+def _add_output_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument('-f', '--format', choices=EXPORT_FORMATS, default='table', help="Output format")
+    parser.add_argument('-o', '--output', help="Write results to a file instead of stdout")
+    parser.add_argument('--batch-size', type=int, default=5000, help="Rows fetched per batch")
+    parser.add_argument(
+        '--processes', type=int, default=0,
+        help="Read rows in this many worker processes while this one writes, 0 reads in process"
+    )
+
+
+def run(args: argparse.Namespace, out: TextIO, err: TextIO) -> int:
+    """Run a parsed command, returns the exit code"""
+    if not Path(args.database).is_file():
+        # ribbitxdb.connect would create an empty database
+        err.write(f"Database not found: {args.database}\n")
+        return 1
+
+    db_manager = DatabaseManager(args.database)
+
+    match args.command:
+        case 'tables':
+            out.writelines(f"{name}\n" for name in db_manager.get_tables())
+        case 'views':
+            out.writelines(f"{name}\n" for name in db_manager.get_views())
+        case 'describe':
+            return _describe(db_manager, args.name, out, err)
+        case 'query':
+            return _with_output(args, out, lambda file: _query(db_manager, args, file, err))
+        case 'script':
+            return _with_output(args, out, lambda file: _script(db_manager, args, file, err))
+        case 'diff':
+            if not Path(args.other).is_file():
+                err.write(f"Database not found: {args.other}\n")
+                return 1
+            return _with_output(args, out, lambda file: _diff(db_manager, args, file, err))
+
+    return 0
+
+
+def _describe(db_manager: DatabaseManager, name: str, out: TextIO, err: TextIO) -> int:
+    if name in db_manager.get_views():
+        out.write(db_manager.get_view_schema(name).get('sql', '') + '\n')
+        return 0
+
+    if name not in db_manager.get_tables():
+        err.write(f"No table or view named {name}\n")
+        return 1
+
+    columns = ['column', 'type', 'not null', 'default', 'pk', 'ai', 'unique', 'check', 'foreign key']
+    rows = [
+        (
+            col['column_name'], col['column_type'], _flag(col['not_null']), col['default_value'] or '',
+            _flag(col['primary_key']), _flag(col['auto_increment']), _flag(col['unique_constraint']),
+            col['check_expression'] or '', col['foreign_key'] or ''
+        )
+        for col in db_manager.get_table_schema(name)
+    ]
+    write_rows([(columns, rows)], out, 'table')
+    return 0
+
+
+def _query(db_manager: DatabaseManager, args: argparse.Namespace, file: TextIO, err: TextIO) -> int:
+    if not returns_rows(args.sql):
+        result = db_manager.execute_query(args.sql)
+        err.write(f"{result.get('rows_affected', 0)} rows affected\n")
+        return 0
+
+    backend = ProcessBackend(args.processes) if args.processes else None
+    try:
+        if backend is not None:
+            batches = backend.iter_query(db_manager.db_path, args.sql, batch_size=args.batch_size)
+        else:
+            batches = db_manager.iter_query(args.sql, batch_size=args.batch_size)
+        count = write_rows(batches, file, args.format)
+    finally:
+        if backend is not None:
+            backend.close()
+
+    err.write(f"{count} rows\n")
+    return 0
+
+
+def _script(db_manager: DatabaseManager, args: argparse.Namespace, file: TextIO, err: TextIO) -> int:
+    with open(args.file, 'r', encoding='utf-8') as f:
+        sql = f.read()
+
+    data = db_manager.execute_script(
+        sql,
+        use_transaction=args.transaction,
+        stop_on_error=not args.continue_on_error,
+        max_rows=args.max_rows
+    )
+
+    for result in data['results']:
+        timing = f"execute {result['execute_time'] * 1000:.2f} ms, fetch {result['fetch_time'] * 1000:.2f} ms"
+        if result['error']:
+            err.write(f"-- {result['statement']}\n-- error: {result['error']}\n")
+        elif result['columns']:
+            err.write(f"-- {result['statement']}\n-- {result['total_rows']} rows ({timing})\n")
+            write_rows([(result['columns'], result['rows'])], file, args.format)
+        else:
+            err.write(f"-- {result['statement']}\n-- {result['rows_affected']} rows affected ({timing})\n")
+
+    if data['rolled_back']:
+        err.write("-- transaction rolled back\n")
+
+    return 1 if data['failed'] else 0
+
+
+def _diff(db_manager: DatabaseManager, args: argparse.Namespace, file: TextIO, err: TextIO) -> int:
+    # both sides are read at the same time when there are worker processes
+    backend = ProcessBackend(args.processes) if args.processes else None
+    try:
+        diff = TableDiff(db_manager, DatabaseManager(args.other), args.table, args.key, args.batch_size, backend)
+        write_rows(diff_batches(diff.rows(), diff.columns, len(diff.key_columns), args.batch_size), file, args.format)
+    finally:
+        if backend is not None:
+            backend.close()
+
+    summary = diff.summary()
+    err.write(
+        f"{summary['added']} added, {summary['removed']} removed, {summary['changed']} changed, "
+        f"{summary['unchanged']} unchanged\n"
+    )
+    for side, columns in (('left', summary['left_only_columns']), ('right', summary['right_only_columns'])):
+        if columns:
+            err.write(f"Only in the {side} table, not compared: {', '.join(columns)}\n")
+
+    # like diff(1), 1 when the tables differ
+    return 1 if summary['added'] or summary['removed'] or summary['changed'] else 0
+
+
+def _with_output(args: argparse.Namespace, out: TextIO, fn) -> int:
+    if not args.output:
+        return fn(out)
+
+    with open(args.output, 'w', encoding='utf-8', newline='') as f:
+        return fn(f)
+
+
+def _flag(value) -> str:
+    return 'yes' if value else ''
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+
+    try:
+        return run(args, sys.stdout, sys.stderr)
+    except Exception as e:
+        sys.stderr.write(f"Error: {e}\n")
+        return 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
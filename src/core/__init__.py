@@ -0,0 +1,2 @@
+from .database_manager import DatabaseManager
+from .viewer_db import query_viewer_db, init_viewer_db
\ No newline at end of file
@@ -0,0 +1,64 @@
+"""
+Snapshots of a database's tables, columns and views. Two snapshots are
+diffed so a refresh only touches the objects that changed instead of
+reloading every table schema.
+"""
+from typing import List, Dict, Any, Optional
+from .file_version import database_version
+
+
+def read_catalog(db_manager) -> Dict[str, Any]:
+    """
+    Tables with their columns and the views of a database
+    :param db_manager: DatabaseManager of the database
+    :return: Dict[str, Any] - version, tables (name -> schema) and views
+    """
+    # taken first, a write during the read leaves the snapshot stale rather than wrong
+    version = database_version(db_manager.db_path)
+
+    return {
+        'version': version,
+        'tables': {table_name: db_manager.get_table_schema(table_name) for table_name in db_manager.get_tables()},
+        'views': db_manager.get_views(),
+    }
+
+
+def refresh_catalog(db_manager, catalog: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """
+    Read the catalog again if the database changed since the snapshot
+    :param db_manager: DatabaseManager of the database
+    :param catalog: Previous snapshot, None reads it unconditionally
+    :return: Optional[Dict[str, Any]] - None when the file content is unchanged
+    """
+    if catalog is not None and database_version(db_manager.db_path) == catalog['version']:
+        return None
+
+    return read_catalog(db_manager)
+
+
+def diff_catalog(old: Dict[str, Any], new: Dict[str, Any]) -> Dict[str, List[str]]:
+    """
+    Objects that differ between two snapshots. A table is changed when its
+    columns or constraints differ
+    :param old: Previous snapshot
+    :param new: Current snapshot
+    :return: Dict[str, List[str]]
+    """
+    old_tables = old['tables']
+    new_tables = new['tables']
+    old_views = set(old['views'])
+    new_views = set(new['views'])
+
+    return {
+        'added_tables': [table for table in new_tables if table not in old_tables],
+        'removed_tables': [table for table in old_tables if table not in new_tables],
+        'changed_tables': [
+            table for table, columns in new_tables.items() if table in old_tables and old_tables[table] != columns
+        ],
+        'added_views': [view for view in new['views'] if view not in old_views],
+        'removed_views': [view for view in old['views'] if view not in new_views],
+    }
+
+
+def has_changes(changes: Dict[str, List[str]]) -> bool:
+    return any(changes.values())
@@ -0,0 +1,250 @@
+"""
+Column statistics: row and null counts, min/max, distinct count and the
+most common values. Exact mode counts every value. Approximate mode keeps
+memory bounded on huge tables, distinct values are estimated with a
+HyperLogLog sketch and the top values from a reservoir sample. ribbitxdb
+scans the table for any read, so every mode streams every row once, auto
+mode counts exactly and switches to the sketch when the table turns out
+to be large.
+"""
+from typing import List, Dict, Any, Optional, Callable, Tuple
+from .file_version import database_version
+from collections import Counter, OrderedDict
+import threading
+import hashlib
+import random
+import math
+import time
+
+MODE_AUTO = 'auto'
+MODE_EXACT = 'exact'
+MODE_APPROXIMATE = 'approximate'
+
+# tables up to this many rows are profiled exactly in auto mode
+EXACT_ROW_LIMIT = 100_000
+
+DEFAULT_SAMPLE_SIZE = 10_000
+DEFAULT_TOP_VALUES = 10
+HLL_PRECISION = 12
+
+# profiles kept by profile_column, keyed by database, table, column and mode
+MAX_CACHED_PROFILES = 128
+
+# key -> (database version, profile)
+_profiles: 'OrderedDict[Tuple[str, str, str, str, int], Tuple[str, Dict[str, Any]]]' = OrderedDict()
+_profiles_lock = threading.Lock()
+
+
+class HyperLogLog:
+    """
+    Distinct count estimate in 2^precision registers, the standard error is
+    about 1.04 / sqrt(2^precision), 1.6% at the default precision
+    """
+
+    def __init__(self, precision: int = HLL_PRECISION):
+        self.precision = precision
+        self.size = 1 << precision
+        self.registers = bytearray(self.size)
+
+    def add(self, value: Any):
+        digest = hashlib.blake2b(repr(value).encode('utf-8', 'surrogatepass'), digest_size=8).digest()
+        hashed = int.from_bytes(digest, 'big')
+        register = hashed >> (64 - self.precision)
+        rest = hashed & ((1 << (64 - self.precision)) - 1)
+        # position of the first set bit in the remaining bits
+        rank = (64 - self.precision) - rest.bit_length() + 1
+        if rank > self.registers[register]:
+            self.registers[register] = rank
+
+    def count(self) -> int:
+        alpha = 0.7213 / (1 + 1.079 / self.size)
+        estimate = alpha * self.size * self.size / sum(2.0 ** -register for register in self.registers)
+
+        zeros = self.registers.count(0)
+        if estimate <= 2.5 * self.size and zeros:
+            # linear counting is more accurate for small cardinalities
+            estimate = self.size * math.log(self.size / zeros)
+
+        return int(round(estimate))
+
+
+class Reservoir:
+    """Uniform sample of fixed size from a stream (algorithm R)"""
+
+    def __init__(self, size: int = DEFAULT_SAMPLE_SIZE, seed: Optional[int] = None):
+        self.size = size
+        self.seen = 0
+        self.items: List[Any] = []
+        self._random = random.Random(seed)
+
+    def add(self, value: Any):
+        self.seen += 1
+        if len(self.items) < self.size:
+            self.items.append(value)
+            return
+
+        slot = self._random.randrange(self.seen)
+        if slot < self.size:
+            self.items[slot] = value
+
+
+def profile_column(
+        db_manager,
+        table_name: str,
+        column_name: str,
+        mode: str = MODE_AUTO,
+        sample_size: int = DEFAULT_SAMPLE_SIZE,
+        top_values: int = DEFAULT_TOP_VALUES,
+        batch_size: int = 5000,
+        use_cache: bool = True,
+        backend=None,
+        progress_callback: Optional[Callable[[int], None]] = None,
+        is_cancelled: Optional[Callable[[], bool]] = None
+) -> Dict[str, Any]:
+    """
+    Statistics of one column. Results are cached until the database changes.
+    Safe to run on a worker thread
+    :param db_manager: DatabaseManager of the database
+    :param table_name: Table name
+    :param column_name: Column name
+    :param mode: auto, exact or approximate. Auto is exact up to EXACT_ROW_LIMIT rows
+    :param sample_size: Reservoir size for the top values in approximate mode
+    :param top_values: Number of most common values returned
+    :param batch_size: Rows fetched per batch
+    :param use_cache: Return a cached profile when the database is unchanged
+    :param backend: ProcessBackend to compute the profile in a worker process
+    :param progress_callback: Called with the number of rows read so far
+    :param is_cancelled: Polled between batches, raises RuntimeError when True
+    :return: Dict[str, Any]
+    """
+    if mode not in (MODE_AUTO, MODE_EXACT, MODE_APPROXIMATE):
+        raise ValueError(f"Unknown profile mode: {mode}")
+
+    key = (db_manager.db_path, table_name, column_name, mode, top_values)
+    # take the version first so writes during the scan leave the entry stale
+    version = database_version(db_manager.db_path)
+    with _profiles_lock:
+        if use_cache and key in _profiles and _profiles[key][0] == version:
+            _profiles.move_to_end(key)
+            return {**_profiles[key][1], 'cached': True}
+
+    args = (table_name, column_name, mode, sample_size, top_values, batch_size)
+    if backend is not None:
+        profile = backend.call(
+            _profile, db_manager.db_path, *args, progress_callback=progress_callback, is_cancelled=is_cancelled
+        )
+    else:
+        profile = _profile(db_manager, *args, progress_callback=progress_callback, is_cancelled=is_cancelled)
+
+    with _profiles_lock:
+        _profiles[key] = (version, profile)
+        _profiles.move_to_end(key)
+        while len(_profiles) > MAX_CACHED_PROFILES:
+            _profiles.popitem(last=False)
+
+    return profile
+
+
+def clear_profile_cache():
+    with _profiles_lock:
+        _profiles.clear()
+
+
+def _profile(
+        db_manager,
+        table_name: str,
+        column_name: str,
+        mode: str,
+        sample_size: int,
+        top_values: int,
+        batch_size: int,
+        progress_callback: Optional[Callable[[int], None]] = None,
+        is_cancelled: Optional[Callable[[], bool]] = None
+) -> Dict[str, Any]:
+    """Computes the profile, see profile_column"""
+    start = time.perf_counter()
+    # counting the rows first would be a scan of its own
+    resolved_mode = MODE_APPROXIMATE if mode == MODE_APPROXIMATE else MODE_EXACT
+    exact_limit = EXACT_ROW_LIMIT if mode == MODE_AUTO else None
+
+    exact = resolved_mode == MODE_EXACT
+    counts: Counter = Counter()
+    sketch = HyperLogLog()
+    reservoir = Reservoir(sample_size)
+    rows = 0
+    nulls = 0
+    minimum = None
+    maximum = None
+
+    for batch in db_manager.iter_table_rows(table_name, [column_name], batch_size):
+        if is_cancelled and is_cancelled():
+            raise RuntimeError("Column profile cancelled")
+
+        for (value,) in batch:
+            rows += 1
+            if exact and exact_limit is not None and rows > exact_limit:
+                _approximate(counts, sketch, reservoir)
+                counts = Counter()
+                exact = False
+                resolved_mode = MODE_APPROXIMATE
+
+            if value is None:
+                nulls += 1
+                continue
+
+            if minimum is None or _less(value, minimum):
+                minimum = value
+            if maximum is None or _less(maximum, value):
+                maximum = value
+
+            if exact:
+                counts[value] += 1
+            else:
+                sketch.add(value)
+                reservoir.add(value)
+
+        if progress_callback:
+            progress_callback(rows)
+
+    non_null = rows - nulls
+    if exact:
+        distinct = len(counts)
+        top = counts.most_common(top_values)
+    else:
+        distinct = min(sketch.count(), non_null)
+        # sample counts scaled to the column, estimates of the real counts
+        scale = non_null / len(reservoir.items) if reservoir.items else 0
+        top = [(value, int(round(count * scale))) for value, count in Counter(reservoir.items).most_common(top_values)]
+
+    return {
+        'table': table_name,
+        'column': column_name,
+        'mode': resolved_mode,
+        'exact': exact,
+        'row_count': rows,
+        'null_count': nulls,
+        'null_fraction': nulls / rows if rows else 0.0,
+        'min': minimum,
+        'max': maximum,
+        'distinct_count': distinct,
+        'top_values': top,
+        'sample_size': non_null if exact else len(reservoir.items),
+        'elapsed': time.perf_counter() - start,
+        'cached': False,
+    }
+
+
+def _approximate(counts: Counter, sketch: HyperLogLog, reservoir: Reservoir):
+    """Feed the values counted so far to the sketch and the reservoir, as if they were sampled from the start"""
+    for value, count in counts.items():
+        sketch.add(value)
+        for _ in range(count):
+            reservoir.add(value)
+
+
+def _less(a: Any, b: Any) -> bool:
+    """Ordering of values of possibly different types, numbers sort before text"""
+    try:
+        return a < b
+    except TypeError:
+        return (isinstance(a, (int, float)), str(a)) > (isinstance(b, (int, float)), str(b))
@@ -0,0 +1,310 @@
+"""
+Schema aware SQL completion. CompletionIndex reads the schema catalog of
+a database once into prefix tries of tables, views and columns, candidates
+for a cursor position are then found without touching the database. Table
+aliases are resolved from the statement under the cursor with a small
+tokenizer.
+"""
+from typing import List, Dict, Any, Optional, Tuple, Iterable, Callable
+from .sql_lexer import KEYWORDS
+import re
+
+# candidate kinds
+TABLE = 'table'
+VIEW = 'view'
+COLUMN = 'column'
+KEYWORD = 'keyword'
+
+DEFAULT_LIMIT = 50
+
+# keywords followed by a table name
+_TABLE_KEYWORDS = frozenset(["FROM", "JOIN", "INTO", "UPDATE", "TABLE"])
+
+# keywords ending the table list of a FROM clause
+_CLAUSE_KEYWORDS = frozenset([
+    "WHERE", "GROUP", "ORDER", "HAVING", "LIMIT", "OFFSET", "UNION", "INTERSECT",
+    "EXCEPT", "ON", "SET", "VALUES", "SELECT", "INNER", "LEFT", "RIGHT", "OUTER",
+    "FULL", "JOIN", "CROSS", "NATURAL", "USING",
+])
+
+_TOKEN = re.compile(r"""
+    (?P<space>\s+)
+  | (?P<comment>--[^\n]*|/\*.*?(?:\*/|$))
+  | (?P<string>'(?:[^']|'')*'?)
+  | (?P<word>[A-Za-z_][A-Za-z0-9_$]*)
+  | (?P<quoted>"(?:[^"]|"")*"?|`(?:[^`]|``)*`?)
+  | (?P<punct>.)
+""", re.VERBOSE | re.DOTALL)
+
+# statement boundaries, quotes and comments are matched so their semicolons are skipped
+_BOUNDARY = re.compile(r"""'(?:[^']|'')*'?|"(?:[^"]|"")*"?|`(?:[^`]|``)*`?|--[^\n]*|/\*.*?(?:\*/|$)|;""", re.DOTALL)
+
+_PREFIX = re.compile(r"[A-Za-z_][A-Za-z0-9_$]*\Z")
+
+Candidate = Tuple[str, str]
+Token = Tuple[str, str]
+
+
+class CompletionTrie:
+    """Case insensitive prefix trie, each node is [children, candidates]"""
+
+    def __init__(self):
+        self._root: list = [{}, []]
+        self.size = 0
+
+    def insert(self, text: str, kind: str):
+        node = self._root
+        for char in text.lower():
+            node = node[0].setdefault(char, [{}, []])
+
+        if (text, kind) not in node[1]:
+            node[1].append((text, kind))
+            self.size += 1
+
+    def complete(self, prefix: str, limit: int = DEFAULT_LIMIT) -> List[Candidate]:
+        """
+        Candidates starting with prefix, shortest first then alphabetical
+        :param prefix: Typed prefix, any case
+        :param limit: Maximum candidates returned
+        :return: List[Candidate] - (text, kind)
+        """
+        node = self._root
+        for char in prefix.lower():
+            node = node[0].get(char)
+            if node is None:
+                return []
+
+        # breadth first so short names come first, the walk stops at limit
+        results: List[Candidate] = []
+        level = [node]
+        while level and len(results) < limit:
+            next_level = []
+            for current in level:
+                results.extend(current[1])
+                for char in sorted(current[0]):
+                    next_level.append(current[0][char])
+            level = next_level
+
+        return results[:limit]
+
+
+class CompletionIndex:
+    """Identifiers of one database, built once and refreshed after DDL"""
+
+    def __init__(self):
+        self.tables: Dict[str, str] = {}
+        self.views: Dict[str, str] = {}
+        # lower case table name -> column names
+        self.columns: Dict[str, List[str]] = {}
+        self.names = CompletionTrie()
+        self.all_columns = CompletionTrie()
+        self.keywords = CompletionTrie()
+        self._column_tries: Dict[str, CompletionTrie] = {}
+
+        for keyword in KEYWORDS:
+            self.keywords.insert(keyword, KEYWORD)
+
+    @classmethod
+    def build(cls, db_manager, is_cancelled: Optional[Callable[[], bool]] = None) -> 'CompletionIndex':
+        """
+        Read the schema catalog of a database. Safe to run on a worker thread
+        :param db_manager: DatabaseManager of the database
+        :param is_cancelled: Polled between tables, stops the build when True
+        :return: CompletionIndex
+        """
+        index = cls()
+        for view in db_manager.get_views():
+            index.add_view(view)
+
+        for table in db_manager.get_tables():
+            if is_cancelled and is_cancelled():
+                break
+            index.add_table(table, [column['column_name'] for column in db_manager.get_table_schema(table)])
+
+        return index
+
+    def add_table(self, table: str, columns: Iterable[str]):
+        self.tables[table.lower()] = table
+        self.names.insert(table, TABLE)
+
+        trie = CompletionTrie()
+        self.columns[table.lower()] = list(columns)
+        for column in self.columns[table.lower()]:
+            trie.insert(column, COLUMN)
+            self.all_columns.insert(column, COLUMN)
+        self._column_tries[table.lower()] = trie
+
+    def add_view(self, view: str):
+        self.views[view.lower()] = view
+        self.names.insert(view, VIEW)
+
+    def column_count(self) -> int:
+        return sum(len(columns) for columns in self.columns.values())
+
+    def complete(self, text: str, position: int, limit: int = DEFAULT_LIMIT) -> Dict[str, Any]:
+        """
+        Completion candidates at a cursor position
+        :param text: Editor text
+        :param position: Cursor position in text
+        :param limit: Maximum candidates returned
+        :return: Dict[str, Any] - prefix (the word being replaced) and
+        candidates, a list of (text, kind)
+        """
+        statement, offset = statement_at(text, position)
+        before = statement[:offset]
+
+        tokens = tokenize(before)
+        # nothing to complete inside a string or comment
+        if tokens and tokens[-1][0] in ('string', 'comment') and before.endswith(tokens[-1][1]) and not _closed(tokens[-1]):
+            return {'prefix': '', 'candidates': []}
+
+        match = _PREFIX.search(before)
+        prefix = match.group() if match else ''
+        if prefix and tokens:
+            tokens = tokens[:-1]
+
+        context = _context(tokens)
+        if context == 'qualified':
+            qualifier = _identifier(tokens[-2][1])
+            aliases = resolve_aliases(statement)
+            table = aliases.get(qualifier.lower(), qualifier).lower()
+            trie = self._column_tries.get(table)
+            return {'prefix': prefix, 'candidates': trie.complete(prefix, limit) if trie else []}
+
+        if context == 'table':
+            sources = [self.names]
+        else:
+            # columns of the tables in the statement come first
+            sources = [
+                self._column_tries[table.lower()]
+                for table in dict.fromkeys(resolve_aliases(statement).values())
+                if table.lower() in self._column_tries
+            ]
+            if not prefix and not sources:
+                return {'prefix': prefix, 'candidates': []}
+            sources += [self.keywords, self.names]
+            if prefix:
+                sources.append(self.all_columns)
+
+        candidates: List[Candidate] = []
+        seen = set()
+        for source in sources:
+            for candidate in source.complete(prefix, limit):
+                if candidate[0] not in seen:
+                    seen.add(candidate[0])
+                    candidates.append(candidate)
+            if len(candidates) >= limit:
+                break
+
+        return {'prefix': prefix, 'candidates': candidates[:limit]}
+
+
+def tokenize(text: str) -> List[Token]:
+    """
+    Tokens of a statement without whitespace
+    :param text: Statement text
+    :return: List[Token] - (kind, value) with kind word, quoted, string,
+    comment or punct. Quoted identifiers keep their quotes
+    """
+    return [(match.lastgroup, match.group()) for match in _TOKEN.finditer(text) if match.lastgroup != 'space']
+
+
+def statement_at(text: str, position: int) -> Tuple[str, int]:
+    """
+    Statement containing a position, statements are separated by
+    semicolons outside of quotes and comments
+    :param text: Script text
+    :param position: Position in text
+    :return: Tuple[str, int] - statement text and the position in it
+    """
+    start = 0
+    end = len(text)
+    for match in _BOUNDARY.finditer(text):
+        if match.group() != ';':
+            continue
+        if match.start() < position:
+            start = match.end()
+        else:
+            end = match.start()
+            break
+
+    return text[start:end], position - start
+
+
+def resolve_aliases(statement: str) -> Dict[str, str]:
+    """
+    Tables referenced by a statement by the names they are referred to with
+    :param statement: Statement text
+    :return: Dict[str, str] - lower case alias or table name -> table name
+    """
+    tokens = [token for token in tokenize(statement) if token[0] != 'comment']
+    aliases: Dict[str, str] = {}
+    in_from = False
+    idx = 0
+
+    while idx < len(tokens):
+        kind, value = tokens[idx]
+        upper = value.upper() if kind == 'word' else ''
+
+        if upper in _TABLE_KEYWORDS or (in_from and value == ','):
+            in_from = upper in ('FROM', 'JOIN') or (in_from and value == ',')
+            idx += 1
+            if idx < len(tokens) and tokens[idx][0] in ('word', 'quoted') and not _is_keyword(tokens[idx][1]):
+                table = _identifier(tokens[idx][1])
+                aliases.setdefault(table.lower(), table)
+                idx += 1
+
+                if idx < len(tokens) and tokens[idx][1].upper() == 'AS':
+                    idx += 1
+                if idx < len(tokens) and tokens[idx][0] in ('word', 'quoted') and not _is_keyword(tokens[idx][1]):
+                    aliases[_identifier(tokens[idx][1]).lower()] = table
+                    idx += 1
+            continue
+
+        if upper in _CLAUSE_KEYWORDS or value in ('(', ')', ';'):
+            in_from = False
+        idx += 1
+
+    return aliases
+
+
+def _is_keyword(value: str) -> bool:
+    return value.upper() in KEYWORDS or value.upper() in _CLAUSE_KEYWORDS
+
+
+def _identifier(value: str) -> str:
+    if value[0] in '"`':
+        quote = value[0]
+        return value[1:-1].replace(quote * 2, quote) if len(value) > 1 and value[-1] == quote else value[1:]
+
+    return value
+
+
+def _closed(token: Token) -> bool:
+    kind, value = token
+    if kind == 'comment':
+        return value.startswith('/*') and value.endswith('*/') and len(value) >= 4
+    return len(value) >= 2 and value.endswith("'") and value.count("'") % 2 == 0
+
+
+def _context(tokens: List[Token]) -> str:
+    """qualified after 'name.', table after FROM/JOIN/... or a comma in a FROM list, else expression"""
+    if len(tokens) >= 2 and tokens[-1][1] == '.' and tokens[-2][0] in ('word', 'quoted'):
+        return 'qualified'
+
+    for kind, value in reversed(tokens):
+        if kind != 'word' and value != ',':
+            return 'expression'
+
+        upper = value.upper()
+        if upper in _TABLE_KEYWORDS:
+            return 'table'
+        if value == ',' or upper == 'AS':
+            continue
+        if upper in KEYWORDS:
+            return 'expression'
+        # a table in a FROM list followed by a comma, keep looking back
+        if tokens and tokens[-1][1] != ',':
+            return 'expression'
+
+    return 'expression'
@@ -1,8 +1,47 @@
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Iterator, Iterable, Tuple, Callable, Sequence
+from .query_builder import build_paginated_select, build_count_select, validate_identifier
+from .result_cache import ResultCache, DEFAULT_MAX_BYTES
+from .sql_script import split_statements, iter_file_statements, returns_rows, statement_type
+from .statement_cache import StatementCache
+from .file_version import database_generation
+from .column_profile import Reservoir
+from .result_cursor import ResultCursor
+from .db_lock import database_lock, LockedConnection
+from .projection import preview_rows
+from .profiling import profiler, profiled
+from . import query_plan
 from pathlib import Path
 import ribbitxdb
+import random
+import math
 import time
 
+# row count results kept by execute_script_file, result sets and errors are always kept
+MAX_SCRIPT_MESSAGES = 1000
+
+# statement text kept per execute_script_file result
+MAX_MESSAGE_STATEMENT = 500
+
+# share of the primary key range that has to exist for key range sampling,
+# sparser keys would need too many lookups and fall back to a scan
+MIN_KEY_DENSITY = 0.01
+
+# rounds of key lookups before key range sampling gives up
+MAX_SAMPLE_ROUNDS = 8
+
+# keys looked up per IN list while sampling. ribbitxdb has no index access
+# path, so every lookup is a full scan, and key range sampling is only
+# used when the keys it draws fit in one lookup
+SAMPLE_LOOKUP_SIZE = 500
+
+# keys drawn per wanted row over the share of the range that exists
+KEY_DRAW_MARGIN = 1.2
+
+
+def _key_draws(rows: int, density: float) -> int:
+    """Keys to draw from the primary key range to find about rows existing rows"""
+    return math.ceil(rows / density * KEY_DRAW_MARGIN) + 1
+
 
 class DatabaseManager:
     """Handles DB interactions"""
@@ -10,84 +49,99 @@ class DatabaseManager:
     def __init__(self, db_path: str):
         self.db_path = Path(db_path).as_posix()
         self.db_name = self.db_path.split("/")[-1]
+        self.result_cache: Optional[ResultCache] = None
+        self.statement_cache = StatementCache()
+
+    def enable_result_cache(self, max_bytes: int = DEFAULT_MAX_BYTES):
+        """Cache SELECT results from execute_query, bounded to max_bytes"""
+        if self.result_cache is None:
+            self.result_cache = ResultCache(max_bytes)
+        else:
+            self.result_cache.max_bytes = max_bytes
+
+    def disable_result_cache(self):
+        self.result_cache = None
+
+    def invalidate_result_cache(self):
+        """Drop cached results, called after every write through the manager"""
+        if self.result_cache is not None:
+            self.result_cache.clear()
 
     # CUD operations
+    @profiled(category='database')
     def insert_row(self, table_name: str, row: Dict[str, Any]):
         """Insert row into specified table"""
-        connection = self._get_connection()
-        cursor = connection.cursor()
         columns = list(row.keys())
         values = list(row.values())
-
         query = f"INSERT INTO {table_name} ({", ".join(columns)}) VALUES ({", ".join(['?' for _ in values])})"
-        cursor.execute(query, values)
-        connection.commit()
-        connection.close()
 
+        connection = self._get_connection()
+        try:
+            self.statement_cache.execute(connection.cursor(), query, values)
+            connection.commit()
+        finally:
+            connection.close()
+        self.invalidate_result_cache()
+
+    @profiled(category='database')
     def update_row(self, table_name: str, row: Dict[str, Any], id: int):
         """Update row based on specified pk column"""
-        connection = self._get_connection()
-        cursor = connection.cursor()
         columns = list(row.keys())
         values = list(row.values()) + [id]
-
         set_clause = ','.join([f"{col} = ?" for col in columns])
         query = f"UPDATE {table_name} SET {set_clause} WHERE 'id' = ?"
-        cursor.execute(query, values)
-        connection.commit()
-        connection.close()
 
+        connection = self._get_connection()
+        try:
+            connection.cursor().execute(query, values)
+            connection.commit()
+        finally:
+            connection.close()
+        self.invalidate_result_cache()
+
+    @profiled(category='database')
     def delete_row(self, table_name: str, id: int):
         """Delete row based on id"""
-        connection = self._get_connection()
-        cursor = connection.cursor()
         query = f"DELETE FROM {table_name} WHERE 'id' = ?"
-        cursor.execute(query, (id,))
-        connection.commit()
-        connection.close()
 
+        connection = self._get_connection()
+        try:
+            connection.cursor().execute(query, (id,))
+            connection.commit()
+        finally:
+            connection.close()
+        self.invalidate_result_cache()
+
+    @profiled(category='database')
     def get_tables(self) -> List[str]:
         """Returns a list of table names"""
-        connection = self._get_connection()
-        cursor = connection.cursor()
-        query = cursor.execute("SELECT name FROM __ribbit_tables WHERE type='table'")
-        res = query.fetchall()
+        res = self._fetch_all("SELECT name FROM __ribbit_tables WHERE type='table'")
         tables = []
 
         for row in res:
             tables.append(row[0])
 
-        cursor.close()
-        connection.close()
-
         return tables
 
+    @profiled(category='database')
     def get_views(self) -> List[str]:
         """Get list of all views in database"""
-        connection = self._get_connection()
-        cursor = connection.cursor()
-        query = cursor.execute("SELECT name, created_at FROM __ribbit_views ORDER BY created_at DESC")
-        res = query.fetchall()
+        res = self._fetch_all("SELECT name, created_at FROM __ribbit_views ORDER BY created_at DESC")
         views = []
 
         for row in res:
             views.append(row[0])
 
-        cursor.close()
-        connection.close()
-
         return views
 
+    @profiled(category='database')
     def get_table_schema(self, table_name: str) -> List[Dict[str, Any]]:
         """
         Returns schema from table name
         :param table_name: Table name
         :return: List[Dict[str, Any]]
         """
-        connection = self._get_connection()
-        cursor = connection.cursor()
-        query = cursor.execute("PRAGMA table_info(?)", (table_name,))
-        res = query.fetchall()
+        res = self._fetch_all("PRAGMA table_info(?)", (table_name,))
         schemas: List[Dict[str, Any]] = []
 
         for row in res:
@@ -106,92 +160,69 @@ class DatabaseManager:
 
             schemas.append(schema)
 
-        cursor.close()
-        connection.close()
-
         return schemas
 
+    @profiled(category='database')
     def get_view_schema(self, view_name: str) -> Dict[str, Any]:
         """
         Returns schema from view name
         :param view_name:
         :return: Dict[str, Any]
         """
-        connection = self._get_connection()
-        cursor = connection.cursor()
-        query = cursor.execute("SELECT sql, created_at FROM __ribbit_views WHERE name = ?", (view_name,))
-        res = query.fetchone()
+        res = self._fetch_all("SELECT sql, created_at FROM __ribbit_views WHERE name = ?", (view_name,))
 
         if not res:
             return {}
 
         schema: Dict[str, Any] = {
-            'sql': res[0],
-            'created_at': res[1],
+            'sql': res[0][0],
+            'created_at': res[0][1],
         }
 
-        cursor.close()
-        connection.close()
-
         return schema
 
-    def get_table_data_paginated(self, table_name: str, page: int = 1, page_size: int = 100, filters: Optional[Dict] = None) -> Dict[str, Any]:
+    @profiled(category='database')
+    def get_table_data_paginated(
+            self,
+            table_name: str,
+            page: int = 1,
+            page_size: int = 100,
+            filters: Optional[Dict] = None,
+            columns: Optional[List[str]] = None,
+            preview_chars: int = 0
+    ) -> Dict[str, Any]:
         """
         Returns paginated data from the selected table
         :param table_name: Table name
         :param page: Page number (1-indexed)
         :param page_size: Number of rows per page
-        :param filters: Filters for searching and sorting
+        :param filters: Filters for searching and sorting. Search values are
+            bound as parameters, see query_builder for the match types
+        :param columns: Columns to select, all of them when None. Filters and
+            sorting may use columns that aren't selected
+        :param preview_chars: Longest TEXT or BLOB value kept whole, longer
+            ones become a CellPreview to look up with get_cell_value. 0 keeps all
         :return: Dict[str, Any]
         """
-        connection = self._get_connection()
         offset = (page - 1) * page_size
+        query, params = build_paginated_select(table_name, filters, page_size, offset, columns)
+
+        connection = self._get_connection()
         cursor = connection.cursor()
-        query = f"{table_name}"
-
-        if filters:
-            # apply search filters first
-            if columns := filters.get("columns", None):
-                query += " WHERE "
-                final_filters = []
-                for column in columns:
-                    col, val = column.get("condition")
-                    filter_type = column.get("type")
-
-                    match filter_type:
-                        case "EQUALS":
-                            # id = 1
-                            final_filters.append(f"{col} = {val}")
-                        case "LIKE":
-                            # text LIKE '%text%'
-                            final_filters.append(f"{col} LIKE '%{val}%'")
-                        case _:
-                            raise ValueError(f"Invalid filter type: {filter_type}")
-
-                filter_string = " OR ".join(final_filters)
-                query += f"{filter_string}"
-
-            # apply sort after
-            if sorting := filters.get("sorting", None):
-                column = sorting.get("column")
-                order = sorting.get("order")
-
-                query += f" ORDER BY {column} {order}"
-
-        count_query = cursor.execute(f" SELECT COUNT(*) FROM {table_name}")
-        total_rows = count_query.fetchone()[0]
-
-        query = cursor.execute(
-            f"SELECT * FROM {query} LIMIT ? OFFSET ?",
-            (page_size, offset)
-        )
-        columns = [desc[0] for desc in cursor.description] if cursor.description else []
-        if columns[0] == "count_*":
-            columns.pop()
-        rows = query.fetchall()
+        try:
+            count_query = self.statement_cache.execute(cursor, f" SELECT COUNT(*) FROM {table_name}")
+            total_rows = count_query.fetchone()[0]
+
+            query = self.statement_cache.execute(cursor, query, params)
+            columns = [desc[0] for desc in cursor.description] if cursor.description else []
+            if columns[0] == "count_*":
+                columns.pop()
+            rows = query.fetchall()
+        finally:
+            cursor.close()
+            connection.close()
 
-        cursor.close()
-        connection.close()
+        rows = preview_rows(rows, preview_chars)
 
         return {
             'columns': columns,
@@ -200,96 +231,600 @@ class DatabaseManager:
             'displayed_rows': len(rows)
         }
 
-    def delete_table(self, table_name: str):
+    @profiled(category='database')
+    def get_table_sample(self, table_name: str, sample_size: int = 100, seed: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Returns uniformly random rows of a table. With an integer primary key,
+        keys are drawn between its MIN and MAX and looked up, keys missing
+        from gaps are drawn again. Other tables, and samples whose keys don't
+        fit in one lookup, are sampled with a reservoir over a streamed scan
+        :param table_name: Table name
+        :param sample_size: Number of rows
+        :param seed: Random seed, the same seed returns the same sample of unchanged data
+        :return: Dict[str, Any] - like get_table_data_paginated, plus
+        sample_method (pk_range or reservoir) and seed
+        """
+        rng = random.Random(seed)
+        schema = self.get_table_schema(table_name)
+        pk_column = next(
+            (x['column_name'] for x in schema if x['primary_key'] and str(x['column_type']).upper().startswith('INT')),
+            None
+        )
+
         connection = self._get_connection()
         cursor = connection.cursor()
-        cursor.execute(f"DROP TABLE {table_name}")
-        cursor.close()
-        connection.commit()
-        connection.close()
 
-    def delete_view(self, view_name: str):
+        try:
+            if pk_column:
+                column = validate_identifier(pk_column)
+                query = self.statement_cache.execute(
+                    cursor, f"SELECT COUNT(*), MIN({column}), MAX({column}) FROM {validate_identifier(table_name)}"
+                )
+                total_rows, low, high = query.fetchone()
+            else:
+                query = self.statement_cache.execute(cursor, f"SELECT COUNT(*) FROM {validate_identifier(table_name)}")
+                total_rows, low, high = query.fetchone()[0], None, None
+
+            columns = [x['column_name'] for x in schema]
+            rows = None
+            sample_method = 'pk_range'
+            # each lookup scans the table like the reservoir does, so a
+            # sample needing more than one is cheaper as a reservoir
+            density = total_rows / (high - low + 1) if pk_column and total_rows else 0
+            if density >= MIN_KEY_DENSITY and \
+                    _key_draws(min(sample_size, total_rows), density) <= SAMPLE_LOOKUP_SIZE:
+                rows = self._sample_by_key(
+                    cursor, table_name, pk_column, columns.index(pk_column), low, high,
+                    min(sample_size, total_rows), total_rows, rng
+                )
+        finally:
+            cursor.close()
+            connection.close()
+
+        if rows is None:
+            sample_method = 'reservoir'
+            reservoir = Reservoir(sample_size, seed=rng.random())
+            for batch in self.iter_table_rows(table_name, columns):
+                for row in batch:
+                    reservoir.add(row)
+            rows = reservoir.items
+
+        return {
+            'columns': columns,
+            'rows': rows,
+            'total_rows': total_rows,
+            'displayed_rows': len(rows),
+            'sample_method': sample_method,
+            'seed': seed,
+        }
+
+    def _sample_by_key(
+            self,
+            cursor,
+            table_name: str,
+            pk_column: str,
+            pk_index: int,
+            low: int,
+            high: int,
+            sample_size: int,
+            total_rows: int,
+            rng: random.Random
+    ) -> Optional[List[tuple]]:
+        """Rows with randomly drawn keys, None when too many keys are gaps"""
+        density = total_rows / (high - low + 1)
+        found: Dict[int, tuple] = {}
+        tried = set()
+        select = f"SELECT * FROM {validate_identifier(table_name)} WHERE {validate_identifier(pk_column)} IN "
+
+        for _ in range(MAX_SAMPLE_ROUNDS):
+            missing = sample_size - len(found)
+            if missing <= 0:
+                break
+
+            # draw enough keys to cover the expected gaps
+            wanted = min(_key_draws(missing, density), high - low + 1 - len(tried))
+            if wanted <= 0:
+                break
+            keys = set()
+            while len(keys) < wanted:
+                key = rng.randint(low, high)
+                if key not in tried:
+                    keys.add(key)
+            tried |= keys
+
+            keys = sorted(keys)
+            for start in range(0, len(keys), SAMPLE_LOOKUP_SIZE):
+                lookup = keys[start:start + SAMPLE_LOOKUP_SIZE]
+                query = self.statement_cache.execute(cursor, select + f"({', '.join('?' for _ in lookup)})", lookup)
+                for row in query.fetchall():
+                    found[row[pk_index]] = row
+
+        if len(found) < sample_size:
+            return None
+
+        # the found keys are a uniform subset, so is a random subset of them
+        keys = sorted(rng.sample(sorted(found), sample_size))
+        return [found[key] for key in keys]
+
+    @profiled(category='database')
+    def count_table_rows(self, table_name: str, filters: Optional[Dict] = None) -> int:
+        """
+        Returns the number of rows matching the search filters
+        :param table_name: Table name
+        :param filters: Filters for searching
+        :return: int
+        """
+        # search index matches are already counted
+        if filters and (keys := filters.get("keys", None)):
+            return len(keys.get("values", []))
+
+        query, params = build_count_select(table_name, filters)
+        return self._fetch_all(query, params)[0][0]
+
+    @profiled(category='database')
+    def get_cell_value(self, table_name: str, column: str, key_column: str, key_value: Any) -> Any:
+        """
+        Returns the full value of one cell, for values shown as a preview
+        :param table_name: Table name
+        :param column: Column of the value
+        :param key_column: Primary key column
+        :param key_value: Primary key of the row
+        :return: Any
+        """
+        rows = self._fetch_all(
+            f"SELECT {validate_identifier(column)} FROM {validate_identifier(table_name)} WHERE {validate_identifier(key_column)} = ?",
+            [key_value]
+        )
+
+        if not rows:
+            raise ValueError(f"No row with {key_column} = {key_value!r} in {table_name}")
+        return rows[0][0]
+
+    def iter_table_rows(self, table_name: str, columns: List[str], batch_size: int = 5000) -> Iterator[List[tuple]]:
+        """
+        Yields batches of rows for the given columns of a table
+        :param table_name: Table name
+        :param columns: Columns to select
+        :param batch_size: Number of rows per batch
+        :return: Iterator[List[tuple]]
+        """
+        select_list = ", ".join(validate_identifier(col) for col in columns)
+        connection = self._get_connection()
+        cursor = connection.cursor()
+
+        try:
+            query = self.statement_cache.execute(cursor, f"SELECT {select_list} FROM {validate_identifier(table_name)}")
+        finally:
+            # the result is built at execute and read without the connection,
+            # so the database isn't locked while the caller works on batches
+            connection.close()
+
+        try:
+            while rows := query.fetchmany(batch_size):
+                yield rows
+        finally:
+            cursor.close()
+
+    def iter_query(
+            self,
+            sql: str,
+            params: Optional[tuple] = None,
+            batch_size: int = 5000
+    ) -> Iterator[Tuple[List[str], List[tuple]]]:
+        """
+        Yields (columns, rows) batches of a query's result, for exports that
+        shouldn't build the whole result in memory. Writes are committed
+        and yield nothing
+        :param sql: SQL query
+        :param params: Bound parameters
+        :param batch_size: Number of rows per batch
+        :return: Iterator[Tuple[List[str], List[tuple]]]
+        """
         connection = self._get_connection()
         cursor = connection.cursor()
-        cursor.execute(f"DROP VIEW {view_name}")
-        cursor.close()
-        connection.commit()
-        connection.close()
 
-    def execute_query(self, sql: str, max_rows: int = 5000) -> Dict[str, Any]:
+        try:
+            query = self.statement_cache.execute(cursor, sql, params)
+            if not returns_rows(sql):
+                connection.commit()
+        finally:
+            # like iter_table_rows, rows are read after the connection closed
+            connection.close()
+
+        if not returns_rows(sql):
+            cursor.close()
+            self.invalidate_result_cache()
+            return
+
+        try:
+            columns = [desc[0] for desc in query.description or []]
+            while rows := query.fetchmany(batch_size):
+                yield columns, rows
+        finally:
+            cursor.close()
+
+    @profiled(category='database')
+    def delete_table(self, table_name: str):
+        connection = self._get_connection()
+        try:
+            connection.cursor().execute(f"DROP TABLE {table_name}")
+            connection.commit()
+        finally:
+            connection.close()
+        self.invalidate_result_cache()
+
+    @profiled(category='database')
+    def delete_view(self, view_name: str):
+        connection = self._get_connection()
+        try:
+            connection.cursor().execute(f"DROP VIEW {view_name}")
+            connection.commit()
+        finally:
+            connection.close()
+        self.invalidate_result_cache()
+
+    @profiled(category='database')
+    def execute_query(self, sql: str, max_rows: int = 5000, params: Optional[tuple] = None, keep_cursor: bool = False) -> Dict[str, Any]:
         """
-        Executes arbitrary query
+        Executes arbitrary query. execution_time covers execute and fetch,
+        timings breaks it down in milliseconds: connect, execute, first_row
+        (execute until the first row is fetched), fetch (execute until every
+        row is fetched) and total. With the result cache enabled, SELECT
+        results are served from it while the database file is unchanged
         :param sql: SQL query
         :param max_rows: Maximum number of rows to fetch
+        :param params: Bound parameters
+        :param keep_cursor: Return a ResultCursor for the rest of a truncated result as 'cursor'
         :return: Dict[str, Any]
         """
+        start_timestamp = time.time()
+        cache_key = None
+
+        if self.result_cache is not None and statement_type(sql) == 'SELECT':
+            start = time.perf_counter_ns()
+            cache_key = ResultCache.make_key(sql, params, database_generation(self.db_path), max_rows)
+            cached = self.result_cache.get(cache_key)
 
+            # a cached result has no cursor to continue from
+            if cached is not None and not (keep_cursor and cached['truncated']):
+                elapsed = time.perf_counter_ns() - start
+                return {
+                    **cached,
+                    # viewers sort rows in place
+                    'rows': list(cached['rows']),
+                    'cached': True,
+                    'execution_time': elapsed / 1e9,
+                    'execution_timestamp': start_timestamp,
+                    'timings': {'cache': elapsed / 1e6, 'total': elapsed / 1e6}
+                }
+
+        start = time.perf_counter_ns()
         connection = self._get_connection()
+        connected = time.perf_counter_ns()
         cursor = connection.cursor()
-        start_time = time.time()
-        query = cursor.execute(sql)
-        end_time = time.time()
-        execution_time = end_time - start_time
-
-        time_data = {
-            'execution_time': execution_time,
-            'execution_timestamp': start_time
-        }
 
-        if query.description:
-            # This is a SELECT query
-            columns = [desc[0] for desc in query.description]
+        try:
+            query = cursor.execute(sql, tuple(params)) if params else cursor.execute(sql)
+            executed = time.perf_counter_ns()
+
+            if query.description:
+                # This is a SELECT query
+                columns = [desc[0] for desc in query.description]
+
+                first_row = query.fetchone()
+                first_row_fetched = time.perf_counter_ns()
+                rows = [first_row] if first_row is not None else []
+
+                if max_rows > 0:
+                    rows += query.fetchmany(max_rows)
+                # For this case, we could allow the user to do a fetch all
+                # for big tables however, since the rows are loaded into memory
+                # it could be an issue
+                else:
+                    rows += query.fetchall()
+
+                fetched = time.perf_counter_ns()
+            else:
+                # INSERT/UPDATE/DELETE query
+                row_count = query.rowcount
+                connection.commit()
+                # the write isn't done until it's committed
+                executed = time.perf_counter_ns()
+        except Exception:
+            cursor.close()
+            raise
+        finally:
+            connection.close()
 
-            if max_rows > 0:
-                rows = query.fetchmany(max_rows + 1)
+        if query.description:
+            if profiler.enabled:
+                # engine time against row conversion while fetching
+                profiler.record('engine.execute', 'engine', connected, executed)
+                profiler.record('engine.fetch', 'engine', executed, fetched, {'rows': len(rows)})
+
+            # Truncate rows
+            has_more = max_rows > 0 and len(rows) > max_rows
+            result_cursor = None
+            if has_more:
+                if keep_cursor:
+                    # the cursor reads the result from memory, the connection isn't needed
+                    result_cursor = ResultCursor(cursor, columns, max_rows, rows[max_rows:])
+                rows = rows[:max_rows]
+            if result_cursor is None:
                 cursor.close()
-                connection.close()
 
-                # Truncate rows
-                has_more = len(rows) > max_rows
-                if has_more:
-                    rows = rows[:max_rows]
+            result = {
+                'columns': columns,
+                'rows': rows,
+                'total_rows': len(rows),
+                'truncated': has_more,
+                'cached': False,
+                **self._time_data(start_timestamp, start, connected, executed, first_row_fetched, fetched)
+            }
 
-                return {
-                    'columns': columns,
-                    'rows': rows,
-                    'total_rows': len(rows),
-                    'truncated': has_more,
-                    **time_data
-                }
-            # For this case, we could allow the user to do a fetch all
-            # for big tables however, since the rows are loaded into memory
-            # it could be an issue
-            else:
-                rows = query.fetchall()
-                cursor.close()
-                connection.close()
-                return {
-                    'columns': columns,
-                    'rows': rows,
-                    'total_rows': len(rows),
-                    'truncated': False,
-                    **time_data
-                }
+            if cache_key is not None:
+                self.result_cache.put(cache_key, {**result, 'rows': list(rows)})
+
+            if result_cursor is not None:
+                result['cursor'] = result_cursor
+
+            return result
         else:
-            # INSERT/UPDATE/DELETE query
-            row_count = query.rowcount
-            connection.commit()
             cursor.close()
-            connection.close()
+            self.invalidate_result_cache()
             return {
                 'columns': [],
                 'rows': [],
                 'rows_affected': row_count if row_count > 0 else 0,
                 'total_rows': 0,
                 'truncated': False,
-                **time_data
+                **self._time_data(start_timestamp, start, connected, executed, executed, executed)
             }
 
-    def _get_connection(self):
+    @profiled(category='database')
+    def execute_script(
+            self,
+            sql: str,
+            use_transaction: bool = False,
+            stop_on_error: bool = True,
+            max_rows: int = 5000
+    ) -> Dict[str, Any]:
+        """
+        Runs every statement of a script on one connection. Each statement
+        result has its own execute and fetch times. Inside a transaction a
+        failing statement rolls back the script when stop_on_error is set,
+        note that ribbitxdb only undoes inserts on rollback
+        :param sql: Script text
+        :param use_transaction: Run the script inside BEGIN/COMMIT
+        :param stop_on_error: Stop at the first failing statement
+        :param max_rows: Maximum rows fetched per statement
+        :return: Dict[str, Any]
+        """
+        statements = split_statements(sql)
+        data = self._run_statements(statements, use_transaction, stop_on_error, max_rows)
+        data['statement_count'] = len(statements)
+        return data
+
+    @profiled(category='database')
+    def execute_script_file(
+            self,
+            path: str,
+            use_transaction: bool = False,
+            stop_on_error: bool = True,
+            max_rows: int = 5000,
+            max_messages: int = MAX_SCRIPT_MESSAGES,
+            progress_callback: Optional[Callable[[Tuple[int, int]], None]] = None,
+            is_cancelled: Optional[Callable[[], bool]] = None
+    ) -> Dict[str, Any]:
+        """
+        Runs a script file like execute_script while reading it in chunks,
+        for dumps too large to load into memory. Result sets and errors are
+        always kept, other statement results only up to max_messages, and
+        statement texts are shortened. The totals cover every statement
+        :param path: Script file
+        :param use_transaction: Run the script inside BEGIN/COMMIT
+        :param stop_on_error: Stop at the first failing statement
+        :param max_rows: Maximum rows fetched per statement
+        :param max_messages: Row count results kept
+        :param progress_callback: Called with (bytes read, file size)
+        :param is_cancelled: Checked between statements, stops the script when True
+        :return: Dict[str, Any]
+        """
+        statements = iter_file_statements(path, progress_callback=progress_callback)
+        data = self._run_statements(
+            statements, use_transaction, stop_on_error, max_rows, max_messages, is_cancelled
+        )
+        data['statement_count'] = data['executed']
+        return data
+
+    def _run_statements(
+            self,
+            statements: Iterable[str],
+            use_transaction: bool,
+            stop_on_error: bool,
+            max_rows: int,
+            max_messages: Optional[int] = None,
+            is_cancelled: Optional[Callable[[], bool]] = None
+    ) -> Dict[str, Any]:
+        results: List[Dict[str, Any]] = []
+        rolled_back = False
+        cancelled = False
+        wrote = False
+        executed = failed = messages = omitted = rows_affected = 0
+        execute_time = fetch_time = 0.0
+        start_timestamp = time.time()
+        script_start = time.perf_counter_ns()
+
+        connection = self._get_connection()
+        cursor = connection.cursor()
+
+        try:
+            if use_transaction:
+                cursor.execute("BEGIN")
+
+            for statement in statements:
+                if is_cancelled and is_cancelled():
+                    cancelled = True
+                    if use_transaction:
+                        connection.rollback()
+                        rolled_back = True
+                    break
+
+                result = self._execute_statement(cursor, statement, max_rows)
+                executed += 1
+                rows_affected += result['rows_affected']
+                execute_time += result['execute_time']
+                fetch_time += result['fetch_time']
+                is_write = not returns_rows(statement)
+                wrote = wrote or is_write
+
+                if max_messages is None:
+                    results.append(result)
+                elif result['columns'] or result['error'] or messages < max_messages:
+                    if len(result['statement']) > MAX_MESSAGE_STATEMENT:
+                        result['statement'] = result['statement'][:MAX_MESSAGE_STATEMENT] + '...'
+                    if not (result['columns'] or result['error']):
+                        messages += 1
+                    results.append(result)
+                else:
+                    omitted += 1
+
+                if result['error'] is None:
+                    if not use_transaction and is_write:
+                        connection.commit()
+                    continue
+
+                failed += 1
+                if stop_on_error:
+                    if use_transaction:
+                        connection.rollback()
+                        rolled_back = True
+                    break
+
+            if use_transaction and not rolled_back:
+                connection.commit()
+        finally:
+            cursor.close()
+            connection.close()
+
+            if wrote:
+                self.invalidate_result_cache()
+
+        return {
+            'results': results,
+            'executed': executed,
+            'omitted_results': omitted,
+            'failed': failed,
+            'rolled_back': rolled_back,
+            'cancelled': cancelled,
+            'rows_affected': rows_affected,
+            'execute_time': execute_time,
+            'fetch_time': fetch_time,
+            'execution_time': (time.perf_counter_ns() - script_start) / 1e9,
+            'execution_timestamp': start_timestamp
+        }
+
+    @profiled(category='database')
+    def explain_query(self, sql: str, analyze: bool = False) -> Dict[str, Any]:
+        """
+        Returns the plan tree of a statement. With analyze set the SELECT is
+        run and every plan node gets its actual row count and time
+        :param sql: Statement
+        :param analyze: Run the statement and record actuals
+        :return: Dict[str, Any] - Root plan node
+        """
+        if analyze:
+            return query_plan.analyze(self, sql)
+
+        return query_plan.explain(self, sql)
+
+    @classmethod
+    def _time_data(
+            cls,
+            timestamp: float,
+            start: int,
+            connected: int,
+            executed: int,
+            first_row: int,
+            fetched: int
+    ) -> Dict[str, Any]:
+        """Build execution times from perf_counter_ns readings"""
+        return {
+            'execution_time': (fetched - connected) / 1e9,
+            'execution_timestamp': timestamp,
+            'timings': {
+                'connect': (connected - start) / 1e6,
+                'execute': (executed - connected) / 1e6,
+                'first_row': (first_row - executed) / 1e6,
+                'fetch': (fetched - executed) / 1e6,
+                'total': (fetched - start) / 1e6,
+            }
+        }
+
+    @classmethod
+    def _execute_statement(cls, cursor, statement: str, max_rows: int) -> Dict[str, Any]:
+        """Run one script statement, timing execute and fetch separately"""
+        result: Dict[str, Any] = {
+            'statement': statement,
+            'columns': [],
+            'rows': [],
+            'total_rows': 0,
+            'rows_affected': 0,
+            'truncated': False,
+            'execute_time': 0.0,
+            'fetch_time': 0.0,
+            'error': None
+        }
+
+        try:
+            start = time.perf_counter_ns()
+            query = cursor.execute(statement)
+            result['execute_time'] = (time.perf_counter_ns() - start) / 1e9
+
+            if returns_rows(statement):
+                start = time.perf_counter_ns()
+                rows = query.fetchmany(max_rows + 1) if max_rows > 0 else query.fetchall()
+                result['fetch_time'] = (time.perf_counter_ns() - start) / 1e9
+
+                has_more = max_rows > 0 and len(rows) > max_rows
+                rows = rows[:max_rows] if has_more else rows
+                result['columns'] = [desc[0] for desc in query.description or []]
+                result['rows'] = rows
+                result['total_rows'] = len(rows)
+                result['truncated'] = has_more
+            else:
+                result['rows_affected'] = max(query.rowcount, 0)
+        except Exception as e:
+            result['error'] = str(e)
+
+        return result
+
+    def _fetch_all(self, sql: str, params: Optional[Sequence] = None) -> List[tuple]:
+        """Rows of a read-only statement on a connection of its own"""
+        connection = self._get_connection()
+        cursor = connection.cursor()
+        try:
+            return self.statement_cache.execute(cursor, sql, params).fetchall()
+        finally:
+            cursor.close()
+            connection.close()
+
+    def is_busy(self) -> bool:
+        """Whether another thread or process has a connection to the database open"""
+        return database_lock(self.db_path).is_busy()
+
+    def _get_connection(self) -> LockedConnection:
+        """
+        Opens a connection holding the database lock until it's closed, so
+        callers have to close it in a finally block. See db_lock for why
+        connections can't overlap
+        """
+        lock = database_lock(self.db_path)
+        lock.acquire()
         try:
             connection = ribbitxdb.connect(self.db_path)
         except Exception:
+            lock.release()
             raise RuntimeError(f"Failed to connect to {self.db_path}")
 
-        return connection
+        return LockedConnection(connection, lock)
@@ -0,0 +1,182 @@
+"""
+One open connection per database file at a time.
+
+ribbitxdb writes the page map it read when the connection opened back to
+page 0 on every commit, and close() commits. A connection that opened
+before another connection's last commit and closes after it points the
+tables back at their old pages, and the other connection's rows are lost.
+Connections are therefore serialised per file: a re-entrant lock per path
+within the process, and an advisory lock on a sidecar file
+(data.rbx.lock) across processes, so the worker processes of the process
+backend wait for the GUI process and the other way around. Programs other
+than this one don't take the lock.
+
+The lock also tells file_version which touches of the file were reads.
+Each holder leaves the write count and the file's stamp in the lock file
+as it releases, so reads in any process, the backend's workers included,
+don't count as changes and versions aren't recomputed after every query.
+"""
+from .file_version import note_open, note_close, write_touch
+from typing import Dict, Optional
+from pathlib import Path
+import threading
+import time
+import os
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+LOCK_FILE_SUFFIX = ".lock"
+
+# seconds between attempts at a lock file held by another process on Windows
+_RETRY_INTERVAL = 0.05
+
+
+def lock_path(db_path: str) -> Path:
+    """Sidecar lock file next to the database, e.g. data.rbx.lock"""
+    return Path(db_path + LOCK_FILE_SUFFIX)
+
+
+class DatabaseLock:
+    """Re-entrant lock on a database file, held while a connection to it is open"""
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self._lock = threading.RLock()
+        self._depth = 0
+        self._written = False
+        self._file = None
+
+    def acquire(self, blocking: bool = True) -> bool:
+        """
+        :param blocking: Wait for the lock, otherwise return False when it's held
+        :return: bool - whether the lock was taken
+        """
+        if not self._lock.acquire(blocking):
+            return False
+
+        if self._depth == 0:
+            if not self._lock_file(blocking):
+                self._lock.release()
+                return False
+            self._written = False
+            note_open(self.db_path)
+
+        self._depth += 1
+        return True
+
+    def release(self):
+        self._depth -= 1
+        if self._depth == 0:
+            if self._file is not None:
+                try:
+                    write_touch(self._file, self.db_path, self._written)
+                except OSError:
+                    pass
+            note_close(self.db_path, self._written)
+            self._unlock_file()
+        self._lock.release()
+
+    def mark_written(self):
+        """Record a commit made while the lock is held"""
+        self._written = True
+
+    def is_busy(self) -> bool:
+        """Whether another thread or process has a connection open, the current thread doesn't count"""
+        if not self.acquire(blocking=False):
+            return True
+        self.release()
+        return False
+
+    def __enter__(self) -> 'DatabaseLock':
+        self.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.release()
+
+    def _lock_file(self, blocking: bool) -> bool:
+        if self._file is None:
+            try:
+                # the touch record is written in place, not appended
+                self._file = os.fdopen(os.open(lock_path(self.db_path), os.O_RDWR | os.O_CREAT), 'r+b')
+            except OSError:
+                # read-only directory, only threads of this process are serialised
+                return True
+
+        fd = self._file.fileno()
+        if fcntl is not None:
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | (0 if blocking else fcntl.LOCK_NB))
+            except BlockingIOError:
+                return False
+            return True
+
+        while True:
+            try:
+                self._file.seek(0)
+                msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+                return True
+            except OSError:
+                if not blocking:
+                    return False
+                time.sleep(_RETRY_INTERVAL)
+
+    def _unlock_file(self):
+        if self._file is None:
+            return
+
+        if fcntl is not None:
+            fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+        else:
+            self._file.seek(0)
+            msvcrt.locking(self._file.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+_locks: Dict[str, DatabaseLock] = {}
+_locks_lock = threading.Lock()
+
+
+def database_lock(db_path: str) -> DatabaseLock:
+    """The process wide lock of a database file"""
+    key = os.path.abspath(db_path)
+    with _locks_lock:
+        lock = _locks.get(key)
+        if lock is None:
+            lock = _locks[key] = DatabaseLock(key)
+        return lock
+
+
+class LockedConnection:
+    """
+    ribbitxdb connection that holds its database lock until it's closed.
+    Commits and rollbacks are recorded as writes, everything else is
+    passed through
+    """
+
+    def __init__(self, connection, lock: DatabaseLock):
+        self._connection = connection
+        self._lock: Optional[DatabaseLock] = lock
+
+    def commit(self):
+        self._connection.commit()
+        self._lock.mark_written()
+
+    def rollback(self):
+        # ribbitxdb only undoes inserts, other statements stay written
+        self._connection.rollback()
+        self._lock.mark_written()
+
+    def close(self):
+        try:
+            self._connection.close()
+        finally:
+            if self._lock is not None:
+                self._lock.release()
+                self._lock = None
+
+    def __getattr__(self, name):
+        return getattr(self._connection, name)
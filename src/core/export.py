@@ -0,0 +1,90 @@
+from typing import List, Iterable, Tuple, TextIO, Any
+import json
+import csv
+
+EXPORT_FORMATS = ('csv', 'jsonl', 'table')
+
+# longest cell printed by the table format
+MAX_TABLE_CELL = 40
+
+
+def write_csv(batches: Iterable[Tuple[List[str], List[tuple]]], file: TextIO) -> int:
+    """
+    Write (columns, rows) batches as CSV with a header row
+    :param batches: Batches from DatabaseManager.iter_query
+    :param file: Open text file
+    :return: int - Rows written
+    """
+    writer = csv.writer(file)
+    header_written = False
+    count = 0
+
+    for columns, rows in batches:
+        if not header_written:
+            writer.writerow(columns)
+            header_written = True
+        writer.writerows(rows)
+        count += len(rows)
+
+    return count
+
+
+def write_jsonl(batches: Iterable[Tuple[List[str], List[tuple]]], file: TextIO) -> int:
+    """Write batches as one JSON object per row"""
+    count = 0
+
+    for columns, rows in batches:
+        for row in rows:
+            file.write(json.dumps(dict(zip(columns, row)), default=str))
+            file.write('\n')
+        count += len(rows)
+
+    return count
+
+
+def write_table(batches: Iterable[Tuple[List[str], List[tuple]]], file: TextIO) -> int:
+    """
+    Write batches as an aligned text table. Column widths come from the
+    header and the first batch so rows can be written as they arrive
+    """
+    widths: List[int] = []
+    count = 0
+
+    for columns, rows in batches:
+        if not widths:
+            widths = [
+                min(MAX_TABLE_CELL, max([len(column)] + [len(_cell(row[idx])) for row in rows]))
+                for idx, column in enumerate(columns)
+            ]
+            file.write(' | '.join(column.ljust(width) for column, width in zip(columns, widths)).rstrip() + '\n')
+            file.write('-+-'.join('-' * width for width in widths) + '\n')
+
+        for row in rows:
+            file.write(' | '.join(_cell(value).ljust(width) for value, width in zip(row, widths)).rstrip() + '\n')
+        count += len(rows)
+
+    return count
+
+
+def write_rows(batches: Iterable[Tuple[List[str], List[tuple]]], file: TextIO, export_format: str) -> int:
+    """
+    Write batches in one of EXPORT_FORMATS
+    :param batches: (columns, rows) batches
+    :param file: Open text file
+    :param export_format: csv, jsonl or table
+    :return: int - Rows written
+    """
+    match export_format:
+        case 'csv':
+            return write_csv(batches, file)
+        case 'jsonl':
+            return write_jsonl(batches, file)
+        case 'table':
+            return write_table(batches, file)
+        case _:
+            raise ValueError(f"Unknown export format: {export_format}")
+
+
+def _cell(value: Any) -> str:
+    text = 'NULL' if value is None else str(value).replace('\n', ' ')
+    return text if len(text) <= MAX_TABLE_CELL else text[:MAX_TABLE_CELL - 3] + '...'
@@ -0,0 +1,151 @@
+"""
+Runs one statement against many databases, e.g. shards with the same
+schema, on a bounded thread pool. Result rows are tagged with the source
+database and streamed in batches as each database produces them, timings
+and errors are reported per database. With a ProcessBackend the threads
+only wait on worker processes, which run the databases on separate cores.
+"""
+from typing import List, Dict, Any, Optional, Callable, Iterable, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from .sql_script import returns_rows
+import threading
+import time
+import os
+
+SOURCE_COLUMN = 'source_database'
+
+DEFAULT_MAX_WORKERS = min(8, os.cpu_count() or 1)
+
+# rows fetched per database, like execute_query
+DEFAULT_MAX_ROWS = 5000
+
+# called with (columns, rows), the source database first
+BatchCallback = Callable[[Tuple[List[str], List[tuple]]], None]
+
+
+def run_on_all(
+        db_managers: Iterable,
+        sql: str,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        max_rows: int = DEFAULT_MAX_ROWS,
+        batch_size: int = 1000,
+        keep_rows: bool = True,
+        backend=None,
+        progress_callback: Optional[BatchCallback] = None,
+        is_cancelled: Optional[Callable[[], bool]] = None
+) -> Dict[str, Any]:
+    """
+    Execute a statement on every database concurrently. Rows are only
+    merged from databases returning the same columns as the first result,
+    the others are reported as failed
+    :param db_managers: DatabaseManagers to run on
+    :param sql: Single SQL statement
+    :param max_workers: Databases queried at the same time
+    :param max_rows: Rows fetched per database, 0 for all
+    :param batch_size: Rows per streamed batch
+    :param keep_rows: Collect the rows in the result, off when the batches are consumed as they stream
+    :param backend: ProcessBackend to run the statement in worker processes
+    :param progress_callback: Called with (columns, rows) per batch, from pool threads
+    :param is_cancelled: Polled between batches, cancelled databases are reported as such
+    :return: Dict[str, Any] - columns, merged rows and a result per database
+    """
+    db_managers = list(db_managers)
+    start_timestamp = time.time()
+    start = time.perf_counter()
+    lock = threading.Lock()
+    merged = {'columns': None, 'rows': [], 'total_rows': 0}
+
+    def add_batch(columns: List[str], rows: List[tuple]) -> bool:
+        with lock:
+            if merged['columns'] is None:
+                merged['columns'] = columns
+            elif merged['columns'] != columns:
+                return False
+            if keep_rows:
+                merged['rows'].extend(rows)
+            merged['total_rows'] += len(rows)
+
+        if progress_callback:
+            progress_callback((columns, rows))
+        return True
+
+    def run(db_manager) -> Dict[str, Any]:
+        result = {
+            'database': db_manager.db_name,
+            'path': db_manager.db_path,
+            'rows': 0,
+            'rows_affected': 0,
+            'truncated': False,
+            'error': None,
+            'cancelled': False,
+            'elapsed': 0.0,
+        }
+        db_start = time.perf_counter()
+
+        try:
+            if is_cancelled and is_cancelled():
+                result['cancelled'] = True
+            elif returns_rows(sql):
+                _fetch(db_manager, sql, max_rows, batch_size, result, add_batch, is_cancelled, backend)
+            elif backend is not None:
+                result['rows_affected'] = backend.call(type(db_manager).execute_query, db_manager.db_path, sql)['rows_affected']
+            else:
+                result['rows_affected'] = db_manager.execute_query(sql)['rows_affected']
+        except Exception as e:
+            result['error'] = str(e)
+
+        result['elapsed'] = time.perf_counter() - db_start
+        return result
+
+    with ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix='fan-out') as pool:
+        results = list(pool.map(run, db_managers))
+
+    return {
+        'columns': merged['columns'] or [],
+        'rows': merged['rows'],
+        'total_rows': merged['total_rows'],
+        'rows_affected': sum(result['rows_affected'] for result in results),
+        'results': results,
+        'failed': sum(1 for result in results if result['error']),
+        'cancelled': any(result['cancelled'] for result in results),
+        'execution_time': time.perf_counter() - start,
+        'execution_timestamp': start_timestamp,
+    }
+
+
+def _fetch(
+        db_manager,
+        sql: str,
+        max_rows: int,
+        batch_size: int,
+        result: Dict[str, Any],
+        add_batch: Callable[[List[str], List[tuple]], bool],
+        is_cancelled: Optional[Callable[[], bool]],
+        backend=None
+):
+    """Stream one database's rows into add_batch, tagged with its name"""
+    source = db_manager.db_name
+    if backend is not None:
+        batches = backend.iter_query(db_manager.db_path, sql, batch_size=batch_size, is_cancelled=is_cancelled)
+    else:
+        batches = db_manager.iter_query(sql, batch_size=batch_size)
+
+    try:
+        for columns, rows in batches:
+            if is_cancelled and is_cancelled():
+                result['cancelled'] = True
+                return
+
+            if max_rows and result['rows'] + len(rows) > max_rows:
+                rows = rows[:max_rows - result['rows']]
+                result['truncated'] = True
+
+            if not add_batch([SOURCE_COLUMN] + columns, [(source, *row) for row in rows]):
+                raise ValueError("Columns differ from the other databases")
+            result['rows'] += len(rows)
+
+            if result['truncated']:
+                return
+    finally:
+        # closes the cursor and connection when stopping early
+        batches.close()
@@ -0,0 +1,139 @@
+from typing import Dict, Tuple, Optional, Hashable, BinaryIO
+import threading
+import hashlib
+import os
+
+_CHUNK_SIZE = 1024 * 1024
+
+# the lock file holds the write count and the (mtime_ns, size) stamp of the
+# last connection that closed, from any process. Byte 0 is what msvcrt
+# locks on Windows, so the record starts after it
+_TOUCH_OFFSET = 1
+_TOUCH_SIZE = 64
+
+# path -> what the file was last seen as, and its generation
+_stamps: Dict[str, Tuple[Hashable, int]] = {}
+
+# path -> (generation, version), so the file is only hashed when it may have changed
+_versions: Dict[str, Tuple[int, str]] = {}
+
+_lock = threading.Lock()
+
+
+def _stamp(path: str) -> Optional[Tuple[int, int]]:
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def read_touch(f: BinaryIO) -> Optional[Tuple[int, Tuple[int, int]]]:
+    """The (write count, stamp) record of an open lock file, None when it has none"""
+    f.seek(_TOUCH_OFFSET)
+    try:
+        writes, mtime, size = (int(x) for x in f.read(_TOUCH_SIZE).split())
+    except ValueError:
+        return None
+    return writes, (mtime, size)
+
+
+def write_touch(f: BinaryIO, path: str, written: bool):
+    """
+    Record how a connection left the database, called by the lock holder
+    after the connection closed. The write count moves when it committed
+    """
+    touch = read_touch(f)
+    writes = (touch[0] if touch else 0) + (1 if written else 0)
+    stamp = _stamp(path) or (0, 0)
+    f.seek(_TOUCH_OFFSET)
+    f.write(f"{writes} {stamp[0]} {stamp[1]}".ljust(_TOUCH_SIZE).encode('ascii'))
+    f.flush()
+
+
+def _observe(key: str) -> Hashable:
+    """
+    The write count while the file is as the last connection left it,
+    otherwise its stamp, so only commits and changes by other programs
+    count and reads in any process don't
+    """
+    from .db_lock import lock_path
+
+    stamp = _stamp(key)
+    try:
+        with open(lock_path(key), 'rb') as f:
+            touch = read_touch(f)
+    except OSError:
+        touch = None
+
+    if touch is not None and touch[1] == stamp:
+        return touch[0]
+    return stamp
+
+
+def database_generation(path: str) -> int:
+    """
+    Returns a counter that moves whenever the database content may have
+    changed, costing a stat call and a read of the lock file. ribbitxdb
+    rewrites its metadata page every time a connection closes, so mtime
+    moves on plain reads. The database lock records how each connection
+    left the file in the lock file, reads don't count and commits do,
+    whichever process made them. Any other change to the file, by a
+    program that doesn't take the lock, moves the counter too
+    :param path: Database file path
+    :return: int
+    """
+    key = os.path.abspath(path)
+    observed = _observe(key)
+    with _lock:
+        entry = _stamps.get(key)
+        if entry is None:
+            _stamps[key] = (observed, 0)
+            return 0
+        if entry[0] != observed:
+            entry = _stamps[key] = (observed, entry[1] + 1)
+        return entry[1]
+
+
+def note_open(path: str):
+    """Called before a connection opens, counts changes made since this process last closed one"""
+    database_generation(path)
+
+
+def note_close(path: str, written: bool):
+    """
+    Called after a connection closed and its touch was recorded, the touch
+    only counts when it committed. Also covers databases whose lock file
+    can't be written
+    """
+    key = os.path.abspath(path)
+    observed = _observe(key)
+    with _lock:
+        generation = _stamps.get(key, (None, 0))[1]
+        _stamps[key] = (observed, generation + 1 if written else generation)
+
+
+def database_version(path: str) -> str:
+    """
+    Returns a version string that changes whenever the database content
+    changes and stays the same across sessions, for versions kept on disk.
+    The file is only hashed again when database_generation moved
+    :param path: Database file path
+    :return: str
+    """
+    key = os.path.abspath(path)
+    generation = database_generation(key)
+    cached = _versions.get(key)
+    if cached and cached[0] == generation:
+        return cached[1]
+
+    size = os.stat(key).st_size
+    digest = hashlib.blake2b(digest_size=16)
+    with open(key, 'rb') as f:
+        while chunk := f.read(_CHUNK_SIZE):
+            digest.update(chunk)
+
+    version = f"{size}:{digest.hexdigest()}"
+    _versions[key] = (generation, version)
+
+    return version
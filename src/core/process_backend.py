@@ -0,0 +1,399 @@
+"""
+Worker processes for database work that would otherwise hold the GIL of
+the calling process. ribbitxdb is pure Python, so parsing, scanning and
+row conversion only use more than one core when they run in other
+processes. Each worker keeps its own DatabaseManager per database file.
+
+Rows come back in batches packed by column: integer and float columns as
+array buffers, other columns as lists, which pickle smaller and faster
+than row tuples. All messages go through one result queue and a router
+thread hands them to the stream they belong to, so a caller iterates
+rows or waits for a result like on an in-process DatabaseManager.
+
+    backend = ProcessBackend(4)
+    for columns, rows in backend.iter_query('data.rbx', "SELECT * FROM users"):
+        ...
+    profile = backend.call(profile_column, 'data.rbx', 'users', 'age')
+"""
+from typing import List, Dict, Any, Optional, Callable, Iterator, Tuple
+from array import array
+import multiprocessing
+import threading
+import itertools
+import atexit
+import queue
+import time
+import os
+
+# streams running at the same time, further calls wait for a free slot
+MAX_STREAMS = 64
+
+# seconds between cancellation checks while waiting for a worker
+POLL_INTERVAL = 0.1
+
+# batches a query may run ahead of its reader, keeps memory bounded when
+# the reader is slower (e.g. a merge waiting on the other side). Only
+# applies while no task waits for a worker, a reader may need the waiting
+# task's rows before it reads on (a diff with fewer processes than sides)
+MAX_BATCHES_AHEAD = 4
+
+_INT64_MIN = -2 ** 63
+_INT64_MAX = 2 ** 63 - 1
+
+# worker process state, set by _init_worker
+_results = None
+_cancel_flags = None
+_consumed = None
+_pending = None
+_worker_pids = None
+_managers: Dict[str, Any] = {}
+
+
+def pack_rows(rows: List[tuple]) -> List[Any]:
+    """
+    Rows to column buffers. Columns holding only ints fitting 64 bits or
+    only floats become arrays, anything else (text, NULLs, mixed) a list
+    :param rows: Rows of equal length
+    :return: List[Any] - one buffer per column
+    """
+    packed = []
+    for values in zip(*rows):
+        kinds = {type(value) for value in values}
+        if kinds == {int} and _INT64_MIN <= min(values) and max(values) <= _INT64_MAX:
+            packed.append(array('q', values))
+        elif kinds == {float}:
+            packed.append(array('d', values))
+        else:
+            packed.append(list(values))
+
+    return packed
+
+
+def unpack_rows(packed: List[Any]) -> List[tuple]:
+    """Column buffers back to row tuples"""
+    return list(zip(*packed))
+
+
+class ProcessBackend:
+    """
+    Pool of worker processes for queries and whole operations on database
+    files. Processes are started with spawn, so the GUI process isn't
+    forked with its threads. Methods block the calling thread, call them
+    from a worker thread in the GUI
+    """
+
+    def __init__(self, processes: Optional[int] = None):
+        self.processes = processes or os.cpu_count() or 1
+        context = multiprocessing.get_context('spawn')
+        self._results = context.Queue()
+        self._cancel_flags = context.Array('b', MAX_STREAMS, lock=False)
+        # batches read per stream, workers wait when too far ahead
+        self._consumed = context.Array('q', MAX_STREAMS, lock=False)
+        # tasks submitted that no worker has started yet
+        self._pending = context.Value('i', 0)
+        # pid of the worker process running the task in a slot, 0 until it starts
+        self._worker_pids = context.Array('q', MAX_STREAMS, lock=False)
+        self._pool = context.Pool(
+            self.processes,
+            initializer=_init_worker,
+            initargs=(self._results, self._cancel_flags, self._consumed, self._pending, self._worker_pids)
+        )
+
+        self._lock = threading.Lock()
+        self._task_ids = itertools.count()
+        self._streams: Dict[int, Tuple[int, Optional[queue.Queue]]] = {}
+        self._free_slots = list(range(MAX_STREAMS))
+        self._slots = threading.Semaphore(MAX_STREAMS)
+        self._closed = False
+
+        self._router = threading.Thread(target=self._route, name='process-backend-router', daemon=True)
+        self._router.start()
+
+    def iter_query(
+            self,
+            db_path: str,
+            sql: str,
+            params: Optional[tuple] = None,
+            batch_size: int = 5000,
+            is_cancelled: Optional[Callable[[], bool]] = None
+    ) -> Iterator[Tuple[List[str], List[tuple]]]:
+        """
+        DatabaseManager.iter_query in a worker process. Closing the iterator
+        early stops the worker after its current batch
+        :param db_path: Database path
+        :param sql: SQL query
+        :param params: Bound parameters
+        :param batch_size: Rows per batch
+        :param is_cancelled: Polled while waiting, stops the worker when True
+        :return: Iterator[Tuple[List[str], List[tuple]]]
+        """
+        task_id, slot, stream = self._open_stream()
+        finished = False
+
+        try:
+            self._submit(task_id, slot, _run_query, (task_id, slot, db_path, sql, params, batch_size))
+            while True:
+                kind, payload = self._next(task_id, stream, is_cancelled)
+                if kind == 'batch':
+                    columns, packed = payload
+                    self._consumed[slot] += 1
+                    yield columns, unpack_rows(packed)
+                elif kind == 'done':
+                    finished = True
+                    return
+        finally:
+            if not finished:
+                self._abandon(task_id)
+
+    def call(
+            self,
+            fn: Callable,
+            db_path: str,
+            *args,
+            progress_callback: Optional[Callable[[Any], None]] = None,
+            is_cancelled: Optional[Callable[[], bool]] = None,
+            **kwargs
+    ) -> Any:
+        """
+        Run fn(db_manager, *args, **kwargs) in a worker process, fn has to be
+        importable by name. When progress_callback or is_cancelled is given,
+        fn is passed both like a progress reporting Worker
+        :param fn: Module level function or DatabaseManager method
+        :param db_path: Database path, the worker's DatabaseManager for it is passed first
+        :param progress_callback: Called in this process with fn's progress values
+        :param is_cancelled: Polled while waiting, fn sees it through its is_cancelled
+        :return: Any - fn's return value, its exceptions are raised as RuntimeError
+        """
+        task_id, slot, stream = self._open_stream()
+        finished = False
+
+        try:
+            report_progress = progress_callback is not None or is_cancelled is not None
+            self._submit(task_id, slot, _run_call, (task_id, slot, fn, db_path, args, kwargs, report_progress))
+            while True:
+                kind, payload = self._next(task_id, stream, is_cancelled)
+                if kind == 'progress' and progress_callback:
+                    progress_callback(payload)
+                elif kind == 'result':
+                    finished = True
+                    return payload
+        finally:
+            if not finished:
+                self._abandon(task_id)
+
+    def close(self):
+        """Stop the worker processes, running calls fail"""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+
+        self._pool.terminate()
+        self._pool.join()
+        self._results.put(None)
+        self._router.join()
+
+        # wake up callers still waiting on a stream
+        with self._lock:
+            for _, stream in self._streams.values():
+                if stream is not None:
+                    stream.put(('error', "Process backend closed"))
+            self._streams.clear()
+
+    def _open_stream(self) -> Tuple[int, int, queue.Queue]:
+        if self._closed:
+            raise RuntimeError("Process backend closed")
+
+        self._slots.acquire()
+        stream = queue.Queue()
+        with self._lock:
+            task_id = next(self._task_ids)
+            slot = self._free_slots.pop()
+            self._cancel_flags[slot] = 0
+            self._consumed[slot] = 0
+            self._worker_pids[slot] = 0
+            self._streams[task_id] = (slot, stream)
+
+        return task_id, slot, stream
+
+    def _submit(self, task_id: int, slot: int, fn: Callable, args: tuple):
+        with self._pending.get_lock():
+            self._pending.value += 1
+        self._pool.apply_async(fn, args, error_callback=lambda error: self._on_submit_error(task_id, slot, error))
+
+    def _on_submit_error(self, task_id: int, slot: int, error: BaseException):
+        """The pool couldn't run the task, e.g. fn or its arguments don't pickle"""
+        if not self._worker_pids[slot]:
+            with self._pending.get_lock():
+                self._pending.value -= 1
+        self._results.put((task_id, 'error', f"{type(error).__name__}: {error}"))
+
+    def _next(self, task_id: int, stream: queue.Queue, is_cancelled: Optional[Callable[[], bool]]) -> Tuple[str, Any]:
+        while True:
+            try:
+                kind, payload = stream.get(timeout=POLL_INTERVAL)
+            except queue.Empty:
+                if is_cancelled and is_cancelled():
+                    self._cancel(task_id)
+                continue
+
+            if kind == 'error':
+                raise RuntimeError(payload)
+            return kind, payload
+
+    def _cancel(self, task_id: int):
+        # a finished task's slot may already belong to another task
+        with self._lock:
+            if task_id in self._streams:
+                self._cancel_flags[self._streams[task_id][0]] = 1
+
+    def _abandon(self, task_id: int):
+        """Stop a stream nobody reads anymore, the router drops what's left"""
+        with self._lock:
+            if task_id in self._streams:
+                slot = self._streams[task_id][0]
+                self._cancel_flags[slot] = 1
+                self._streams[task_id] = (slot, None)
+
+    def _route(self):
+        while True:
+            try:
+                message = self._results.get(timeout=POLL_INTERVAL)
+            except queue.Empty:
+                self._fail_lost_tasks()
+                continue
+
+            if message is None:
+                return
+
+            task_id, kind, payload = message
+            with self._lock:
+                slot, stream = self._streams.get(task_id, (None, None))
+                # result, done and error end a task
+                if kind not in ('batch', 'progress') and slot is not None:
+                    self._end_task(task_id, slot)
+
+            if stream is not None:
+                stream.put((kind, payload))
+
+    def _fail_lost_tasks(self):
+        """
+        Fail tasks whose worker process is gone, e.g. killed when out of
+        memory. The pool starts a new worker, but the task is lost
+        """
+        with self._lock:
+            running = {task_id: self._worker_pids[slot] for task_id, (slot, _) in self._streams.items()}
+            running = {task_id: pid for task_id, pid in running.items() if pid}
+            if not running:
+                return
+
+            alive = {process.pid for process in multiprocessing.active_children()}
+            streams = []
+            for task_id, pid in running.items():
+                if pid not in alive:
+                    slot, stream = self._streams[task_id]
+                    self._end_task(task_id, slot)
+                    streams.append(stream)
+
+        for stream in streams:
+            if stream is not None:
+                stream.put(('error', "Worker process exited while running the task"))
+
+    def _end_task(self, task_id: int, slot: int):
+        """Free the slot of a finished task, called with the lock held"""
+        del self._streams[task_id]
+        self._free_slots.append(slot)
+        self._slots.release()
+
+
+_backend: Optional[ProcessBackend] = None
+_backend_processes = 0
+_backend_lock = threading.Lock()
+
+
+def configure(processes: int):
+    """
+    Set the worker processes used by get_backend, 0 runs everything in
+    process. The pool is started on first use
+    """
+    global _backend_processes
+    with _backend_lock:
+        if processes == _backend_processes:
+            return
+        _backend_processes = max(0, processes)
+    shutdown()
+
+
+def get_backend() -> Optional[ProcessBackend]:
+    """The shared backend, None when worker processes are off"""
+    global _backend
+    with _backend_lock:
+        if _backend is None and _backend_processes > 0:
+            _backend = ProcessBackend(_backend_processes)
+        return _backend
+
+
+def shutdown():
+    global _backend
+    with _backend_lock:
+        backend, _backend = _backend, None
+    if backend is not None:
+        backend.close()
+
+
+atexit.register(shutdown)
+
+
+def _init_worker(results, cancel_flags, consumed, pending, worker_pids):
+    global _results, _cancel_flags, _consumed, _pending, _worker_pids
+    _results = results
+    _cancel_flags = cancel_flags
+    _consumed = consumed
+    _pending = pending
+    _worker_pids = worker_pids
+
+
+def _start_task(slot: int):
+    # lets the caller notice when this process dies before the task ends
+    _worker_pids[slot] = os.getpid()
+    with _pending.get_lock():
+        _pending.value -= 1
+
+
+def _manager(db_path: str):
+    from .database_manager import DatabaseManager
+
+    if db_path not in _managers:
+        _managers[db_path] = DatabaseManager(db_path)
+    return _managers[db_path]
+
+
+def _run_query(task_id: int, slot: int, db_path: str, sql: str, params: Optional[tuple], batch_size: int):
+    _start_task(slot)
+    try:
+        batches = _manager(db_path).iter_query(sql, params, batch_size)
+        produced = 0
+        for columns, rows in batches:
+            # waiting for the reader while another task waits for this
+            # worker could wait forever
+            while produced - _consumed[slot] >= MAX_BATCHES_AHEAD and not _cancel_flags[slot] and not _pending.value:
+                time.sleep(0.002)
+            if _cancel_flags[slot]:
+                batches.close()
+                break
+            _results.put((task_id, 'batch', (columns, pack_rows(rows))))
+            produced += 1
+        _results.put((task_id, 'done', None))
+    except Exception as e:
+        _results.put((task_id, 'error', str(e)))
+
+
+def _run_call(task_id: int, slot: int, fn: Callable, db_path: str, args: tuple, kwargs: dict, report_progress: bool):
+    _start_task(slot)
+    try:
+        if report_progress:
+            kwargs['progress_callback'] = lambda value: _results.put((task_id, 'progress', value))
+            kwargs['is_cancelled'] = lambda: bool(_cancel_flags[slot])
+        _results.put((task_id, 'result', fn(_manager(db_path), *args, **kwargs)))
+    except Exception as e:
+        _results.put((task_id, 'error', str(e)))
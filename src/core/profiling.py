@@ -0,0 +1,259 @@
+"""
+Lightweight instrumentation. Spans are recorded around DatabaseManager
+calls, model resets, highlighter passes, painting and viewer-db writes
+while the profiler is enabled, and cost one attribute check otherwise.
+Recent spans and per-name statistics feed the Performance dialog, a
+session can be written out as a Chrome trace (chrome://tracing, Perfetto)
+or profiled with cProfile.
+"""
+from typing import Dict, Any, List, Optional, Callable, Deque, Tuple
+from collections import deque
+from contextlib import contextmanager, nullcontext
+import functools
+import threading
+import cProfile
+import json
+import time
+import os
+
+# recent spans kept for the dialog and trace export
+DEFAULT_MAX_SPANS = 20000
+
+# durations kept per span name for percentiles and histograms
+MAX_SAMPLES = 2000
+
+# histogram bucket upper bounds in ms, the last bucket is unbounded
+HISTOGRAM_BOUNDS = (1, 4, 16, 64, 256, 1024)
+
+
+class Profiler:
+    """
+    Collects spans and duration samples. Safe to use from worker threads
+    """
+
+    def __init__(self, max_spans: int = DEFAULT_MAX_SPANS):
+        self.enabled = False
+        self.spans: Deque[Dict[str, Any]] = deque(maxlen=max_spans)
+        self.samples: Dict[str, Deque[float]] = {}
+        self.counts: Dict[str, int] = {}
+        self.totals: Dict[str, float] = {}
+        self.origin_ns = time.perf_counter_ns()
+        self._cprofile: Optional[cProfile.Profile] = None
+        self._lock = threading.Lock()
+
+    def enable(self):
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+
+    def clear(self):
+        with self._lock:
+            self.spans.clear()
+            self.samples.clear()
+            self.counts.clear()
+            self.totals.clear()
+            self.origin_ns = time.perf_counter_ns()
+
+    def record(
+            self,
+            name: str,
+            category: str,
+            start_ns: int,
+            end_ns: int,
+            args: Optional[Dict[str, Any]] = None,
+            keep: bool = True
+    ):
+        """
+        Record a finished span
+        :param name: Span name, statistics are grouped by it
+        :param category: engine, database, qt, highlighter, viewer_db, event_loop...
+        :param start_ns: perf_counter_ns at the start
+        :param end_ns: perf_counter_ns at the end
+        :param args: Extra details shown in the dialog and trace
+        :param keep: False only updates the statistics, for spans that fire
+        too often to keep individually
+        """
+        duration_ms = (end_ns - start_ns) / 1e6
+
+        with self._lock:
+            samples = self.samples.get(name)
+            if samples is None:
+                samples = self.samples[name] = deque(maxlen=MAX_SAMPLES)
+                self.counts[name] = 0
+                self.totals[name] = 0.0
+
+            samples.append(duration_ms)
+            self.counts[name] += 1
+            self.totals[name] += duration_ms
+
+            if keep:
+                self.spans.append({
+                    'name': name,
+                    'category': category,
+                    'start_ns': start_ns,
+                    'duration_ms': duration_ms,
+                    'thread': threading.get_ident(),
+                    'args': args or {},
+                })
+
+    def span(self, name: str, category: str = 'app', keep: bool = True, **args):
+        """
+        Context manager timing its body, does nothing while disabled
+            with profiler.span('model.reset', 'qt', rows=len(rows)):
+                ...
+        """
+        if not self.enabled:
+            return nullcontext()
+
+        return self._span(name, category, keep, args)
+
+    @contextmanager
+    def _span(self, name: str, category: str, keep: bool, args: Dict[str, Any]):
+        start = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            self.record(name, category, start, time.perf_counter_ns(), args, keep)
+
+    def recent_spans(self, limit: int = 500) -> List[Dict[str, Any]]:
+        """Most recent spans, newest first"""
+        with self._lock:
+            spans = list(self.spans)
+
+        return spans[::-1][:limit]
+
+    def summary(self) -> List[Dict[str, Any]]:
+        """
+        Statistics per span name, slowest total first
+        :return: List[Dict[str, Any]] - name, count, total_ms, mean_ms, p50_ms, p95_ms, max_ms
+        """
+        with self._lock:
+            items = [(name, list(samples), self.counts[name], self.totals[name]) for name, samples in self.samples.items()]
+
+        rows = []
+        for name, samples, count, total in items:
+            ordered = sorted(samples)
+            rows.append({
+                'name': name,
+                'count': count,
+                'total_ms': total,
+                'mean_ms': total / count,
+                'p50_ms': _percentile(ordered, 0.5),
+                'p95_ms': _percentile(ordered, 0.95),
+                'max_ms': ordered[-1],
+            })
+
+        rows.sort(key=lambda row: row['total_ms'], reverse=True)
+        return rows
+
+    def histogram(self, name: str) -> List[Tuple[str, int]]:
+        """
+        Recent durations of a span name in HISTOGRAM_BOUNDS buckets
+        :return: List[Tuple[str, int]] - (bucket label, count)
+        """
+        with self._lock:
+            samples = list(self.samples.get(name, ()))
+
+        counts = [0] * (len(HISTOGRAM_BOUNDS) + 1)
+        for duration in samples:
+            bucket = 0
+            while bucket < len(HISTOGRAM_BOUNDS) and duration >= HISTOGRAM_BOUNDS[bucket]:
+                bucket += 1
+            counts[bucket] += 1
+
+        labels = [f"< {bound} ms" for bound in HISTOGRAM_BOUNDS] + [f">= {HISTOGRAM_BOUNDS[-1]} ms"]
+        return list(zip(labels, counts))
+
+    def chrome_trace(self) -> Dict[str, Any]:
+        """Kept spans in the Chrome trace event format"""
+        pid = os.getpid()
+        with self._lock:
+            spans = list(self.spans)
+
+        return {
+            'traceEvents': [
+                {
+                    'name': span['name'],
+                    'cat': span['category'],
+                    'ph': 'X',
+                    'ts': (span['start_ns'] - self.origin_ns) / 1000,
+                    'dur': span['duration_ms'] * 1000,
+                    'pid': pid,
+                    'tid': span['thread'],
+                    'args': {key: _trace_value(value) for key, value in span['args'].items()},
+                }
+                for span in spans
+            ],
+            'displayTimeUnit': 'ms',
+        }
+
+    def write_chrome_trace(self, path: str):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.chrome_trace(), f)
+
+    @property
+    def cprofile_running(self) -> bool:
+        return self._cprofile is not None
+
+    def start_cprofile(self):
+        """Start cProfile for the calling thread"""
+        if self._cprofile is not None:
+            raise RuntimeError("cProfile is already running")
+
+        self._cprofile = cProfile.Profile()
+        self._cprofile.enable()
+
+    def stop_cprofile(self, path: Optional[str] = None) -> cProfile.Profile:
+        """
+        Stop cProfile
+        :param path: Write the stats here, readable with pstats or snakeviz
+        :return: cProfile.Profile
+        """
+        if self._cprofile is None:
+            raise RuntimeError("cProfile is not running")
+
+        profile, self._cprofile = self._cprofile, None
+        profile.disable()
+
+        if path:
+            profile.dump_stats(path)
+
+        return profile
+
+
+profiler = Profiler()
+
+
+def profiled(name: Optional[str] = None, category: str = 'app', keep: bool = True) -> Callable:
+    """
+    Decorator recording a span for each call while the profiler is enabled
+    :param name: Span name, defaults to the function's qualified name
+    :param category: Span category
+    :param keep: False only updates the statistics
+    """
+    def decorator(fn: Callable) -> Callable:
+        span_name = name or fn.__qualname__
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not profiler.enabled:
+                return fn(*args, **kwargs)
+
+            start = time.perf_counter_ns()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                profiler.record(span_name, category, start, time.perf_counter_ns(), keep=keep)
+
+        return wrapper
+
+    return decorator
+
+
+def _percentile(ordered: List[float], fraction: float) -> float:
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))] if ordered else 0.0
+
+
+def _trace_value(value: Any) -> Any:
+    return value if isinstance(value, (int, float, str, bool)) or value is None else str(value)
@@ -0,0 +1,75 @@
+"""
+Narrower table pages: only the visible columns are selected, and large
+TEXT and BLOB values are cut to a preview that stands in for them until
+the full value is looked up by primary key. ribbitxdb has no SUBSTR in
+the select list, so previews are cut right after the fetch, before the
+rows reach the model.
+"""
+from typing import List, Dict, Any, Optional, Iterable
+
+# characters (or bytes) of a large value kept in a page
+DEFAULT_PREVIEW_CHARS = 200
+
+
+class CellPreview:
+    """Start of a value too large for the grid, str() shows it with an ellipsis"""
+
+    __slots__ = ('value', 'size')
+
+    def __init__(self, value, size: int):
+        self.value = value
+        self.size = size
+
+    @property
+    def is_bytes(self) -> bool:
+        return isinstance(self.value, bytes)
+
+    def __str__(self) -> str:
+        text = self.value.hex(' ') if self.is_bytes else self.value
+        return f"{text}…"
+
+    def __repr__(self) -> str:
+        return f"CellPreview({self.value!r}, size={self.size})"
+
+
+def preview_rows(rows: List[tuple], preview_chars: int) -> List[tuple]:
+    """
+    Replace str and bytes values longer than preview_chars with a CellPreview
+    :param rows: Fetched rows
+    :param preview_chars: Longest value kept whole, 0 keeps every value
+    :return: List[tuple] - rows without large values are returned as they are
+    """
+    if preview_chars <= 0:
+        return rows
+
+    def cut(value):
+        if isinstance(value, (str, bytes)) and len(value) > preview_chars:
+            return CellPreview(value[:preview_chars], len(value))
+        return value
+
+    return [
+        tuple(cut(value) for value in row)
+        if any(isinstance(value, (str, bytes)) and len(value) > preview_chars for value in row) else row
+        for row in rows
+    ]
+
+
+def project_result(data: Dict[str, Any], columns: Optional[Iterable[str]], preview_chars: int = 0) -> Dict[str, Any]:
+    """
+    Keep only the given columns of a fetched result, for results that
+    couldn't be projected in SQL such as samples
+    :param data: Result with columns and rows
+    :param columns: Columns to keep in their result order, None keeps all
+    :param preview_chars: Longest value kept whole, 0 keeps every value
+    :return: Dict[str, Any] - a copy of data
+    """
+    rows = data.get('rows', [])
+    result_columns = data.get('columns', [])
+
+    if columns is not None:
+        keep = set(columns)
+        indexes = [idx for idx, column in enumerate(result_columns) if column in keep]
+        result_columns = [result_columns[idx] for idx in indexes]
+        rows = [tuple(row[idx] for idx in indexes) for row in rows]
+
+    return {**data, 'columns': result_columns, 'rows': preview_rows(rows, preview_chars)}
@@ -0,0 +1,294 @@
+from typing import List, Dict, Any, Optional, Tuple
+import re
+
+# Match types understood by the search builder. EQUALS and LIKE are kept
+# as aliases since they were the original filter types
+EXACT = "EXACT"
+PREFIX = "PREFIX"
+CONTAINS = "CONTAINS"
+RANGE = "RANGE"
+AUTO = "AUTO"
+# every word of the text in the column, the last one as a word prefix.
+# Answered by the search index, not by SQL, see search_index.search_words
+WORDS = "WORDS"
+
+MATCH_ALIASES = {
+    "EQUALS": EXACT,
+    "LIKE": CONTAINS,
+}
+
+MATCH_TYPES = (EXACT, PREFIX, CONTAINS, RANGE)
+
+NUMERIC_TYPES = ("INTEGER", "REAL", "NUMERIC")
+
+_IDENTIFIER_PATTERN = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+_RANGE_SEPARATOR = ".."
+
+# ribbitxdb turns a LIKE pattern into a regex by swapping % for .* and _
+# for ., so literal wildcards are written as escapes that contain neither
+_LIKE_LITERALS = {"%": r"\x25", "_": r"\x5f"}
+
+
+def validate_identifier(name: str) -> str:
+    """
+    Validates a table or column name before it is placed into SQL.
+    Identifiers can't be bound as parameters, so anything that isn't
+    a plain identifier is rejected
+    :param name: Identifier
+    :return: str
+    """
+    if not isinstance(name, str) or not _IDENTIFIER_PATTERN.match(name):
+        raise ValueError(f"Invalid identifier: {name}")
+
+    return name
+
+
+def escape_like(text: str) -> str:
+    """
+    Escapes search text for a LIKE pattern, so %, _ and regex
+    metacharacters match themselves
+    :param text: Search text
+    :return: str
+    """
+    return "".join(_LIKE_LITERALS.get(char) or re.escape(char) for char in str(text))
+
+
+def normalise_match_type(match_type: str) -> str:
+    """Map legacy filter types onto their match type"""
+    match_type = MATCH_ALIASES.get(match_type, match_type)
+    if match_type not in MATCH_TYPES:
+        raise ValueError(f"Invalid filter type: {match_type}")
+
+    return match_type
+
+
+def build_search_clause(columns: List[Dict[str, Any]]) -> Tuple[str, List[Any]]:
+    """
+    Builds an OR'd search predicate with bound parameters
+    :param columns: List of {'condition': (column, value), 'type': match_type}
+    :return: Tuple[str, List[Any]]
+    """
+    predicates = []
+    params: List[Any] = []
+
+    # equality and prefix predicates go first so the engine can short
+    # circuit on the cheaper comparisons
+    ordered = sorted(
+        columns,
+        key=lambda x: MATCH_TYPES.index(normalise_match_type(x.get("type")))
+    )
+
+    for column in ordered:
+        col, val = column.get("condition")
+        col = validate_identifier(col)
+
+        match normalise_match_type(column.get("type")):
+            case "EXACT":
+                # id = ?
+                predicates.append(f"{col} = ?")
+                params.append(val)
+            case "PREFIX":
+                # name LIKE 'text%'
+                predicates.append(f"{col} LIKE ?")
+                params.append(f"{escape_like(val)}%")
+            case "CONTAINS":
+                # text LIKE '%text%'
+                predicates.append(f"{col} LIKE ?")
+                params.append(f"%{escape_like(val)}%")
+            case "RANGE":
+                # age >= ? AND age <= ?, either bound may be open
+                low, high = val
+                bounds = []
+                if low is not None:
+                    bounds.append(f"{col} >= ?")
+                    params.append(low)
+                if high is not None:
+                    bounds.append(f"{col} <= ?")
+                    params.append(high)
+                if not bounds:
+                    raise ValueError(f"Range filter on {col} has no bounds")
+                predicates.append(f"({' AND '.join(bounds)})")
+
+    if not predicates:
+        return "", []
+
+    return f"({' OR '.join(predicates)})", params
+
+
+def build_order_clause(sorting: Optional[Dict[str, str]]) -> str:
+    """Builds ORDER BY clause from sorting filter"""
+    if not sorting:
+        return ""
+
+    column = validate_identifier(sorting.get("column"))
+    order = str(sorting.get("order", "ASC")).upper()
+    if order not in ("ASC", "DESC"):
+        raise ValueError(f"Invalid sort order: {order}")
+
+    return f" ORDER BY {column} {order}"
+
+
+def build_paginated_select(
+        table_name: str,
+        filters: Optional[Dict] = None,
+        limit: int = 100,
+        offset: int = 0,
+        columns: Optional[List[str]] = None
+) -> Tuple[str, List[Any]]:
+    """
+    Builds the paginated SELECT used by the table viewer
+    :param table_name: Table name
+    :param filters: Filters for searching and sorting
+    :param limit: Number of rows per page
+    :param offset: Row offset
+    :param columns: Columns to select, all of them when None or empty
+    :return: Tuple[str, List[Any]]
+    """
+    select_list = ", ".join(validate_identifier(column) for column in columns) if columns else "*"
+    query = f"SELECT {select_list} FROM {validate_identifier(table_name)}"
+    params: List[Any] = []
+
+    if filters:
+        # rows already matched by a search index, looked up by key
+        if keys := filters.get("keys", None):
+            key_column = validate_identifier(keys.get("column"))
+            values = keys.get("values", [])
+            sorting = filters.get("sorting", None)
+
+            # keys come sorted, so without a user sort only the current
+            # page of keys has to be sent to the engine
+            if not sorting:
+                values = values[offset:offset + limit]
+                offset = 0
+                sorting = {"column": key_column, "order": "ASC"}
+
+            if not values:
+                # IN () isn't valid and a primary key is never NULL
+                return f"{query} WHERE {key_column} IS NULL LIMIT ? OFFSET ?", [limit, 0]
+
+            query += f" WHERE {key_column} IN ({', '.join('?' for _ in values)})"
+            query += build_order_clause(sorting)
+            query += " LIMIT ? OFFSET ?"
+            return query, list(values) + [limit, offset]
+
+        # apply search filters first
+        if columns := filters.get("columns", None):
+            where, params = build_search_clause(columns)
+            if where:
+                query += f" WHERE {where}"
+
+        # apply sort after
+        query += build_order_clause(filters.get("sorting", None))
+
+    query += " LIMIT ? OFFSET ?"
+    params += [limit, offset]
+
+    return query, params
+
+
+def build_count_select(table_name: str, filters: Optional[Dict] = None) -> Tuple[str, List[Any]]:
+    """
+    Builds the COUNT(*) for the rows matching the search filters
+    :param table_name: Table name
+    :param filters: Filters for searching, sorting is ignored
+    :return: Tuple[str, List[Any]]
+    """
+    query = f"SELECT COUNT(*) FROM {validate_identifier(table_name)}"
+
+    if filters and (columns := filters.get("columns", None)):
+        where, params = build_search_clause(columns)
+        if where:
+            return f"{query} WHERE {where}", params
+
+    return query, []
+
+
+def parse_range(text: str, column_type: str) -> Optional[Tuple[Any, Any]]:
+    """
+    Parses 'low..high' range syntax, either side may be omitted
+    :param text: Search text
+    :param column_type: Column type, used to convert the bounds
+    :return: Optional[Tuple[Any, Any]]
+    """
+    if _RANGE_SEPARATOR not in text:
+        return None
+
+    low, high = (x.strip() for x in text.split(_RANGE_SEPARATOR, 1))
+    try:
+        low = _convert_value(low, column_type) if low else None
+        high = _convert_value(high, column_type) if high else None
+    except ValueError:
+        return None
+
+    if low is None and high is None:
+        return None
+
+    return low, high
+
+
+def build_column_filter(
+        column: str,
+        column_type: str,
+        search_text: str,
+        match_type: str = AUTO,
+        indexed: bool = False
+) -> Optional[Dict[str, Any]]:
+    """
+    Picks the filter for one searched column. In AUTO mode numeric
+    columns use equality (or a range for 'low..high'), indexed text
+    columns use a prefix match and other text columns use contains
+    :param column: Column name
+    :param column_type: Column type from the schema
+    :param search_text: Text typed into the search box
+    :param match_type: Requested match type, or AUTO
+    :param indexed: Whether the column is a primary key or unique
+    :return: Optional[Dict[str, Any]] - None if the text can't apply to this column
+    """
+    column_type = (column_type or "TEXT").upper()
+    numeric = column_type in NUMERIC_TYPES
+
+    if match_type == WORDS:
+        # words are only indexed in text columns
+        if numeric:
+            return None
+        return {
+            "condition": (column, search_text),
+            "type": WORDS
+        }
+
+    if match_type == AUTO:
+        if numeric:
+            match_type = RANGE if _RANGE_SEPARATOR in search_text else EXACT
+        else:
+            match_type = PREFIX if indexed else CONTAINS
+
+    match_type = normalise_match_type(match_type)
+
+    if match_type == RANGE:
+        value = parse_range(search_text, column_type)
+        if value is None:
+            return None
+    elif numeric:
+        # LIKE on numbers has no meaning for the engine, so numeric
+        # columns are only ever compared by value
+        try:
+            value = _convert_value(search_text, column_type)
+        except ValueError:
+            return None
+        if match_type != EXACT:
+            match_type = EXACT
+    else:
+        value = search_text
+
+    return {
+        "condition": (column, value),
+        "type": match_type
+    }
+
+
+def _convert_value(text: str, column_type: str) -> Any:
+    if column_type == "INTEGER":
+        return int(text)
+    if column_type in NUMERIC_TYPES:
+        return float(text)
+    return text
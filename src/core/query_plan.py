@@ -0,0 +1,340 @@
+from ribbitxdb.query.parser import SQLParser
+from typing import List, Dict, Any, Optional
+import math
+import time
+
+# Default selectivities used when estimating filtered row counts, in the
+# spirit of the classic System R defaults
+EQUALS_SELECTIVITY = 0.1
+RANGE_SELECTIVITY = 1 / 3
+PREFIX_SELECTIVITY = 0.1
+CONTAINS_SELECTIVITY = 0.25
+NOT_EQUALS_SELECTIVITY = 0.9
+
+RANGE_OPERATORS = ('<', '>', '<=', '>=', 'BETWEEN')
+
+
+def _node(
+        operation: str,
+        detail: str,
+        estimated_rows: int,
+        cost: float,
+        stage: str,
+        children: Optional[List[Dict[str, Any]]] = None,
+        full_scan: bool = False,
+        index: Optional[str] = None
+) -> Dict[str, Any]:
+    return {
+        'operation': operation,
+        'detail': detail,
+        'estimated_rows': max(0, int(round(estimated_rows))),
+        # cost is cumulative, it includes the cost of the children
+        'cost': cost + sum(child['cost'] for child in children or []),
+        'stage': stage,
+        'full_scan': full_scan,
+        'index': index,
+        'actual_rows': None,
+        'time_ms': None,
+        'children': children or [],
+    }
+
+
+def explain(db_manager, sql: str) -> Dict[str, Any]:
+    """
+    Builds an estimated plan for a statement. ribbitxdb's own EXPLAIN only
+    returns a fixed row, so the plan is derived from the parsed statement,
+    table row counts and the schema. The engine has no index access path,
+    so every table read is a full scan; columns that are primary keys or
+    unique are still reported as index candidates
+    :param db_manager: DatabaseManager of the database to plan against
+    :param sql: Statement
+    :return: Dict[str, Any] - Root plan node
+    """
+    parsed = SQLParser().parse(sql.strip().rstrip(';'))
+    statement_type = parsed.get('type')
+    planner = _Planner(db_manager)
+
+    match statement_type:
+        case 'SELECT':
+            return planner.plan_select(parsed)
+        case 'UPDATE' | 'DELETE':
+            source = planner.plan_source(parsed['table'], parsed.get('where'))
+            operation = 'Update' if statement_type == 'UPDATE' else 'Delete'
+            return _node(operation, parsed['table'], source['estimated_rows'], source['estimated_rows'], 'write', [source])
+        case 'INSERT':
+            return _node('Insert', parsed['table'], 1, 1, 'write')
+        case _:
+            return _node(str(statement_type).title(), parsed.get('table') or '', 0, 0, 'other')
+
+
+def analyze(db_manager, sql: str) -> Dict[str, Any]:
+    """
+    Builds the estimated plan then runs the SELECT, timing each plan stage.
+    The stages are replayed with ribbitxdb's own executor steps so the
+    actual row count and time of every node can be recorded. Only SELECT
+    statements are run
+    :param db_manager: DatabaseManager of the database to plan against
+    :param sql: SELECT statement
+    :return: Dict[str, Any] - Root plan node with actual rows and times
+    """
+    plan = explain(db_manager, sql)
+    parsed = SQLParser().parse(sql.strip().rstrip(';'))
+
+    if parsed.get('type') != 'SELECT':
+        raise ValueError("Analyze only runs SELECT statements")
+
+    nodes = _nodes_by_stage(plan)
+    connection = db_manager._get_connection()
+
+    try:
+        executor = connection.executor
+        _replay_select(executor, parsed, nodes)
+    except AttributeError:
+        # executor internals changed, fall back to timing the whole statement
+        start = time.perf_counter_ns()
+        rows = connection.cursor().execute(sql).fetchall()
+        plan['actual_rows'] = len(rows)
+        plan['time_ms'] = (time.perf_counter_ns() - start) / 1e6
+    finally:
+        connection.close()
+
+    return plan
+
+
+def format_condition(condition: Any) -> str:
+    """Render a parsed WHERE clause back to readable SQL"""
+    if not isinstance(condition, dict):
+        return repr(condition)
+
+    if condition.get('type') == 'identifier':
+        return str(condition.get('value'))
+
+    if condition.get('type') == 'literal':
+        value = condition.get('value')
+        return f"'{value}'" if isinstance(value, str) else str(value)
+
+    operator = str(condition.get('operator', '')).upper()
+    left = format_condition(condition.get('left'))
+    right = format_condition(condition.get('right'))
+
+    if operator in ('AND', 'OR'):
+        return f"({left} {operator} {right})"
+
+    return f"{left} {operator} {right}"
+
+
+class _Planner:
+    def __init__(self, db_manager):
+        self.db_manager = db_manager
+        self._row_counts: Dict[str, int] = {}
+        self._indexed: Dict[str, List[str]] = {}
+
+    def row_count(self, table_name: str) -> int:
+        if table_name not in self._row_counts:
+            self._row_counts[table_name] = self.db_manager.count_table_rows(table_name)
+
+        return self._row_counts[table_name]
+
+    def indexed_columns(self, table_name: str) -> List[str]:
+        if table_name not in self._indexed:
+            self._indexed[table_name] = [
+                col['column_name'] for col in self.db_manager.get_table_schema(table_name)
+                if col['primary_key'] or col['unique_constraint']
+            ]
+
+        return self._indexed[table_name]
+
+    def plan_scan(self, table_name: str, where: Optional[Dict] = None) -> Dict[str, Any]:
+        rows = self.row_count(table_name)
+        candidates = [
+            col for col in self._index_candidates(where)
+            if col in self.indexed_columns(table_name)
+        ]
+        index = f"candidate: {', '.join(candidates)} (not used by engine)" if candidates else None
+
+        return _node('Full Table Scan', table_name, rows, rows, 'scan', full_scan=True, index=index)
+
+    def plan_source(self, table_name: str, where: Optional[Dict], joins: Optional[List[Dict]] = None) -> Dict[str, Any]:
+        node = self.plan_scan(table_name, where)
+
+        for join in joins or []:
+            right = self.plan_scan(join['table'], where)
+            left_rows = node['estimated_rows']
+            right_rows = right['estimated_rows']
+            on = join['on']
+            # assume key joins, each row matches about one row on the other side
+            estimated = max(left_rows, right_rows) if join['type'] != 'INNER' else min(left_rows, right_rows)
+            node = _node(
+                'Nested Loop Join',
+                f"{join['type']} JOIN {join['table']} ON {on['left']} = {on['right']}",
+                estimated,
+                left_rows * right_rows,
+                'join',
+                [node, right]
+            )
+
+        if where:
+            input_rows = node['estimated_rows']
+            selectivity = self._selectivity(where, table_name, input_rows)
+            node = _node('Filter', format_condition(where), input_rows * selectivity, input_rows, 'filter', [node])
+
+        return node
+
+    def plan_select(self, parsed: Dict[str, Any]) -> Dict[str, Any]:
+        node = self.plan_source(parsed['table'], parsed.get('where'), parsed.get('joins'))
+        rows = node['estimated_rows']
+
+        if parsed.get('aggregates') or parsed.get('group_by'):
+            group_by = parsed.get('group_by')
+            # without statistics, guess that groups hold ten rows each
+            estimated = max(1, rows // 10) if group_by else 1
+            detail = f"GROUP BY {', '.join(group_by)}" if group_by else ', '.join(
+                agg['alias'] for agg in parsed.get('aggregates', [])
+            )
+            node = _node('Aggregate', detail, estimated, rows, 'aggregate', [node])
+        elif parsed.get('distinct'):
+            node = _node('Distinct', ', '.join(parsed['columns']), rows, rows, 'distinct', [node])
+
+        rows = node['estimated_rows']
+        if order_by := parsed.get('order_by'):
+            detail = ', '.join(f"{x['column']} {x['direction']}" for x in order_by)
+            node = _node('Sort', detail, rows, rows * math.log2(max(rows, 2)), 'sort', [node])
+
+        node = _node('Project', ', '.join(parsed.get('columns', [])), rows, rows, 'project', [node])
+
+        limit = parsed.get('limit')
+        offset = parsed.get('offset')
+        if limit or offset:
+            estimated = max(0, rows - (offset or 0))
+            if limit:
+                estimated = min(estimated, limit)
+            node = _node('Limit', f"LIMIT {limit} OFFSET {offset or 0}", estimated, 0, 'limit', [node])
+
+        if union := parsed.get('union'):
+            right = self.plan_select(union['next'])
+            node = _node(
+                'Union All' if union['all'] else 'Union',
+                '',
+                node['estimated_rows'] + right['estimated_rows'],
+                node['estimated_rows'] + right['estimated_rows'],
+                'union',
+                [node, right]
+            )
+
+        return node
+
+    def _selectivity(self, condition: Dict[str, Any], table_name: str, rows: int) -> float:
+        operator = str(condition.get('operator', '')).upper()
+
+        if operator == 'AND':
+            return (
+                self._selectivity(condition['left'], table_name, rows) *
+                self._selectivity(condition['right'], table_name, rows)
+            )
+
+        if operator == 'OR':
+            left = self._selectivity(condition['left'], table_name, rows)
+            right = self._selectivity(condition['right'], table_name, rows)
+            return left + right - left * right
+
+        column = (condition.get('left') or {}).get('value')
+        value = (condition.get('right') or {}).get('value')
+
+        if operator == '=':
+            # primary key or unique lookup matches at most one row
+            if column in self.indexed_columns(table_name) and rows > 0:
+                return 1 / rows
+            return EQUALS_SELECTIVITY
+        if operator in ('!=', '<>'):
+            return NOT_EQUALS_SELECTIVITY
+        if operator in RANGE_OPERATORS:
+            return RANGE_SELECTIVITY
+        if operator == 'LIKE':
+            prefix = isinstance(value, str) and not value.startswith(('%', '_'))
+            return PREFIX_SELECTIVITY if prefix else CONTAINS_SELECTIVITY
+        if operator == 'IN' and isinstance(value, list):
+            return min(1.0, len(value) * EQUALS_SELECTIVITY)
+
+        return EQUALS_SELECTIVITY
+
+    def _index_candidates(self, condition: Optional[Dict[str, Any]]) -> List[str]:
+        """Columns compared by equality, IN or a prefix LIKE"""
+        if not isinstance(condition, dict):
+            return []
+
+        operator = str(condition.get('operator', '')).upper()
+        if operator in ('AND', 'OR'):
+            return self._index_candidates(condition.get('left')) + self._index_candidates(condition.get('right'))
+
+        column = (condition.get('left') or {}).get('value')
+        value = (condition.get('right') or {}).get('value')
+
+        if operator in ('=', 'IN') + RANGE_OPERATORS:
+            return [column]
+        if operator == 'LIKE' and isinstance(value, str) and not value.startswith(('%', '_')):
+            return [column]
+
+        return []
+
+
+def _nodes_by_stage(plan: Dict[str, Any]) -> Dict[str, List[Dict[str, Any]]]:
+    """Plan nodes grouped by stage, in execution (bottom up) order"""
+    nodes: Dict[str, List[Dict[str, Any]]] = {}
+
+    def visit(node):
+        for child in node['children']:
+            visit(child)
+        nodes.setdefault(node['stage'], []).append(node)
+
+    visit(plan)
+    return nodes
+
+
+def _replay_select(executor, parsed: Dict[str, Any], nodes: Dict[str, List[Dict[str, Any]]]):
+    """Run the steps of ribbitxdb's execute_select one at a time, timing each"""
+
+    def record(stage, fn, *args, position=0):
+        start = time.perf_counter_ns()
+        result = fn(*args)
+        elapsed = (time.perf_counter_ns() - start) / 1e6
+        stage_nodes = nodes.get(stage, [])
+        if position < len(stage_nodes):
+            stage_nodes[position]['actual_rows'] = len(result)
+            stage_nodes[position]['time_ms'] = elapsed
+        return result
+
+    table_name = parsed['table']
+    rows = record('scan', executor._get_source_rows, table_name)
+
+    for idx, join in enumerate(parsed.get('joins') or []):
+        rows = record('join', executor._execute_joins, rows, [join], table_name, position=idx)
+
+    if parsed.get('where'):
+        rows = record('filter', executor._filter_rows_advanced, rows, parsed['where'])
+
+    if parsed.get('aggregates') or parsed.get('group_by'):
+        rows = record('aggregate', executor._execute_aggregates, rows, parsed)
+    elif parsed.get('distinct'):
+        rows = record('distinct', executor._apply_distinct, rows, parsed['columns'])
+
+    if parsed.get('order_by'):
+        rows = record('sort', executor._apply_order_by, rows, parsed['order_by'])
+
+    def project(rows):
+        if parsed.get('aggregates') or parsed.get('group_by') or parsed['columns'] == ['*']:
+            return rows
+        return [{col: row.get(col) for col in parsed['columns']} for row in rows]
+
+    rows = record('project', project, rows)
+
+    def limit(rows):
+        if parsed.get('offset'):
+            rows = rows[parsed['offset']:]
+        if parsed.get('limit'):
+            rows = rows[:parsed['limit']]
+        return rows
+
+    rows = record('limit', limit, rows)
+
+    if union := parsed.get('union'):
+        record('union', lambda: rows + executor.execute_select(union['next']))
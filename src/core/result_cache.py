@@ -0,0 +1,96 @@
+from typing import Dict, Any, Optional, Tuple, Hashable
+from collections import OrderedDict
+import threading
+import re
+
+# string literals and quoted identifiers are kept as they are, whitespace
+# outside of them is collapsed
+_NORMALIZE_PATTERN = re.compile(r"('(?:[^']|'')*'|\"(?:[^\"]|\"\")*\")|\s+")
+
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+
+def normalize_sql(sql: str) -> str:
+    """Collapse whitespace and drop the trailing semicolon so formatting doesn't change the key"""
+    normalized = _NORMALIZE_PATTERN.sub(lambda m: m.group(1) or ' ', sql.strip())
+    return normalized.rstrip('; ')
+
+
+def estimate_size(result: Dict[str, Any]) -> int:
+    """Rough memory footprint of a result, good enough to bound the cache"""
+    size = 64 * len(result.get('columns', []))
+
+    for row in result.get('rows', []):
+        size += 56 + 8 * len(row)
+        for value in row:
+            if isinstance(value, (str, bytes)):
+                size += len(value) + 49
+            else:
+                size += 32
+
+    return size
+
+
+class ResultCache:
+    """
+    LRU cache of SELECT results bounded by their estimated size. Keys
+    include the database generation, so results from before an outside
+    write are never returned, they just age out
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[Hashable, Tuple[Dict[str, Any], int]] = OrderedDict()
+        # queries may run on worker threads
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(sql: str, params: Optional[tuple], version: Hashable, max_rows: int) -> Tuple:
+        return normalize_sql(sql), tuple(params or ()), version, max_rows
+
+    def get(self, key: Hashable) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key: Hashable, result: Dict[str, Any]):
+        size = estimate_size(result)
+        if size > self.max_bytes:
+            return
+
+        with self._lock:
+            if key in self._entries:
+                self.size -= self._entries.pop(key)[1]
+
+            self._entries[key] = (result, size)
+            self.size += size
+
+            while self.size > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self.size -= evicted_size
+
+    def clear(self):
+        """Drop every entry, called after writes through the viewer"""
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'entries': len(self._entries),
+            'size': self.size,
+        }
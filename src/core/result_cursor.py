@@ -0,0 +1,128 @@
+"""
+Cursor of a truncated SELECT, kept so the rest of the result can be
+fetched on demand instead of running the query again.
+
+ribbitxdb builds the whole result when the statement executes and the
+cursor reads from it without its connection, so the connection is closed
+right away like after any query. A connection left open would write its
+stale metadata when it's finally closed and undo writes made in the
+meantime. The unread rows stay in memory until the cursor is closed, so
+cursors are closed when they sat unused for max_idle seconds.
+"""
+from typing import List, Optional, Callable
+import threading
+import time
+
+# seconds a cursor may sit unused before expired() is True
+DEFAULT_MAX_IDLE = 300
+
+
+class ResultCursor:
+    """Remaining rows of a query result, fetched in batches"""
+
+    def __init__(self, cursor, columns: List[str], position: int, pending: Optional[List[tuple]] = None, max_idle: float = DEFAULT_MAX_IDLE):
+        """
+        :param cursor: DB-API cursor positioned after the rows read so far
+        :param columns: Result columns
+        :param position: Rows already handed out, before pending
+        :param pending: Rows read ahead of position, returned first
+        :param max_idle: Seconds without a fetch until the cursor expires
+        """
+        self.columns = columns
+        self.position = position
+        self.max_idle = max_idle
+        # the engine's row count covers the whole result, -1 when unknown
+        self.total_rows: Optional[int] = cursor.rowcount if cursor.rowcount >= 0 else None
+        self.last_used = time.monotonic()
+        self._cursor = cursor
+        self._pending = list(pending or [])
+        self._lock = threading.Lock()
+
+        if not self._pending:
+            self._read_ahead()
+
+    @property
+    def closed(self) -> bool:
+        return self._cursor is None
+
+    @property
+    def remaining_rows(self) -> Optional[int]:
+        """Rows not fetched yet, None when the engine doesn't report a total"""
+        if self.total_rows is None:
+            return None if not self.closed else 0
+        return max(0, self.total_rows - self.position)
+
+    def fetch(self, max_rows: int) -> List[tuple]:
+        """
+        Next rows of the result, the cursor closes itself after the last one.
+        Safe to call from a worker thread
+        :param max_rows: Rows to fetch, 0 for all that are left
+        :return: List[tuple]
+        """
+        with self._lock:
+            if self._cursor is None:
+                raise RuntimeError("Result cursor is closed, execute the query again")
+
+            rows = self._pending
+            if max_rows <= 0:
+                rows += self._cursor.fetchall()
+            elif len(rows) < max_rows:
+                rows += self._cursor.fetchmany(max_rows - len(rows))
+            self._pending = rows[max_rows:] if max_rows > 0 else []
+            rows = rows[:max_rows] if max_rows > 0 else rows
+
+            self.position += len(rows)
+            self.last_used = time.monotonic()
+            if not self._pending:
+                self._read_ahead()
+
+            return rows
+
+    def fetch_batches(
+            self,
+            max_rows: int,
+            batch_size: int,
+            progress_callback: Optional[Callable[[List[tuple]], None]] = None,
+            is_cancelled: Optional[Callable[[], bool]] = None
+    ) -> int:
+        """
+        Fetch in batches passed to progress_callback, so large fetches don't
+        have to be held in one list
+        :param max_rows: Rows to fetch, 0 for all that are left
+        :param batch_size: Rows per batch
+        :param progress_callback: Called with each batch
+        :param is_cancelled: Polled between batches
+        :return: int - Rows fetched
+        """
+        fetched = 0
+        while not self.closed and (max_rows <= 0 or fetched < max_rows):
+            if is_cancelled and is_cancelled():
+                break
+
+            rows = self.fetch(batch_size if max_rows <= 0 else min(batch_size, max_rows - fetched))
+            fetched += len(rows)
+            if progress_callback:
+                progress_callback(rows)
+
+        return fetched
+
+    def expired(self, now: Optional[float] = None) -> bool:
+        """True when no rows were fetched for max_idle seconds"""
+        return (now if now is not None else time.monotonic()) - self.last_used > self.max_idle
+
+    def close(self):
+        """Release the unread rows"""
+        with self._lock:
+            if self._cursor is not None:
+                self._cursor.close()
+                self._cursor = None
+            self._pending = []
+
+    def _read_ahead(self):
+        # one row ahead tells whether there is more without a trailing empty fetch
+        row = self._cursor.fetchone()
+        if row is None:
+            self._cursor.close()
+            self._cursor = None
+        else:
+            self._pending = [row]
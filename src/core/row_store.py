@@ -0,0 +1,314 @@
+"""
+Rows of a result that move to a temporary file once they outgrow a
+memory budget, so huge results can be paged, sorted and exported without
+holding them in memory.
+
+Spilled rows are pickled in blocks of BLOCK_ROWS with an index of block
+offsets, a page reads one or two blocks and a row costs its share of an
+8 byte offset in memory. Sorting a spilled store is an external merge
+sort: runs sized to the memory budget are sorted, written to a second
+file and merged into a new store.
+
+    store = RowStore(spill_bytes=64 * 1024 * 1024)
+    for columns, rows in db_manager.iter_query(sql):
+        store.extend(rows)
+    page = store[5000:5050]
+    by_age = sorted_by_column(store, 3)
+"""
+from typing import List, Optional, Callable, Iterator, Iterable, Any, Tuple
+from collections import OrderedDict
+from .result_cache import estimate_size
+from array import array
+import threading
+import tempfile
+import pickle
+import heapq
+
+DEFAULT_SPILL_BYTES = 256 * 1024 * 1024
+
+# rows per block in the spill file
+BLOCK_ROWS = 1000
+
+# blocks kept in memory for paging back and forth
+CACHED_BLOCKS = 16
+
+# rows per block of a sorted run, the merge holds one block per run
+MERGE_BLOCK_ROWS = 256
+
+# smallest sorted run, budgets below it would make too many runs to merge
+MIN_RUN_ROWS = 10_000
+
+
+def numeric_key(column: int) -> Callable[[tuple], float]:
+    """Sort key of a numeric column, NULLs first. Raises on text"""
+    return lambda row: float(row[column]) if row[column] is not None else float('-inf')
+
+
+def text_key(column: int) -> Callable[[tuple], str]:
+    """Sort key comparing any column as text, NULLs first"""
+    return lambda row: str(row[column]) if row[column] is not None else ""
+
+
+class RowStore:
+    """
+    List of rows kept in memory up to spill_bytes and in a temporary file
+    past it. Supports len, indexing, slicing, extend and sort like a list.
+    Reads and appends are thread safe, so a store can be sorted on a
+    worker thread while pages are read from it
+    """
+
+    def __init__(self, rows: Optional[List[tuple]] = None, spill_bytes: int = DEFAULT_SPILL_BYTES, directory: Optional[str] = None):
+        """
+        :param rows: Initial rows, the list is taken over rather than copied
+        :param spill_bytes: Estimated size past which rows go to disk, 0 never spills
+        :param directory: Directory of the spill file, the system temp directory by default
+        """
+        self.spill_bytes = spill_bytes
+        self.directory = directory
+        # estimated size of the rows in memory, set per row once spilled
+        self._bytes = 0
+        self._row_bytes = 0
+        # rows after the last full block, all rows until spilled
+        self._rows: List[tuple] = []
+        self._file = None
+        # start offset of each block and the end of the last one
+        self._offsets = array('q')
+        self._spilled_rows = 0
+        self._cache: OrderedDict[int, List[tuple]] = OrderedDict()
+        self._lock = threading.RLock()
+
+        if rows:
+            self._rows = rows if isinstance(rows, list) else list(rows)
+            self._bytes = estimate_size({'rows': self._rows})
+            self._check_budget()
+
+    @property
+    def spilled(self) -> bool:
+        return self._file is not None
+
+    @property
+    def memory_bytes(self) -> int:
+        """Estimated size of the rows held in memory, including cached blocks"""
+        if not self.spilled:
+            return self._bytes
+        return self._row_bytes * (len(self._rows) + sum(len(block) for block in self._cache.values()))
+
+    @property
+    def disk_bytes(self) -> int:
+        return self._offsets[-1] if self.spilled else 0
+
+    def __len__(self) -> int:
+        return self._spilled_rows + len(self._rows)
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            start, stop, step = key.indices(len(self))
+            if step != 1:
+                return [self[idx] for idx in range(start, stop, step)]
+            return self._range(start, stop)
+
+        size = len(self)
+        if key < 0:
+            key += size
+        if not 0 <= key < size:
+            raise IndexError("RowStore index out of range")
+        return self._range(key, key + 1)[0]
+
+    def __iter__(self) -> Iterator[tuple]:
+        for batch in self.iter_batches():
+            yield from batch
+
+    def iter_batches(self, batch_size: int = BLOCK_ROWS) -> Iterator[List[tuple]]:
+        """Rows in batches, for exports"""
+        for start in range(0, len(self), batch_size):
+            yield self._range(start, start + batch_size)
+
+    def extend(self, rows: Iterable[tuple]):
+        with self._lock:
+            if not self.spilled:
+                rows = rows if isinstance(rows, list) else list(rows)
+                self._rows.extend(rows)
+                self._bytes += estimate_size({'rows': rows})
+                self._check_budget()
+            else:
+                self._rows.extend(rows)
+                self._flush_blocks()
+
+    def sort(self, key: Callable[[tuple], Any], reverse: bool = False):
+        """Sort in place, spilled rows with an external merge sort"""
+        if not self.spilled:
+            self._rows.sort(key=key, reverse=reverse)
+            return
+
+        result = self.sorted(key, reverse)
+        with self._lock:
+            self._close_file()
+            self._file, result._file = result._file, None
+            self._offsets = result._offsets
+            self._spilled_rows = result._spilled_rows
+            self._rows = result._rows
+
+    def sorted(
+            self,
+            key: Callable[[tuple], Any],
+            reverse: bool = False,
+            progress_callback: Optional[Callable[[float], None]] = None,
+            is_cancelled: Optional[Callable[[], bool]] = None
+    ) -> 'RowStore':
+        """
+        Sorted copy, the store itself is unchanged and stays readable. Memory
+        is bounded by spill_bytes for the runs and a block per run for the merge
+        :param key: Sort key of a row, its exceptions are raised
+        :param reverse: Descending order
+        :param progress_callback: Called with the fraction done
+        :param is_cancelled: Polled per run and block, raises RuntimeError when True
+        :return: RowStore
+        """
+        if not self.spilled:
+            return RowStore(sorted(self._rows, key=key, reverse=reverse), self.spill_bytes, self.directory)
+
+        total = len(self)
+        run_rows = max(MIN_RUN_ROWS, self.spill_bytes // max(1, self._row_bytes))
+        result = RowStore(spill_bytes=self.spill_bytes, directory=self.directory)
+        result._start_spill(self._row_bytes)
+        runs_file = tempfile.TemporaryFile(prefix='rbx-sort-', dir=self.directory)
+
+        def report(done: int):
+            if is_cancelled and is_cancelled():
+                raise RuntimeError("Sort cancelled")
+            if progress_callback:
+                progress_callback(done / (2 * total))
+
+        try:
+            runs = []
+            for start in range(0, total, run_rows):
+                run = self._range(start, start + run_rows)
+                run.sort(key=key, reverse=reverse)
+                runs.append(_write_run(runs_file, run))
+                report(start + len(run))
+
+            merged = heapq.merge(*(_read_run(runs_file, blocks) for blocks in runs), key=key, reverse=reverse)
+            batch = []
+            for row in merged:
+                batch.append(row)
+                if len(batch) == BLOCK_ROWS:
+                    result.extend(batch)
+                    batch = []
+                    report(total + len(result))
+            result.extend(batch)
+        except BaseException:
+            result.close()
+            raise
+        finally:
+            runs_file.close()
+
+        return result
+
+    def close(self):
+        """Drop the rows and delete the spill file"""
+        with self._lock:
+            self._close_file()
+            self._rows = []
+            self._bytes = 0
+
+    def _check_budget(self):
+        if self.spill_bytes and self._bytes > self.spill_bytes:
+            self._start_spill(max(1, self._bytes // max(1, len(self._rows))))
+            self._flush_blocks()
+
+    def _start_spill(self, row_bytes: int):
+        self._row_bytes = row_bytes
+        self._file = tempfile.TemporaryFile(prefix='rbx-rows-', dir=self.directory)
+        self._offsets = array('q', [0])
+
+    def _flush_blocks(self):
+        """Write every full block of in-memory rows to the file"""
+        rows = self._rows
+        full = len(rows) - len(rows) % BLOCK_ROWS
+        for start in range(0, full, BLOCK_ROWS):
+            data = pickle.dumps(rows[start:start + BLOCK_ROWS], pickle.HIGHEST_PROTOCOL)
+            self._file.seek(self._offsets[-1])
+            self._file.write(data)
+            self._offsets.append(self._offsets[-1] + len(data))
+            self._spilled_rows += BLOCK_ROWS
+        if full:
+            self._rows = rows[full:]
+
+    def _read_block(self, index: int) -> List[tuple]:
+        block = self._cache.get(index)
+        if block is not None:
+            self._cache.move_to_end(index)
+            return block
+
+        self._file.seek(self._offsets[index])
+        block = pickle.loads(self._file.read(self._offsets[index + 1] - self._offsets[index]))
+        self._cache[index] = block
+        if len(self._cache) > CACHED_BLOCKS:
+            self._cache.popitem(last=False)
+        return block
+
+    def _range(self, start: int, stop: int) -> List[tuple]:
+        with self._lock:
+            if not self.spilled:
+                return self._rows[start:stop]
+
+            rows = []
+            position = start
+            while position < min(stop, self._spilled_rows):
+                index, offset = divmod(position, BLOCK_ROWS)
+                taken = self._read_block(index)[offset:offset + stop - position]
+                rows.extend(taken)
+                position += len(taken)
+
+            if stop > self._spilled_rows:
+                rows.extend(self._rows[max(0, start - self._spilled_rows):stop - self._spilled_rows])
+            return rows
+
+    def _close_file(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        self._offsets = array('q')
+        self._spilled_rows = 0
+        self._cache.clear()
+
+
+def sorted_by_column(
+        store: RowStore,
+        column: int,
+        reverse: bool = False,
+        progress_callback: Optional[Callable[[float], None]] = None,
+        is_cancelled: Optional[Callable[[], bool]] = None
+) -> RowStore:
+    """
+    Sorted copy of a store by one column, numerically when every value
+    converts to a number and as text otherwise
+    :param store: Rows to sort
+    :param column: Column index
+    :param reverse: Descending order
+    :param progress_callback: Called with the fraction done
+    :param is_cancelled: Polled while sorting, raises RuntimeError when True
+    :return: RowStore
+    """
+    try:
+        return store.sorted(numeric_key(column), reverse, progress_callback, is_cancelled)
+    except (ValueError, TypeError):
+        return store.sorted(text_key(column), reverse, progress_callback, is_cancelled)
+
+
+def _write_run(file, rows: List[tuple]) -> List[Tuple[int, int]]:
+    """Append a sorted run in blocks, returns the (offset, length) of each"""
+    blocks = []
+    file.seek(0, 2)
+    for start in range(0, len(rows), MERGE_BLOCK_ROWS):
+        data = pickle.dumps(rows[start:start + MERGE_BLOCK_ROWS], pickle.HIGHEST_PROTOCOL)
+        blocks.append((file.tell(), len(data)))
+        file.write(data)
+    return blocks
+
+
+def _read_run(file, blocks: List[Tuple[int, int]]) -> Iterator[tuple]:
+    for offset, length in blocks:
+        # runs are read interleaved, every block seeks
+        file.seek(offset)
+        yield from pickle.loads(file.read(length))
@@ -0,0 +1,251 @@
+from typing import List, Dict, Any, Optional, Iterable, Callable, Set, Tuple
+from .file_version import database_version
+from pathlib import Path
+import bisect
+import json
+import re
+import os
+
+_TOKEN_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+INDEX_FILE_SUFFIX = ".idx"
+INDEX_FORMAT_VERSION = 2
+
+
+def tokenize(text: Any) -> List[str]:
+    """Split a cell value into lowercase word tokens"""
+    if text is None:
+        return []
+
+    return _TOKEN_PATTERN.findall(str(text).lower())
+
+
+def index_path(db_path: str) -> Path:
+    """Sidecar index file stored next to the database, e.g. data.rbx.idx"""
+    return Path(db_path + INDEX_FILE_SUFFIX)
+
+
+class SearchIndex:
+    """
+    Inverted index (column -> token -> primary keys) over the text columns
+    of one table. Answers word searches without scanning the table, a row
+    matches when one of the searched columns has every word
+    """
+
+    def __init__(self, db_path: str, table_name: str, pk_column: str, columns: List[str]):
+        self.db_path = db_path
+        self.table_name = table_name
+        self.pk_column = pk_column
+        self.columns = list(columns)
+        self.version: Optional[str] = None
+        self.postings: Dict[str, Dict[str, Set[Any]]] = {column: {} for column in self.columns}
+        self.row_count = 0
+        self._sorted_tokens: Dict[str, List[str]] = {}
+
+    @property
+    def term_count(self) -> int:
+        return sum(len(postings) for postings in self.postings.values())
+
+    def add_rows(self, rows: Iterable[tuple]):
+        """Add rows of (pk, *column_values) to the index, values in the order of columns"""
+        for row in rows:
+            pk = row[0]
+            for column, value in zip(self.columns, row[1:]):
+                postings = self.postings[column]
+                for token in tokenize(value):
+                    postings.setdefault(token, set()).add(pk)
+            self.row_count += 1
+
+        self._sorted_tokens = {}
+
+    def build(
+            self,
+            db_manager,
+            batch_size: int = 5000,
+            progress_callback: Optional[Callable[[int], None]] = None,
+            is_cancelled: Optional[Callable[[], bool]] = None
+    ) -> 'SearchIndex':
+        """
+        Build the index from scratch, one batch at a time. Safe to run on a
+        worker thread as long as the index isn't searched until it returns
+        :param db_manager: DatabaseManager for the indexed database
+        :param batch_size: Rows fetched per batch
+        :param progress_callback: Called with the number of rows indexed so far
+        :param is_cancelled: Polled between batches, stops the build when True
+        :return: SearchIndex
+        """
+        # take the version first so writes during the build leave it stale
+        version = database_version(self.db_path)
+        self.postings = {column: {} for column in self.columns}
+        self.row_count = 0
+
+        for batch in db_manager.iter_table_rows(
+            self.table_name, [self.pk_column] + self.columns, batch_size
+        ):
+            if is_cancelled and is_cancelled():
+                self.version = None
+                return self
+
+            self.add_rows(batch)
+            if progress_callback:
+                progress_callback(self.row_count)
+
+        self.version = version
+        return self
+
+    def is_stale(self) -> bool:
+        """Index needs rebuilding if the database changed since it was built"""
+        if self.version is None:
+            return True
+
+        try:
+            return database_version(self.db_path) != self.version
+        except OSError:
+            return True
+
+    def covers(self, columns: Iterable[str]) -> bool:
+        """Whether every given column is indexed"""
+        return set(columns).issubset(self.columns)
+
+    def search(self, text: str, columns: Optional[Iterable[str]] = None, prefix: bool = True) -> List[Any]:
+        """
+        Returns sorted primary keys of rows where one of the columns contains
+        every token in text. With prefix set, the last token matches any
+        token starting with it
+        :param text: Search text
+        :param columns: Columns to search, all indexed columns when None
+        :param prefix: Treat the last token as a prefix
+        :return: List[Any]
+        """
+        tokens = tokenize(text)
+        if not tokens:
+            return []
+
+        result: Set[Any] = set()
+        for column in (self.columns if columns is None else columns):
+            result |= self._search_column(column, tokens, prefix)
+
+        return sorted(result)
+
+    def _search_column(self, column: str, tokens: List[str], prefix: bool) -> Set[Any]:
+        postings = self.postings.get(column, {})
+        result: Optional[Set[Any]] = None
+        for idx, token in enumerate(tokens):
+            if prefix and idx == len(tokens) - 1:
+                matches = self._prefix_postings(column, token)
+            else:
+                matches = postings.get(token, set())
+
+            result = matches if result is None else result & matches
+            if not result:
+                return set()
+
+        return result
+
+    def _prefix_postings(self, column: str, token: str) -> Set[Any]:
+        postings = self.postings.get(column, {})
+        sorted_tokens = self._sorted_tokens.get(column)
+        if sorted_tokens is None:
+            sorted_tokens = self._sorted_tokens[column] = sorted(postings.keys())
+
+        matches: Set[Any] = set()
+        start = bisect.bisect_left(sorted_tokens, token)
+        for candidate in sorted_tokens[start:]:
+            if not candidate.startswith(token):
+                break
+            matches |= postings[candidate]
+
+        return matches
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'pk_column': self.pk_column,
+            'columns': self.columns,
+            'version': self.version,
+            'row_count': self.row_count,
+            'postings': {
+                column: {token: list(keys) for token, keys in postings.items()}
+                for column, postings in self.postings.items()
+            },
+        }
+
+    @classmethod
+    def from_dict(cls, db_path: str, table_name: str, data: Dict[str, Any]) -> 'SearchIndex':
+        index = cls(db_path, table_name, data['pk_column'], data['columns'])
+        index.version = data.get('version')
+        index.row_count = data.get('row_count', 0)
+        postings = data.get('postings', {})
+        index.postings = {
+            column: {token: set(keys) for token, keys in postings.get(column, {}).items()}
+            for column in index.columns
+        }
+        return index
+
+
+def search_words(
+        db_manager,
+        table_name: str,
+        pk_column: str,
+        columns: List[str],
+        text: str,
+        index: Optional[SearchIndex] = None
+) -> Tuple[List[Any], Optional[SearchIndex]]:
+    """
+    Keys of rows where one of the columns holds every word of text, the
+    last word as a prefix of a word. Unlike a LIKE prefix search the words
+    may be anywhere in the value and in any order. The given index answers
+    when it covers the columns, it's rebuilt first when stale. Without one
+    an index of the columns is built for this search, so the rows don't
+    depend on whether an index exists
+    :param db_manager: DatabaseManager of the database
+    :param table_name: Table name
+    :param pk_column: Primary key the keys are taken from
+    :param columns: Text columns to search
+    :param text: Search text
+    :param index: Search index of the table
+    :return: Tuple[List[Any], Optional[SearchIndex]] - sorted keys, and the
+    index rebuilt from a stale one that should replace it
+    """
+    rebuilt = None
+    if index is None or index.pk_column != pk_column or not index.covers(columns):
+        index = SearchIndex(db_manager.db_path, table_name, pk_column, columns).build(db_manager)
+    elif index.is_stale():
+        index = rebuilt = SearchIndex(index.db_path, table_name, pk_column, index.columns).build(db_manager)
+
+    return index.search(text, columns), rebuilt
+
+
+def load_indexes(db_path: str) -> Dict[str, SearchIndex]:
+    """Load all table indexes from the database's sidecar file"""
+    path = index_path(db_path)
+    if not path.exists():
+        return {}
+
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        # a broken sidecar is just rebuilt
+        return {}
+
+    if data.get('version') != INDEX_FORMAT_VERSION:
+        return {}
+
+    return {
+        table_name: SearchIndex.from_dict(db_path, table_name, table_data)
+        for table_name, table_data in data.get('tables', {}).items()
+    }
+
+
+def save_indexes(db_path: str, indexes: Dict[str, SearchIndex]):
+    """Write all table indexes to the database's sidecar file"""
+    path = index_path(db_path)
+    data = {
+        'version': INDEX_FORMAT_VERSION,
+        'tables': {name: index.to_dict() for name, index in indexes.items()},
+    }
+
+    tmp_path = path.with_suffix(path.suffix + '.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f)
+    os.replace(tmp_path, path)
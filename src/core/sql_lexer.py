@@ -0,0 +1,125 @@
+"""
+Single-pass SQL lexer for highlighting. Lines are scanned with one combined
+regular expression, constructs spanning lines (block comments, strings and
+quoted identifiers) are carried to the next line as a state number, which
+is what QSyntaxHighlighter stores per block.
+"""
+from typing import List, Tuple
+import re
+
+# token kinds
+KEYWORD = 'keyword'
+FUNCTION = 'function'
+STRING = 'string'
+NUMBER = 'number'
+COMMENT = 'comment'
+
+# line end states
+STATE_NORMAL = 0
+STATE_BLOCK_COMMENT = 1
+STATE_SINGLE_QUOTE = 2
+STATE_DOUBLE_QUOTE = 3
+STATE_BACKTICK = 4
+
+KEYWORDS = frozenset([
+    "SELECT", "FROM", "WHERE", "INSERT", "UPDATE", "DELETE",
+    "CREATE", "DROP", "ALTER", "TABLE", "INDEX", "VIEW",
+    "JOIN", "INNER", "LEFT", "RIGHT", "OUTER", "FULL",
+    "ON", "AND", "OR", "NOT", "IN", "EXISTS", "LIKE",
+    "ORDER", "BY", "GROUP", "HAVING", "LIMIT", "OFFSET",
+    "AS", "DISTINCT", "COUNT", "SUM", "AVG", "MAX", "MIN",
+    "UNION", "INTERSECT", "EXCEPT", "CASE", "WHEN", "THEN",
+    "ELSE", "END", "NULL", "IS", "BETWEEN", "ASC", "DESC",
+    "PRIMARY", "KEY", "FOREIGN", "REFERENCES", "UNIQUE",
+    "DEFAULT", "CHECK", "CONSTRAINT", "AUTO_INCREMENT",
+    "AUTOINCREMENT", "INTEGER", "VARCHAR", "TEXT", "REAL",
+    "BLOB", "NUMERIC", "DATE", "CURRENT_TIMESTAMP",
+    "CURRENT_DATE", "CURRENT_TIME", "BOOLEAN", "INTO",
+    "VALUES", "SET", "SHOW", "EXPLAIN", "DESCRIBE",
+    "RELEASE", "SAVEPOINT", "ROLLBACK", "COMMIT", "BEGIN",
+    "PRAGMA", "IF"
+])
+
+_TOKEN = re.compile(r"""
+    (?P<comment>--.*)
+  | (?P<block>/\*)
+  | (?P<quote>['"`])
+  | (?P<number>\b[0-9]+(?:\.[0-9]+)?\b)
+  | (?P<word>[A-Za-z_][A-Za-z0-9_]*)(?P<call>\()?
+""", re.VERBOSE)
+
+# rest of a quoted section, a doubled quote is an escaped quote
+_QUOTE_END = {
+    "'": re.compile(r"(?:[^']|'')*'"),
+    '"': re.compile(r'(?:[^"]|"")*"'),
+    '`': re.compile(r"(?:[^`]|``)*`"),
+}
+
+_QUOTE_STATES = {"'": STATE_SINGLE_QUOTE, '"': STATE_DOUBLE_QUOTE, '`': STATE_BACKTICK}
+_STATE_QUOTES = {state: quote for quote, state in _QUOTE_STATES.items()}
+
+Token = Tuple[int, int, str]
+
+
+def tokenize_line(text: str, state: int = STATE_NORMAL) -> Tuple[List[Token], int]:
+    """
+    Highlightable tokens of one line
+    :param text: Line text without the line break
+    :param state: State the previous line ended in
+    :return: Tuple[List[Token], int] - (start, length, kind) tokens and the
+    state this line ends in
+    """
+    tokens: List[Token] = []
+    length = len(text)
+    pos = 0
+
+    if state != STATE_NORMAL:
+        kind = COMMENT if state == STATE_BLOCK_COMMENT else STRING
+        pos, state = _continue(text, 0, state)
+        tokens.append((0, pos, kind))
+        if state != STATE_NORMAL:
+            return tokens, state
+
+    search = _TOKEN.search
+    while pos < length:
+        match = search(text, pos)
+        if match is None:
+            break
+
+        start = match.start()
+        group = match.lastgroup
+
+        if group == 'word' or group == 'call':
+            if match.group('call'):
+                tokens.append((start, match.end('word') - start, FUNCTION))
+            elif match.group('word').upper() in KEYWORDS:
+                tokens.append((start, match.end() - start, KEYWORD))
+            pos = match.end('word')
+        elif group == 'number':
+            tokens.append((start, match.end() - start, NUMBER))
+            pos = match.end()
+        elif group == 'comment':
+            tokens.append((start, length - start, COMMENT))
+            pos = length
+        elif group == 'block':
+            end, state = _continue(text, match.end(), STATE_BLOCK_COMMENT)
+            tokens.append((start, end - start, COMMENT))
+            pos = end
+        else:
+            quote = match.group('quote')
+            end, state = _continue(text, match.end(), _QUOTE_STATES[quote])
+            tokens.append((start, end - start, STRING))
+            pos = end
+
+    return tokens, state
+
+
+def _continue(text: str, pos: int, state: int) -> Tuple[int, int]:
+    """End of a construct opened before pos, (end, STATE_NORMAL) when it closes on this line"""
+    if state == STATE_BLOCK_COMMENT:
+        end = text.find('*/', pos)
+        return (len(text), state) if end == -1 else (end + 2, STATE_NORMAL)
+
+    match = _QUOTE_END[_STATE_QUOTES[state]].match(text, pos)
+    return (len(text), state) if match is None else (match.end(), STATE_NORMAL)
+
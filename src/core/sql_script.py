@@ -0,0 +1,191 @@
+from typing import List, Optional, Iterator, Callable, Tuple
+import re
+import os
+
+# statement types that return a result set, ribbitxdb leaves the cursor
+# description empty when they match no rows so the keyword decides
+RESULT_STATEMENTS = ('SELECT', 'PRAGMA', 'SHOW', 'DESCRIBE', 'EXPLAIN')
+
+# statement types that change tables, views or columns
+SCHEMA_STATEMENTS = ('CREATE', 'DROP', 'ALTER')
+
+# characters read per chunk from script files
+DEFAULT_CHUNK_SIZE = 1024 * 1024
+
+_SPECIAL = re.compile(r"['\"`;]|--|/\*")
+
+
+def split_statements(sql: str) -> List[str]:
+    """
+    Split a script into statements on semicolons outside of string
+    literals, quoted identifiers and comments. ribbitxdb's tokenizer has no
+    comment support, so comments are dropped from the statements
+    :param sql: Script text
+    :return: List[str] - Statements without the trailing semicolon
+    """
+    splitter = StatementSplitter()
+    return splitter.feed(sql) + splitter.finish()
+
+
+class StatementSplitter:
+    """
+    Incremental split_statements for scripts read in chunks. Quotes and
+    comments may span chunks, a chunk ending on a character that needs the
+    next one to decide ('-', '/', '*' or a quote) keeps it for the next feed
+    """
+
+    def __init__(self):
+        self._current: List[str] = []
+        self._pending = ''
+        # None outside of quotes and comments, else the opening quote, '--' or '/*'
+        self._mode: Optional[str] = None
+
+    def feed(self, text: str) -> List[str]:
+        """
+        Add text to the script
+        :param text: Next chunk
+        :return: List[str] - Statements completed by this chunk
+        """
+        self._pending += text
+        return self._scan(final=False)
+
+    def finish(self) -> List[str]:
+        """End of the script, returns the last statement if there is one"""
+        statements = self._scan(final=True)
+        _append_statement(statements, self._current)
+        self._current = []
+        self._mode = None
+        return statements
+
+    def _scan(self, final: bool) -> List[str]:
+        statements: List[str] = []
+        current = self._current
+        text = self._pending
+        length = len(text)
+        pos = 0
+
+        while pos < length:
+            mode = self._mode
+
+            if mode is None:
+                match = _SPECIAL.search(text, pos)
+                if match is None:
+                    # a trailing '-' or '/' may start a comment with the next chunk
+                    end = length if final or text[-1] not in '-/' else length - 1
+                    current.append(text[pos:end])
+                    pos = end
+                    break
+
+                token = match.group()
+                current.append(text[pos:match.start()])
+                pos = match.end()
+
+                if token == ';':
+                    _append_statement(statements, current)
+                    current.clear()
+                elif token == '/*':
+                    # keep tokens on both sides of the comment apart
+                    current.append(' ')
+                    self._mode = token
+                elif token == '--':
+                    self._mode = token
+                else:
+                    current.append(token)
+                    self._mode = token
+            elif mode == '--':
+                end = text.find('\n', pos)
+                if end == -1:
+                    pos = length
+                    break
+                self._mode = None
+                pos = end
+            elif mode == '/*':
+                end = text.find('*/', pos)
+                if end == -1:
+                    # a trailing '*' may close the comment with the next chunk
+                    pos = length if final else max(pos, length - 1)
+                    break
+                self._mode = None
+                pos = end + 2
+            else:
+                # copy the quoted section, a doubled quote is an escaped quote
+                end = text.find(mode, pos)
+                if end == -1:
+                    current.append(text[pos:])
+                    pos = length
+                    break
+                if end + 1 == length and not final:
+                    # a closing or an escaped quote, the next chunk decides
+                    current.append(text[pos:end])
+                    pos = end
+                    break
+                if end + 1 < length and text[end + 1] == mode:
+                    current.append(text[pos:end + 2])
+                    pos = end + 2
+                else:
+                    current.append(text[pos:end + 1])
+                    self._mode = None
+                    pos = end + 1
+
+        self._pending = text[pos:]
+        return statements
+
+
+def read_chunks(
+        path: str,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        progress_callback: Optional[Callable[[Tuple[int, int]], None]] = None
+) -> Iterator[str]:
+    """
+    Read a text file in chunks
+    :param path: File path
+    :param chunk_size: Characters per chunk
+    :param progress_callback: Called with (bytes read, file size) after each chunk
+    :return: Iterator[str]
+    """
+    total = os.path.getsize(path)
+
+    with open(path, 'r', encoding='utf-8', errors='replace', newline='') as f:
+        while chunk := f.read(chunk_size):
+            if progress_callback:
+                progress_callback((f.buffer.tell(), total))
+            yield chunk
+
+
+def iter_file_statements(
+        path: str,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        progress_callback: Optional[Callable[[Tuple[int, int]], None]] = None
+) -> Iterator[str]:
+    """Statements of a script file, read in chunks so the file is never fully in memory"""
+    splitter = StatementSplitter()
+
+    for chunk in read_chunks(path, chunk_size, progress_callback):
+        yield from splitter.feed(chunk)
+
+    yield from splitter.finish()
+
+
+def write_script(path: str, text: str):
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(text)
+
+
+def statement_type(statement: str) -> str:
+    """First keyword of a statement, upper cased"""
+    parts = statement.split(None, 1)
+    return parts[0].upper() if parts else ''
+
+
+def returns_rows(statement: str) -> bool:
+    return statement_type(statement) in RESULT_STATEMENTS
+
+
+def changes_schema(statement: str) -> bool:
+    return statement_type(statement) in SCHEMA_STATEMENTS
+
+
+def _append_statement(statements: List[str], parts: List[str]):
+    statement = ''.join(parts).strip()
+    if statement:
+        statements.append(statement)
@@ -0,0 +1,186 @@
+from typing import Dict, Any, Optional, Sequence, Tuple
+from collections import OrderedDict
+import threading
+import time
+
+DEFAULT_MAX_STATEMENTS = 256
+
+# parameter types that ribbitxdb binds as plain literals. NULL and other
+# types are bound as keywords or identifiers and aren't cached
+_SENTINEL_TYPES = (int, float, str)
+
+
+def _sentinel(param_type: type, idx: int) -> Any:
+    """Placeholder literal for a parameter, unlikely to appear in real SQL"""
+    if param_type is int:
+        return 7_314_159_265_358_000 + idx
+    if param_type is float:
+        return 7_314_159_265.5 + idx
+    return f"__ribbit_param_{idx}__"
+
+
+def _substitute(node: Any, values: Dict[Tuple[type, Any], Any]) -> Any:
+    """Copy a parsed tree, swapping sentinels for parameter values"""
+    if isinstance(node, dict):
+        return {key: _substitute(value, values) for key, value in node.items()}
+    if isinstance(node, list):
+        return [_substitute(value, values) for value in node]
+    if isinstance(node, tuple):
+        return tuple(_substitute(value, values) for value in node)
+    if type(node) in _SENTINEL_TYPES:
+        return values.get((type(node), node), node)
+
+    return node
+
+
+def _count_sentinels(node: Any, sentinels: set) -> int:
+    if isinstance(node, dict):
+        return sum(_count_sentinels(value, sentinels) for value in node.values())
+    if isinstance(node, (list, tuple)):
+        return sum(_count_sentinels(value, sentinels) for value in node)
+    if type(node) in _SENTINEL_TYPES:
+        return int((type(node), node) in sentinels)
+
+    return 0
+
+
+class _CachedParser:
+    """
+    Stands in for a connection's SQLParser. The next parse returns the tree
+    handed over by StatementCache.execute instead of parsing the bound SQL
+    """
+
+    def __init__(self, parser):
+        self.parser = parser
+        self.pending: Optional[Dict[str, Any]] = None
+
+    def parse(self, sql: str) -> Dict[str, Any]:
+        if self.pending is not None:
+            parsed, self.pending = self.pending, None
+            return parsed
+
+        return self.parser.parse(sql)
+
+    def __getattr__(self, name):
+        return getattr(self.parser, name)
+
+
+class StatementCache:
+    """
+    LRU cache of parsed statements keyed by SQL text and parameter types.
+    ribbitxdb has no prepared statements, it binds parameters into the SQL
+    text and parses it again on every execute. The cache parses each
+    statement once with placeholder values and fills in the parameters on
+    later executions, so page loads that only change LIMIT/OFFSET or the
+    inserted values skip the parser
+    """
+
+    def __init__(self, max_size: int = DEFAULT_MAX_STATEMENTS):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self.parse_ns = 0
+        self.saved_ns = 0
+        # key -> (template, sentinels, parse time), template is None when
+        # the statement can't be cached
+        self._entries: OrderedDict[Tuple, Tuple[Optional[Dict[str, Any]], Tuple, int]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def execute(self, cursor, sql: str, params: Optional[Sequence] = None):
+        """
+        cursor.execute(sql, params), parsing through the cache
+        :param cursor: ribbitxdb cursor
+        :param sql: SQL with ? placeholders
+        :param params: Parameters
+        :return: Cursor
+        """
+        executor = cursor.connection.executor
+        if not isinstance(executor.parser, _CachedParser):
+            executor.parser = _CachedParser(executor.parser)
+
+        parser: _CachedParser = executor.parser
+        params = tuple(params) if params else ()
+        parser.pending = self.get(parser.parser, sql, params)
+
+        try:
+            return cursor.execute(sql, params) if params else cursor.execute(sql)
+        finally:
+            parser.pending = None
+
+    def get(self, parser, sql: str, params: tuple = ()) -> Optional[Dict[str, Any]]:
+        """
+        Parsed tree for the statement with params filled in, or None when the
+        statement can't be cached and should be parsed as usual
+        """
+        if any(type(param) not in _SENTINEL_TYPES for param in params):
+            return None
+
+        key = (sql, tuple(type(param) for param in params))
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+
+        if entry is None:
+            entry = self._prepare(parser, sql, params)
+            with self._lock:
+                self.misses += 1
+                self.parse_ns += entry[2]
+                self._entries[key] = entry
+                if len(self._entries) > self.max_size:
+                    self._entries.popitem(last=False)
+
+            template, sentinels, _ = entry
+            return _substitute(template, dict(zip(sentinels, params))) if template is not None else None
+
+        template, sentinels, parse_ns = entry
+        if template is None:
+            return None
+
+        start = time.perf_counter_ns()
+        parsed = _substitute(template, dict(zip(sentinels, params)))
+        with self._lock:
+            self.hits += 1
+            self.saved_ns += max(0, parse_ns - (time.perf_counter_ns() - start))
+
+        return parsed
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'entries': len(self._entries),
+            'parse_ms': self.parse_ns / 1e6,
+            'saved_ms': self.saved_ns / 1e6,
+        }
+
+    @classmethod
+    def _prepare(cls, parser, sql: str, params: tuple) -> Tuple[Optional[Dict[str, Any]], Tuple, int]:
+        sentinels = tuple((type(param), _sentinel(type(param), idx)) for idx, param in enumerate(params))
+        bound = sql
+        for param_type, value in sentinels:
+            literal = f"'{value}'" if param_type is str else str(value)
+            bound = bound.replace('?', literal, 1)
+
+        start = time.perf_counter_ns()
+        try:
+            template = parser.parse(bound)
+        except Exception:
+            # let the real execute raise the error for the real values
+            return None, sentinels, 0
+        parse_ns = time.perf_counter_ns() - start
+
+        # every parameter has to land in the tree exactly once, otherwise
+        # the parser transformed it and the template can't be reused
+        if _count_sentinels(template, set(sentinels)) != len(sentinels):
+            return None, sentinels, parse_ns
+
+        return template, sentinels, parse_ns
@@ -0,0 +1,228 @@
+"""
+Row level diff of the same table in two databases. Both sides are read
+in primary key order in batches and merge-joined, so only one batch per
+side is held in memory however large the tables are. Rows are classified
+as added (only in the right database), removed (only in the left one) or
+changed, with the changed columns listed.
+"""
+from typing import List, Dict, Any, Optional, Iterable, Iterator, Tuple, Callable
+from .query_builder import validate_identifier
+
+ADDED = 'added'
+REMOVED = 'removed'
+CHANGED = 'changed'
+UNCHANGED = 'unchanged'
+
+# status, left row, right row, indexes of the changed columns
+DiffRow = Tuple[str, Optional[tuple], Optional[tuple], List[int]]
+
+
+def merge_diff(
+        left_rows: Iterable[tuple],
+        right_rows: Iterable[tuple],
+        key_size: int,
+        include_unchanged: bool = False
+) -> Iterator[DiffRow]:
+    """
+    Merge-join two row streams sorted by their first key_size values
+    :param left_rows: Rows of the old table, key columns first
+    :param right_rows: Rows of the new table, same columns in the same order
+    :param key_size: Number of key columns
+    :param include_unchanged: Also yield rows that are equal on both sides
+    :return: Iterator[DiffRow]
+    """
+    left_iter = iter(left_rows)
+    right_iter = iter(right_rows)
+    left = next(left_iter, None)
+    right = next(right_iter, None)
+
+    while left is not None and right is not None:
+        left_key = left[:key_size]
+        right_key = right[:key_size]
+
+        if left_key == right_key:
+            if left != right:
+                yield CHANGED, left, right, [idx for idx in range(key_size, len(left)) if left[idx] != right[idx]]
+            elif include_unchanged:
+                yield UNCHANGED, left, right, []
+            left = next(left_iter, None)
+            right = next(right_iter, None)
+        elif left_key < right_key:
+            yield REMOVED, left, None, []
+            left = next(left_iter, None)
+        else:
+            yield ADDED, None, right, []
+            right = next(right_iter, None)
+
+    while left is not None:
+        yield REMOVED, left, None, []
+        left = next(left_iter, None)
+
+    while right is not None:
+        yield ADDED, None, right, []
+        right = next(right_iter, None)
+
+
+class TableDiff:
+    """
+    Diff of one table between two DatabaseManagers. Columns present on only
+    one side are listed in left_only_columns/right_only_columns and left
+    out of the comparison
+    """
+
+    def __init__(
+            self,
+            left,
+            right,
+            table_name: str,
+            key_columns: Optional[List[str]] = None,
+            batch_size: int = 5000,
+            backend=None
+    ):
+        self.left = left
+        self.right = right
+        self.table_name = table_name
+        self.batch_size = batch_size
+        # ProcessBackend reading each side in a worker process
+        self.backend = backend
+
+        if table_name not in left.get_tables():
+            raise ValueError(f"{left.db_name} has no table named {table_name}")
+        if table_name not in right.get_tables():
+            raise ValueError(f"{right.db_name} has no table named {table_name}")
+
+        left_schema = left.get_table_schema(table_name)
+        left_columns = [column['column_name'] for column in left_schema]
+        right_columns = [column['column_name'] for column in right.get_table_schema(table_name)]
+
+        self.key_columns = key_columns or [column['column_name'] for column in left_schema if column['primary_key']]
+        if not self.key_columns:
+            raise ValueError(f"{table_name} has no primary key, pass the key columns to compare rows by")
+        missing = [column for column in self.key_columns if column not in left_columns or column not in right_columns]
+        if missing:
+            raise ValueError(f"Key columns missing from a side: {', '.join(missing)}")
+
+        self.columns = self.key_columns + [
+            column for column in left_columns if column in right_columns and column not in self.key_columns
+        ]
+        self.left_only_columns = [column for column in left_columns if column not in right_columns]
+        self.right_only_columns = [column for column in right_columns if column not in left_columns]
+        self.counts = {ADDED: 0, REMOVED: 0, CHANGED: 0, UNCHANGED: 0}
+
+    def query(self) -> str:
+        select_list = ", ".join(validate_identifier(column) for column in self.columns)
+        order = ", ".join(validate_identifier(column) for column in self.key_columns)
+        return f"SELECT {select_list} FROM {validate_identifier(self.table_name)} ORDER BY {order}"
+
+    def rows(
+            self,
+            include_unchanged: bool = False,
+            progress_callback: Optional[Callable[[Tuple[int, int]], None]] = None,
+            is_cancelled: Optional[Callable[[], bool]] = None
+    ) -> Iterator[DiffRow]:
+        """
+        Stream the differences, counts are updated as rows go by
+        :param include_unchanged: Also yield equal rows
+        :param progress_callback: Called with (left rows read, right rows read) per batch
+        :param is_cancelled: Polled per batch, raises RuntimeError when True
+        :return: Iterator[DiffRow]
+        """
+        self.counts = {ADDED: 0, REMOVED: 0, CHANGED: 0, UNCHANGED: 0}
+        read = [0, 0]
+
+        def stream(db_manager, side: int) -> Iterator[tuple]:
+            if self.backend is not None:
+                batches = self.backend.iter_query(db_manager.db_path, self.query(), batch_size=self.batch_size)
+            else:
+                batches = db_manager.iter_query(self.query(), batch_size=self.batch_size)
+
+            for _, batch in batches:
+                if is_cancelled and is_cancelled():
+                    raise RuntimeError("Table diff cancelled")
+                read[side] += len(batch)
+                if progress_callback:
+                    progress_callback((read[0], read[1]))
+                yield from batch
+
+        for diff_row in merge_diff(stream(self.left, 0), stream(self.right, 1), len(self.key_columns), True):
+            self.counts[diff_row[0]] += 1
+            if diff_row[0] != UNCHANGED or include_unchanged:
+                yield diff_row
+
+    def run(
+            self,
+            max_rows: int = 1000,
+            progress_callback: Optional[Callable[[Tuple[int, int]], None]] = None,
+            is_cancelled: Optional[Callable[[], bool]] = None
+    ) -> Dict[str, Any]:
+        """
+        Compare the whole table, keeping the first max_rows differences
+        :param max_rows: Differences kept for display, the counts cover every row
+        :param progress_callback: Called with (left rows read, right rows read) per batch
+        :param is_cancelled: Polled per batch, raises RuntimeError when True
+        :return: Dict[str, Any] - summary and rows
+        """
+        rows: List[DiffRow] = []
+        for diff_row in self.rows(progress_callback=progress_callback, is_cancelled=is_cancelled):
+            if len(rows) < max_rows:
+                rows.append(diff_row)
+
+        return {**self.summary(), 'rows': rows}
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            'table': self.table_name,
+            'columns': self.columns,
+            'key_columns': self.key_columns,
+            'left_only_columns': self.left_only_columns,
+            'right_only_columns': self.right_only_columns,
+            'added': self.counts[ADDED],
+            'removed': self.counts[REMOVED],
+            'changed': self.counts[CHANGED],
+            'unchanged': self.counts[UNCHANGED],
+            'left_rows': self.counts[REMOVED] + self.counts[CHANGED] + self.counts[UNCHANGED],
+            'right_rows': self.counts[ADDED] + self.counts[CHANGED] + self.counts[UNCHANGED],
+        }
+
+
+def diff_columns(columns: List[str], key_size: int) -> List[str]:
+    """Export header: status, key columns, changed columns, then old and new value of each column"""
+    header = ['status'] + columns[:key_size] + ['changed_columns']
+    for column in columns[key_size:]:
+        header += [f"{column} (left)", f"{column} (right)"]
+    return header
+
+
+def diff_batches(
+        diff_rows: Iterable[DiffRow],
+        columns: List[str],
+        key_size: int,
+        batch_size: int = 5000
+) -> Iterator[Tuple[List[str], List[tuple]]]:
+    """
+    Flatten diff rows into (columns, rows) batches for export.write_rows
+    :param diff_rows: Rows from TableDiff.rows or merge_diff
+    :param columns: Compared columns, keys first
+    :param key_size: Number of key columns
+    :param batch_size: Rows per batch
+    :return: Iterator[Tuple[List[str], List[tuple]]]
+    """
+    header = diff_columns(columns, key_size)
+    batch: List[tuple] = []
+    empty = (None,) * len(columns)
+
+    for status, left, right, changed in diff_rows:
+        key = (left or right)[:key_size]
+        left = left or empty
+        right = right or empty
+        values = []
+        for idx in range(key_size, len(columns)):
+            values += [left[idx], right[idx]]
+        batch.append((status, *key, ', '.join(columns[idx] for idx in changed), *values))
+
+        if len(batch) >= batch_size:
+            yield header, batch
+            batch = []
+
+    # the header is written even when nothing differs
+    yield header, batch
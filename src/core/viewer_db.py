@@ -0,0 +1,102 @@
+from .statement_cache import StatementCache
+from .profiling import profiled
+from typing import Any, List, Optional
+from platformdirs import user_data_dir
+from ribbitxdb import BatchOperations
+from .. import APP_NAME, APP_AUTHOR
+import ribbitxdb
+
+VIEWER_SCHEMA = [
+    """
+        CREATE TABLE IF NOT EXISTS databases (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            path TEXT UNIQUE
+        );
+    """,
+    """
+        CREATE TABLE IF NOT EXISTS history (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            database TEXT,
+            execution_timestamp TEXT,
+            execution_time REAL,
+            row_count INTEGER,
+            query TEXT,
+            timings TEXT
+        );
+    """
+]
+
+
+def viewer_db_path() -> str:
+    """Viewer database holding opened databases and query history"""
+    return user_data_dir(APP_NAME, APP_AUTHOR, ensure_exists=True) + "/viewer.rbx"
+
+
+def init_viewer_db():
+    """Create the viewer tables and bring older viewer databases up to date"""
+    query_viewer_db(VIEWER_SCHEMA)
+
+    # history tables from older versions have no timing breakdown
+    history_columns = [row[1] for row in query_viewer_db('PRAGMA table_info(history)').get('rows', [])]
+    if 'timings' not in history_columns:
+        query_viewer_db('ALTER TABLE history ADD COLUMN timings TEXT')
+
+
+# viewer db statements (history inserts, lookups) repeat with new values
+viewer_statement_cache = StatementCache()
+
+
+@profiled(category='viewer_db')
+def query_viewer_db(
+        query: Any,
+        params: Optional[tuple] = None,
+        table: Optional[str] = None,
+        key_cols: Optional[List[str]] = None
+): # pragma: no cover
+    try:
+        conn = ribbitxdb.connect(viewer_db_path())
+        # regular query
+        if isinstance(query, str):
+            cursor = conn.cursor()
+            query = viewer_statement_cache.execute(cursor, query, params)
+
+            if query.description:
+                columns = [desc[0] for desc in query.description]
+                rows = query.fetchall()
+
+                conn.commit()
+                cursor.close()
+                conn.close()
+                return {
+                    'columns': columns,
+                    'rows': rows,
+                }
+            else:
+                conn.commit()
+                cursor.close()
+                conn.close()
+                return {
+                    'columns': [],
+                    'rows': [],
+                }
+        # bulk query
+        elif isinstance(query, list):
+            if table and key_cols:
+                batch_ops = BatchOperations(conn)
+                batch_ops.bulk_upsert(table, query, key_cols)
+                conn.close()
+                return
+
+            # multiple queries
+            cur = conn.cursor()
+            for q in query:
+                cur.execute(q)
+
+            conn.commit()
+            cur.close()
+            conn.close()
+        else:
+            raise ValueError
+    except Exception as e:
+        raise e
+
@@ -1,17 +1,29 @@
 from PySide6.QtWidgets import QApplication
 from src.ui.main_window import MainWindow
-from src.utils import query_viewer_db
+from src.core.viewer_db import init_viewer_db
+from src.core.profiling import profiler
 from src import APP_NAME, APP_AUTHOR
 from PySide6.QtCore import Qt
 from pathlib import Path
+import multiprocessing
+import argparse
 import sys
 
+def parse_args(argv):
+    """Profiling options, anything else is left for Qt"""
+    parser = argparse.ArgumentParser(add_help=False)
+    parser.add_argument('--profile-trace', metavar='PATH', help="Record spans and write a Chrome trace on exit")
+    parser.add_argument('--cprofile', metavar='PATH', help="Run the session under cProfile and dump its stats on exit")
+    return parser.parse_known_args(argv[1:])
+
 def main():
+    args, qt_args = parse_args(sys.argv)
+
     QApplication.setHighDpiScaleFactorRoundingPolicy(
         Qt.HighDpiScaleFactorRoundingPolicy.PassThrough
     )
 
-    app = QApplication(sys.argv)
+    app = QApplication(sys.argv[:1] + qt_args)
     app.setApplicationName(APP_NAME)
     app.setOrganizationName(APP_AUTHOR)
 
@@ -29,35 +41,30 @@ def main():
         pass
 
     try:
-        queries = [
-            """
-                        CREATE TABLE IF NOT EXISTS databases (
-                            id INTEGER PRIMARY KEY AUTOINCREMENT,
-                            path TEXT UNIQUE
-                        );
-                    """,
-            """
-                    CREATE TABLE IF NOT EXISTS history (
-                            id INTEGER PRIMARY KEY AUTOINCREMENT,
-                            database TEXT,
-                            execution_timestamp TEXT,
-                            execution_time REAL,
-                            row_count INTEGER,
-                            query TEXT
-                        );
-                    """
-        ]
-
-        query_viewer_db(queries)
+        init_viewer_db()
     except Exception as e:
         raise RuntimeError(f'Could not connect to viewer database: {str(e)}')
 
+    if args.profile_trace:
+        profiler.enable()
+    if args.cprofile:
+        profiler.start_cprofile()
+
     window = MainWindow()
     window.show()
 
-    sys.exit(app.exec())
+    exit_code = app.exec()
+
+    if args.cprofile:
+        profiler.stop_cprofile(args.cprofile)
+    if args.profile_trace:
+        profiler.write_chrome_trace(args.profile_trace)
+
+    sys.exit(exit_code)
 
 if __name__ == '__main__':
+    # worker processes of frozen builds start through the executable
+    multiprocessing.freeze_support()
     main()
 
 
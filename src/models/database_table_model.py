@@ -1,6 +1,8 @@
 from PySide6.QtCore import QModelIndex, Qt, QAbstractTableModel
 from PySide6.QtGui import QColor
-from typing import Any, Dict
+from ..core.projection import CellPreview
+from ..core.profiling import profiler
+from typing import Any, Dict, List
 
 
 class DatabaseTableModel(QAbstractTableModel):
@@ -32,14 +34,26 @@ class DatabaseTableModel(QAbstractTableModel):
         if role == Qt.ItemDataRole.DisplayRole:
             return str(value) if value is not None else "NULL"
         elif role == Qt.ItemDataRole.ForegroundRole:
-            if value is None:
+            if value is None or isinstance(value, CellPreview):
                 return QColor("#6B7280")
+        elif role == Qt.ItemDataRole.ToolTipRole:
+            if isinstance(value, CellPreview):
+                unit = "bytes" if value.is_bytes else "characters"
+                return f"{value.size:,} {unit}, double-click to open the full value"
         elif role == Qt.ItemDataRole.TextAlignmentRole:
             if isinstance(value, (int, float)):
                 return Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter
 
         return None
 
+    @property
+    def columns(self) -> List[str]:
+        return self._columns
+
+    def value(self, row: int, column: int) -> Any:
+        """Value of a cell as fetched, a CellPreview for cut values"""
+        return self._rows[row][column]
+
     def columnCount(self, parent = QModelIndex()):
         return len(self._columns)
 
@@ -48,10 +62,11 @@ class DatabaseTableModel(QAbstractTableModel):
 
     def set_data(self, data: Dict[str, Any]):
         """Set row and column data"""
-        self.beginResetModel()
-        self._columns = data.get("columns", [])
-        self._rows = data.get("rows", [])
-        self.endResetModel()
+        with profiler.span('DatabaseTableModel.set_data', 'qt', rows=len(data.get("rows", []))):
+            self.beginResetModel()
+            self._columns = data.get("columns", [])
+            self._rows = data.get("rows", [])
+            self.endResetModel()
 
     def flags(self, index: QModelIndex):
         """Item flags for table data item"""
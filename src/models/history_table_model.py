@@ -1,6 +1,8 @@
 from PySide6.QtCore import QAbstractTableModel, Qt, QModelIndex
 from typing import Dict, Any, List
 from PySide6.QtGui import QColor
+from ..utils import format_timings
+import json
 
 
 class HistoryTableModel(QAbstractTableModel):
@@ -39,6 +41,13 @@ class HistoryTableModel(QAbstractTableModel):
         elif role == Qt.ItemDataRole.TextAlignmentRole:
             if isinstance(value, (int, float)):
                 return Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter
+        elif role == Qt.ItemDataRole.ToolTipRole:
+            # timing breakdown is stored after the displayed columns
+            if column == 2 and len(self._rows[row]) > len(self._columns):
+                try:
+                    return format_timings(json.loads(self._rows[row][len(self._columns)]))
+                except (TypeError, ValueError):
+                    return None
 
         return None
 
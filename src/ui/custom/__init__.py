@@ -1 +1,3 @@
-from .multiselect_combo_box import MultiSelectComboBox
\ No newline at end of file
+from .multiselect_combo_box import MultiSelectComboBox, IndexedRole
+from .profiled_table_view import ProfiledTableView
+from .sql_text_edit import SQLTextEdit
\ No newline at end of file
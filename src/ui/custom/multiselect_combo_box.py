@@ -3,6 +3,9 @@ from PySide6.QtCore import Qt, QEvent
 from typing import List
 
 
+# column is a primary key or unique, so prefix/equality searches on it are cheap
+IndexedRole = Qt.ItemDataRole.UserRole + 1
+
 
 class MultiSelectComboBox(QComboBox):
     def __init__(self, parent=None):
@@ -22,8 +25,10 @@ class MultiSelectComboBox(QComboBox):
     def add_item(self, data: tuple):
         name = data[0]
         col_type = data[1]
+        indexed = data[2] if len(data) > 2 else False
         item = QListWidgetItem(name)
         item.setData(Qt.ItemDataRole.UserRole, col_type)
+        item.setData(IndexedRole, indexed)
         item.setFlags(item.flags() | Qt.ItemFlag.ItemIsUserCheckable)
         item.setCheckState(Qt.CheckState.Unchecked)
         self.list_widget.addItem(item)
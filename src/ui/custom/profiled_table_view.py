@@ -0,0 +1,10 @@
+from ...core.profiling import profiler
+from PySide6.QtWidgets import QTableView
+
+
+class ProfiledTableView(QTableView):
+    """QTableView recording a span per viewport paint while profiling"""
+
+    def paintEvent(self, event):
+        with profiler.span('QTableView.paint', 'qt', view=self.objectName()):
+            super().paintEvent(event)
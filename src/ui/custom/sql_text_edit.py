@@ -0,0 +1,97 @@
+from PySide6.QtWidgets import QPlainTextEdit, QCompleter
+from PySide6.QtGui import QStandardItemModel, QStandardItem, QTextCursor
+from PySide6.QtCore import Qt
+from typing import Callable, Optional, Dict, Any
+
+# characters of text around the cursor handed to the completion provider
+COMPLETION_WINDOW_BEFORE = 20000
+COMPLETION_WINDOW_AFTER = 5000
+
+CompletionProvider = Callable[[str, int], Dict[str, Any]]
+
+
+class SQLTextEdit(QPlainTextEdit):
+    """
+    QPlainTextEdit with a completion popup. Candidates come from
+    completion_provider(text, position), which gets the text around the
+    cursor and returns a prefix and a list of (text, kind) candidates.
+    The popup opens while typing a name or after a dot, Ctrl+Space opens
+    it anywhere
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.completion_provider: Optional[CompletionProvider] = None
+        self._prefix = ''
+
+        self.completion_model = QStandardItemModel(self)
+        self.completer = QCompleter(self.completion_model, self)
+        self.completer.setWidget(self)
+        self.completer.setCompletionMode(QCompleter.CompletionMode.PopupCompletion)
+        self.completer.setCaseSensitivity(Qt.CaseSensitivity.CaseInsensitive)
+        self.completer.setModelSorting(QCompleter.ModelSorting.UnsortedModel)
+        self.completer.activated.connect(self.insert_completion)
+
+    def insert_completion(self, text: str):
+        cursor = self.textCursor()
+        cursor.movePosition(QTextCursor.MoveOperation.Left, QTextCursor.MoveMode.KeepAnchor, len(self._prefix))
+        cursor.insertText(text)
+        self.setTextCursor(cursor)
+
+    def keyPressEvent(self, event):
+        popup = self.completer.popup()
+        if popup.isVisible() and event.key() in (
+            Qt.Key.Key_Enter, Qt.Key.Key_Return, Qt.Key.Key_Tab, Qt.Key.Key_Backtab, Qt.Key.Key_Escape
+        ):
+            # the completer handles these
+            event.ignore()
+            return
+
+        forced = event.key() == Qt.Key.Key_Space and bool(event.modifiers() & Qt.KeyboardModifier.ControlModifier)
+        if not forced:
+            super().keyPressEvent(event)
+
+        if self.completion_provider is None or self.isReadOnly():
+            return
+
+        text = event.text()
+        if forced or popup.isVisible() or (text and (text[-1].isalnum() or text[-1] in '_.')):
+            self.show_completions(forced)
+
+    def show_completions(self, forced: bool = False):
+        """Ask the provider for candidates at the cursor and open the popup"""
+        text, position = self._text_around_cursor()
+        completions = self.completion_provider(text, position)
+        candidates = completions['candidates']
+        self._prefix = completions['prefix']
+
+        typed_dot = text[position - len(self._prefix) - 1:position - len(self._prefix)] == '.'
+        if not candidates or not (forced or self._prefix or typed_dot):
+            self.completer.popup().hide()
+            return
+
+        self.completion_model.clear()
+        for candidate, kind in candidates:
+            item = QStandardItem(candidate)
+            item.setToolTip(kind)
+            self.completion_model.appendRow(item)
+
+        self.completer.setCompletionPrefix(self._prefix)
+        popup = self.completer.popup()
+        popup.setCurrentIndex(self.completer.completionModel().index(0, 0))
+
+        rect = self.cursorRect()
+        rect.setWidth(popup.sizeHintForColumn(0) + popup.verticalScrollBar().sizeHint().width())
+        self.completer.complete(rect)
+
+    def _text_around_cursor(self):
+        """Text near the cursor and the cursor position in it, long scripts aren't copied whole"""
+        position = self.textCursor().position()
+        start = max(0, position - COMPLETION_WINDOW_BEFORE)
+        end = min(self.document().characterCount() - 1, position + COMPLETION_WINDOW_AFTER)
+
+        cursor = QTextCursor(self.document())
+        cursor.setPosition(start)
+        cursor.setPosition(end, QTextCursor.MoveMode.KeepAnchor)
+        # selectedText separates blocks with U+2029
+        return cursor.selectedText().replace('\u2029', '\n'), position - start
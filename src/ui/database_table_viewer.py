@@ -3,16 +3,24 @@ from PySide6.QtWidgets import (
     QTableView, QHeaderView, QMessageBox,
     QVBoxLayout, QWidget, QLabel, QStackedWidget,
     QHBoxLayout, QLineEdit, QPushButton,
-    QListWidgetItem, QToolBar, QMenu
+    QListWidgetItem, QToolBar, QMenu, QComboBox
 )
-from ..utils import try_convert_int, try_convert_float, copy_to_clipboard
+from ..core.query_builder import build_column_filter, AUTO, CONTAINS, PREFIX, EXACT, RANGE, WORDS
+from ..core.search_index import SearchIndex, load_indexes, save_indexes, search_words
 from ..core.database_manager import DatabaseManager
+from ..core.projection import CellPreview, DEFAULT_PREVIEW_CHARS, project_result
+from .custom import MultiSelectComboBox, IndexedRole, ProfiledTableView
+from PySide6.QtCore import Qt, QThreadPool, QTimer
 from .pagination_widget import PaginationWidget
+from .dialogs import CellViewerDialog
+from ..utils import copy_to_clipboard
 from ..models import DatabaseTableModel
-from .custom import MultiSelectComboBox
-from typing import Dict, Any, Optional
-from PySide6.QtCore import Qt
+from typing import Dict, Any, Optional, List, Set, Tuple
+from .workers import Worker
+import random
 
+# typing pause before a live search runs
+SEARCH_DEBOUNCE_MS = 300
 
 
 class DatabaseTableViewer(QWidget):
@@ -23,10 +31,28 @@ class DatabaseTableViewer(QWidget):
         self.setWindowTitle("Table Viewer")
         self.current_table: Optional[str] = None
         self.current_db_manager: Optional[DatabaseManager] = None
-        self.table_view = QTableView()
+        self.table_view = ProfiledTableView()
+        self.table_view.setObjectName("table_viewer")
         self.data_model = DatabaseTableModel()
         self.table_view.setModel(self.data_model)
         self.filters = {}
+        # search indexes for the current database, keyed by table name
+        self.search_indexes: Dict[str, SearchIndex] = {}
+        self.search_indexes_db_path: Optional[str] = None
+        self.index_worker: Optional[Worker] = None
+        self.search_worker: Optional[Worker] = None
+        self.count_worker: Optional[Worker] = None
+        self.sample_worker: Optional[Worker] = None
+        self.reload_worker: Optional[Worker] = None
+        self.pk_column: Optional[str] = None
+        self.schema: List[Dict[str, Any]] = []
+        # columns hidden by the user, keyed by database path and table name
+        self.hidden_columns: Dict[Tuple[str, str], Set[str]] = {}
+        # longest TEXT or BLOB value shown whole, longer ones are opened by key
+        self.preview_chars = DEFAULT_PREVIEW_CHARS
+        # last sample with every column, projected again when columns change
+        self.sample_data: Optional[Dict[str, Any]] = None
+        self.copy_worker: Optional[Worker] = None
         self.setup_ui()
 
     def setup_ui(self):
@@ -50,12 +76,36 @@ class DatabaseTableViewer(QWidget):
         self.multi_combo_box = MultiSelectComboBox()
         self.multi_combo_box.setMaximumWidth(200)
 
+        self.match_type_combo = QComboBox()
+        self.match_type_combo.addItem("Auto", AUTO)
+        self.match_type_combo.addItem("Contains", CONTAINS)
+        self.match_type_combo.addItem("Prefix", PREFIX)
+        self.match_type_combo.addItem("Exact", EXACT)
+        self.match_type_combo.addItem("Range (a..b)", RANGE)
+        self.match_type_combo.addItem("Words", WORDS)
+        self.match_type_combo.setItemData(
+            self.match_type_combo.count() - 1,
+            "Every word anywhere in the value, answered by the search index",
+            Qt.ItemDataRole.ToolTipRole
+        )
+        self.match_type_combo.setToolTip("Match type")
+        self.match_type_combo.setMaximumWidth(120)
+        self.match_type_combo.currentIndexChanged.connect(
+            lambda: self.on_search_text_changed(self.search_input.text())
+        )
+
         self.search_input = QLineEdit()
         self.search_input.setPlaceholderText("Search Data")
 
         self.search_input.setMaximumWidth(300)
         self.search_input.setEnabled(False)
         self.search_input.returnPressed.connect(self.search)
+        self.search_input.textChanged.connect(self.on_search_text_changed)
+
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(SEARCH_DEBOUNCE_MS)
+        self.search_timer.timeout.connect(self.search)
 
         self.search_button = QPushButton("Search🔍")
         self.search_button.setMaximumWidth(100)
@@ -65,9 +115,27 @@ class DatabaseTableViewer(QWidget):
         columns_to_filter_label.setMaximumWidth(100)
         h_layout.addWidget(columns_to_filter_label)
         h_layout.addWidget(self.multi_combo_box)
+        h_layout.addWidget(self.match_type_combo)
         h_layout.addWidget(self.search_input)
         h_layout.addWidget(self.search_button)
 
+        self.index_button = QPushButton("⚡ Index")
+        self.index_button.setMaximumWidth(100)
+        self.index_button.setToolTip("Build a search index for the selected text columns")
+        self.index_button.clicked.connect(self.build_search_index)
+        h_layout.addWidget(self.index_button)
+
+        self.columns_button = QPushButton("Columns")
+        self.columns_button.setMaximumWidth(100)
+        self.columns_button.setToolTip("Choose the columns to fetch and show")
+        self.columns_menu = QMenu(self.columns_button)
+        self.columns_menu.aboutToShow.connect(self.populate_columns_menu)
+        self.columns_button.setMenu(self.columns_menu)
+        h_layout.addWidget(self.columns_button)
+
+        self.status_label = QLabel()
+        h_layout.addWidget(self.status_label)
+
         self.add_button = QPushButton("➕")
         self.add_button.setToolTip("Add row")
         self.update_button = QPushButton("✔️")
@@ -95,6 +163,8 @@ class DatabaseTableViewer(QWidget):
         self.pagination = PaginationWidget()
         self.pagination.page_changed.connect(self.on_page_changed)
         self.pagination.page_size_changed.connect(self.on_page_size_changed)
+        self.pagination.sample_requested.connect(self.load_sample)
+        self.pagination.sample_mode_changed.connect(self.on_sample_mode_changed)
         self.main_layout.addWidget(self.pagination)
 
         self.add_button.setEnabled(False)
@@ -102,6 +172,8 @@ class DatabaseTableViewer(QWidget):
         self.delete_button.setEnabled(False)
         self.search_input.setEnabled(False)
         self.search_button.setEnabled(False)
+        self.index_button.setEnabled(False)
+        self.columns_button.setEnabled(False)
         self.stacked_widget.setCurrentIndex(1)
 
     def setup_table_view(self):
@@ -114,6 +186,7 @@ class DatabaseTableViewer(QWidget):
         self.table_view.horizontalHeader().sortIndicatorChanged.connect(self.on_sorting_changed)
         self.table_view.setContextMenuPolicy(Qt.ContextMenuPolicy.CustomContextMenu)
         self.table_view.customContextMenuRequested.connect(self.on_context_menu)
+        self.table_view.doubleClicked.connect(self.on_cell_double_clicked)
 
         v_header = self.table_view.verticalHeader()
         v_header.setVisible(True)
@@ -125,15 +198,129 @@ class DatabaseTableViewer(QWidget):
             menu = QMenu()
 
             copy_action = QAction('Copy Value')
-            copy_action.triggered.connect(
-                lambda: copy_to_clipboard(idx.data(Qt.ItemDataRole.DisplayRole))
-            )
+            copy_action.triggered.connect(lambda: self.copy_value(idx.row(), idx.column()))
             menu.addAction(copy_action)
 
+            open_action = QAction('Open Value...')
+            open_action.triggered.connect(lambda: self.open_value(idx.row(), idx.column()))
+            open_action.setEnabled(self._row_key(idx.row()) is not None)
+            menu.addAction(open_action)
+
             menu.exec(self.table_view.viewport().mapToGlobal(pos))
 
+    def on_cell_double_clicked(self, idx):
+        if isinstance(self.data_model.value(idx.row(), idx.column()), CellPreview):
+            self.open_value(idx.row(), idx.column())
+
+    def open_value(self, row: int, column: int):
+        """Show the full value of a cell, fetched by primary key"""
+        key_value = self._row_key(row)
+        if key_value is None:
+            return
+
+        dialog = CellViewerDialog(
+            self.current_db_manager, self.current_table, self.data_model.columns[column],
+            self.pk_column, key_value, self
+        )
+        dialog.show()
+        dialog.load()
+
+    def copy_value(self, row: int, column: int):
+        """Copy a cell, previews are fetched whole first"""
+        value = self.data_model.value(row, column)
+        if not isinstance(value, CellPreview):
+            copy_to_clipboard(self.data_model.data(self.data_model.index(row, column)))
+            return
+
+        if self.copy_worker:
+            self.copy_worker.cancel()
+
+        self.status_label.setText("Copying value...")
+        self.copy_worker = Worker(
+            self.current_db_manager.get_cell_value,
+            self.current_table, self.data_model.columns[column], self.pk_column, self._row_key(row)
+        )
+        self.copy_worker.signals.finished.connect(self.on_copy_value_loaded)
+        self.copy_worker.signals.error.connect(
+            lambda error: self.status_label.setText(f"Failed to copy value: {error}")
+        )
+        QThreadPool.globalInstance().start(self.copy_worker)
+
+    def on_copy_value_loaded(self, value: Any):
+        self.copy_worker = None
+        self.status_label.setText("")
+        copy_to_clipboard(CellViewerDialog._format_value(value))
+
+    def _row_key(self, row: int) -> Any:
+        """Primary key of a displayed row, None without one"""
+        if not self.pk_column or self.pk_column not in self.data_model.columns:
+            return None
+        return self.data_model.value(row, self.data_model.columns.index(self.pk_column))
+
+    def populate_columns_menu(self):
+        """Checkable entry per column, the primary key can't be hidden"""
+        self.columns_menu.clear()
+        if not self.current_table or not self.current_db_manager:
+            return
+
+        hidden = self.hidden_columns.get(self._table_key(), set())
+        show_all = self.columns_menu.addAction("Show All")
+        show_all.setEnabled(bool(hidden))
+        show_all.triggered.connect(self.show_all_columns)
+        self.columns_menu.addSeparator()
+
+        for column in self.schema:
+            name = column['column_name']
+            action = self.columns_menu.addAction(f"{name} ({column['column_type']})")
+            action.setCheckable(True)
+            action.setChecked(name not in hidden)
+            action.setEnabled(not column['primary_key'])
+            action.toggled.connect(lambda checked, name=name: self.set_column_visible(name, checked))
+
+    def set_column_visible(self, column_name: str, visible: bool):
+        hidden = self.hidden_columns.setdefault(self._table_key(), set())
+        if visible:
+            hidden.discard(column_name)
+        else:
+            hidden.add(column_name)
+        self.refresh_columns()
+
+    def show_all_columns(self):
+        self.hidden_columns.pop(self._table_key(), None)
+        self.refresh_columns()
+
+    def refresh_columns(self):
+        """Show the chosen columns, pages are fetched again and samples projected again"""
+        self.table_view.horizontalHeader().setSortIndicator(-1, Qt.SortOrder.AscendingOrder)
+        # header sections move when columns change, so the sort starts over
+        self.filters.pop('sorting', None)
+
+        if self.pagination.sample_mode:
+            if self.sample_data:
+                self.data_model.set_data(project_result(self.sample_data, **self.page_options()))
+            return
+
+        self.on_page_changed(self.pagination.current_page)
+
+    def page_options(self) -> Dict[str, Any]:
+        """Projection of the current table, keyword arguments of get_table_data_paginated"""
+        return self._page_options(self.schema, self.hidden_columns.get(self._table_key(), set()))
+
+    def _page_options(self, schema: List[Dict[str, Any]], hidden: Set[str]) -> Dict[str, Any]:
+        columns = None
+        if hidden:
+            columns = [x['column_name'] for x in schema if x['primary_key'] or x['column_name'] not in hidden]
+
+        # without a primary key a cut value couldn't be looked up again
+        has_key = any(x['primary_key'] for x in schema)
+        return {'columns': columns, 'preview_chars': self.preview_chars if has_key else 0}
+
+    def _table_key(self) -> Tuple[str, str]:
+        return self.current_db_manager.db_path, self.current_table
+
     def on_sorting_changed(self, idx: int, sorting: Qt.SortOrder):
-        if idx == -1:
+        # a sample is a set of random rows, sorting the table would page it instead
+        if idx == -1 or self.pagination.sample_mode:
             return
 
         data = self.data_model.headerData(idx, Qt.Orientation.Horizontal, Qt.ItemDataRole.DisplayRole)
@@ -149,11 +336,24 @@ class DatabaseTableViewer(QWidget):
         self.on_page_changed(current_page)
 
 
+    def load_table(self, db_manager: DatabaseManager, table_name: str):
+        """Fetch the first page of a table with its chosen columns and show it"""
+        schema = db_manager.get_table_schema(table_name)
+        options = self._page_options(schema, self.hidden_columns.get((db_manager.db_path, table_name), set()))
+        data = db_manager.get_table_data_paginated(table_name, 1, self.pagination.page_size, None, **options)
+        self.display_data(data, db_manager, table_name, schema)
+
     def display_data(self, data: Dict[str, Any], db_manager: Optional[DatabaseManager] = None,
-                     table_name: Optional[str] = None):
+                     table_name: Optional[str] = None, schema: Optional[List[Dict[str, Any]]] = None):
         """Display query results"""
         self.multi_combo_box.clear_items()
+        self._cancel_search()
+        self.search_timer.stop()
+        self.status_label.setText("")
+        # clearing the text shouldn't kick off a live search
+        self.search_input.blockSignals(True)
         self.search_input.setText("")
+        self.search_input.blockSignals(False)
         if data.get('total_rows') == 0:
             self.clear_data()
             self.add_button.setEnabled(True)
@@ -168,6 +368,9 @@ class DatabaseTableViewer(QWidget):
 
         self.current_db_manager = db_manager
         self.current_table = table_name
+        # filters belong to the previous table
+        self.filters = {}
+        self.sample_data = None
 
         h_header = self.table_view.horizontalHeader()
         h_header.setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
@@ -181,18 +384,30 @@ class DatabaseTableViewer(QWidget):
         h_header.setStretchLastSection(True)
 
         # column types
-        schema = self.current_db_manager.get_table_schema(table_name)
-        columns = [(x['column_name'], x['column_type']) for x in schema]
+        if schema is None:
+            schema = self.current_db_manager.get_table_schema(table_name)
+        self.schema = schema
+        columns = [
+            (x['column_name'], x['column_type'], x['primary_key'] or x['unique_constraint'])
+            for x in schema
+        ]
 
         self.multi_combo_box.add_items(columns)
+        self.pk_column = next((x['column_name'] for x in schema if x['primary_key']), None)
+        self._load_search_indexes()
+
         total_rows = data.get('total_rows', len(data.get('rows', [])))
         displayed_rows = data.get('displayed_rows', len(data.get('rows', [])))
+        self.pagination.set_sample_mode(False)
         self.pagination.set_total_rows(total_rows, displayed_rows)
         self.search_input.setEnabled(True)
         self.search_button.setEnabled(True)
         self.add_button.setEnabled(True)
         self.update_button.setEnabled(True)
         self.delete_button.setEnabled(True)
+        # views have no primary key to index by
+        self.index_button.setEnabled(self.pk_column is not None)
+        self.columns_button.setEnabled(True)
 
     def on_page_changed(self, page: int):
         if not self.current_table or not self.current_db_manager:
@@ -201,7 +416,7 @@ class DatabaseTableViewer(QWidget):
         try:
             page_size = self.pagination.page_size
             data = self.current_db_manager.get_table_data_paginated(
-                self.current_table, page, page_size, self.filters
+                self.current_table, page, page_size, self.filters, **self.page_options()
             )
 
             self.data_model.set_data(data)
@@ -210,67 +425,232 @@ class DatabaseTableViewer(QWidget):
             raise e
 
 
+    def reload_page(self):
+        """
+        Fetch the current page again on the thread pool, after the table
+        changed outside the viewer. Samples are left as they are
+        """
+        if not self.current_table or not self.current_db_manager or self.pagination.sample_mode:
+            return
+
+        if self.reload_worker:
+            self.reload_worker.cancel()
+
+        self.reload_worker = Worker(
+            self.current_db_manager.get_table_data_paginated,
+            self.current_table,
+            self.pagination.current_page,
+            self.pagination.page_size,
+            dict(self.filters),
+            **self.page_options()
+        )
+        self.reload_worker.signals.finished.connect(self.on_page_reloaded)
+        self.reload_worker.signals.error.connect(
+            lambda error: self.status_label.setText(f"Reload failed: {error}")
+        )
+        QThreadPool.globalInstance().start(self.reload_worker)
+
+    def on_page_reloaded(self, data: Dict[str, Any]):
+        self.reload_worker = None
+        if self.pagination.sample_mode:
+            return
+
+        self.data_model.set_data(data)
+
+        # while searching the pages cover the matches, not the table
+        if 'columns' in self.filters or 'keys' in self.filters:
+            return
+
+        total_rows = data.get('total_rows', len(data.get('rows', [])))
+        displayed_rows = data.get('displayed_rows', len(data.get('rows', [])))
+        self.pagination.set_total_rows(total_rows, displayed_rows, keep_page=True)
+
+    def on_sample_mode_changed(self, enabled: bool):
+        """Samples cover the whole table, searching goes back to pages"""
+        self._cancel_search()
+        self.search_input.setEnabled(not enabled)
+        self.search_button.setEnabled(not enabled)
+        if enabled:
+            self.filters.pop('columns', None)
+            self.filters.pop('keys', None)
+            self.search_input.blockSignals(True)
+            self.search_input.setText("")
+            self.search_input.blockSignals(False)
+        elif self.sample_worker:
+            self.sample_worker.cancel()
+            self.sample_worker = None
+
+    def load_sample(self, sample_size: int, seed: Optional[int]):
+        """Fetch random rows of the current table on the thread pool"""
+        if not self.current_table or not self.current_db_manager:
+            return
+
+        if self.sample_worker:
+            self.sample_worker.cancel()
+
+        # a drawn seed is shown so the sample can be repeated
+        if seed is None:
+            seed = random.randrange(2 ** 31)
+
+        self.status_label.setText("Sampling...")
+        self.sample_worker = Worker(self.current_db_manager.get_table_sample, self.current_table, sample_size, seed)
+        self.sample_worker.signals.finished.connect(self.on_sample_loaded)
+        self.sample_worker.signals.error.connect(
+            lambda error: self.status_label.setText(f"Sampling failed: {error}")
+        )
+        QThreadPool.globalInstance().start(self.sample_worker)
+
+    def on_sample_loaded(self, data: Dict[str, Any]):
+        self.sample_worker = None
+        self.status_label.setText("")
+        if not self.pagination.sample_mode:
+            return
+
+        # samples come with every column, so hiding one doesn't need a new sample
+        self.sample_data = data
+        self.table_view.setSortingEnabled(False)
+        self.data_model.set_data(project_result(data, **self.page_options()))
+        self.table_view.setSortingEnabled(True)
+        self.table_view.horizontalHeader().setSortIndicator(-1, Qt.SortOrder.AscendingOrder)
+
+        self.pagination.set_sample_info(data['total_rows'], data['displayed_rows'], data['sample_method'], data['seed'])
+
+    def on_search_text_changed(self, text: str):
+        """Restart the debounce timer, the search runs once typing pauses"""
+        if not self.current_table or not self.current_db_manager:
+            return
+
+        self.search_timer.start()
+
     # We already have db manager, we can just query the paginated search
     def search(self):
-        if len(self.search_input.text()) == 0:
-            self.filters["columns"] = []
-            page_size = self.pagination.page_size
-            data = self.current_db_manager.get_table_data_paginated(
-                self.current_table, 1, page_size, self.filters
-            )
+        self.search_timer.stop()
 
-            h_header = self.table_view.horizontalHeader()
-            h_header.setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
-
-            self.data_model.set_data(data)
+        if not self.current_table or not self.current_db_manager:
+            return
 
-            h_header.setSectionResizeMode(QHeaderView.ResizeMode.Interactive)
-            h_header.setStretchLastSection(True)
+        search_text = self.search_input.text().strip()
 
-            total_rows = data.get('total_rows', len(data.get('rows', [])))
-            displayed_rows = data.get('displayed_rows', len(data.get('rows', [])))
-            self.pagination.set_total_rows(total_rows, displayed_rows)
-            self.pagination.go_to_page(1)
+        if len(search_text) == 0:
+            self.filters["columns"] = []
+            self.filters.pop("keys", None)
+            self._start_search(search_text)
             return
 
         filter_columns = []
         filter_items_selected = self.multi_combo_box.get_selected_items()
-        search_text = self.search_input.text().strip()
 
-        # when we search, we check the column types. for text types, convert
-        # just pass the search query into the column filter. for int or real,
-        # try to convert the search query into an int first, then try to
-        # convert into a float. if any pass, then just add them to the filter
+        # when we search, the match type is picked per column type. numeric
+        # columns only match on a converted value (or a low..high range),
+        # text columns use a prefix match when they are indexed and a
+        # contains match otherwise, unless a match type was chosen. Word
+        # searches only apply to text columns
+        match_type = self.match_type_combo.currentData()
         for item in filter_items_selected:
             list_item: QListWidgetItem = item[1]
-            data = list_item.data(Qt.ItemDataRole.UserRole)
-            if data == "TEXT":
-                filter_columns.append({
-                    "condition": (item[0], search_text),
-                    "type": "LIKE"
-                })
-                continue
-            # item is int or real
-            if data == "INTEGER":
-                if try_convert_int(search_text):
-                    filter_columns.append({
-                        "condition": (item[0], int(search_text)),
-                        "type": "EQUALS"
-                    })
-
-            if data == "REAL":
-                if try_convert_float(search_text):
-                    filter_columns.append({
-                        "condition": (item[0], float(search_text)),
-                        "type": "EQUALS"
-                    })
-
-
-        self.filters['columns'] = filter_columns
-        page_size = self.pagination.page_size
-        data = self.current_db_manager.get_table_data_paginated(
-            self.current_table, 1, page_size, self.filters
+            column_filter = build_column_filter(
+                item[0],
+                list_item.data(Qt.ItemDataRole.UserRole),
+                search_text,
+                match_type,
+                bool(list_item.data(IndexedRole))
+            )
+
+            if column_filter:
+                filter_columns.append(column_filter)
+
+        self.filters.pop("keys", None)
+        if match_type == WORDS:
+            if not self.pk_column:
+                self.status_label.setText("Searching words needs a primary key")
+                return
+            # word filters aren't SQL, the search worker looks them up in
+            # the search index and pages are fetched by the keys it finds
+            self.filters.pop("columns", None)
+        else:
+            self.filters['columns'] = filter_columns
+
+        self._start_search(search_text, {**self.filters, 'columns': filter_columns})
+
+    def _start_search(self, search_text: str, filters: Optional[Dict[str, Any]] = None):
+        """
+        Fetch the first page on the thread pool. Any search still in flight
+        is cancelled; the engine call itself can't be interrupted, so its
+        result is dropped instead. A result already emitted is still
+        delivered, so the handlers check it came from the current worker
+        """
+        self._cancel_search()
+
+        worker = Worker(
+            self._run_search,
+            self.current_db_manager, self.current_table, self.pagination.page_size,
+            dict(self.filters) if filters is None else filters, self.page_options(), search_text,
+            self.pk_column, self.search_indexes.get(self.current_table)
+        )
+        worker.signals.finished.connect(lambda result: self.on_search_results(worker, result, search_text))
+        worker.signals.error.connect(
+            lambda error: worker is self.search_worker and self.on_search_error(f"Search failed: {error}")
         )
+        self.search_worker = worker
+
+        if search_text:
+            self.status_label.setText("Searching...")
+
+        QThreadPool.globalInstance().start(worker)
+
+    def _cancel_search(self):
+        if self.search_worker:
+            self.search_worker.cancel()
+            self.search_worker = None
+
+        if self.count_worker:
+            self.count_worker.cancel()
+            self.count_worker = None
+
+    @staticmethod
+    def _run_search(
+            db_manager: DatabaseManager,
+            table_name: str,
+            page_size: int,
+            filters: Dict[str, Any],
+            page_options: Dict[str, Any],
+            search_text: str,
+            pk_column: Optional[str],
+            index: Optional[SearchIndex]
+    ) -> Tuple[Dict[str, Any], Dict[str, Any], Optional[SearchIndex]]:
+        """
+        Runs on the search worker. Word filters are looked up in the search
+        index and replaced by the keys found, then the first page is fetched
+        :return: Tuple[Dict[str, Any], Dict[str, Any], Optional[SearchIndex]] -
+        page, filters used and the index if it was stale and rebuilt
+        """
+        rebuilt = None
+        words = [x['condition'][0] for x in filters.get('columns', []) if x['type'] == WORDS]
+        if words:
+            keys, rebuilt = search_words(db_manager, table_name, pk_column, words, search_text, index)
+            filters.pop('columns')
+            filters['keys'] = {'column': pk_column, 'values': keys}
+
+        data = db_manager.get_table_data_paginated(table_name, 1, page_size, filters, **page_options)
+        return data, filters, rebuilt
+
+    def on_search_error(self, message: str):
+        self.search_worker = None
+        self.count_worker = None
+        self.status_label.setText(message)
+
+    def on_search_results(self, worker: Worker, result: tuple, search_text: str):
+        """First page of a search arrived, show it and count matches in the background"""
+        if worker is not self.search_worker:
+            return
+
+        self.search_worker = None
+        data, filters, rebuilt = result
+
+        # later pages and the count reuse the keys looked up in the index
+        self.filters = filters
+        if rebuilt is not None and rebuilt.db_path == self.search_indexes_db_path:
+            self._store_search_index(rebuilt)
 
         h_header = self.table_view.horizontalHeader()
         h_header.setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
@@ -285,6 +665,95 @@ class DatabaseTableViewer(QWidget):
         self.pagination.set_total_rows(total_rows, displayed_rows)
         self.pagination.go_to_page(1)
 
+        if not search_text:
+            self.status_label.setText("")
+            return
+
+        self.status_label.setText("Counting matches...")
+        worker = Worker(
+            self.current_db_manager.count_table_rows,
+            self.current_table, dict(self.filters)
+        )
+        worker.signals.finished.connect(lambda count: self.on_match_count(worker, count, displayed_rows))
+        worker.signals.error.connect(
+            lambda error: worker is self.count_worker and self.on_search_error(f"Failed to count matches: {error}")
+        )
+        self.count_worker = worker
+        QThreadPool.globalInstance().start(worker)
+
+    def on_match_count(self, worker: Worker, count: int, displayed_rows: int):
+        if worker is not self.count_worker:
+            return
+
+        self.count_worker = None
+        self.status_label.setText(f"{count:,} matching rows")
+
+        # page over the matches rather than the whole table, unless the
+        # user already moved on from the first page
+        if self.pagination.current_page == 1:
+            self.pagination.set_total_rows(count, displayed_rows)
+
+    def build_search_index(self):
+        """Build the search index for the selected text columns on the thread pool"""
+        if not self.current_table or not self.current_db_manager or not self.pk_column:
+            return
+
+        if self.index_worker:
+            self.index_worker.cancel()
+
+        columns = [
+            item[0] for item in self.multi_combo_box.get_selected_items()
+            if item[1].data(Qt.ItemDataRole.UserRole) == 'TEXT'
+        ]
+
+        if not columns:
+            self.status_label.setText("No text columns selected to index")
+            return
+
+        db_manager = self.current_db_manager
+        index = SearchIndex(db_manager.db_path, self.current_table, self.pk_column, columns)
+        self.index_worker = Worker(index.build, db_manager, report_progress=True)
+        self.index_worker.signals.progress.connect(
+            lambda count: self.status_label.setText(f"Indexing {index.table_name}: {count:,} rows")
+        )
+        self.index_worker.signals.finished.connect(self.on_search_index_built)
+        self.index_worker.signals.error.connect(
+            lambda error: self.status_label.setText(f"Indexing failed: {error}")
+        )
+        self.status_label.setText(f"Indexing {self.current_table}...")
+        QThreadPool.globalInstance().start(self.index_worker)
+
+    def on_search_index_built(self, index: SearchIndex):
+        self.index_worker = None
+
+        # database changed while the index was being built
+        if index.db_path != self.search_indexes_db_path:
+            return
+
+        self._store_search_index(index)
+
+    def _store_search_index(self, index: SearchIndex):
+        self.search_indexes[index.table_name] = index
+
+        try:
+            save_indexes(index.db_path, self.search_indexes)
+        except OSError as e:
+            self.status_label.setText(f"Failed to save search index: {str(e)}")
+            return
+
+        self.status_label.setText(
+            f"Search index for {index.table_name} ready ({index.row_count:,} rows, {index.term_count:,} terms)"
+        )
+
+    def _load_search_indexes(self):
+        """Load the sidecar search indexes when the database changes"""
+        db_path = self.current_db_manager.db_path
+        if db_path == self.search_indexes_db_path:
+            return
+
+        self.search_indexes = load_indexes(db_path)
+        self.search_indexes_db_path = db_path
+
     def on_page_size_changed(self, page_size: int):
         current_page = self.pagination.current_page
         self.on_page_changed(current_page)
@@ -299,6 +768,16 @@ class DatabaseTableViewer(QWidget):
             'rows': [],
             'total_rows': 0
         }
+        self._cancel_search()
+        for worker in (self.sample_worker, self.reload_worker, self.copy_worker):
+            if worker:
+                worker.cancel()
+        self.sample_worker = None
+        self.reload_worker = None
+        self.copy_worker = None
+        self.sample_data = None
+        self.schema = []
+        self.columns_button.setEnabled(False)
         self.data_model.set_data(empty_data)
         self.pagination.reset()
         self.current_table = None
@@ -3,13 +3,13 @@ from PySide6.QtWidgets import (
     QMessageBox
 )
 from ..utils import trim_string, get_dummy_data, copy_to_clipboard
-from .dialogs import AcceptActionDialog, SchemaViewerDialog
+from .dialogs import AcceptActionDialog, SchemaViewerDialog, ColumnProfileDialog
 from ..core.database_manager import DatabaseManager
 from PySide6.QtCore import Qt, Signal, QPoint
 from PySide6.QtGui import QAction, QCursor
 from platformdirs import user_data_dir
 from .. import APP_NAME, APP_AUTHOR
-from typing import Optional
+from typing import Optional, List, Dict, Any
 from pathlib import Path
 
 
@@ -155,6 +155,78 @@ class DatabaseTree(QTreeWidget):
         item.setExpanded(True)
         self.database_refreshed.emit(db_path)
 
+    def apply_catalog_changes(self, db_path: str, catalog: Dict[str, Any], changes: Dict[str, List[str]]):
+        """
+        Patch the tree of a database with changes from diff_catalog, only the
+        affected table and view items are rebuilt
+        :param db_path: Database path
+        :param catalog: Current catalog, tables are in the order to show
+        :param changes: Changes from diff_catalog
+        """
+        root = self.find_database_item(db_path)
+        if root is None:
+            return
+
+        db_manager: DatabaseManager = root.data(0, Qt.ItemDataRole.UserRole).get('db_manager')
+        tables_category = self._find_child(root, 'tables')
+        views_category = self._find_child(root, 'views')
+
+        if tables_category is not None:
+            for table_name in changes['removed_tables']:
+                item = self._find_child(tables_category, 'table', table_name)
+                if item is not None:
+                    tables_category.removeChild(item)
+
+            for table_name in changes['changed_tables']:
+                item = self._find_child(tables_category, 'table', table_name)
+                if item is not None:
+                    self._load_table_columns(item, table_name, db_manager, catalog['tables'][table_name])
+
+            table_names = list(catalog['tables'])
+            for table_name in changes['added_tables']:
+                self._add_table_item(
+                    tables_category,
+                    table_name,
+                    db_manager,
+                    catalog['tables'][table_name],
+                    min(table_names.index(table_name), tables_category.childCount())
+                )
+            tables_category.setExpanded(True)
+
+        if views_category is not None:
+            for view_name in changes['removed_views']:
+                item = self._find_child(views_category, 'view', view_name)
+                if item is not None:
+                    views_category.removeChild(item)
+
+            for view_name in changes['added_views']:
+                self._add_view_item(
+                    views_category,
+                    view_name,
+                    db_manager,
+                    min(catalog['views'].index(view_name), views_category.childCount())
+                )
+            views_category.setExpanded(True)
+
+    def find_database_item(self, db_path: str) -> Optional[QTreeWidgetItem]:
+        for idx in range(self.topLevelItemCount()):
+            item = self.topLevelItem(idx)
+            data = item.data(0, Qt.ItemDataRole.UserRole)
+            if data and data.get('path') == db_path:
+                return item
+
+        return None
+
+    @staticmethod
+    def _find_child(parent: QTreeWidgetItem, item_type: str, name: Optional[str] = None) -> Optional[QTreeWidgetItem]:
+        for idx in range(parent.childCount()):
+            child = parent.child(idx)
+            data = child.data(0, Qt.ItemDataRole.UserRole)
+            if data and data.get('type') == item_type and (name is None or data.get('name') == name):
+                return child
+
+        return None
+
     def on_item_clicked(self, item: QTreeWidgetItem, column: int):
         """Handle item click"""
         data = item.data(0, Qt.ItemDataRole.UserRole)
@@ -318,6 +390,12 @@ class DatabaseTree(QTreeWidget):
             )
             menu.addAction(copy_action)
 
+            profile_action = QAction("Profile Column", self)
+            profile_action.triggered.connect(
+                lambda: self.show_column_profile(data.get('table'), col_name, data.get('db_manager'))
+            )
+            menu.addAction(profile_action)
+
         elif item_type == 'database':
             actions = []
             disconnect_action = QAction("Disconnect Database", self)
@@ -428,7 +506,7 @@ class DatabaseTree(QTreeWidget):
         try:
             column_names = db_manager.get_table_schema(table_name)
             schema_viewer = SchemaViewerDialog(self)
-            schema_viewer.display_table_schema_dialog(table_name, column_names)
+            schema_viewer.display_table_schema_dialog(table_name, column_names, db_manager)
         except Exception as e:
             QMessageBox.warning(
                 self,
@@ -436,6 +514,12 @@ class DatabaseTree(QTreeWidget):
                 f"Failed to retrieve schema: {str(e)}"
             )
 
+    def show_column_profile(self, table_name: str, column_name: str, db_manager: DatabaseManager):
+        """Show statistics of a table column"""
+        dialog = ColumnProfileDialog(db_manager, table_name, column_name, self)
+        dialog.profile()
+        dialog.exec()
+
     def show_view_schema(self, view_name: str, db_manager: DatabaseManager):
         """Show detailed schema information for a view"""
         try:
@@ -468,14 +552,7 @@ class DatabaseTree(QTreeWidget):
                 return
 
             for table_name in tables:
-                table_item = QTreeWidgetItem(tables_category, [table_name])
-                table_item.setData(0, Qt.ItemDataRole.UserRole, {
-                    'type': 'table',
-                    'name': table_name,
-                    'db_manager': db_manager
-                })
-                table_item.setExpanded(True)
-                self._load_table_columns(table_item, table_name, db_manager)
+                self._add_table_item(tables_category, table_name, db_manager)
 
             tables_category.setExpanded(True)
 
@@ -500,25 +577,71 @@ class DatabaseTree(QTreeWidget):
                 return
 
             for view_name in views:
-                view_item = QTreeWidgetItem(views_category, [view_name])
-                view_item.setData(0, Qt.ItemDataRole.UserRole, {
-                    'type': 'view',
-                    'name': view_name,
-                    'db_manager': db_manager
-                })
+                self._add_view_item(views_category, view_name, db_manager)
 
             views_category.setExpanded(True)
 
         except Exception as e:
             QMessageBox.warning(self, "Error", f"Failed to load database views: {str(e)}")
 
-    def _load_table_columns(self, table_item: QTreeWidgetItem, table_name: str, db_manager: DatabaseManager):
-        """Load columns from table"""
+    def _add_table_item(
+            self,
+            tables_category: QTreeWidgetItem,
+            table_name: str,
+            db_manager: DatabaseManager,
+            columns: Optional[List[Dict[str, Any]]] = None,
+            index: Optional[int] = None
+    ) -> QTreeWidgetItem:
+        """Add a table with its columns, appended unless an index is given"""
+        table_item = QTreeWidgetItem([table_name])
+        if index is None:
+            tables_category.addChild(table_item)
+        else:
+            tables_category.insertChild(index, table_item)
+        table_item.setData(0, Qt.ItemDataRole.UserRole, {
+            'type': 'table',
+            'name': table_name,
+            'db_manager': db_manager
+        })
+        table_item.setExpanded(True)
+        self._load_table_columns(table_item, table_name, db_manager, columns)
+
+        return table_item
+
+    def _add_view_item(
+            self,
+            views_category: QTreeWidgetItem,
+            view_name: str,
+            db_manager: DatabaseManager,
+            index: Optional[int] = None
+    ) -> QTreeWidgetItem:
+        view_item = QTreeWidgetItem([view_name])
+        if index is None:
+            views_category.addChild(view_item)
+        else:
+            views_category.insertChild(index, view_item)
+        view_item.setData(0, Qt.ItemDataRole.UserRole, {
+            'type': 'view',
+            'name': view_name,
+            'db_manager': db_manager
+        })
+
+        return view_item
+
+    def _load_table_columns(
+            self,
+            table_item: QTreeWidgetItem,
+            table_name: str,
+            db_manager: DatabaseManager,
+            columns: Optional[List[Dict[str, Any]]] = None
+    ):
+        """Load columns from table, columns already read can be passed in"""
         try:
             table_item.takeChildren()
 
             # retrieve table columns
-            columns = db_manager.get_table_schema(table_name)
+            if columns is None:
+                columns = db_manager.get_table_schema(table_name)
 
             columns_category = QTreeWidgetItem(table_item, ["Columns"])
             columns_category.setExpanded(True)
@@ -563,7 +686,8 @@ class DatabaseTree(QTreeWidget):
                 column_item.setData(0, Qt.ItemDataRole.UserRole, {
                     'type': 'column',
                     'table': table_name,
-                    'column': col
+                    'column': col,
+                    'db_manager': db_manager
                 })
 
         except Exception as e:
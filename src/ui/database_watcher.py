@@ -0,0 +1,124 @@
+from ..core.catalog import refresh_catalog, diff_catalog, has_changes
+from ..core.database_manager import DatabaseManager
+from PySide6.QtCore import QObject, QTimer, QFileSystemWatcher, QThreadPool, Signal
+from typing import Dict, Any, Optional, Set
+from .workers import Worker
+from pathlib import Path
+
+# quiet period after the last file event before the database is checked,
+# a write produces a burst of events
+WATCH_DEBOUNCE_MS = 500
+
+
+class DatabaseWatcher(QObject):
+    """
+    Watches open database files for changes made outside the viewer. The
+    file content version is checked on the thread pool, ribbitxdb touches
+    the file on plain reads so most events are not changes. When the
+    content changed, the catalog is read again and diffed with the cached
+    one. Nothing is checked while a connection to the file is open, such as
+    a running script, the writer's last commit touches the file again
+    """
+
+    # db_path, new catalog, changes from diff_catalog
+    catalog_changed = Signal(str, dict, dict)
+    # db_path, emitted for any content change including row changes
+    data_changed = Signal(str)
+    file_removed = Signal(str)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.db_managers: Dict[str, DatabaseManager] = {}
+        self.catalogs: Dict[str, Optional[Dict[str, Any]]] = {}
+        self.workers: Dict[str, Worker] = {}
+        self.pending: Set[str] = set()
+
+        self._watcher = QFileSystemWatcher(self)
+        self._watcher.fileChanged.connect(self.on_file_changed)
+
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(WATCH_DEBOUNCE_MS)
+        self._timer.timeout.connect(self.check_pending)
+
+    def watch(self, db_manager: DatabaseManager):
+        """Start watching a database, its current catalog is read as the baseline"""
+        db_path = db_manager.db_path
+        self.db_managers[db_path] = db_manager
+        self.catalogs[db_path] = None
+        if Path(db_path).exists():
+            self._watcher.addPath(db_path)
+        self.check(db_path)
+
+    def unwatch(self, db_path: str):
+        self.db_managers.pop(db_path, None)
+        self.catalogs.pop(db_path, None)
+        self.pending.discard(db_path)
+        worker = self.workers.pop(db_path, None)
+        if worker:
+            worker.cancel()
+        if db_path in self._watcher.files():
+            self._watcher.removePath(db_path)
+
+    def unwatch_all(self):
+        for db_path in list(self.db_managers):
+            self.unwatch(db_path)
+
+    def is_watching(self, db_path: str) -> bool:
+        return db_path in self.db_managers
+
+    def on_file_changed(self, db_path: str):
+        if db_path not in self.db_managers:
+            return
+
+        # files replaced by a rename drop out of the watcher
+        if db_path not in self._watcher.files():
+            if not Path(db_path).exists():
+                self.file_removed.emit(db_path)
+                return
+            self._watcher.addPath(db_path)
+
+        self.pending.add(db_path)
+        self._timer.start()
+
+    def check_pending(self):
+        for db_path in list(self.pending):
+            db_manager = self.db_managers.get(db_path)
+            # a running check picks the path up again when it finishes, and
+            # a database being written to is checked once the writer is done
+            if db_manager is not None and db_manager.is_busy():
+                self._timer.start()
+            elif db_path not in self.workers:
+                self.pending.discard(db_path)
+                self.check(db_path)
+
+    def check(self, db_path: str):
+        """Read the catalog on the thread pool if the file content changed"""
+        db_manager = self.db_managers.get(db_path)
+        if not db_manager:
+            return
+
+        worker = Worker(refresh_catalog, db_manager, self.catalogs.get(db_path))
+        worker.signals.finished.connect(lambda catalog: self.on_checked(db_path, worker, catalog))
+        worker.signals.error.connect(lambda error: self.on_checked(db_path, worker, None))
+        self.workers[db_path] = worker
+        QThreadPool.globalInstance().start(worker)
+
+    def on_checked(self, db_path: str, worker: Worker, catalog: Optional[Dict[str, Any]]):
+        if self.workers.get(db_path) is not worker:
+            return
+        del self.workers[db_path]
+
+        if catalog is not None:
+            previous = self.catalogs.get(db_path)
+            self.catalogs[db_path] = catalog
+
+            # the first read is the baseline
+            if previous is not None:
+                changes = diff_catalog(previous, catalog)
+                if has_changes(changes):
+                    self.catalog_changed.emit(db_path, catalog, changes)
+                self.data_changed.emit(db_path)
+
+        if db_path in self.pending:
+            self._timer.start()
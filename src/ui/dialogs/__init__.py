@@ -1,3 +1,8 @@
 from .about_dialog import AboutDialog
 from .schema_viewer_dialog import SchemaViewerDialog
-from .accept_action_dialog import AcceptActionDialog
\ No newline at end of file
+from .accept_action_dialog import AcceptActionDialog
+from .query_plan_dialog import QueryPlanDialog
+from .performance_dialog import PerformanceDialog
+from .column_profile_dialog import ColumnProfileDialog
+from .table_diff_dialog import TableDiffDialog
+from .cell_viewer_dialog import CellViewerDialog
@@ -0,0 +1,102 @@
+from PySide6.QtWidgets import (
+    QDialog, QVBoxLayout, QHBoxLayout, QPlainTextEdit, QPushButton, QLabel, QMessageBox
+)
+from src.core.database_manager import DatabaseManager
+from src.utils import copy_to_clipboard
+from PySide6.QtCore import QThreadPool
+from PySide6.QtGui import QFontDatabase
+from typing import Any, Optional
+from ..workers import Worker
+
+
+class CellViewerDialog(QDialog):
+    """Full value of a table cell, looked up by primary key on the thread pool"""
+
+    def __init__(
+            self,
+            db_manager: DatabaseManager,
+            table_name: str,
+            column_name: str,
+            key_column: str,
+            key_value: Any,
+            parent=None
+    ):
+        super().__init__(parent)
+        self.db_manager = db_manager
+        self.table_name = table_name
+        self.column_name = column_name
+        self.key_column = key_column
+        self.key_value = key_value
+        self.value: Any = None
+        self.worker: Optional[Worker] = None
+        self.setWindowTitle(f"Value: {table_name}.{column_name} ({key_column} = {key_value})")
+        self.setMinimumSize(640, 420)
+        self.setup_ui()
+
+    def setup_ui(self):
+        layout = QVBoxLayout(self)
+
+        self.text_edit = QPlainTextEdit()
+        self.text_edit.setReadOnly(True)
+
+        self.status_label = QLabel()
+
+        button_layout = QHBoxLayout()
+        self.copy_button = QPushButton("Copy")
+        self.copy_button.setEnabled(False)
+        self.copy_button.clicked.connect(lambda: copy_to_clipboard(self._format_value(self.value)))
+        close_button = QPushButton("Close")
+        close_button.clicked.connect(self.close)
+        button_layout.addWidget(self.status_label)
+        button_layout.addStretch()
+        button_layout.addWidget(self.copy_button)
+        button_layout.addWidget(close_button)
+
+        layout.addWidget(self.text_edit)
+        layout.addLayout(button_layout)
+
+    def load(self):
+        if self.worker:
+            self.worker.cancel()
+
+        self.status_label.setText("Loading...")
+        self.worker = Worker(
+            self.db_manager.get_cell_value, self.table_name, self.column_name, self.key_column, self.key_value
+        )
+        self.worker.signals.finished.connect(self.on_value_loaded)
+        self.worker.signals.error.connect(self.on_load_error)
+        QThreadPool.globalInstance().start(self.worker)
+
+    def on_value_loaded(self, value: Any):
+        self.worker = None
+        self.value = value
+
+        if isinstance(value, bytes):
+            # bytes as hex, 16 per line
+            self.text_edit.setFont(QFontDatabase.systemFont(QFontDatabase.SystemFont.FixedFont))
+            self.status_label.setText(f"{len(value):,} bytes")
+        elif value is None:
+            self.status_label.setText("NULL")
+        else:
+            self.status_label.setText(f"{len(str(value)):,} characters")
+
+        self.text_edit.setPlainText(self._format_value(value))
+        self.copy_button.setEnabled(True)
+
+    def on_load_error(self, error: str):
+        self.worker = None
+        self.status_label.setText("")
+        QMessageBox.critical(self, "Error", f"Failed to load value: {error}")
+
+    def closeEvent(self, event):
+        if self.worker:
+            self.worker.cancel()
+        super().closeEvent(event)
+
+    @staticmethod
+    def _format_value(value: Any) -> str:
+        if value is None:
+            return "NULL"
+        if isinstance(value, bytes):
+            return "\n".join(value[start:start + 16].hex(' ') for start in range(0, len(value), 16))
+        return str(value)
@@ -0,0 +1,152 @@
+from PySide6.QtWidgets import (
+    QDialog, QVBoxLayout, QHBoxLayout, QFormLayout, QTableWidget, QTableWidgetItem,
+    QHeaderView, QPushButton, QLabel, QComboBox, QMessageBox
+)
+from src.core.column_profile import profile_column, MODE_AUTO, MODE_EXACT, MODE_APPROXIMATE
+from src.core.database_manager import DatabaseManager
+from src.core.process_backend import get_backend
+from PySide6.QtCore import Qt, QThreadPool
+from typing import Dict, Any, Optional
+from ..workers import Worker
+
+
+class ColumnProfileDialog(QDialog):
+    """Statistics of a table column, computed on the thread pool"""
+
+    modes = [
+        ("Auto", MODE_AUTO),
+        ("Approximate", MODE_APPROXIMATE),
+        ("Exact", MODE_EXACT),
+    ]
+
+    def __init__(self, db_manager: DatabaseManager, table_name: str, column_name: str, parent=None):
+        super().__init__(parent)
+        self.db_manager = db_manager
+        self.table_name = table_name
+        self.column_name = column_name
+        self.worker: Optional[Worker] = None
+        self.setWindowTitle(f"Column Profile: {table_name}.{column_name}")
+        self.setMinimumSize(460, 480)
+        self.setup_ui()
+
+    def setup_ui(self):
+        layout = QVBoxLayout(self)
+
+        self.value_labels: Dict[str, QLabel] = {}
+        form = QFormLayout()
+        for key, title in (
+            ('row_count', "Rows"),
+            ('null_count', "Nulls"),
+            ('distinct_count', "Distinct"),
+            ('min', "Min"),
+            ('max', "Max"),
+            ('mode', "Mode"),
+        ):
+            label = QLabel()
+            label.setTextInteractionFlags(Qt.TextInteractionFlag.TextSelectableByMouse)
+            self.value_labels[key] = label
+            form.addRow(title + ":", label)
+
+        self.top_table = QTableWidget()
+        self.top_table.setColumnCount(3)
+        self.top_table.setHorizontalHeaderLabels(["Value", "Count", "Share"])
+        self.top_table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        self.top_table.setAlternatingRowColors(True)
+        self.top_table.horizontalHeader().setSectionResizeMode(0, QHeaderView.ResizeMode.Stretch)
+
+        self.status_label = QLabel()
+        self.status_label.setWordWrap(True)
+
+        button_layout = QHBoxLayout()
+        self.mode_cmb = QComboBox()
+        for title, mode in self.modes:
+            self.mode_cmb.addItem(title, mode)
+        self.mode_cmb.setToolTip(
+            "Approximate estimates distinct values and top values with bounded memory, "
+            "Auto uses it on large tables"
+        )
+        self.profile_button = QPushButton("Profile")
+        self.profile_button.clicked.connect(lambda: self.profile(use_cache=False))
+        close_button = QPushButton("Close")
+        close_button.clicked.connect(self.close)
+        button_layout.addWidget(self.mode_cmb)
+        button_layout.addStretch()
+        button_layout.addWidget(self.profile_button)
+        button_layout.addWidget(close_button)
+
+        layout.addLayout(form)
+        layout.addWidget(QLabel("Most common values:"))
+        layout.addWidget(self.top_table)
+        layout.addWidget(self.status_label)
+        layout.addLayout(button_layout)
+
+    def profile(self, use_cache: bool = True):
+        if self.worker:
+            self.worker.cancel()
+
+        self.profile_button.setEnabled(False)
+        self.status_label.setText("Profiling...")
+
+        self.worker = Worker(
+            profile_column,
+            self.db_manager,
+            self.table_name,
+            self.column_name,
+            mode=self.mode_cmb.currentData(),
+            use_cache=use_cache,
+            backend=get_backend(),
+            report_progress=True
+        )
+        self.worker.signals.progress.connect(lambda rows: self.status_label.setText(f"Profiling... {rows:,} rows read"))
+        self.worker.signals.finished.connect(self.on_profile_ready)
+        self.worker.signals.error.connect(self.on_profile_error)
+        QThreadPool.globalInstance().start(self.worker)
+
+    def on_profile_ready(self, profile: Dict[str, Any]):
+        self.worker = None
+        self.profile_button.setEnabled(True)
+        approximate = "" if profile['exact'] else "~"
+
+        self.value_labels['row_count'].setText(f"{profile['row_count']:,}")
+        self.value_labels['null_count'].setText(f"{profile['null_count']:,} ({profile['null_fraction']:.1%})")
+        self.value_labels['distinct_count'].setText(f"{approximate}{profile['distinct_count']:,}")
+        self.value_labels['min'].setText(self._format_value(profile['min']))
+        self.value_labels['max'].setText(self._format_value(profile['max']))
+        self.value_labels['mode'].setText(
+            "Exact" if profile['exact'] else f"Approximate, top values from a {profile['sample_size']:,} row sample"
+        )
+
+        non_null = profile['row_count'] - profile['null_count']
+        self.top_table.setRowCount(len(profile['top_values']))
+        for row, (value, count) in enumerate(profile['top_values']):
+            count_item = QTableWidgetItem(f"{approximate}{count:,}")
+            share_item = QTableWidgetItem(f"{count / non_null:.1%}" if non_null else "")
+            for item in (count_item, share_item):
+                item.setTextAlignment(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
+
+            self.top_table.setItem(row, 0, QTableWidgetItem(self._format_value(value)))
+            self.top_table.setItem(row, 1, count_item)
+            self.top_table.setItem(row, 2, share_item)
+        self.top_table.resizeColumnToContents(1)
+
+        source = "Cached, the database is unchanged" if profile['cached'] else f"Computed in {profile['elapsed']:.3f} seconds"
+        self.status_label.setText(source)
+
+    def on_profile_error(self, error: str):
+        self.worker = None
+        self.profile_button.setEnabled(True)
+        self.status_label.setText("")
+        QMessageBox.critical(self, "Error", f"Failed to profile column: {error}")
+
+    def closeEvent(self, event):
+        if self.worker:
+            self.worker.cancel()
+        super().closeEvent(event)
+
+    @staticmethod
+    def _format_value(value: Any) -> str:
+        if value is None:
+            return "NULL"
+
+        text = str(value)
+        return text if len(text) <= 200 else text[:200] + "..."
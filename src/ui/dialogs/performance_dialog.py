@@ -0,0 +1,221 @@
+from PySide6.QtWidgets import (
+    QDialog, QVBoxLayout, QHBoxLayout, QTableWidget, QTableWidgetItem,
+    QHeaderView, QPushButton, QLabel, QCheckBox, QTabWidget, QFileDialog,
+    QMessageBox, QSplitter
+)
+from ...core.profiling import profiler
+from PySide6.QtCore import Qt, QTimer
+from ..lag_monitor import LagMonitor
+from PySide6.QtGui import QFont
+from typing import List, Any
+
+# refresh period of the tables while the dialog is visible
+REFRESH_MS = 1000
+
+# longest histogram bar in characters
+HISTOGRAM_WIDTH = 40
+
+
+class PerformanceDialog(QDialog):
+    """Recent spans, per-name statistics and event loop lag of the session"""
+
+    def __init__(self, lag_monitor: LagMonitor, parent=None):
+        super().__init__(parent)
+        self.lag_monitor = lag_monitor
+        self.setWindowTitle("Performance")
+        self.setMinimumSize(900, 550)
+
+        self.refresh_timer = QTimer(self)
+        self.refresh_timer.setInterval(REFRESH_MS)
+        self.refresh_timer.timeout.connect(self.refresh)
+
+        self.setup_ui()
+
+    def setup_ui(self):
+        layout = QVBoxLayout(self)
+
+        top_layout = QHBoxLayout()
+        self.record_checkbox = QCheckBox("Record")
+        self.record_checkbox.setToolTip("Record spans and event loop lag, adds a small overhead")
+        self.record_checkbox.setChecked(profiler.enabled)
+        self.record_checkbox.toggled.connect(self.set_recording)
+        self.lag_label = QLabel()
+        top_layout.addWidget(self.record_checkbox)
+        top_layout.addStretch()
+        top_layout.addWidget(self.lag_label)
+
+        self.tabs = QTabWidget()
+
+        self.recent_table = self._create_table(["Name", "Category", "Duration (ms)", "Thread", "Details"])
+        self.tabs.addTab(self.recent_table, "Recent")
+
+        summary_splitter = QSplitter(Qt.Orientation.Vertical)
+        self.summary_table = self._create_table(
+            ["Name", "Count", "Total (ms)", "Mean (ms)", "p50 (ms)", "p95 (ms)", "Max (ms)"]
+        )
+        self.summary_table.itemSelectionChanged.connect(self.show_histogram)
+        self.histogram_label = QLabel("Select a row to show its histogram")
+        self.histogram_label.setFont(QFont("monospace"))
+        self.histogram_label.setAlignment(Qt.AlignmentFlag.AlignTop | Qt.AlignmentFlag.AlignLeft)
+        self.histogram_label.setTextInteractionFlags(Qt.TextInteractionFlag.TextSelectableByMouse)
+        summary_splitter.addWidget(self.summary_table)
+        summary_splitter.addWidget(self.histogram_label)
+        self.tabs.addTab(summary_splitter, "Summary")
+
+        button_layout = QHBoxLayout()
+        clear_button = QPushButton("Clear")
+        clear_button.clicked.connect(self.clear)
+        trace_button = QPushButton("Save Trace...")
+        trace_button.setToolTip("Save recorded spans as a Chrome trace, open it in chrome://tracing or Perfetto")
+        trace_button.clicked.connect(self.save_trace)
+        self.cprofile_button = QPushButton()
+        self.cprofile_button.setToolTip("Profile every Python call on the GUI thread with cProfile")
+        self.cprofile_button.clicked.connect(self.toggle_cprofile)
+        close_button = QPushButton("Close")
+        close_button.clicked.connect(self.close)
+        button_layout.addWidget(clear_button)
+        button_layout.addWidget(trace_button)
+        button_layout.addWidget(self.cprofile_button)
+        button_layout.addStretch()
+        button_layout.addWidget(close_button)
+
+        layout.addLayout(top_layout)
+        layout.addWidget(self.tabs)
+        layout.addLayout(button_layout)
+
+        self._update_cprofile_button()
+
+    def set_recording(self, enabled: bool):
+        if enabled:
+            profiler.enable()
+            self.lag_monitor.start()
+        else:
+            profiler.disable()
+            self.lag_monitor.stop()
+        self.refresh()
+
+    def refresh(self):
+        lag = (
+            f"Event loop lag: {self.lag_monitor.last_lag_ms:.1f} ms, max {self.lag_monitor.max_lag_ms:.1f} ms"
+            if self.lag_monitor.is_running() else "Event loop lag: not recording"
+        )
+        self.lag_label.setText(lag)
+
+        spans = profiler.recent_spans()
+        self._fill_table(self.recent_table, [
+            [
+                span['name'],
+                span['category'],
+                span['duration_ms'],
+                span['thread'],
+                ', '.join(f"{key}={value}" for key, value in span['args'].items()),
+            ]
+            for span in spans
+        ])
+
+        selected = self._selected_summary_name()
+        rows = profiler.summary()
+        self._fill_table(self.summary_table, [
+            [row['name'], row['count'], row['total_ms'], row['mean_ms'], row['p50_ms'], row['p95_ms'], row['max_ms']]
+            for row in rows
+        ])
+
+        # keep the histogram on the same span name across refreshes
+        if selected:
+            matches = self.summary_table.findItems(selected, Qt.MatchFlag.MatchExactly)
+            if matches:
+                self.summary_table.blockSignals(True)
+                self.summary_table.selectRow(matches[0].row())
+                self.summary_table.blockSignals(False)
+        self.show_histogram()
+
+    def show_histogram(self):
+        name = self._selected_summary_name()
+        if not name:
+            return
+
+        buckets = profiler.histogram(name)
+        peak = max((count for _, count in buckets), default=0) or 1
+        lines = [f"{name}"] + [
+            f"{label:>12}  {'█' * round(count / peak * HISTOGRAM_WIDTH):<{HISTOGRAM_WIDTH}}  {count}"
+            for label, count in buckets
+        ]
+        self.histogram_label.setText('\n'.join(lines))
+
+    def clear(self):
+        profiler.clear()
+        if self.lag_monitor.is_running():
+            self.lag_monitor.start()
+        self.histogram_label.setText("Select a row to show its histogram")
+        self.refresh()
+
+    def save_trace(self):
+        path, _ = QFileDialog.getSaveFileName(self, "Save Trace", "trace.json", "Chrome Trace (*.json)")
+        if not path:
+            return
+
+        try:
+            profiler.write_chrome_trace(path)
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"Failed to save trace: {str(e)}")
+
+    def toggle_cprofile(self):
+        if not profiler.cprofile_running:
+            profiler.start_cprofile()
+            self._update_cprofile_button()
+            return
+
+        path, _ = QFileDialog.getSaveFileName(self, "Save Profile", "session.prof", "cProfile Stats (*.prof)")
+        try:
+            profiler.stop_cprofile(path or None)
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"Failed to save profile: {str(e)}")
+        self._update_cprofile_button()
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.refresh()
+        self.refresh_timer.start()
+
+    def hideEvent(self, event):
+        self.refresh_timer.stop()
+        super().hideEvent(event)
+
+    def _update_cprofile_button(self):
+        self.cprofile_button.setText("Stop cProfile..." if profiler.cprofile_running else "Start cProfile")
+
+    def _selected_summary_name(self):
+        rows = self.summary_table.selectionModel().selectedRows()
+        return self.summary_table.item(rows[0].row(), 0).text() if rows else None
+
+    @staticmethod
+    def _create_table(headers: List[str]) -> QTableWidget:
+        table = QTableWidget(0, len(headers))
+        table.setHorizontalHeaderLabels(headers)
+        table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        table.setSelectionBehavior(QTableWidget.SelectionBehavior.SelectRows)
+        table.setSelectionMode(QTableWidget.SelectionMode.SingleSelection)
+        table.setAlternatingRowColors(True)
+        table.verticalHeader().setVisible(False)
+        table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Interactive)
+        table.horizontalHeader().setStretchLastSection(True)
+        return table
+
+    @staticmethod
+    def _fill_table(table: QTableWidget, rows: List[List[Any]]):
+        table.setUpdatesEnabled(False)
+        table.setRowCount(len(rows))
+
+        for row_idx, row in enumerate(rows):
+            for column, value in enumerate(row):
+                if isinstance(value, float):
+                    item = QTableWidgetItem(f"{value:,.3f}")
+                    item.setTextAlignment(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
+                elif isinstance(value, int):
+                    item = QTableWidgetItem(str(value))
+                    item.setTextAlignment(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
+                else:
+                    item = QTableWidgetItem(str(value))
+                table.setItem(row_idx, column, item)
+
+        table.setUpdatesEnabled(True)
@@ -0,0 +1,116 @@
+from PySide6.QtWidgets import (
+    QDialog, QVBoxLayout, QHBoxLayout, QTreeWidget, QTreeWidgetItem,
+    QHeaderView, QPushButton, QLabel, QMessageBox
+)
+from src.core.database_manager import DatabaseManager
+from PySide6.QtCore import Qt, QThreadPool
+from PySide6.QtGui import QBrush, QColor
+from typing import Dict, Any, Optional
+from ..workers import Worker
+
+
+class QueryPlanDialog(QDialog):
+    full_scan_color = QColor("#db0235")
+
+    def __init__(self, db_manager: DatabaseManager, sql: str, parent=None):
+        super().__init__(parent)
+        self.db_manager = db_manager
+        self.sql = sql
+        self.worker: Optional[Worker] = None
+        self.setWindowTitle(f"Query Plan: {db_manager.db_name}")
+        self.setMinimumSize(800, 400)
+        self.setup_ui()
+
+    def setup_ui(self):
+        layout = QVBoxLayout(self)
+
+        self.tree = QTreeWidget()
+        self.tree.setColumnCount(7)
+        self.tree.setHeaderLabels([
+            "Operation", "Details", "Est. Rows", "Cost", "Actual Rows", "Time (ms)", "Index"
+        ])
+        self.tree.setAlternatingRowColors(True)
+        self.tree.header().setSectionResizeMode(QHeaderView.ResizeMode.ResizeToContents)
+        self.tree.header().setStretchLastSection(True)
+
+        self.status_label = QLabel()
+        self.status_label.setWordWrap(True)
+
+        button_layout = QHBoxLayout()
+        button_layout.setAlignment(Qt.AlignmentFlag.AlignRight)
+        self.analyze_button = QPushButton("Analyze")
+        self.analyze_button.setToolTip("Run the query and show actual rows and times per step")
+        self.analyze_button.clicked.connect(self.analyze)
+        close_button = QPushButton("Close")
+        close_button.clicked.connect(self.close)
+        button_layout.addWidget(self.analyze_button)
+        button_layout.addWidget(close_button)
+
+        layout.addWidget(self.tree)
+        layout.addWidget(self.status_label)
+        layout.addLayout(button_layout)
+
+    def explain(self):
+        self._run(False)
+
+    def analyze(self):
+        self._run(True)
+
+    def on_plan_ready(self, plan: Dict[str, Any]):
+        self.worker = None
+        self.analyze_button.setEnabled(True)
+        self.tree.clear()
+        self._add_node(self.tree.invisibleRootItem(), plan)
+        self.tree.expandAll()
+
+        message = f"Estimated cost: {plan['cost']:,.0f}"
+        if plan['time_ms'] is not None:
+            message += f" | Actual: {plan['actual_rows']} rows in {plan['time_ms']:.3f} ms"
+        self.status_label.setText(message + " | Full table scans are highlighted")
+
+    def on_plan_error(self, error: str):
+        self.worker = None
+        self.analyze_button.setEnabled(True)
+        self.status_label.setText("")
+        QMessageBox.critical(self, "Error", f"Failed to explain query: {error}")
+
+    def closeEvent(self, event):
+        if self.worker:
+            self.worker.cancel()
+        super().closeEvent(event)
+
+    def _run(self, analyze: bool):
+        if self.worker:
+            self.worker.cancel()
+
+        self.analyze_button.setEnabled(False)
+        self.status_label.setText("Analyzing..." if analyze else "Planning...")
+
+        self.worker = Worker(self.db_manager.explain_query, self.sql, analyze)
+        self.worker.signals.finished.connect(self.on_plan_ready)
+        self.worker.signals.error.connect(self.on_plan_error)
+        QThreadPool.globalInstance().start(self.worker)
+
+    def _add_node(self, parent: QTreeWidgetItem, node: Dict[str, Any]):
+        item = QTreeWidgetItem(parent, [
+            node['operation'],
+            node['detail'],
+            f"{node['estimated_rows']:,}",
+            f"{node['cost']:,.0f}",
+            f"{node['actual_rows']:,}" if node['actual_rows'] is not None else "",
+            f"{node['time_ms']:.3f}" if node['time_ms'] is not None else "",
+            node['index'] or "",
+        ])
+        item.setToolTip(1, node['detail'])
+
+        for column in (2, 3, 4, 5):
+            item.setTextAlignment(column, Qt.AlignmentFlag.AlignRight)
+
+        if node['full_scan']:
+            brush = QBrush(self.full_scan_color)
+            for column in range(self.tree.columnCount()):
+                item.setForeground(column, brush)
+            item.setToolTip(0, "Full table scan, every row is read")
+
+        for child in node['children']:
+            self._add_node(item, child)
@@ -3,13 +3,15 @@ import json
 from PySide6.QtWidgets import (
     QDialog, QVBoxLayout, QTableWidget, QTableWidgetItem,
     QHeaderView, QTextEdit, QLabel,
-    QTabWidget, QPlainTextEdit, QMessageBox
+    QTabWidget, QPlainTextEdit, QMessageBox, QMenu
 )
+from .column_profile_dialog import ColumnProfileDialog
 from src.utils import (
     parse_timestamp, try_convert_int, try_convert_float
 )
 from typing import List, Dict, Any
-from PySide6.QtCore import Qt
+from PySide6.QtCore import Qt, QPoint
+from PySide6.QtGui import QCursor
 
 
 class SchemaViewerDialog(QDialog):
@@ -17,8 +19,16 @@ class SchemaViewerDialog(QDialog):
         super().__init__(parent)
         self.setMinimumHeight(400)
 
-    def display_table_schema_dialog(self, table_name: str, columns: List[Dict[str, Any]]):
+    def display_table_schema_dialog(self, table_name: str, columns: List[Dict[str, Any]], db_manager=None):
+        """
+        Show the columns and create script of a table
+        :param table_name: Table name
+        :param columns: Table schema from DatabaseManager.get_table_schema
+        :param db_manager: DatabaseManager of the table, enables column profiles
+        """
         self.setWindowTitle(f"Schema: {table_name}")
+        self.table_name = table_name
+        self.db_manager = db_manager
         tab_widget = QTabWidget()
 
         layout = QVBoxLayout(self)
@@ -28,6 +38,9 @@ class SchemaViewerDialog(QDialog):
         table.setVerticalScrollMode(QTableWidget.ScrollMode.ScrollPerPixel)
         table.setHorizontalScrollMode(QTableWidget.ScrollMode.ScrollPerPixel)
         table.setColumnCount(9)
+        if db_manager is not None:
+            table.setContextMenuPolicy(Qt.ContextMenuPolicy.CustomContextMenu)
+            table.customContextMenuRequested.connect(lambda position: self.show_context_menu(table, position))
         table.setRowCount(len(columns))
         table.setHorizontalHeaderLabels([
             "Column", "Type", "Nullable", "Default", "Check", "PK", "AI", "UQ", "FK"
@@ -116,6 +129,22 @@ class SchemaViewerDialog(QDialog):
 
         self.exec()
 
+    def show_context_menu(self, table: QTableWidget, position: QPoint):
+        item = table.itemAt(position)
+        if not item:
+            return
+
+        column_name = table.item(item.row(), 0).text()
+        menu = QMenu(self)
+        profile_action = menu.addAction("Profile Column")
+        profile_action.triggered.connect(lambda: self.show_column_profile(column_name))
+        menu.exec(QCursor.pos())
+
+    def show_column_profile(self, column_name: str):
+        dialog = ColumnProfileDialog(self.db_manager, self.table_name, column_name, self)
+        dialog.profile()
+        dialog.exec()
+
     def on_item_double_clicked(self, item: QTableWidgetItem):
         # possibly add other cases?
         column_idx = item.column()
@@ -0,0 +1,231 @@
+from PySide6.QtWidgets import (
+    QDialog, QVBoxLayout, QHBoxLayout, QTableWidget, QTableWidgetItem, QHeaderView,
+    QPushButton, QLabel, QComboBox, QMessageBox, QFileDialog
+)
+from src.core.table_diff import TableDiff, diff_batches, ADDED, REMOVED, CHANGED
+from src.core.database_manager import DatabaseManager
+from src.core.export import write_rows
+from src.core.process_backend import get_backend
+from PySide6.QtCore import Qt, QThreadPool
+from PySide6.QtGui import QBrush, QColor
+from typing import Dict, Any, Optional
+from ..workers import Worker
+
+# differences listed in the dialog, the summary and exports cover all of them
+MAX_DIFF_ROWS = 1000
+
+
+class TableDiffDialog(QDialog):
+    """Compare a table between two open databases"""
+
+    status_colors = {
+        ADDED: QColor("#00FF94"),
+        REMOVED: QColor("#db0235"),
+        CHANGED: QColor("#FBBF24"),
+    }
+
+    def __init__(self, db_managers: Dict[str, DatabaseManager], parent=None):
+        super().__init__(parent)
+        self.db_managers = db_managers
+        self.worker: Optional[Worker] = None
+        self.export_worker: Optional[Worker] = None
+        self.setWindowTitle("Compare Tables")
+        self.setMinimumSize(900, 500)
+        self.setup_ui()
+
+    def setup_ui(self):
+        layout = QVBoxLayout(self)
+
+        select_layout = QHBoxLayout()
+        self.left_cmb = QComboBox()
+        self.right_cmb = QComboBox()
+        for db_path, db_manager in self.db_managers.items():
+            for combo in (self.left_cmb, self.right_cmb):
+                combo.addItem(db_manager.db_name, db_path)
+                combo.setItemData(combo.count() - 1, db_path, Qt.ItemDataRole.ToolTipRole)
+        if self.right_cmb.count() > 1:
+            self.right_cmb.setCurrentIndex(1)
+        self.table_cmb = QComboBox()
+        self.table_cmb.setMinimumWidth(160)
+
+        self.left_cmb.currentIndexChanged.connect(self.load_tables)
+        self.right_cmb.currentIndexChanged.connect(self.load_tables)
+
+        self.compare_button = QPushButton("Compare")
+        self.compare_button.clicked.connect(self.compare)
+
+        select_layout.addWidget(QLabel("Left:"))
+        select_layout.addWidget(self.left_cmb)
+        select_layout.addWidget(QLabel("Right:"))
+        select_layout.addWidget(self.right_cmb)
+        select_layout.addWidget(QLabel("Table:"))
+        select_layout.addWidget(self.table_cmb)
+        select_layout.addStretch()
+        select_layout.addWidget(self.compare_button)
+
+        self.table = QTableWidget()
+        self.table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        self.table.setAlternatingRowColors(True)
+        self.table.setVerticalScrollMode(QTableWidget.ScrollMode.ScrollPerPixel)
+
+        self.status_label = QLabel()
+        self.status_label.setWordWrap(True)
+
+        button_layout = QHBoxLayout()
+        button_layout.setAlignment(Qt.AlignmentFlag.AlignRight)
+        self.export_button = QPushButton("Export...")
+        self.export_button.setToolTip("Write every difference to CSV or JSON lines")
+        self.export_button.clicked.connect(self.export)
+        self.export_button.setEnabled(False)
+        close_button = QPushButton("Close")
+        close_button.clicked.connect(self.close)
+        button_layout.addWidget(self.export_button)
+        button_layout.addWidget(close_button)
+
+        layout.addLayout(select_layout)
+        layout.addWidget(self.table)
+        layout.addWidget(self.status_label)
+        layout.addLayout(button_layout)
+
+        self.load_tables()
+
+    def load_tables(self):
+        """Tables present in both databases"""
+        self.table_cmb.clear()
+        left, right = self._selected()
+        if not left or not right:
+            self.compare_button.setEnabled(False)
+            self.status_label.setText("Open two databases to compare")
+            return
+
+        try:
+            right_tables = set(right.get_tables())
+            self.table_cmb.addItems([table for table in left.get_tables() if table in right_tables])
+        except Exception as e:
+            self.status_label.setText(f"Failed to load tables: {e}")
+
+        self.compare_button.setEnabled(self.table_cmb.count() > 0)
+        self.status_label.setText("" if self.table_cmb.count() else "No table exists in both databases")
+
+    def compare(self):
+        left, right = self._selected()
+        table_name = self.table_cmb.currentText()
+        if not left or not right or not table_name:
+            return
+
+        if self.worker:
+            self.worker.cancel()
+
+        try:
+            self.diff = TableDiff(left, right, table_name, backend=get_backend())
+        except Exception as e:
+            QMessageBox.warning(self, "Error", str(e))
+            return
+
+        self.compare_button.setEnabled(False)
+        self.export_button.setEnabled(False)
+        self.status_label.setText("Comparing...")
+
+        self.worker = Worker(self.diff.run, MAX_DIFF_ROWS, report_progress=True)
+        self.worker.signals.progress.connect(
+            lambda read: self.status_label.setText(f"Comparing... {read[0]:,} left and {read[1]:,} right rows read")
+        )
+        self.worker.signals.finished.connect(self.on_diff_ready)
+        self.worker.signals.error.connect(self.on_diff_error)
+        QThreadPool.globalInstance().start(self.worker)
+
+    def on_diff_ready(self, result: Dict[str, Any]):
+        self.worker = None
+        self.compare_button.setEnabled(True)
+        self.export_button.setEnabled(True)
+
+        columns = result['columns']
+        key_size = len(result['key_columns'])
+        self.table.clear()
+        self.table.setColumnCount(len(columns) + 1)
+        self.table.setHorizontalHeaderLabels(["Status"] + columns)
+        self.table.setRowCount(len(result['rows']))
+
+        for row_idx, (status, left, right, changed) in enumerate(result['rows']):
+            brush = QBrush(self.status_colors[status])
+            status_item = QTableWidgetItem(status)
+            status_item.setForeground(brush)
+            self.table.setItem(row_idx, 0, status_item)
+
+            values = right if status == ADDED else left
+            for idx, column in enumerate(columns):
+                if idx in changed:
+                    item = QTableWidgetItem(f"{self._format(left[idx])} → {self._format(right[idx])}")
+                    item.setForeground(brush)
+                    item.setToolTip(f"{column} changed")
+                else:
+                    item = QTableWidgetItem(self._format(values[idx]))
+                    if idx >= key_size and status != CHANGED:
+                        item.setForeground(brush)
+                self.table.setItem(row_idx, idx + 1, item)
+
+        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Interactive)
+        self.table.resizeColumnsToContents()
+
+        message = (
+            f"{result['added']:,} added, {result['removed']:,} removed, {result['changed']:,} changed, "
+            f"{result['unchanged']:,} unchanged ({result['left_rows']:,} left rows, {result['right_rows']:,} right rows)"
+        )
+        differences = result['added'] + result['removed'] + result['changed']
+        if differences > len(result['rows']):
+            message += f". Showing the first {len(result['rows']):,} differences, export lists all of them"
+        for side, columns in (('left', result['left_only_columns']), ('right', result['right_only_columns'])):
+            if columns:
+                message += f". Only in the {side} table, not compared: {', '.join(columns)}"
+        self.status_label.setText(message)
+
+    def on_diff_error(self, error: str):
+        self.worker = None
+        self.compare_button.setEnabled(True)
+        self.status_label.setText("")
+        QMessageBox.critical(self, "Error", f"Failed to compare tables: {error}")
+
+    def export(self):
+        file_name, selected_filter = QFileDialog.getSaveFileName(
+            self, "Export Diff", f"{self.diff.table_name}_diff.csv", "CSV files (*.csv);;JSON lines (*.jsonl)"
+        )
+        if not file_name:
+            return
+
+        export_format = 'jsonl' if file_name.endswith('.jsonl') or 'jsonl' in selected_filter else 'csv'
+        self.export_button.setEnabled(False)
+        self.status_label.setText(f"Exporting to {file_name}...")
+
+        # the diff streams again, so exports aren't limited to the rows shown
+        self.export_worker = Worker(self._write_export, self.diff, file_name, export_format)
+        self.export_worker.signals.finished.connect(
+            lambda count: self._on_exported(f"{count:,} differences exported to {file_name}")
+        )
+        self.export_worker.signals.error.connect(lambda error: self._on_exported(f"Export failed: {error}"))
+        QThreadPool.globalInstance().start(self.export_worker)
+
+    def _on_exported(self, message: str):
+        self.export_worker = None
+        self.export_button.setEnabled(True)
+        self.status_label.setText(message)
+
+    def closeEvent(self, event):
+        for worker in (self.worker, self.export_worker):
+            if worker:
+                worker.cancel()
+        super().closeEvent(event)
+
+    @staticmethod
+    def _write_export(diff: TableDiff, file_name: str, export_format: str) -> int:
+        with open(file_name, 'w', encoding='utf-8', newline='') as f:
+            batches = diff_batches(diff.rows(), diff.columns, len(diff.key_columns))
+            return write_rows(batches, f, export_format)
+
+    def _selected(self):
+        left = self.db_managers.get(self.left_cmb.currentData())
+        right = self.db_managers.get(self.right_cmb.currentData())
+        return left, right
+
+    @staticmethod
+    def _format(value: Any) -> str:
+        return "NULL" if value is None else str(value)
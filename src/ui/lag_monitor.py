@@ -0,0 +1,50 @@
+from PySide6.QtCore import QObject, QTimer, Qt
+from ..core.profiling import profiler
+import time
+
+# a 60 Hz frame, longer lag is visible as stutter
+FRAME_BUDGET_MS = 1000 / 60
+
+
+class LagMonitor(QObject):
+    """
+    Measures event loop lag with a precise timer: a tick arriving late means
+    the GUI thread was busy. Lag is recorded as event_loop.lag samples, lag
+    over a frame is also kept as a span
+    """
+
+    def __init__(self, interval_ms: int = 50, parent=None):
+        super().__init__(parent)
+        self.interval_ms = interval_ms
+        self.last_lag_ms = 0.0
+        self.max_lag_ms = 0.0
+        self._last = 0
+
+        self._timer = QTimer(self)
+        self._timer.setTimerType(Qt.TimerType.PreciseTimer)
+        self._timer.setInterval(interval_ms)
+        self._timer.timeout.connect(self._tick)
+
+    def start(self):
+        self.last_lag_ms = 0.0
+        self.max_lag_ms = 0.0
+        self._last = time.perf_counter_ns()
+        self._timer.start()
+
+    def stop(self):
+        self._timer.stop()
+
+    def is_running(self) -> bool:
+        return self._timer.isActive()
+
+    def _tick(self):
+        now = time.perf_counter_ns()
+        expected = self._last + self.interval_ms * 1_000_000
+        self._last = now
+
+        lag_ms = max(0.0, (now - expected) / 1e6)
+        self.last_lag_ms = lag_ms
+        self.max_lag_ms = max(self.max_lag_ms, lag_ms)
+
+        if profiler.enabled:
+            profiler.record('event_loop.lag', 'event_loop', min(expected, now), now, keep=lag_ms > FRAME_BUDGET_MS)
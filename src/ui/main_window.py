@@ -11,11 +11,16 @@ from .database_tree import DatabaseTree
 from platformdirs import user_data_dir
 from .query_editor import QueryEditor
 from .. import APP_NAME, APP_AUTHOR
-from ..utils import query_viewer_db
-from .dialogs import AboutDialog
+from ..core.viewer_db import query_viewer_db
+from .dialogs import AboutDialog, PerformanceDialog, TableDiffDialog
+from ..core.profiling import profiler
+from ..core import process_backend
+from .lag_monitor import LagMonitor
+from .database_watcher import DatabaseWatcher
 from pathlib import Path
-from typing import Dict
+from typing import Dict, Optional
 import sys
+import os
 
 
 class MainWindow(QMainWindow):
@@ -23,6 +28,18 @@ class MainWindow(QMainWindow):
         super().__init__()
         self.db_managers: Dict[str, DatabaseManager] = {}
         self.data_dir = Path(user_data_dir(APP_NAME, APP_AUTHOR, ensure_exists=True))
+        self.performance_dialog: Optional[PerformanceDialog] = None
+
+        # profiling can be switched on from the command line or the Performance dialog
+        self.lag_monitor = LagMonitor(parent=self)
+        if profiler.enabled:
+            self.lag_monitor.start()
+
+        # open database files are watched for changes made outside the viewer
+        self.watcher = DatabaseWatcher(self)
+        self.watcher.catalog_changed.connect(self.on_catalog_changed)
+        self.watcher.data_changed.connect(self.on_database_changed)
+        self.watcher.file_removed.connect(self.on_database_file_removed)
 
         self.setWindowTitle("RibbitXDB Viewer")
         self.setGeometry(100, 100, 1400, 900)
@@ -104,6 +121,41 @@ class MainWindow(QMainWindow):
         exit_action.triggered.connect(self.close)
         file_menu.addAction(exit_action)
 
+        tools_menu = menubar.addMenu("&Tools")
+        performance_action = QAction("&Performance...", self)
+        performance_action.triggered.connect(self.open_performance_dialog)
+        tools_menu.addAction(performance_action)
+        compare_action = QAction("&Compare Tables...", self)
+        compare_action.triggered.connect(self.open_table_diff_dialog)
+        tools_menu.addAction(compare_action)
+
+        tools_menu.addSeparator()
+        settings = QSettings()
+        self.watch_files_action = QAction("&Watch Database Files", self)
+        self.watch_files_action.setCheckable(True)
+        self.watch_files_action.setChecked(settings.value("watch_files", True, type=bool))
+        self.watch_files_action.setToolTip("Update the database tree when a file is changed by another program")
+        self.watch_files_action.toggled.connect(self.on_watch_files_toggled)
+        tools_menu.addAction(self.watch_files_action)
+
+        self.reload_on_change_action = QAction("&Reload Table On Change", self)
+        self.reload_on_change_action.setCheckable(True)
+        self.reload_on_change_action.setChecked(settings.value("reload_on_change", True, type=bool))
+        self.reload_on_change_action.setToolTip("Fetch the viewed page again when its database file changes")
+        self.reload_on_change_action.toggled.connect(
+            lambda checked: QSettings().setValue("reload_on_change", checked)
+        )
+        tools_menu.addAction(self.reload_on_change_action)
+
+        self.worker_processes_action = QAction("Use Worker &Processes", self)
+        self.worker_processes_action.setCheckable(True)
+        self.worker_processes_action.setToolTip(
+            "Run profiles, table diffs and queries on all databases in separate processes, using every core"
+        )
+        self.worker_processes_action.toggled.connect(self.on_worker_processes_toggled)
+        self.worker_processes_action.setChecked(settings.value("worker_processes", False, type=bool))
+        tools_menu.addAction(self.worker_processes_action)
+
         help_menu = menubar.addMenu("&Help")
         about_action = QAction("&About...", self)
         about_action.triggered.connect(self.open_about_dialog)
@@ -159,6 +211,8 @@ class MainWindow(QMainWindow):
                 # Load tree with this manager
                 self.db_tree.load_database(db_manager)
                 self.query_editor.add_db(db_manager)
+                if self.watch_files_action.isChecked():
+                    self.watcher.watch(db_manager)
 
                 self.statusBar().showMessage(f"Opened: {filepath}")
             except Exception as e:
@@ -169,6 +223,23 @@ class MainWindow(QMainWindow):
         dialog = AboutDialog(self)
         dialog.show()
 
+    def open_performance_dialog(self):
+        """Open the performance dialog, one instance is kept for the session"""
+        if self.performance_dialog is None:
+            self.performance_dialog = PerformanceDialog(self.lag_monitor, self)
+
+        self.performance_dialog.show()
+        self.performance_dialog.raise_()
+
+    def open_table_diff_dialog(self):
+        """Open the table diff dialog for the open databases"""
+        if len(self.db_managers) < 2:
+            QMessageBox.information(self, "Compare Tables", "Open two databases to compare their tables")
+            return
+
+        dialog = TableDiffDialog(self.db_managers, self)
+        dialog.show()
+
     def on_table_selected(self, db_path: str, table_name: str):
         """Handle table selection from tree"""
         if db_path not in self.db_managers:
@@ -176,10 +247,7 @@ class MainWindow(QMainWindow):
 
         try:
             db_manager = self.db_managers[db_path]
-            page_size = self.db_table_viewer.pagination.page_size
-
-            data = db_manager.get_table_data_paginated(table_name, page=1, page_size=page_size)
-            self.db_table_viewer.display_data(data, db_manager, table_name)
+            self.db_table_viewer.load_table(db_manager, table_name)
 
             total_pages = self.db_table_viewer.pagination.total_pages
             self.open_database_viewer()
@@ -194,6 +262,7 @@ class MainWindow(QMainWindow):
         try:
             # Get and close the specific database manager
             if db_path in self.db_managers:
+                self.watcher.unwatch(db_path)
                 self.query_editor.remove_db(db_path)
                 query_viewer_db('DELETE FROM databases WHERE path = ?', (db_path,))
                 del self.db_managers[db_path]
@@ -212,19 +281,71 @@ class MainWindow(QMainWindow):
         except Exception as e:
             QMessageBox.warning(self, "Error", f"Failed to refresh database: {str(e)}")
 
+    def on_watch_files_toggled(self, checked: bool):
+        QSettings().setValue("watch_files", checked)
+
+        if not checked:
+            self.watcher.unwatch_all()
+            return
+
+        for db_manager in self.db_managers.values():
+            self.watcher.watch(db_manager)
+
+    def on_worker_processes_toggled(self, checked: bool):
+        QSettings().setValue("worker_processes", checked)
+        # the pool starts on first use
+        process_backend.configure((os.cpu_count() or 1) if checked else 0)
+
+    def on_catalog_changed(self, db_path: str, catalog: dict, changes: dict):
+        """Tables or views changed outside the viewer, patch the tree"""
+        self.db_tree.apply_catalog_changes(db_path, catalog, changes)
+        self.query_editor.refresh_completions(db_path)
+
+        viewer = self.db_table_viewer
+        if viewer.current_db_manager and viewer.current_db_manager.db_path == db_path:
+            if viewer.current_table in changes['removed_tables'] + changes['removed_views']:
+                viewer.clear_data()
+            elif viewer.current_table in changes['changed_tables']:
+                # new columns, load the table like a fresh selection
+                self.on_table_selected(db_path, viewer.current_table)
+
+        summary = ", ".join(
+            f"{len(names)} {key.replace('_', ' ')}" for key, names in changes.items() if names
+        )
+        self.statusBar().showMessage(f"{db_path} changed: {summary}")
+
+    def on_database_changed(self, db_path: str):
+        """The file content changed, rows of the viewed table may have too"""
+        viewer = self.db_table_viewer
+        if (
+            self.reload_on_change_action.isChecked()
+            and viewer.current_db_manager
+            and viewer.current_db_manager.db_path == db_path
+            # the watcher reports the change again when the writer closes
+            and not viewer.current_db_manager.is_busy()
+        ):
+            viewer.reload_page()
+
+    def on_database_file_removed(self, db_path: str):
+        self.statusBar().showMessage(f"{db_path} was moved or deleted")
+
     def on_query_copied(self, table_name: str, query_type: str):
         self.statusBar().showMessage(f"{query_type} query for {table_name} copied to clipboard")
 
     def on_views_refreshed(self, db_name: str):
+        self.query_editor.refresh_completions()
         self.statusBar().showMessage(f"Views for {db_name} refreshed")
 
     def on_view_deleted(self, view_name: str, db_name: str):
+        self.query_editor.refresh_completions()
         self.statusBar().showMessage(f"View {view_name} deleted from {db_name}")
 
     def on_tables_refreshed(self, db_name: str):
+        self.query_editor.refresh_completions()
         self.statusBar().showMessage(f"Tables for {db_name} refreshed")
 
     def on_table_deleted(self, table_name: str, db_name: str):
+        self.query_editor.refresh_completions()
         self.statusBar().showMessage(f"Table {table_name} deleted from {db_name}")
 
     def _load_dbs(self):
@@ -246,6 +367,8 @@ class MainWindow(QMainWindow):
             db_manager = DatabaseManager(db_path)
             self.db_tree.load_database(db_manager)
             self.db_managers[db_path] = db_manager
+            if self.watch_files_action.isChecked():
+                self.watcher.watch(db_manager)
 
         self.query_editor.populate_db_list(self.db_managers)
 
@@ -1,4 +1,5 @@
 from PySide6.QtWidgets import QWidget, QHBoxLayout, QLabel, QComboBox, QPushButton, QLineEdit
+from typing import Optional
 from PySide6.QtGui import QIntValidator
 from PySide6.QtCore import Signal, Qt
 
@@ -9,6 +10,9 @@ class PaginationWidget(QWidget):
     # Signals
     page_changed = Signal(int)
     page_size_changed = Signal(int)
+    # sample size and seed, None for a new random sample
+    sample_requested = Signal(int, object)
+    sample_mode_changed = Signal(bool)
 
     def __init__(self):
         super().__init__()
@@ -17,6 +21,7 @@ class PaginationWidget(QWidget):
         self.page_size = 50
         self.total_rows = 0
         self.displayed_rows = 0
+        self.sample_mode = False
         self.setup_ui()
 
     def setup_ui(self):
@@ -34,6 +39,13 @@ class PaginationWidget(QWidget):
         self.page_size_combo.setMaximumWidth(80)
         layout.addWidget(self.page_size_combo)
 
+        self.mode_combo = QComboBox()
+        self.mode_combo.addItem("Pages", False)
+        self.mode_combo.addItem("Sample", True)
+        self.mode_combo.setToolTip("Sample shows uniformly random rows from the whole table")
+        self.mode_combo.currentIndexChanged.connect(self.on_mode_changed)
+        layout.addWidget(self.mode_combo)
+
         layout.addStretch()
 
         # Navigation buttons
@@ -71,22 +83,73 @@ class PaginationWidget(QWidget):
         self.last_btn.setMaximumWidth(80)
         layout.addWidget(self.last_btn)
 
+        # sample controls, the sample size is the page size
+        self.seed_label = QLabel("Seed:")
+        layout.addWidget(self.seed_label)
+        self.seed_input = QLineEdit()
+        self.seed_input.setMaximumWidth(100)
+        self.seed_input.setValidator(QIntValidator(0, 2147483647))
+        self.seed_input.setPlaceholderText("random")
+        self.seed_input.setToolTip("The same seed shows the same rows, leave empty for a new sample each time")
+        self.seed_input.returnPressed.connect(self.request_sample)
+        layout.addWidget(self.seed_input)
+
+        self.resample_btn = QPushButton("Resample")
+        self.resample_btn.clicked.connect(self.request_sample)
+        self.resample_btn.setMaximumWidth(100)
+        layout.addWidget(self.resample_btn)
+
         layout.addStretch()
 
         # Total rows info
         self.info_label = QLabel("Total: 0 rows")
         layout.addWidget(self.info_label)
 
+        self.set_sample_mode(False)
         self.update_buttons()
 
-    def set_total_rows(self, total_rows: int, displayed_rows: int):
-        """Set total number of rows and calculate pages"""
+    def set_sample_mode(self, enabled: bool):
+        """Switch the controls between pages and samples without emitting signals"""
+        self.sample_mode = enabled
+        self.mode_combo.blockSignals(True)
+        self.mode_combo.setCurrentIndex(1 if enabled else 0)
+        self.mode_combo.blockSignals(False)
+
+        for widget in (self.first_btn, self.prev_btn, self.page_label, self.page_input, self.next_btn, self.last_btn):
+            widget.setVisible(not enabled)
+        for widget in (self.seed_label, self.seed_input, self.resample_btn):
+            widget.setVisible(enabled)
+
+    def on_mode_changed(self, index: int):
+        self.set_sample_mode(bool(self.mode_combo.itemData(index)))
+        self.sample_mode_changed.emit(self.sample_mode)
+        if self.sample_mode:
+            self.request_sample()
+        else:
+            self.update_ui()
+            self.page_changed.emit(self.current_page)
+
+    def sample_seed(self) -> Optional[int]:
+        text = self.seed_input.text().strip()
+        return int(text) if text else None
+
+    def request_sample(self):
+        self.sample_requested.emit(self.page_size, self.sample_seed())
+
+    def set_sample_info(self, total_rows: int, displayed_rows: int, method: str, seed: int):
+        """Show what the current sample was drawn from"""
+        self.seed_input.setPlaceholderText(f"random (last {seed})")
+        method = "primary key range" if method == 'pk_range' else "table scan"
+        self.info_label.setText(f"Sample: {displayed_rows:,} of {total_rows:,} rows by {method}")
+
+    def set_total_rows(self, total_rows: int, displayed_rows: int, keep_page: bool = False):
+        """Set total number of rows and calculate pages, keep_page stays on the current page if it still exists"""
         self.total_rows = total_rows
         self.displayed_rows = displayed_rows
         self.total_pages = max(1, (total_rows + self.page_size - 1) // self.page_size)
 
         # Reset to first page when data changes
-        self.current_page = 1
+        self.current_page = min(self.current_page, self.total_pages) if keep_page else 1
 
         self.update_ui()
 
@@ -147,8 +210,11 @@ class PaginationWidget(QWidget):
                 # Recalculate pages
                 # self.total_pages = max(1, (self.total_rows + self.page_size - 1) // self.page_size)
                 # self.current_page = min(self.current_page, self.total_pages)
-                self.update_ui()
-                self.page_size_changed.emit(new_size)
+                if self.sample_mode:
+                    self.request_sample()
+                else:
+                    self.update_ui()
+                    self.page_size_changed.emit(new_size)
         except ValueError:
             pass
 
@@ -157,4 +223,5 @@ class PaginationWidget(QWidget):
         self.current_page = 1
         self.total_pages = 1
         self.total_rows = 0
+        self.set_sample_mode(False)
         self.update_ui()
\ No newline at end of file
@@ -1,21 +1,48 @@
 from PySide6.QtWidgets import (
     QWidget, QToolBar,
-    QPlainTextEdit, QVBoxLayout, QTabWidget, QTableView, QHeaderView, QComboBox, QSplitter, QMessageBox, QLabel,
-    QFileDialog, QMenu, QApplication, QHBoxLayout, QPushButton
+    QVBoxLayout, QTabWidget, QTableView, QHeaderView, QComboBox, QSplitter, QMessageBox, QLabel,
+    QFileDialog, QMenu, QApplication, QHBoxLayout, QPushButton, QTableWidget, QTableWidgetItem, QSpinBox
 )
-from PySide6.QtGui import QAction, QFont, QKeySequence
+from PySide6.QtGui import QAction, QFont, QKeySequence, QTextCursor
 from ..core.database_manager import DatabaseManager
+from ..core.sql_script import split_statements, read_chunks, write_script, changes_schema
+from ..core.completion import CompletionIndex
+from ..core.fan_out import run_on_all
+from ..core.process_backend import get_backend
+from ..core.row_store import DEFAULT_SPILL_BYTES
 from ..utils.sql_highlighter import SQLHighlighter
 from .query_table_viewer import QueryResultViewer
-from .dialogs import AcceptActionDialog
+from .dialogs import AcceptActionDialog, QueryPlanDialog
+from .custom import SQLTextEdit
 from ..models import HistoryTableModel
 from platformdirs import user_data_dir
-from PySide6.QtCore import Qt, QPoint
-from ..utils import query_viewer_db
+from PySide6.QtCore import Qt, QPoint, QThreadPool, QTimer
+from ..core.viewer_db import query_viewer_db
+from ..core.export import write_csv
+from ..utils import format_timings
 from .. import APP_NAME, APP_AUTHOR
-from typing import Optional, Dict
+from typing import Optional, Dict, Any, List
+from collections import deque
+from .workers import Worker
 from datetime import datetime
-import csv
+import json
+import time
+import os
+
+# files above this size are offered the read-only large file mode
+LARGE_FILE_BYTES = 8 * 1024 * 1024
+
+# characters shown from a file in large file mode
+LARGE_FILE_PREVIEW = 64 * 1024
+
+# characters inserted into the editor per event loop iteration while loading
+LOAD_CHUNK_SIZE = 128 * 1024
+
+# rows fetched by a query before "Fetch more" takes over
+DEFAULT_ROW_LIMIT = 5000
+
+# results past this many MB are kept in a temporary file
+DEFAULT_SPILL_MB = DEFAULT_SPILL_BYTES // (1024 * 1024)
 
 class QueryEditor(QWidget):
     ok_style = """
@@ -35,8 +62,23 @@ class QueryEditor(QWidget):
         self.main_layout = QVBoxLayout(self)
         self.tab_widget = QTabWidget()
         self.query_result_viewer = QueryResultViewer()
+        self.results_tabs = QTabWidget()
         self.data_model = HistoryTableModel()
         self.data_dir = user_data_dir(APP_NAME, APP_AUTHOR, ensure_exists=True)
+        # script file executed by streaming instead of from the editor
+        self.large_file_path: Optional[str] = None
+        self.load_worker: Optional[Worker] = None
+        self.save_worker: Optional[Worker] = None
+        self.script_worker: Optional[Worker] = None
+        self.fan_out_worker: Optional[Worker] = None
+        self.load_queue = deque()
+        self.load_done = False
+        self.loaded_file_name = None
+        self.script_cancelled = False
+        # db_path -> identifiers for completion, built once per database
+        self.completion_indexes: Dict[str, CompletionIndex] = {}
+        self.completion_worker: Optional[Worker] = None
+        self.keyword_completions = CompletionIndex()
         self.setup_ui()
 
     def setup_ui(self):
@@ -57,7 +99,7 @@ class QueryEditor(QWidget):
         if current_tab == 'History':
             # populate history table
             try:
-                query: dict = query_viewer_db('SELECT database, execution_timestamp, execution_time, row_count, query FROM history ORDER BY id DESC')
+                query: dict = query_viewer_db('SELECT database, execution_timestamp, execution_time, row_count, query, timings FROM history ORDER BY id DESC')
                 rows = query.get('rows')
 
                 h_header = self.history_table.horizontalHeader()
@@ -107,6 +149,7 @@ class QueryEditor(QWidget):
         self.db_list_cmb.setItemData(self.db_list_cmb.count() - 1, db_manager.db_path, Qt.ItemDataRole.ToolTipRole)
 
     def remove_db(self, db_path: str):
+        self.completion_indexes.pop(db_path, None)
         for i in range(self.db_list_cmb.count()):
             data = self.db_list_cmb.itemData(i, Qt.ItemDataRole.UserRole)
             data_db_path = data.get('db_path')
@@ -128,57 +171,517 @@ class QueryEditor(QWidget):
         db_manager: DatabaseManager = data.get('db_manager', None)
         if db_manager:
             self.current_db_manager = db_manager
+            self.toggle_result_cache(self.cache_action.isChecked())
+            self._build_completions()
+
+    def refresh_completions(self, db_path: Optional[str] = None):
+        """
+        Drop completion identifiers after the schema changed, the current
+        database is read again in the background
+        :param db_path: Changed database, every database when None
+        """
+        if db_path is None:
+            self.completion_indexes.clear()
+        else:
+            self.completion_indexes.pop(db_path, None)
+
+        self._build_completions()
+
+    def _build_completions(self):
+        db_manager = self.current_db_manager
+        if not db_manager or db_manager.db_path in self.completion_indexes:
+            return
+
+        if self.completion_worker:
+            self.completion_worker.cancel()
+
+        self.completion_worker = Worker(CompletionIndex.build, db_manager)
+        self.completion_worker.signals.finished.connect(
+            lambda index: self._on_completions_built(db_manager.db_path, index)
+        )
+        QThreadPool.globalInstance().start(self.completion_worker)
+
+    def _on_completions_built(self, db_path: str, index: CompletionIndex):
+        self.completion_worker = None
+        self.completion_indexes[db_path] = index
+
+    def complete(self, text: str, position: int) -> Dict[str, Any]:
+        """Completion provider of the editor, falls back to keywords until the schema is read"""
+        index = None
+        if self.current_db_manager:
+            index = self.completion_indexes.get(self.current_db_manager.db_path)
+
+        return (index or self.keyword_completions).complete(text, position)
+
+    def toggle_result_cache(self, enabled: bool):
+        if not self.current_db_manager:
+            return
+
+        if enabled:
+            self.current_db_manager.enable_result_cache()
+        else:
+            self.current_db_manager.disable_result_cache()
 
     def execute_query(self):
+        if self.large_file_path:
+            self.execute_large_file()
+            return
+
+        if self.sql_input.textCursor().hasSelection():
+            sql = self.sql_input.textCursor().selectedText()
+        else:
+            sql = self.sql_input.toPlainText()
+
+        # QPlainTextEdit separates selected lines with paragraph separators
+        sql = sql.replace('\u2029', '\n')
+
+        statements = split_statements(sql)
+        if self.fan_out_action.isChecked():
+            self.execute_on_all(statements)
+            return
+
+        if self.current_db_manager and any(changes_schema(statement) for statement in statements):
+            # read the schema again once the statements ran
+            QTimer.singleShot(0, lambda db_path=self.current_db_manager.db_path: self.refresh_completions(db_path))
+
+        if len(statements) > 1:
+            self.execute_script(sql)
+            return
+
+        self._clear_script_tabs()
+
         try:
-            if self.sql_input.textCursor().hasSelection():
-                sql = self.sql_input.textCursor().selectedText()
-            else:
-                sql = self.sql_input.toPlainText()
+            # comments and the trailing semicolon are stripped by the splitter
+            data = self.current_db_manager.execute_query(
+                statements[0] if statements else sql, max_rows=self.row_limit_spin.value(), keep_cursor=True
+            )
 
-            data = self.current_db_manager.execute_query(sql)
+            start = time.perf_counter_ns()
             self.query_result_viewer.display_results(data)
+            timings = data.get('timings', {})
+            timings['model'] = (time.perf_counter_ns() - start) / 1e6
+
             self.export_action.setEnabled(len(data.get("rows", [])) > 0)
 
             execution_time = data.get('execution_time', 0)
             execution_timestamp = data.get('execution_timestamp', 0)
             rows_affected = data.get('rows_affected', 0)
 
-            query_viewer_db(
-                "INSERT INTO history (database, query, row_count, execution_time, execution_timestamp) VALUES (?, ?, ?, ?, ?)",
-                    (
-                        self.current_db_manager.db_name,
-                        sql.strip(),
-                        rows_affected,
-                        execution_time,
-                        datetime.fromtimestamp(execution_timestamp).strftime('%Y-%m-%d %H:%M:%S')
-                    )
-            )
+            self._add_history(sql, rows_affected, execution_time, execution_timestamp, timings)
+
+            source = "served from cache" if data.get('cached') else "executed successfully"
+            details = format_timings(timings)
+            if cache := self.current_db_manager.result_cache:
+                details += f" | cache {cache.hits} hits, {cache.misses} misses"
 
-            self._show_okay_status(f"Query executed successfully in {execution_time:.3f} seconds. {rows_affected} rows affected.")
+            limited = ""
+            if data.get('truncated'):
+                limited = f" Showing the first {len(data['rows']):,} rows"
+                limited += ", fetch more below." if data.get('cursor') else ", raise the row limit for more."
+
+            self._show_okay_status(
+                f"Query {source} in {execution_time:.3f} seconds. {rows_affected} rows affected.{limited}\n{details}"
+            )
 
         except Exception as e:
             self._show_error_status("Failed to execute query: " + str(e))
             self.export_action.setEnabled(False)
             self.query_result_viewer.clear_results()
 
+    def execute_on_all(self, statements: List[str]):
+        """Run one statement on every open database, rows stream into the result view"""
+        db_managers = [
+            data['db_manager'] for data in (self.db_list_cmb.itemData(idx) for idx in range(self.db_list_cmb.count()))
+            if data
+        ]
+        if not db_managers:
+            self._show_error_status("Open a database to execute the query against")
+            return
+        if len(statements) != 1:
+            self._show_error_status("Running on all databases takes a single statement")
+            return
+
+        sql = statements[0]
+        self._clear_script_tabs()
+        self.query_result_viewer.clear_results()
+        self.export_action.setEnabled(False)
+        self.execute_action.setEnabled(False)
+        self.cancel_action.setToolTip("Stop fetching from the databases")
+        self.cancel_action.setVisible(True)
+        self._show_okay_status(f"Executing on {len(db_managers)} databases...")
+
+        self.script_cancelled = False
+        worker = Worker(
+            run_on_all, db_managers, sql,
+            max_rows=self.row_limit_spin.value(),
+            keep_rows=False,
+            backend=get_backend(),
+            report_progress=True
+        )
+        worker.is_cancelled = lambda: self.script_cancelled
+        worker.signals.progress.connect(
+            lambda batch: worker is self.fan_out_worker and self.query_result_viewer.append_results(*batch)
+        )
+        worker.signals.finished.connect(lambda data: self._on_executed_on_all(data, sql))
+        worker.signals.error.connect(self._on_execute_on_all_error)
+        self.fan_out_worker = worker
+        QThreadPool.globalInstance().start(worker)
+
+    def _on_executed_on_all(self, data: Dict[str, Any], sql: str):
+        self.fan_out_worker = None
+        self.cancel_action.setVisible(False)
+        self.execute_action.setEnabled(True)
+
+        results = data['results']
+        if changes_schema(sql):
+            self.refresh_completions()
+        self.results_tabs.addTab(self._create_databases_table(results), "Databases")
+        self.export_action.setEnabled(data['total_rows'] > 0)
+
+        timings = {result['database']: result['elapsed'] * 1000 for result in results}
+        timings['total'] = data['execution_time'] * 1000
+        self._add_history(
+            sql,
+            data['total_rows'] or data['rows_affected'],
+            data['execution_time'],
+            data['execution_timestamp'],
+            timings,
+            database=f"{len(results)} databases"
+        )
+
+        slowest = max(results, key=lambda result: result['elapsed'])
+        summary = (
+            f"Executed on {len(results)} databases in {data['execution_time']:.3f} seconds. "
+            f"{data['total_rows']} rows, {data['rows_affected']} rows affected. "
+            f"Slowest: {slowest['database']} ({slowest['elapsed']:.3f} seconds)."
+        )
+        if truncated := sum(1 for result in results if result['truncated']):
+            summary += f" Rows limited on {truncated} databases."
+
+        if data['failed']:
+            self._show_error_status(f"{data['failed']} of {len(results)} databases failed. {summary}")
+            self.results_tabs.setCurrentIndex(self.results_tabs.count() - 1)
+        elif data['cancelled']:
+            self._show_error_status(f"Cancelled. {summary}")
+        else:
+            self._show_okay_status(summary)
+
+    def _on_execute_on_all_error(self, error: str):
+        self.fan_out_worker = None
+        self.cancel_action.setVisible(False)
+        self.execute_action.setEnabled(True)
+        self._show_error_status("Failed to execute on all databases: " + error)
+
+    def execute_script(self, sql: str):
+        """Run a multi statement script, one result tab per result set"""
+        self._clear_script_tabs()
+        self.query_result_viewer.clear_results()
+
+        try:
+            data = self.current_db_manager.execute_script(
+                sql,
+                use_transaction=self.transaction_action.isChecked(),
+                stop_on_error=self.stop_on_error_action.isChecked(),
+                max_rows=self.row_limit_spin.value()
+            )
+            self._show_script_results(data, sql)
+
+        except Exception as e:
+            self._show_error_status("Failed to execute script: " + str(e))
+            self.export_action.setEnabled(False)
+
+    def execute_large_file(self):
+        """Run the large file as a streamed script on the thread pool"""
+        if not self.current_db_manager:
+            self._show_error_status("Select a database to execute the file against")
+            return
+
+        self._clear_script_tabs()
+        self.query_result_viewer.clear_results()
+        self.execute_action.setEnabled(False)
+        self.cancel_action.setToolTip("Stop the running file after the current statement")
+        self.cancel_action.setVisible(True)
+        self._show_okay_status(f"Executing {self.large_file_path}...")
+
+        path = self.large_file_path
+        db_manager = self.current_db_manager
+        self.script_cancelled = False
+        self.script_worker = Worker(
+            db_manager.execute_script_file,
+            path,
+            use_transaction=self.transaction_action.isChecked(),
+            stop_on_error=self.stop_on_error_action.isChecked(),
+            max_rows=self.row_limit_spin.value(),
+            report_progress=True
+        )
+        # Worker.cancel drops the result, the statements that ran are still reported
+        self.script_worker.is_cancelled = lambda: self.script_cancelled
+        self.script_worker.signals.progress.connect(
+            lambda progress: self._show_okay_status(
+                f"Executing {path}: {progress[0] / max(progress[1], 1):.0%}"
+            )
+        )
+        self.script_worker.signals.finished.connect(lambda data: self._on_large_file_executed(data, path, db_manager))
+        self.script_worker.signals.error.connect(self._on_large_file_error)
+        QThreadPool.globalInstance().start(self.script_worker)
+
+    def cancel_large_file(self):
+        """Stop the streamed script between statements, or a run on all databases between batches"""
+        self.script_cancelled = True
+
+    def _on_large_file_executed(self, data: Dict[str, Any], path: str, db_manager: DatabaseManager):
+        self.script_worker = None
+        self.cancel_action.setVisible(False)
+        self.execute_action.setEnabled(True)
+        # the file isn't scanned for DDL, dumps usually create tables. The
+        # database it ran on may no longer be selected, or even open
+        self.refresh_completions(db_manager.db_path)
+        self._show_script_results(data, f"-- large file: {path}", db_manager.db_name)
+
+    def _on_large_file_error(self, error: str):
+        self.script_worker = None
+        self.cancel_action.setVisible(False)
+        self.execute_action.setEnabled(True)
+        self._show_error_status("Failed to execute file: " + error)
+
+    def _show_script_results(self, data: Dict[str, Any], sql: str, database: Optional[str] = None):
+        results = data.get('results', [])
+        result_sets = [result for result in results if result['columns']]
+
+        for idx, result in enumerate(result_sets):
+            if idx == 0:
+                viewer = self.query_result_viewer
+            else:
+                viewer = QueryResultViewer()
+                viewer.set_spill_bytes(self.query_result_viewer.spill_bytes)
+                self.results_tabs.addTab(viewer, f"Result {idx + 1}")
+            viewer.display_results(result)
+            self.results_tabs.setTabToolTip(self.results_tabs.indexOf(viewer), result['statement'])
+
+        self.results_tabs.addTab(self._create_messages_table(results), "Messages")
+        self.results_tabs.setCurrentIndex(0 if result_sets else self.results_tabs.count() - 1)
+        self.export_action.setEnabled(any(result['rows'] for result in result_sets))
+
+        execution_time = data.get('execution_time', 0)
+        rows_affected = data.get('rows_affected', 0)
+        timings = {
+            'execute': data.get('execute_time', 0) * 1000,
+            'fetch': data.get('fetch_time', 0) * 1000,
+            'total': execution_time * 1000,
+        }
+        self._add_history(
+            sql, rows_affected, execution_time, data.get('execution_timestamp', 0), timings, database=database
+        )
+
+        summary = (
+            f"{data.get('executed', len(results))} of {data.get('statement_count', 0)} statements executed "
+            f"in {execution_time:.3f} seconds. {rows_affected} rows affected."
+        )
+        if data.get('omitted_results'):
+            summary += f" {data['omitted_results']} statement results not listed."
+
+        if data.get('failed'):
+            message = f"{data['failed']} statements failed. {summary}"
+            if data.get('rolled_back'):
+                message += " Transaction rolled back."
+            self._show_error_status(message)
+        elif data.get('cancelled'):
+            message = f"Script cancelled. {summary}"
+            if data.get('rolled_back'):
+                message += " Transaction rolled back."
+            self._show_error_status(message)
+        else:
+            self._show_okay_status(f"Script executed successfully. {summary}")
+
+    def explain_query(self):
+        if not self.current_db_manager:
+            self._show_error_status("Select a database to explain the query against")
+            return
+
+        if self.sql_input.textCursor().hasSelection():
+            sql = self.sql_input.textCursor().selectedText()
+        else:
+            sql = self.sql_input.toPlainText()
+
+        statements = split_statements(sql.replace('\u2029', '\n'))
+        if len(statements) != 1:
+            self._show_error_status("Select a single statement to explain")
+            return
+
+        dialog = QueryPlanDialog(self.current_db_manager, statements[0], self)
+        dialog.explain()
+        dialog.exec()
+
     def save_sql(self):
         file_name, _ = QFileDialog.getSaveFileName(self, 'Save Query', "", "SQL files (*.sql);;All Files (*.*)")
         if file_name:
-            f = open(file_name, 'w')
             text = self.sql_input.toPlainText().strip()
-            f.write(text)
-            f.close()
-            QMessageBox.information(self, f'SQL saved', f'SQL saved to {file_name}')
+            self.save_action.setEnabled(False)
+            self._show_okay_status(f"Saving to {file_name}...")
+
+            # large scripts take a while to write, keep the editor usable
+            self.save_worker = Worker(write_script, file_name, text)
+            self.save_worker.signals.finished.connect(lambda _: self._on_saved(file_name))
+            self.save_worker.signals.error.connect(self._on_save_error)
+            QThreadPool.globalInstance().start(self.save_worker)
+
+    def _on_saved(self, file_name: str):
+        self.save_worker = None
+        self.on_query_text_changed()
+        self._show_okay_status(f"SQL saved to {file_name}")
+
+    def _on_save_error(self, error: str):
+        self.save_worker = None
+        self.on_query_text_changed()
+        self._show_error_status("Failed to save SQL: " + error)
 
     def load_sql(self):
         file_name, _ = QFileDialog.getOpenFileName(self, "Open SQL File", "", f"SQL files (*.sql);;All Files (*.*)")
-        if file_name:
-            f = open(file_name, 'r')
-            text = f.read()
-            f.close()
-            self.sql_input.setPlainText(text)
-            self._show_okay_status(f"Query loaded from {file_name}")
+        if not file_name:
+            return
+
+        size = os.path.getsize(file_name)
+        if size > LARGE_FILE_BYTES:
+            answer = QMessageBox.question(
+                self,
+                "Large file",
+                f"{os.path.basename(file_name)} is {size / 1024 / 1024:.1f} MB. Open it in large file mode?\n\n"
+                f"Large file mode shows the start of the file read-only and executes the whole file "
+                f"as a streamed script without loading it into the editor.",
+                QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No | QMessageBox.StandardButton.Cancel
+            )
+            if answer == QMessageBox.StandardButton.Cancel:
+                return
+            if answer == QMessageBox.StandardButton.Yes:
+                self.open_large_file(file_name)
+                return
+
+        self.load_file(file_name)
+
+    def load_file(self, file_name: str):
+        """
+        Load a file into the editor. The file is read on the thread pool and
+        inserted a chunk per event loop iteration, highlighting only follows
+        the visible lines
+        """
+        self.close_large_file()
+        self._cancel_load()
+
+        self.sql_input.setUndoRedoEnabled(False)
+        self.sql_input.setReadOnly(True)
+        self.sql_input.clear()
+        self.load_done = False
+        self._show_okay_status(f"Loading {file_name}...")
+
+        worker = Worker(self._read_file, file_name, report_progress=True)
+        # chunks, results and errors already in flight from a cancelled load are dropped
+        worker.signals.progress.connect(
+            lambda progress: self._on_chunk_read(progress) if worker is self.load_worker else None
+        )
+        worker.signals.finished.connect(
+            lambda _: self._on_file_read(file_name) if worker is self.load_worker else None
+        )
+        worker.signals.error.connect(
+            lambda error: self._on_load_error(error) if worker is self.load_worker else None
+        )
+        self.load_worker = worker
+        QThreadPool.globalInstance().start(worker)
+
+    def open_large_file(self, file_name: str):
+        """Show the start of a file read-only, Execute streams the whole file"""
+        self._cancel_load()
+
+        with open(file_name, 'r', encoding='utf-8', errors='replace') as f:
+            preview = f.read(LARGE_FILE_PREVIEW)
+
+        self.large_file_path = file_name
+        self.sql_input.setPlainText(preview)
+        self.sql_input.setReadOnly(True)
+        self.close_file_action.setVisible(True)
+        self.on_query_text_changed()
+
+        size = os.path.getsize(file_name)
+        self._show_okay_status(
+            f"Large file mode: {file_name} ({size / 1024 / 1024:.1f} MB). Showing the first "
+            f"{LARGE_FILE_PREVIEW // 1024} KB read-only, Execute runs the whole file as a streamed script."
+        )
+
+    def close_large_file(self):
+        """Leave large file mode and clear the editor"""
+        if not self.large_file_path:
+            return
+
+        self.cancel_large_file()
+        self.large_file_path = None
+        self.close_file_action.setVisible(False)
+        self.sql_input.setReadOnly(False)
+        self.sql_input.clear()
+        self._show_okay_status("Ready")
+
+    @staticmethod
+    def _read_file(file_name: str, progress_callback, is_cancelled) -> bool:
+        position = (0, 0)
+
+        def on_read(progress):
+            nonlocal position
+            position = progress
+
+        for chunk in read_chunks(file_name, LOAD_CHUNK_SIZE, on_read):
+            if is_cancelled():
+                return False
+            progress_callback((chunk, *position))
+
+        return True
+
+    def _on_chunk_read(self, progress):
+        # chunks queue up on the GUI side and go in one per iteration, so
+        # painting and input are handled between them
+        self.load_queue.append(progress)
+        self.load_timer.start()
+
+    def _insert_next_chunk(self):
+        if self.load_queue:
+            chunk, read, total = self.load_queue.popleft()
+            cursor = QTextCursor(self.sql_input.document())
+            cursor.movePosition(QTextCursor.MoveOperation.End)
+            cursor.insertText(chunk)
+            self._show_okay_status(f"Loading: {read / max(total, 1):.0%}")
+
+        if self.load_queue:
+            self.load_timer.start()
+        elif self.load_done:
+            self._finish_load()
+
+    def _on_file_read(self, file_name: str):
+        self.load_worker = None
+        self.load_done = True
+        self.loaded_file_name = file_name
+        if not self.load_queue:
+            self._finish_load()
+
+    def _finish_load(self):
+        self.load_done = False
+        self.sql_input.setReadOnly(False)
+        self.sql_input.setUndoRedoEnabled(True)
+        self.sql_input.moveCursor(QTextCursor.MoveOperation.Start)
+        self._show_okay_status(f"Query loaded from {self.loaded_file_name}")
+
+    def _on_load_error(self, error: str):
+        self.load_worker = None
+        self.load_queue.clear()
+        self.sql_input.setReadOnly(False)
+        self.sql_input.setUndoRedoEnabled(True)
+        self._show_error_status("Failed to load SQL: " + error)
+
+    def _cancel_load(self):
+        if self.load_worker:
+            self.load_worker.cancel()
+            self.load_worker = None
+        self.load_queue.clear()
+        self.load_timer.stop()
+        self.load_done = False
+        self.sql_input.setReadOnly(False)
+        self.sql_input.setUndoRedoEnabled(True)
 
     def on_column_right_click(self, position: QPoint):
         index = self.history_table.indexAt(position)
@@ -219,10 +722,12 @@ class QueryEditor(QWidget):
                 self._show_error_status("Failed to clear history: " + str(e))
 
     def on_query_text_changed(self):
-        text = self.sql_input.toPlainText().strip()
+        has_text = not self.sql_input.document().isEmpty()
         # self.format_action.setEnabled(len(text) > 0)
-        self.save_action.setEnabled(len(text) > 0)
-        self.execute_action.setEnabled(len(text) > 0)
+        # large file mode only shows a preview, saving it would cut the file
+        self.save_action.setEnabled(has_text and not self.large_file_path and not self.save_worker)
+        self.execute_action.setEnabled(has_text and not self.script_worker)
+        self.explain_action.setEnabled(has_text and not self.large_file_path)
 
     # There is some issues with sqlparse with regards to
     # create statements. For now i will disable the
@@ -246,16 +751,21 @@ class QueryEditor(QWidget):
     #     except Exception as e:
     #         self._show_error_status("Failed to format query: " + str(e))
 
+    def on_editor_update(self, *_):
+        viewport = self.sql_input.viewport()
+        last_visible = self.sql_input.cursorForPosition(QPoint(0, viewport.height() - 1)).blockNumber()
+        self.highlighter.highlight_until(last_visible)
+
     def export_data_to_csv(self):
+        viewer = self.results_tabs.currentWidget()
+        if not isinstance(viewer, QueryResultViewer):
+            viewer = self.query_result_viewer
+
         file_name, _ = QFileDialog.getSaveFileName(self, 'Save Results', "", "CSV (*.csv);;All Files (*.*)")
         if file_name:
-            with open(file_name, 'w') as f:
-                writer = csv.writer(f)
-                columns = self.query_result_viewer.all_columns
-                rows = self.query_result_viewer.all_rows
-                writer.writerow(columns)
-                writer.writerows(rows)
-                f.close()
+            with open(file_name, 'w', newline='') as f:
+                # spilled results are read back a block at a time
+                write_csv(((viewer.all_columns, rows) for rows in viewer.all_rows.iter_batches()), f)
 
             QMessageBox.information(self, f'Query results saved', f'Query results saved to {file_name}')
 
@@ -276,6 +786,30 @@ class QueryEditor(QWidget):
         self.execute_action.setToolTip(f"Execute ({execute_key_sequence.toString()})")
         actions.append(self.execute_action)
 
+        self.explain_action = QAction("Explain", self)
+        self.explain_action.setEnabled(False)
+        self.explain_action.triggered.connect(self.explain_query)
+        self.explain_action.setShortcut(QKeySequence("Ctrl+E"))
+        self.explain_action.setToolTip("Explain query plan (Ctrl+E)")
+        actions.append(self.explain_action)
+
+        self.transaction_action = QAction("Transaction", self)
+        self.transaction_action.setCheckable(True)
+        self.transaction_action.setToolTip("Run scripts inside a single transaction")
+        actions.append(self.transaction_action)
+
+        self.stop_on_error_action = QAction("Stop on error", self)
+        self.stop_on_error_action.setCheckable(True)
+        self.stop_on_error_action.setChecked(True)
+        self.stop_on_error_action.setToolTip("Stop a script at the first failing statement")
+        actions.append(self.stop_on_error_action)
+
+        self.cache_action = QAction("Cache", self)
+        self.cache_action.setCheckable(True)
+        self.cache_action.setToolTip("Reuse results of repeated SELECT queries while the database is unchanged")
+        self.cache_action.toggled.connect(self.toggle_result_cache)
+        actions.append(self.cache_action)
+
         self.export_action = QAction("Export", self)
         self.export_action.setEnabled(False)
         self.export_action.triggered.connect(self.export_data_to_csv)
@@ -300,8 +834,47 @@ class QueryEditor(QWidget):
         load_action.triggered.connect(self.load_sql)
         actions.append(load_action)
 
+        self.close_file_action = QAction("Close File", self)
+        self.close_file_action.setToolTip("Leave large file mode")
+        self.close_file_action.triggered.connect(self.close_large_file)
+        self.close_file_action.setVisible(False)
+        actions.append(self.close_file_action)
+
+        self.fan_out_action = QAction("All databases", self)
+        self.fan_out_action.setCheckable(True)
+        self.fan_out_action.setToolTip("Run the statement on every open database, rows are tagged with their database")
+        actions.append(self.fan_out_action)
+
+        self.cancel_action = QAction("Cancel", self)
+        self.cancel_action.setToolTip("Stop the running file after the current statement")
+        self.cancel_action.triggered.connect(self.cancel_large_file)
+        self.cancel_action.setVisible(False)
+        actions.append(self.cancel_action)
+
         toolbar.addActions(actions)
 
+        toolbar.addWidget(QLabel(" Row limit: "))
+        self.row_limit_spin = QSpinBox()
+        self.row_limit_spin.setRange(0, 10_000_000)
+        self.row_limit_spin.setSingleStep(1000)
+        self.row_limit_spin.setSpecialValueText("All")
+        self.row_limit_spin.setValue(DEFAULT_ROW_LIMIT)
+        self.row_limit_spin.setToolTip("Rows fetched per query, the rest of a SELECT can be fetched from the results")
+        toolbar.addWidget(self.row_limit_spin)
+
+        toolbar.addWidget(QLabel(" Memory limit: "))
+        self.spill_spin = QSpinBox()
+        self.spill_spin.setRange(0, 1024 * 1024)
+        self.spill_spin.setSingleStep(64)
+        self.spill_spin.setSuffix(" MB")
+        self.spill_spin.setSpecialValueText("None")
+        self.spill_spin.setValue(DEFAULT_SPILL_MB)
+        self.spill_spin.setToolTip("Results larger than this are kept in a temporary file, paging and sorting read from it")
+        self.spill_spin.valueChanged.connect(
+            lambda value: self.query_result_viewer.set_spill_bytes(value * 1024 * 1024)
+        )
+        toolbar.addWidget(self.spill_spin)
+
         self.main_layout.addWidget(toolbar)
 
     def _create_editor(self):
@@ -310,11 +883,20 @@ class QueryEditor(QWidget):
         layout.setContentsMargins(0, 0, 0, 0)
         layout.setSpacing(0)
 
-        self.sql_input = QPlainTextEdit()
+        self.sql_input = SQLTextEdit()
+        self.sql_input.completion_provider = self.complete
 
-        SQLHighlighter(self.sql_input.document())
+        # only lines scrolled into view are highlighted, long scripts load fast
+        self.highlighter = SQLHighlighter(self.sql_input.document())
+        self.highlighter.lazy = True
+        self.sql_input.updateRequest.connect(self.on_editor_update)
         self.sql_input.textChanged.connect(self.on_query_text_changed)
 
+        self.load_timer = QTimer(self)
+        self.load_timer.setSingleShot(True)
+        self.load_timer.setInterval(0)
+        self.load_timer.timeout.connect(self._insert_next_chunk)
+
         sql_font = QFont()
         sql_font.setFamily("Consolas")
         sql_font.setPointSize(15)
@@ -329,7 +911,8 @@ class QueryEditor(QWidget):
         self.v_splitter = QSplitter(Qt.Orientation.Vertical)
         self.v_splitter.setChildrenCollapsible(False)
         self.v_splitter.addWidget(self.editor)
-        self.v_splitter.addWidget(self.query_result_viewer)
+        self.results_tabs.addTab(self.query_result_viewer, "Result")
+        self.v_splitter.addWidget(self.results_tabs)
         self.tab_widget.addTab(self.v_splitter, "Query Editor")
 
 
@@ -356,6 +939,87 @@ class QueryEditor(QWidget):
         layout.addWidget(self.history_table)
         self.tab_widget.addTab(history_widget, "History")
 
+    def _create_messages_table(self, results) -> QTableWidget:
+        table = QTableWidget()
+        table.setColumnCount(6)
+        table.setRowCount(len(results))
+        table.setHorizontalHeaderLabels(["Statement", "Status", "Rows", "Execute (ms)", "Fetch (ms)", "Message"])
+        table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        table.setSelectionBehavior(QTableWidget.SelectionBehavior.SelectRows)
+        table.setAlternatingRowColors(True)
+
+        for row_idx, result in enumerate(results):
+            statement_item = QTableWidgetItem(result['statement'])
+            statement_item.setToolTip(result['statement'])
+            table.setItem(row_idx, 0, statement_item)
+            table.setItem(row_idx, 1, QTableWidgetItem("Error" if result['error'] else "OK"))
+            rows = result['total_rows'] if result['columns'] else result['rows_affected']
+            table.setItem(row_idx, 2, QTableWidgetItem(str(rows)))
+            table.setItem(row_idx, 3, QTableWidgetItem(f"{result['execute_time'] * 1000:.3f}"))
+            table.setItem(row_idx, 4, QTableWidgetItem(f"{result['fetch_time'] * 1000:.3f}"))
+            table.setItem(row_idx, 5, QTableWidgetItem(result['error'] or ""))
+
+        table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.ResizeToContents)
+        table.horizontalHeader().setStretchLastSection(True)
+
+        return table
+
+    def _create_databases_table(self, results) -> QTableWidget:
+        table = QTableWidget()
+        table.setColumnCount(5)
+        table.setRowCount(len(results))
+        table.setHorizontalHeaderLabels(["Database", "Status", "Rows", "Time (ms)", "Message"])
+        table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        table.setSelectionBehavior(QTableWidget.SelectionBehavior.SelectRows)
+        table.setAlternatingRowColors(True)
+
+        for row_idx, result in enumerate(results):
+            database_item = QTableWidgetItem(result['database'])
+            database_item.setToolTip(result['path'])
+            table.setItem(row_idx, 0, database_item)
+            status = "Error" if result['error'] else "Cancelled" if result['cancelled'] else "OK"
+            table.setItem(row_idx, 1, QTableWidgetItem(status))
+            rows = result['rows'] or result['rows_affected']
+            table.setItem(row_idx, 2, QTableWidgetItem(f"{rows}+" if result['truncated'] else str(rows)))
+            table.setItem(row_idx, 3, QTableWidgetItem(f"{result['elapsed'] * 1000:.3f}"))
+            table.setItem(row_idx, 4, QTableWidgetItem(result['error'] or ""))
+
+        table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.ResizeToContents)
+        table.horizontalHeader().setStretchLastSection(True)
+
+        return table
+
+    def _clear_script_tabs(self):
+        """Remove result and message tabs left over from the last script"""
+        while self.results_tabs.count() > 1:
+            widget = self.results_tabs.widget(1)
+            self.results_tabs.removeTab(1)
+            widget.deleteLater()
+
+        self.results_tabs.setTabToolTip(0, "")
+        self.results_tabs.setCurrentIndex(0)
+
+    def _add_history(
+            self,
+            sql: str,
+            rows_affected: int,
+            execution_time: float,
+            execution_timestamp: float,
+            timings: Dict[str, float],
+            database: Optional[str] = None
+    ):
+        query_viewer_db(
+            "INSERT INTO history (database, query, row_count, execution_time, execution_timestamp, timings) VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    database or self.current_db_manager.db_name,
+                    sql.strip(),
+                    rows_affected,
+                    execution_time,
+                    datetime.fromtimestamp(execution_timestamp).strftime('%Y-%m-%d %H:%M:%S'),
+                    json.dumps(timings)
+                )
+        )
+
     def _show_okay_status(self, message):
         self.status_label.setStyleSheet(self.ok_style)
         self.status_label.setText(message)
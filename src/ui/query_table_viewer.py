@@ -1,13 +1,23 @@
 from PySide6.QtWidgets import (
     QTableView, QHeaderView, QVBoxLayout,
-    QWidget, QMenu
+    QWidget, QMenu, QHBoxLayout, QLabel, QPushButton, QSpinBox, QCheckBox
 )
 from .pagination_widget import PaginationWidget
+from .custom import ProfiledTableView
+from .workers import Worker
 from ..models import DatabaseTableModel
-from ..utils import copy_to_clipboard
-from typing import Dict, Any, List
+from ..core.result_cursor import ResultCursor
+from ..core.row_store import RowStore, DEFAULT_SPILL_BYTES, numeric_key, text_key, sorted_by_column
+from ..utils import copy_to_clipboard, format_bytes
+from typing import Dict, Any, List, Optional
 from PySide6.QtGui import QAction
-from PySide6.QtCore import Qt
+from PySide6.QtCore import Qt, QTimer, QThreadPool
+
+# rows per "Fetch more"
+DEFAULT_FETCH_SIZE = 5000
+
+# how often an open cursor is checked for expiry
+CURSOR_CHECK_MS = 10_000
 
 
 class QueryResultViewer(QWidget):
@@ -16,23 +26,34 @@ class QueryResultViewer(QWidget):
     def __init__(self):
         super().__init__()
 
-        # Store all data in memory for client-side pagination
+        # Store all data for client-side pagination, past spill_bytes on disk
         self.all_columns: List[str] = []
-        self.all_rows: List[tuple] = []
+        self.spill_bytes = DEFAULT_SPILL_BYTES
+        self.all_rows = RowStore(spill_bytes=self.spill_bytes)
+        self.sort_worker: Optional[Worker] = None
 
         # Track current sort state
         self.current_sort_column: int = -1
         self.current_sort_order: Qt.SortOrder = Qt.SortOrder.DescendingOrder
 
+        # rest of a truncated result, fetched on demand
+        self.cursor: Optional[ResultCursor] = None
+        self.fetch_worker: Optional[Worker] = None
+
         self.setup_ui()
 
+        self.cursor_timer = QTimer(self)
+        self.cursor_timer.setInterval(CURSOR_CHECK_MS)
+        self.cursor_timer.timeout.connect(self.check_cursor)
+
     def setup_ui(self):
         """Create UI with table and pagination"""
         layout = QVBoxLayout(self)
         layout.setContentsMargins(0, 0, 0, 0)
         layout.setSpacing(0)
 
-        self.table_view = QTableView()
+        self.table_view = ProfiledTableView()
+        self.table_view.setObjectName("query_results")
         self.data_model = DatabaseTableModel()
         self.table_view.setModel(self.data_model)
 
@@ -45,6 +66,48 @@ class QueryResultViewer(QWidget):
         self.pagination.page_size_changed.connect(self.on_page_size_changed)
         layout.addWidget(self.pagination)
 
+        self._create_fetch_bar()
+        layout.addWidget(self.fetch_bar)
+
+    def _create_fetch_bar(self):
+        """Memory and disk use of the results and controls for fetching the rest of a truncated result"""
+        self.fetch_bar = QWidget()
+        layout = QHBoxLayout(self.fetch_bar)
+        layout.setContentsMargins(4, 0, 4, 4)
+
+        self.fetch_label = QLabel()
+        layout.addWidget(self.fetch_label)
+        layout.addStretch()
+
+        fetch_size_label = QLabel("Fetch size:")
+        layout.addWidget(fetch_size_label)
+        self.fetch_size_spin = QSpinBox()
+        self.fetch_size_spin.setRange(100, 1_000_000)
+        self.fetch_size_spin.setSingleStep(1000)
+        self.fetch_size_spin.setValue(DEFAULT_FETCH_SIZE)
+        self.fetch_size_spin.setToolTip("Rows added per fetch")
+        layout.addWidget(self.fetch_size_spin)
+
+        self.auto_fetch_check = QCheckBox("On scroll")
+        self.auto_fetch_check.setChecked(True)
+        self.auto_fetch_check.setToolTip("Fetch more when scrolling to the bottom of the last page")
+        layout.addWidget(self.auto_fetch_check)
+
+        self.fetch_more_btn = QPushButton("Fetch more")
+        self.fetch_more_btn.clicked.connect(lambda: self.fetch_more())
+        layout.addWidget(self.fetch_more_btn)
+
+        self.fetch_all_btn = QPushButton("Fetch all")
+        self.fetch_all_btn.setToolTip("Fetch every remaining row, past the memory limit they go to a temporary file")
+        self.fetch_all_btn.clicked.connect(lambda: self.fetch_more(0))
+        layout.addWidget(self.fetch_all_btn)
+
+        self.fetch_controls = [
+            fetch_size_label, self.fetch_size_spin, self.auto_fetch_check, self.fetch_more_btn, self.fetch_all_btn
+        ]
+
+        self.fetch_bar.setVisible(False)
+
     def setup_table_view(self):
         """Initialize table settings"""
         self.table_view.setAlternatingRowColors(True)
@@ -64,6 +127,8 @@ class QueryResultViewer(QWidget):
         v_header = self.table_view.verticalHeader()
         v_header.setVisible(True)
 
+        self.table_view.verticalScrollBar().valueChanged.connect(self.on_scrolled)
+
     def on_context_menu(self, pos):
         idx = self.table_view.indexAt(pos)
 
@@ -83,8 +148,9 @@ class QueryResultViewer(QWidget):
         Display query results with client-side pagination
         """
         self.all_columns = result.get('columns', [])
-        self.all_rows = result.get('rows', [])
+        self._set_rows(RowStore(result.get('rows', []), self.spill_bytes))
         rows_length = len(self.all_rows)
+        self.set_cursor(result.get('cursor'))
 
         self.current_sort_column = -1
         self.current_sort_order = Qt.SortOrder.AscendingOrder
@@ -95,6 +161,164 @@ class QueryResultViewer(QWidget):
         self.pagination.set_total_rows(rows_length, rows_length)
         self._display_page(page=1)
 
+    def append_results(self, columns: List[str], rows: List[tuple]):
+        """
+        Add rows to the results while they stream in, the current page is
+        only redrawn while it still has room
+        """
+        if not self.all_columns:
+            self.all_columns = columns
+            self.current_sort_column = -1
+            self.current_sort_order = Qt.SortOrder.AscendingOrder
+
+        shown = len(self.all_rows)
+        self.all_rows.extend(rows)
+        self.pagination.set_total_rows(len(self.all_rows), len(self.all_rows), keep_page=True)
+
+        page = self.pagination.current_page
+        if shown < page * self.pagination.page_size:
+            self._display_page(page)
+        if self.all_rows.spilled:
+            self.update_fetch_bar()
+
+    def set_spill_bytes(self, spill_bytes: int):
+        """Memory budget of the results, past it rows go to a temporary file"""
+        self.spill_bytes = spill_bytes
+        self.all_rows.spill_bytes = spill_bytes
+
+    def _set_rows(self, rows: RowStore):
+        """Replace the results, the previous spill file is deleted"""
+        if self.sort_worker is not None:
+            self.sort_worker.cancel()
+            self.sort_worker = None
+        if rows is not self.all_rows:
+            self.all_rows.close()
+        self.all_rows = rows
+
+    def set_cursor(self, cursor: Optional[ResultCursor]):
+        """Take over the cursor of a truncated result, the previous one is closed"""
+        if self.cursor is not None and self.cursor is not cursor:
+            self.cursor.close()
+        self.cursor = cursor
+        if self.fetch_worker is not None:
+            self.fetch_worker.cancel()
+            self.fetch_worker = None
+
+        if cursor is not None:
+            self.cursor_timer.start()
+        else:
+            self.cursor_timer.stop()
+        self.update_fetch_bar()
+
+    @property
+    def has_more(self) -> bool:
+        return self.cursor is not None and not self.cursor.closed
+
+    def fetch_more(self, max_rows: Optional[int] = None):
+        """
+        Append the next rows of the result from the cursor on the thread pool
+        :param max_rows: Rows to fetch, the fetch size by default and 0 for all
+        """
+        if not self.has_more or self.fetch_worker is not None or self.sort_worker is not None:
+            return
+
+        fetch_size = self.fetch_size_spin.value()
+        # batches of the fetch size, a fetch all can go to disk as it arrives
+        worker = Worker(
+            self.cursor.fetch_batches,
+            fetch_size if max_rows is None else max_rows,
+            fetch_size,
+            report_progress=True
+        )
+        worker.signals.progress.connect(lambda rows: self.on_rows_fetched(worker, rows))
+        worker.signals.finished.connect(lambda _: self.on_fetched(worker))
+        worker.signals.error.connect(lambda error: self.on_fetch_error(worker, error))
+        self.fetch_worker = worker
+        self.update_fetch_bar()
+        QThreadPool.globalInstance().start(worker)
+
+    def on_rows_fetched(self, worker: Worker, rows: List[tuple]):
+        if worker is not self.fetch_worker:
+            return
+
+        if self.current_sort_column >= 0:
+            # sorted once the fetch is done
+            self.all_rows.extend(rows)
+            self.pagination.set_total_rows(len(self.all_rows), len(self.all_rows), keep_page=True)
+        else:
+            self.append_results(self.all_columns, rows)
+        self.update_fetch_bar()
+
+    def on_fetched(self, worker: Worker):
+        if worker is not self.fetch_worker:
+            return
+
+        self.fetch_worker = None
+        if self.current_sort_column >= 0:
+            # fetched rows are in query order, keep the sorted view sorted
+            self._sort_all_data()
+            self._display_page(self.pagination.current_page)
+        self.update_fetch_bar()
+
+    def on_fetch_error(self, worker: Worker, error: str):
+        if worker is not self.fetch_worker:
+            return
+
+        self.fetch_worker = None
+        self.update_fetch_bar()
+        self.fetch_label.setText(f"Fetch failed: {error}")
+
+    def on_scrolled(self, value: int):
+        """Fetch more at the bottom of the last page"""
+        if (
+                self.auto_fetch_check.isChecked()
+                and value == self.table_view.verticalScrollBar().maximum()
+                and self.pagination.current_page == self.pagination.total_pages
+        ):
+            self.fetch_more()
+
+    def check_cursor(self):
+        """Close a cursor nobody fetched from for a while, its unread rows are held in memory"""
+        if self.cursor is not None and not self.cursor.closed and self.fetch_worker is None and self.cursor.expired():
+            self.cursor.close()
+            self.cursor_timer.stop()
+            self.update_fetch_bar()
+
+    def update_fetch_bar(self):
+        """Rows loaded, their estimated memory and disk use and whether there is more"""
+        self.fetch_bar.setVisible(self.cursor is not None or self.all_rows.spilled)
+        for widget in self.fetch_controls:
+            widget.setVisible(self.cursor is not None)
+
+        loaded = len(self.all_rows)
+        memory = f"~{format_bytes(self.all_rows.memory_bytes)} in memory"
+        if self.all_rows.spilled:
+            memory += f", {format_bytes(self.all_rows.disk_bytes)} on disk"
+
+        if self.cursor is None:
+            text = f"{loaded:,} rows ({memory})"
+        elif self.cursor.closed and self.cursor.remaining_rows:
+            idle_minutes = self.cursor.max_idle / 60
+            text = (
+                f"{loaded:,} rows loaded ({memory}). Cursor closed after {idle_minutes:g} minutes unused, "
+                f"execute the query again for the rest"
+            )
+        elif self.cursor.closed:
+            text = f"All {loaded:,} rows loaded ({memory})"
+        elif self.cursor.total_rows is not None:
+            text = f"{loaded:,} of {self.cursor.total_rows:,} rows loaded ({memory})"
+        else:
+            text = f"{loaded:,} rows loaded ({memory}), more available"
+        if self.fetch_worker is not None:
+            text += ". Fetching..."
+        if self.sort_worker is not None:
+            text += ". Sorting on disk..."
+        self.fetch_label.setText(text)
+
+        can_fetch = self.has_more and self.fetch_worker is None and self.sort_worker is None
+        self.fetch_more_btn.setEnabled(can_fetch)
+        self.fetch_all_btn.setEnabled(can_fetch)
+
     def on_sort_changed(self, idx: int, sorting: Qt.SortOrder):
         self.current_sort_column = idx
         self.current_sort_order = sorting
@@ -104,22 +328,62 @@ class QueryResultViewer(QWidget):
         self._display_page(current_page)
 
     def _sort_all_data(self):
-        """Sort all data in memory using column and order"""
+        """Sort all data using column and order, spilled results on the thread pool"""
         if self.current_sort_column < 0 or not self.all_rows:
             return
 
         reverse = self.current_sort_order == Qt.SortOrder.AscendingOrder
 
+        if self.all_rows.spilled:
+            self._sort_on_disk(self.current_sort_column, reverse)
+            return
+
         try:
-            self.all_rows.sort(
-                key = lambda row: float(row[self.current_sort_column]) if row[self.current_sort_column] is not None else float('-inf'),
-                reverse = reverse
-            )
+            self.all_rows.sort(key=numeric_key(self.current_sort_column), reverse=reverse)
         except (ValueError, TypeError):
-            self.all_rows.sort(
-                key=lambda row: str(row[self.current_sort_column]) if row[self.current_sort_column] is not None else "",
-                reverse=reverse
+            self.all_rows.sort(key=text_key(self.current_sort_column), reverse=reverse)
+
+    def _sort_on_disk(self, column: int, reverse: bool):
+        """External sort into a new store, pages show the old order until it's done"""
+        if self.sort_worker is not None:
+            self.sort_worker.cancel()
+
+        rows = self.all_rows
+        worker = Worker(sorted_by_column, rows, column, reverse, report_progress=True)
+        worker.signals.progress.connect(
+            lambda done: worker is self.sort_worker and self.fetch_label.setText(
+                f"Sorting {len(rows):,} rows on disk: {done:.0%}"
             )
+        )
+        worker.signals.finished.connect(lambda result: self.on_sorted(worker, rows, result))
+        worker.signals.error.connect(lambda error: self.on_sort_error(worker, error))
+        self.sort_worker = worker
+        self.update_fetch_bar()
+        QThreadPool.globalInstance().start(worker)
+
+    def on_sorted(self, worker: Worker, rows: RowStore, result: RowStore):
+        if worker is not self.sort_worker or rows is not self.all_rows:
+            result.close()
+            return
+
+        self.sort_worker = None
+        if len(result) != len(rows):
+            # rows streamed in while sorting
+            result.close()
+            self._sort_all_data()
+            return
+
+        self._set_rows(result)
+        self._display_page(self.pagination.current_page)
+        self.update_fetch_bar()
+
+    def on_sort_error(self, worker: Worker, error: str):
+        if worker is not self.sort_worker:
+            return
+
+        self.sort_worker = None
+        self.update_fetch_bar()
+        self.fetch_label.setText(f"Sort failed: {error}")
 
     def _display_page(self, page: int):
         """Display a specific page of results (client-side pagination)"""
@@ -163,6 +427,11 @@ class QueryResultViewer(QWidget):
 
         self._display_page(page)
 
+        # a last page without a scroll bar can't be scrolled to the bottom
+        scroll_bar = self.table_view.verticalScrollBar()
+        if scroll_bar.maximum() == 0:
+            self.on_scrolled(scroll_bar.value())
+
     def on_page_size_changed(self, page_size: int):
         """Handle page size change - recalculate and show current page"""
         if not self.all_rows:
@@ -180,7 +449,8 @@ class QueryResultViewer(QWidget):
         }
         self.data_model.set_data(empty_data)
         self.all_columns = []
-        self.all_rows = []
+        self._set_rows(RowStore(spill_bytes=self.spill_bytes))
+        self.set_cursor(None)
         self.current_sort_column = -1
         self.current_sort_order = Qt.SortOrder.DescendingOrder
         self.pagination.reset()
\ No newline at end of file
@@ -0,0 +1,48 @@
+from PySide6.QtCore import QObject, QRunnable, Signal
+from typing import Callable
+
+
+class WorkerSignals(QObject):
+    """Signals emitted by a Worker, delivered on the GUI thread"""
+
+    finished = Signal(object)
+    error = Signal(str)
+    progress = Signal(object)
+
+
+class Worker(QRunnable):
+    """
+    Runs a function on the global thread pool. When report_progress is set,
+    the function is passed progress_callback and is_cancelled keyword args
+    """
+
+    def __init__(self, fn: Callable, *args, report_progress: bool = False, **kwargs):
+        super().__init__()
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.report_progress = report_progress
+        self.cancelled = False
+        self.signals = WorkerSignals()
+
+    def cancel(self):
+        """Results of a cancelled worker are dropped"""
+        self.cancelled = True
+
+    def is_cancelled(self) -> bool:
+        return self.cancelled
+
+    def run(self):
+        if self.report_progress:
+            self.kwargs['progress_callback'] = self.signals.progress.emit
+            self.kwargs['is_cancelled'] = self.is_cancelled
+
+        try:
+            result = self.fn(*self.args, **self.kwargs)
+        except Exception as e:
+            if not self.cancelled:
+                self.signals.error.emit(str(e))
+            return
+
+        if not self.cancelled:
+            self.signals.finished.emit(result)
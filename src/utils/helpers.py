@@ -1,10 +1,5 @@
-from PySide6.QtWidgets import QApplication
-from typing import Any, List, Optional
-from platformdirs import user_data_dir
-from ribbitxdb import BatchOperations
-from src import APP_NAME, APP_AUTHOR
+from typing import Any, Optional
 from datetime import datetime
-import ribbitxdb
 
 
 def trim_string(text):
@@ -36,64 +31,36 @@ def get_dummy_data(col_type: str, column: str) -> Any:
     return f'\'{column}\''
     # How to determine boolean?
 
-def copy_to_clipboard(text: str):
-    clipboard = QApplication.clipboard()
-    clipboard.setText(text)
-
-def query_viewer_db(
-        query: Any,
-        params: Optional[tuple] = None,
-        table: Optional[str] = None,
-        key_cols: Optional[List[str]] = None
-): # pragma: no cover
-    try:
-        data_dir = user_data_dir(APP_NAME, APP_AUTHOR, ensure_exists=True)
-        conn = ribbitxdb.connect(data_dir + "/viewer.rbx")
-        # regular query
-        if isinstance(query, str):
-            cursor = conn.cursor()
-            if params:
-                query = cursor.execute(query, params)
-            else:
-                query = cursor.execute(query)
+TIMING_LABELS = {
+    'cache': 'cache lookup',
+    'connect': 'connect',
+    'execute': 'execute',
+    'first_row': 'first row',
+    'fetch': 'fetch',
+    'total': 'total',
+    'model': 'display',
+}
 
-            if query.description:
-                columns = [desc[0] for desc in query.description]
-                rows = query.fetchall()
+def format_timings(timings: Optional[dict]) -> str:
+    """Format a timing breakdown (in ms) as 'connect 1.20 ms | execute ...'"""
+    if not timings:
+        return ""
 
-                conn.commit()
-                cursor.close()
-                conn.close()
-                return {
-                    'columns': columns,
-                    'rows': rows,
-                }
-            else:
-                conn.commit()
-                cursor.close()
-                conn.close()
-                return {
-                    'columns': [],
-                    'rows': [],
-                }
-        # bulk query
-        elif isinstance(query, list):
-            if table and key_cols:
-                batch_ops = BatchOperations(conn)
-                batch_ops.bulk_upsert(table, query, key_cols)
-                conn.close()
-                return
+    return " | ".join(
+        f"{label} {timings[key]:.2f} ms" for key, label in TIMING_LABELS.items() if key in timings
+    )
 
-            # multiple queries
-            cur = conn.cursor()
-            for q in query:
-                cur.execute(q)
+def format_bytes(size: int) -> str:
+    """Format a byte count as '512 KB', '1.2 MB' or '3.4 GB'"""
+    if size < 1024 * 1024:
+        return f"{size / 1024:.0f} KB"
+    if size < 1024 * 1024 * 1024:
+        return f"{size / 1024 / 1024:.1f} MB"
+    return f"{size / 1024 / 1024 / 1024:.1f} GB"
 
-            conn.commit()
-            cur.close()
-            conn.close()
-        else:
-            raise ValueError
-    except Exception as e:
-        raise e
+def copy_to_clipboard(text: str):
+    # imported here so the helpers stay usable without Qt
+    from PySide6.QtWidgets import QApplication
 
+    clipboard = QApplication.clipboard()
+    clipboard.setText(text)
@@ -1,117 +1,177 @@
-from PySide6.QtCore import QRegularExpression
+from ..core.sql_lexer import tokenize_line, KEYWORD, FUNCTION, STRING, NUMBER, COMMENT, STATE_NORMAL
 from PySide6.QtGui import QSyntaxHighlighter, QTextCharFormat, QColor, QFont
+from PySide6.QtCore import QTimer
+from ..core.profiling import profiled
+import time
+
+# time a single change may spend highlighting before the rest is deferred
+PASS_BUDGET_MS = 30
+
+# time each deferred chunk may take, leaves the event loop free between chunks
+CHUNK_BUDGET_MS = 8
+
+# lines past the last visible one highlighted ahead in lazy mode
+LAZY_MARGIN = 200
+
+# block state of lines left for the deferred chunks, differs from every
+# lexer state so QSyntaxHighlighter walks on through them while resuming
+STATE_DEFERRED = -2
 
 
 class SQLHighlighter(QSyntaxHighlighter):
-    """SQL syntax highlighter"""
+    """
+    SQL syntax highlighter. Lines are tokenized in one pass by sql_lexer,
+    multi-line comments and strings are carried between blocks as block
+    state. Large changes (loading a long script, pasting) highlight for
+    PASS_BUDGET_MS and continue from a timer in small chunks so the editor
+    stays responsive. In lazy mode only lines up to the one given to
+    highlight_until (the end of the viewport) are highlighted, the rest
+    waits until it is scrolled into view
+    """
 
     def __init__(self, document):
         super().__init__(document)
-        self.highlighting_rules = []
+        self.formats = {}
 
         keyword_format = QTextCharFormat()
         keyword_format.setForeground(QColor("#00FF94"))
         keyword_format.setFontWeight(QFont.Weight.Bold)
+        self.formats[KEYWORD] = keyword_format
 
-        keywords = [
-            "SELECT", "FROM", "WHERE", "INSERT", "UPDATE", "DELETE",
-            "CREATE", "DROP", "ALTER", "TABLE", "INDEX", "VIEW",
-            "JOIN", "INNER", "LEFT", "RIGHT", "OUTER", "FULL",
-            "ON", "AND", "OR", "NOT", "IN", "EXISTS", "LIKE",
-            "ORDER", "BY", "GROUP", "HAVING", "LIMIT", "OFFSET",
-            "AS", "DISTINCT", "COUNT", "SUM", "AVG", "MAX", "MIN",
-            "UNION", "INTERSECT", "EXCEPT", "CASE", "WHEN", "THEN",
-            "ELSE", "END", "NULL", "IS", "BETWEEN", "ASC", "DESC",
-            "PRIMARY", "KEY", "FOREIGN", "REFERENCES", "UNIQUE",
-            "DEFAULT", "CHECK", "CONSTRAINT", "AUTO_INCREMENT",
-            "AUTOINCREMENT", "INTEGER", "VARCHAR", "TEXT", "REAL",
-            "BLOB", "NUMERIC", "DATE", "CURRENT_TIMESTAMP",
-            "CURRENT_DATE", "CURRENT_TIME", "BOOLEAN", "INTO",
-            "VALUES", "SET", "SHOW", "EXPLAIN", "DESCRIBE",
-            "RELEASE", "SAVEPOINT", "ROLLBACK", "COMMIT", "BEGIN",
-            "PRAGMA", "IF"
-        ]
-
-        for word in keywords:
-            pattern = QRegularExpression(
-                f"\\b{word}\\b",
-                QRegularExpression.PatternOption.CaseInsensitiveOption
-            )
-            self.highlighting_rules.append((pattern, keyword_format))
-
-        self.string_format = QTextCharFormat()
-        self.string_format.setForeground(QColor("#7DD3FC"))
-
-        # String patterns
-        self.string_patterns = [
-            QRegularExpression("'[^']*'"),
-            QRegularExpression('"[^"]*"')
-        ]
+        string_format = QTextCharFormat()
+        string_format.setForeground(QColor("#7DD3FC"))
+        self.formats[STRING] = string_format
 
         number_format = QTextCharFormat()
         number_format.setForeground(QColor("#FFA500"))
-        self.number_pattern = QRegularExpression("\\b[0-9]+(?:\\.[0-9]+)?\\b")
+        self.formats[NUMBER] = number_format
 
         comment_format = QTextCharFormat()
         comment_format.setForeground(QColor("#6B7280"))
         comment_format.setFontItalic(True)
-        self.highlighting_rules.append((
-            QRegularExpression("--[^\n]*"), comment_format
-        ))
+        self.formats[COMMENT] = comment_format
 
         function_format = QTextCharFormat()
         function_format.setForeground(QColor("#FBBF24"))
-        self.highlighting_rules.append((
-            QRegularExpression("\\b[A-Za-z_][A-Za-z0-9_]*(?=\\()"),
-            function_format
-        ))
-
+        self.formats[FUNCTION] = function_format
+
+        # start of the current synchronous pass, None between passes
+        self._pass_start = None
+        self._pass_deferred = False
+        # first block number left for the deferred chunks
+        self._deferred_from = None
+        self._resuming = False
+        self._chunk_first = False
+        self._chunk_deadline = 0
+        self._last_block = -1
+        self.lazy = False
+        self._target = LAZY_MARGIN
+
+        self._resume_timer = QTimer(self)
+        self._resume_timer.setSingleShot(True)
+        self._resume_timer.setInterval(0)
+        self._resume_timer.timeout.connect(self._resume)
+
+        document.contentsChange.connect(self._on_contents_change)
+
+    def is_pending(self) -> bool:
+        """True while some blocks are deferred, in lazy mode they may be waiting to be scrolled into view"""
+        return self._deferred_from is not None
+
+    def highlight_until(self, block_number: int):
+        """
+        Lazy mode: make sure lines up to block_number and a margin after it
+        are highlighted
+        :param block_number: Last visible block
+        """
+        self._target = block_number + LAZY_MARGIN
+        if self._deferred_from is not None and self._deferred_from <= self._target:
+            self._resume_timer.start()
+
+    # runs once per line, too often to keep every call as a span
+    @profiled('SQLHighlighter.highlightBlock', 'highlighter', keep=False)
     def highlightBlock(self, text):
         """Apply syntax highlighting to a block of text"""
-        # Track which positions are inside strings
-        string_ranges = []
-
-        # First pass: Highlight strings and track their positions
-        for pattern in self.string_patterns:
-            iterator = pattern.globalMatch(text)
-            while iterator.hasNext():
-                match = iterator.next()
-                start = match.capturedStart()
-                length = match.capturedLength()
-                self.setFormat(start, length, self.string_format)
-                string_ranges.append((start, start + length))
-
-        # Second pass: Apply other rules, but skip string ranges
-        for pattern, format_style in self.highlighting_rules:
-            iterator = pattern.globalMatch(text)
-            while iterator.hasNext():
-                match = iterator.next()
-                start = match.capturedStart()
-                length = match.capturedLength()
-
-                # Check if this match is inside a string
-                inside_string = any(
-                    s_start <= start < s_end
-                    for s_start, s_end in string_ranges
-                )
-
-                if not inside_string:
-                    self.setFormat(start, length, format_style)
-
-        # Third pass: Highlight numbers (outside strings only)
-        iterator = self.number_pattern.globalMatch(text)
-        while iterator.hasNext():
-            match = iterator.next()
-            start = match.capturedStart()
-            length = match.capturedLength()
-
-            # Check if this number is inside a string
-            inside_string = any(
-                s_start <= start < s_end
-                for s_start, s_end in string_ranges
-            )
-
-            if not inside_string:
-                number_format = QTextCharFormat()
-                number_format.setForeground(QColor("#FFA500"))
-                self.setFormat(start, length, number_format)
\ No newline at end of file
+        if self._resuming:
+            if not self._chunk_first and time.perf_counter_ns() > self._chunk_deadline:
+                # keeping the stored state ends QSyntaxHighlighter's walk here
+                self.setCurrentBlockState(self.currentBlockState())
+                return
+            self._chunk_first = False
+        else:
+            if self._pass_start is None:
+                self._pass_start = time.perf_counter_ns()
+                self._pass_deferred = False
+                # fires once control is back in the event loop, after the pass
+                QTimer.singleShot(0, self._end_pass)
+            if (
+                    self._pass_deferred
+                    or time.perf_counter_ns() - self._pass_start > PASS_BUDGET_MS * 1_000_000
+                    or self.lazy and self.currentBlock().blockNumber() > self._target
+            ):
+                # the rest of a long pass is called once per block, keep it cheap
+                if not self._pass_deferred:
+                    self._pass_deferred = True
+                    self._defer(self.currentBlock().blockNumber())
+                # new lines are marked, changed lines keep their state so the
+                # walk stops after the changed range instead of running on
+                if self.currentBlockState() == -1:
+                    self.setCurrentBlockState(STATE_DEFERRED)
+                else:
+                    self.setCurrentBlockState(self.currentBlockState())
+                return
+
+        previous_state = self.previousBlockState()
+        tokens, state = tokenize_line(text, previous_state if previous_state >= 0 else STATE_NORMAL)
+
+        formats = self.formats
+        for start, length, kind in tokens:
+            self.setFormat(start, length, formats[kind])
+
+        self.setCurrentBlockState(state)
+        if self._resuming:
+            self._last_block = self.currentBlock().blockNumber()
+
+    def _defer(self, block_number: int):
+        if self._deferred_from is None or block_number < self._deferred_from:
+            self._deferred_from = block_number
+        self._resume_timer.start()
+
+    def _end_pass(self):
+        self._pass_start = None
+
+    def _resume(self):
+        """Highlight deferred blocks for CHUNK_BUDGET_MS, in document order"""
+        document = self.document()
+        if self._deferred_from is None or document is None:
+            return
+
+        self._chunk_deadline = time.perf_counter_ns() + CHUNK_BUDGET_MS * 1_000_000
+        block = document.findBlockByNumber(self._deferred_from)
+        self._resuming = True
+        try:
+            while block.isValid() and time.perf_counter_ns() < self._chunk_deadline:
+                if self.lazy and block.blockNumber() > self._target:
+                    break
+
+                # rehighlightBlock walks on through following blocks while
+                # their state changes, which is every deferred block
+                self._chunk_first = True
+                self.rehighlightBlock(block)
+                block = document.findBlockByNumber(max(block.blockNumber(), self._last_block) + 1)
+        finally:
+            self._resuming = False
+
+        if block.isValid():
+            self._deferred_from = block.blockNumber()
+            if not self.lazy or self._deferred_from <= self._target:
+                self._resume_timer.start()
+        else:
+            self._deferred_from = None
+
+    def _on_contents_change(self, position: int, chars_removed: int, chars_added: int):
+        # edits above the deferred blocks shift their numbers
+        if self._deferred_from is not None:
+            changed = self.document().findBlock(position).blockNumber()
+            if changed >= 0:
+                self._deferred_from = min(self._deferred_from, changed)
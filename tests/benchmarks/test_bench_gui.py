@@ -0,0 +1,35 @@
+from benchmarks.bench_gui import run_in_event_loop, generate_script, run_benchmarks
+from PySide6.QtWidgets import QApplication
+import unittest
+import sys
+
+
+class TestBenchGui(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        if not QApplication.instance():
+            cls.app = QApplication(sys.argv)
+        else:
+            cls.app = QApplication.instance()
+
+    def test_run_in_event_loop(self):
+        calls = []
+        result = run_in_event_loop([lambda: calls.append(1)] * 4)
+
+        self.assertEqual(4, len(calls), 'Every step should run')
+        self.assertEqual(4, result['runs'], 'Every step is one timed frame')
+        self.assertIn('max_stall_ms', result, 'Stalls should be reported')
+        self.assertEqual(0, result['frames_over_budget'], 'Empty steps fit in a frame')
+
+    def test_generate_script(self):
+        script = generate_script(200, seed=1)
+
+        self.assertEqual(200, len(script.split('\n')), 'Expected one line per requested line')
+        self.assertEqual(script, generate_script(200, seed=1), 'The same seed gives the same script')
+
+    def test_run_benchmarks(self):
+        results = run_benchmarks(rows=200, lines=50, repeat=1, page_size=50, frames=3, seed=0)
+
+        self.assertIn('view_scroll[200]', results)
+        self.assertIn('highlight_typing[50 lines]', results)
+        self.assertEqual(3, results['viewer_page[200]']['runs'], 'Expected one run per paging frame')
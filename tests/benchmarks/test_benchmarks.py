@@ -0,0 +1,55 @@
+from benchmarks.report import measure, compare_reports
+from src.core.database_manager import DatabaseManager
+from benchmarks.data import generate_database
+from benchmarks.bench_table_diff import bench_merge
+from benchmarks.bench_row_store import bench_row_store
+from pathlib import Path
+import unittest
+import tempfile
+
+
+class TestBenchmarks(unittest.TestCase):
+    def test_generate_database(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = generate_database(str(Path(tmp) / 'bench.rbx'), 25, batch_size=10)
+            db_manager = DatabaseManager(path)
+
+            self.assertEqual(25, db_manager.count_table_rows('bench'), 'Expected 25 generated rows')
+            self.assertEqual(8, len(db_manager.get_table_schema('bench')), 'Expected mixed type columns')
+
+            # the same seed gives the same data
+            rows = db_manager.execute_query('SELECT * FROM bench')['rows']
+            path = generate_database(str(Path(tmp) / 'again.rbx'), 25)
+            self.assertEqual(rows, DatabaseManager(path).execute_query('SELECT * FROM bench')['rows'])
+
+    def test_measure(self):
+        calls = []
+        result = measure(lambda: calls.append(1), repeat=3, warmup=2, items=100)
+
+        self.assertEqual(5, len(calls), 'Warmup runs should not be timed')
+        self.assertEqual(3, result['runs'])
+        self.assertIn('rows_per_s', result)
+
+    def test_compare_reports(self):
+        old = {'results': {'a': {'median_ms': 10.0}, 'b': {'median_ms': 10.0}}}
+        new = {'results': {'a': {'median_ms': 12.0}, 'b': {'median_ms': 10.5}, 'c': {'median_ms': 1.0}}}
+
+        rows = {row['name']: row for row in compare_reports(old, new, threshold=0.1)}
+        self.assertEqual({'a', 'b'}, set(rows), 'Only shared benchmarks are compared')
+        self.assertTrue(rows['a']['regression'], '20% slower should be a regression')
+        self.assertFalse(rows['b']['regression'], '5% is within the threshold')
+
+    def test_bench_table_diff(self):
+        result = bench_merge(1000, track_memory=True)
+
+        self.assertEqual(10, result['added'], 'One row in CHANGE_EVERY is added')
+        self.assertEqual(10, result['removed'])
+        self.assertEqual(10, result['changed'])
+        self.assertIn('peak_memory_mb', result)
+
+    def test_bench_row_store(self):
+        results = bench_row_store(3000, 1, track_memory=True)
+
+        self.assertGreater(results['fill[3000]']['disk_mb'], 0, 'Rows past the 1 MB budget should spill')
+        self.assertIn('peak_memory_mb', results['sort[3000]'])
+        self.assertIn('export[3000]', results)
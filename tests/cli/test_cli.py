@@ -0,0 +1,83 @@
+from src.cli import build_parser, run
+from src.core.database_manager import DatabaseManager
+from pathlib import Path
+import unittest
+import tempfile
+import shutil
+import pytest
+import json
+import io
+
+
+@pytest.mark.usefixtures("db_manager", "populated_db_manager")
+class TestCli(unittest.TestCase):
+    def _run(self, *argv):
+        out = io.StringIO()
+        err = io.StringIO()
+        code = run(build_parser().parse_args([self.populated_db_manager.db_path, *argv]), out, err)
+        return code, out.getvalue(), err.getvalue()
+
+    def test_catalog(self):
+        code, out, _ = self._run('tables')
+        self.assertEqual(0, code)
+        self.assertEqual(['users', 'posts'], out.split(), 'Expected both tables')
+
+        code, out, _ = self._run('views')
+        self.assertEqual(['users_view'], out.split())
+
+        code, out, _ = self._run('describe', 'users')
+        self.assertIn('email', out, 'Schema should list the columns')
+
+        code, _, err = self._run('describe', 'missing')
+        self.assertEqual(1, code, 'Unknown table should fail')
+
+    def test_query_formats(self):
+        code, out, err = self._run('query', 'SELECT id, name FROM users WHERE age < 30', '--format', 'jsonl', '--batch-size', '1')
+        self.assertEqual(0, code)
+        rows = [json.loads(line) for line in out.splitlines()]
+        self.assertEqual([{'id': 1, 'name': 'Test User 1'}, {'id': 2, 'name': 'Test User 2'}], rows)
+        self.assertIn('2 rows', err)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            output = Path(tmp) / 'users.csv'
+            code, out, _ = self._run('query', 'SELECT id, age FROM users', '-f', 'csv', '-o', str(output))
+            lines = output.read_text().splitlines()
+
+        self.assertEqual('', out, 'Output file should be used instead of stdout')
+        self.assertEqual('id,age', lines[0])
+        self.assertEqual(11, len(lines), 'Expected header and 10 rows')
+
+    def test_script(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            script = Path(tmp) / 'script.sql'
+            script.write_text("DELETE FROM users WHERE id = 1;\n-- count what's left\nSELECT COUNT(*) FROM users;")
+            code, out, err = self._run('script', str(script), '-f', 'csv')
+
+        self.assertEqual(0, code)
+        self.assertIn('9', out.splitlines(), 'Count should reflect the delete')
+        self.assertIn('1 rows affected', err)
+
+    def test_diff(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            other = Path(tmp) / 'other.rbx'
+            shutil.copyfile(self.populated_db_manager.db_path, other)
+            code, out, err = self._run('diff', str(other), 'users', '-f', 'csv')
+            self.assertEqual(0, code, 'Identical tables should succeed')
+            self.assertEqual(1, len(out.splitlines()), 'Only the header without differences')
+
+            DatabaseManager(str(other)).execute_query("UPDATE users SET name = 'Changed' WHERE id = 3")
+            code, out, err = self._run('diff', str(other), 'users', '-f', 'csv')
+
+        self.assertEqual(1, code, 'Differences should exit with 1 like diff')
+        self.assertTrue(out.splitlines()[1].startswith('changed,3,name,Test User 3,Changed'))
+        self.assertIn('1 changed', err)
+
+    def test_processes(self):
+        code, out, err = self._run('query', 'SELECT id FROM users', '-f', 'csv', '--processes', '1')
+        self.assertEqual(0, code)
+        self.assertEqual(11, len(out.splitlines()), 'Rows read in a worker process should be written the same')
+
+    def test_missing_database(self):
+        code = run(build_parser().parse_args(['missing.rbx', 'tables']), io.StringIO(), io.StringIO())
+        self.assertEqual(1, code, 'Missing database should not be created')
+        self.assertFalse(Path('missing.rbx').exists())
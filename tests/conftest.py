@@ -1,4 +1,5 @@
 from src.core.database_manager import DatabaseManager
+from src.core.db_lock import lock_path
 from pathlib import Path
 import ribbitxdb
 import tempfile
@@ -13,6 +14,7 @@ def temp_db_path():
     yield path
 
     Path(path).unlink(missing_ok=True)
+    lock_path(path).unlink(missing_ok=True)
 
 @pytest.fixture
 def db_manager(request, temp_db_path):
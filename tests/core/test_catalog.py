@@ -0,0 +1,46 @@
+from src.core.catalog import read_catalog, refresh_catalog, diff_catalog, has_changes
+from src.core.database_manager import DatabaseManager
+import unittest
+import pytest
+
+
+@pytest.mark.usefixtures("db_manager", "populated_db_manager")
+class TestCatalog(unittest.TestCase):
+    populated_db_manager: DatabaseManager
+
+    def test_read_catalog(self):
+        catalog = read_catalog(self.populated_db_manager)
+
+        self.assertEqual(['users', 'posts'], list(catalog['tables']))
+        self.assertEqual(['users_view'], catalog['views'])
+        self.assertEqual('id', catalog['tables']['users'][0]['column_name'], 'Tables should carry their schema')
+
+    def test_refresh_catalog(self):
+        catalog = read_catalog(self.populated_db_manager)
+
+        # reads touch the file but leave its content alone
+        self.populated_db_manager.get_tables()
+        self.assertIsNone(refresh_catalog(self.populated_db_manager, catalog), 'Unchanged files are not read again')
+
+        self.populated_db_manager.execute_query("CREATE TABLE tags(id INTEGER PRIMARY KEY, name TEXT)")
+        refreshed = refresh_catalog(self.populated_db_manager, catalog)
+        self.assertIn('tags', refreshed['tables'])
+
+    def test_diff_catalog(self):
+        old = {
+            'tables': {'users': [{'column_name': 'id'}], 'posts': [{'column_name': 'id'}]},
+            'views': ['users_view'],
+        }
+        new = {
+            'tables': {'users': [{'column_name': 'id'}, {'column_name': 'age'}], 'tags': [{'column_name': 'id'}]},
+            'views': ['users_view', 'tags_view'],
+        }
+        changes = diff_catalog(old, new)
+
+        self.assertEqual(['tags'], changes['added_tables'])
+        self.assertEqual(['posts'], changes['removed_tables'])
+        self.assertEqual(['users'], changes['changed_tables'], 'A new column should mark the table as changed')
+        self.assertEqual(['tags_view'], changes['added_views'])
+        self.assertEqual([], changes['removed_views'])
+        self.assertTrue(has_changes(changes))
+        self.assertFalse(has_changes(diff_catalog(new, new)))
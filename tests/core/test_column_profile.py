@@ -0,0 +1,83 @@
+from src.core.column_profile import (
+    HyperLogLog, Reservoir, profile_column, clear_profile_cache, MODE_EXACT, MODE_APPROXIMATE
+)
+from src.core.database_manager import DatabaseManager
+from unittest.mock import patch
+import unittest
+import pytest
+
+
+class TestSketches(unittest.TestCase):
+    def test_hyperloglog(self):
+        for cardinality in (10, 1000, 100_000):
+            sketch = HyperLogLog()
+            for value in range(cardinality):
+                sketch.add(value)
+                sketch.add(value)
+
+            error = abs(sketch.count() - cardinality) / cardinality
+            self.assertLess(error, 0.05, f'Estimate of {cardinality} distinct values is off by {error:.1%}')
+
+    def test_reservoir(self):
+        reservoir = Reservoir(100, seed=1)
+        for value in range(10_000):
+            reservoir.add(value)
+
+        self.assertEqual(100, len(reservoir.items), 'Sample size should stay bounded')
+        self.assertEqual(10_000, reservoir.seen)
+        self.assertGreater(max(reservoir.items), 5000, 'Later values should be sampled too')
+
+
+@pytest.mark.usefixtures("db_manager", "populated_db_manager")
+class TestProfileColumn(unittest.TestCase):
+    populated_db_manager: DatabaseManager
+
+    def setUp(self):
+        clear_profile_cache()
+
+    def test_exact(self):
+        profile = profile_column(self.populated_db_manager, 'users', 'age', mode=MODE_EXACT)
+        self.assertTrue(profile['exact'])
+        self.assertEqual(10, profile['row_count'])
+        self.assertEqual(0, profile['null_count'])
+        self.assertEqual(20, profile['min'])
+        self.assertEqual(65, profile['max'])
+        self.assertEqual(10, profile['distinct_count'])
+        self.assertEqual(1, profile['top_values'][0][1])
+
+    def test_approximate(self):
+        profile = profile_column(self.populated_db_manager, 'users', 'age', mode=MODE_APPROXIMATE, sample_size=5)
+        self.assertFalse(profile['exact'])
+        self.assertEqual(5, profile['sample_size'], 'Top values come from the sample')
+        self.assertEqual(10, profile['distinct_count'], 'Small counts should be estimated exactly')
+        self.assertEqual(20, profile['min'], 'Min and max are exact in every mode')
+
+    def test_auto(self):
+        profile = profile_column(self.populated_db_manager, 'users', 'age')
+        self.assertEqual(MODE_EXACT, profile['mode'], 'Small tables should be profiled exactly')
+
+        # the switch happens during the scan, the rows aren't counted first
+        with patch('src.core.column_profile.EXACT_ROW_LIMIT', 4), \
+                patch.object(self.populated_db_manager, 'count_table_rows') as count_table_rows:
+            profile = profile_column(self.populated_db_manager, 'users', 'age', sample_size=20, use_cache=False)
+        count_table_rows.assert_not_called()
+        self.assertEqual(MODE_APPROXIMATE, profile['mode'], 'Tables over the limit should be approximated')
+        self.assertEqual(10, profile['row_count'])
+        self.assertEqual(10, profile['distinct_count'], 'Values counted before the switch should be estimated too')
+        self.assertEqual(10, profile['sample_size'], 'Values counted before the switch should be sampled too')
+        self.assertEqual((20, 65), (profile['min'], profile['max']))
+
+    def test_cache(self):
+        profile = profile_column(self.populated_db_manager, 'users', 'age')
+        self.assertFalse(profile['cached'])
+        self.assertTrue(profile_column(self.populated_db_manager, 'users', 'age')['cached'])
+
+        # a write changes the database version
+        self.populated_db_manager.insert_row('users', {'name': 'Profile', 'email': 'profile@email.com', 'age': None})
+        profile = profile_column(self.populated_db_manager, 'users', 'age')
+        self.assertFalse(profile['cached'], 'Writes should invalidate cached profiles')
+        self.assertEqual(1, profile['null_count'])
+
+    def test_invalid_mode(self):
+        with self.assertRaises(ValueError):
+            profile_column(self.populated_db_manager, 'users', 'age', mode='guess')
@@ -0,0 +1,92 @@
+from src.core.completion import CompletionIndex, CompletionTrie, resolve_aliases, statement_at, TABLE, COLUMN, KEYWORD
+from src.core.database_manager import DatabaseManager
+import unittest
+import pytest
+import time
+
+
+def complete(index: CompletionIndex, text: str):
+    """Complete at the | marker"""
+    position = text.index('|')
+    return index.complete(text.replace('|', ''), position)
+
+
+class TestCompletion(unittest.TestCase):
+    def setUp(self):
+        self.index = CompletionIndex()
+        self.index.add_table('users', ['id', 'name', 'email', 'age'])
+        self.index.add_table('posts', ['id', 'user_id', 'title'])
+        self.index.add_view('adults')
+
+    def test_trie(self):
+        trie = CompletionTrie()
+        for word in ('user_id', 'Users', 'username', 'title'):
+            trie.insert(word, COLUMN)
+
+        self.assertEqual(['Users', 'user_id', 'username'], [text for text, _ in trie.complete('US')], 'Shortest first, any case')
+        self.assertEqual([], trie.complete('x'))
+        self.assertEqual(2, len(trie.complete('', limit=2)))
+
+    def test_resolve_aliases(self):
+        aliases = resolve_aliases('SELECT * FROM users AS u, "Other" o LEFT JOIN posts p ON p.user_id = u.id WHERE 1')
+        self.assertEqual('users', aliases['u'])
+        self.assertEqual('posts', aliases['p'])
+        self.assertEqual('Other', aliases['o'], 'Quoted names are unquoted')
+        self.assertEqual('users', aliases['users'], 'Tables are reachable by their own name')
+        self.assertNotIn('where', aliases, 'Keywords are not aliases')
+
+    def test_statement_at(self):
+        text = "SELECT ';'; SELECT 2"
+        self.assertEqual(("SELECT ';'", 3), statement_at(text, 3), 'Quoted semicolons do not end statements')
+        self.assertEqual((' SELECT 2', 2), statement_at(text, 13))
+
+    def test_contexts(self):
+        result = complete(self.index, 'SELECT u.| FROM users u')
+        self.assertEqual({'id', 'name', 'email', 'age'}, {text for text, _ in result['candidates']})
+
+        result = complete(self.index, 'SELECT p.ti| FROM users u JOIN posts p ON p.user_id = u.id')
+        self.assertEqual('ti', result['prefix'])
+        self.assertEqual([('title', COLUMN)], result['candidates'])
+
+        result = complete(self.index, 'SELECT * FROM users, a|')
+        self.assertEqual(['adults'], [text for text, _ in result['candidates']], 'Only tables and views after FROM')
+
+        result = complete(self.index, 'SELECT na| FROM users')
+        self.assertEqual(('name', COLUMN), result['candidates'][0], 'Columns of the statement tables come first')
+
+        result = complete(self.index, 'SELECT * FROM users WHERE name = \'na|')
+        self.assertEqual([], result['candidates'], 'Nothing is completed inside strings')
+
+        result = complete(self.index, 'sel|')
+        self.assertEqual([('SELECT', KEYWORD)], result['candidates'])
+
+        result = complete(self.index, 'SELECT 1; SELECT * FROM us|')
+        self.assertEqual([('users', TABLE)], result['candidates'])
+
+    def test_large_schema(self):
+        index = CompletionIndex()
+        for table in range(200):
+            index.add_table(f'table_{table}', [f'column_{table}_{column}' for column in range(25)])
+        self.assertEqual(5000, index.column_count())
+
+        text = 'SELECT a.column_1 FROM table_1 a JOIN table_2 b ON a.column_1_1 = b.col'
+        start = time.perf_counter()
+        for _ in range(100):
+            result = index.complete(text, len(text))
+        elapsed_ms = (time.perf_counter() - start) * 1000 / 100
+
+        self.assertEqual(25, len(result['candidates']))
+        self.assertLess(elapsed_ms, 5, 'Completion should not scan the schema')
+
+
+@pytest.mark.usefixtures("db_manager", "populated_db_manager")
+class TestCompletionIndexBuild(unittest.TestCase):
+    db_manager: DatabaseManager
+
+    def test_build(self):
+        index = CompletionIndex.build(self.db_manager)
+        self.assertIn('users', index.tables)
+        self.assertIn('email', index.columns['users'])
+
+        result = index.complete('SELECT u.em FROM users u', len('SELECT u.em'))
+        self.assertEqual([('email', COLUMN)], result['candidates'])
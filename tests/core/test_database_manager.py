@@ -1,5 +1,8 @@
+from src.core.projection import CellPreview
 from unittest.mock import patch
 import unittest
+import tempfile
+import os
 import pytest
 import time
 
@@ -152,6 +155,41 @@ class TestDatabaseManager(unittest.TestCase):
         self.assertEqual(10, data['total_rows'], 'Expected 10 as total row count')
         self.assertEqual(1, data['displayed_rows'], 'Expected 1 row to be displayed')
 
+        # values are bound, so quotes in the search text are safe
+        filters['columns'] = [
+            {
+                'condition': ('title', "Title 1' OR 'a' = 'a"),
+                'type': 'LIKE'
+            }
+        ]
+
+        data = self.populated_db_manager.get_table_data_paginated(
+            'posts',
+            filters=filters
+        )
+
+        self.assertEqual(0, data['displayed_rows'], 'Expected quoted search text to match nothing')
+
+        # prefix and range searches
+        filters['columns'] = [
+            {
+                'condition': ('name', 'Test User 1'),
+                'type': 'PREFIX'
+            },
+            {
+                'condition': ('age', (40, 45)),
+                'type': 'RANGE'
+            }
+        ]
+
+        data = self.populated_db_manager.get_table_data_paginated(
+            'users',
+            filters=filters
+        )
+
+        # Test User 1 and Test User 10 by prefix, ages 40 and 45 by range
+        self.assertEqual(4, data['displayed_rows'], 'Expected 4 rows to be displayed')
+
         # invalid filter type
         filters['columns'] = [
             {
@@ -200,6 +238,59 @@ class TestDatabaseManager(unittest.TestCase):
         self.assertEqual(10, data['total_rows'], 'Expected 10 as total row count')
         self.assertEqual(0, data['displayed_rows'], 'Expected no rows to be displayed')
 
+    def test_get_table_data_paginated_projection(self):
+        data = self.populated_db_manager.get_table_data_paginated(
+            'users', filters={'sorting': {'column': 'age', 'order': 'DESC'}}, columns=['id', 'name']
+        )
+
+        self.assertEqual(['id', 'name'], data['columns'], 'Only the chosen columns should be fetched')
+        self.assertEqual((10, 'Test User 10'), data['rows'][0], 'Sorting should work on columns that are not fetched')
+        self.assertEqual(10, data['total_rows'])
+
+        # bodies are 11 characters long
+        data = self.populated_db_manager.get_table_data_paginated('posts', columns=['id', 'body'], preview_chars=11)
+        self.assertFalse(any(isinstance(row[1], CellPreview) for row in data['rows']), 'Values that fit should be kept whole')
+
+        data = self.populated_db_manager.get_table_data_paginated('posts', columns=['id', 'body'], preview_chars=10)
+        preview = data['rows'][0][1]
+        self.assertIsInstance(preview, CellPreview, 'Longer values should be cut')
+        self.assertEqual('Test Body ', preview.value)
+        self.assertEqual(11, preview.size)
+        self.assertEqual('Test Body 0', self.populated_db_manager.get_cell_value('posts', 'body', 'id', data['rows'][0][0]))
+
+        with self.assertRaises(ValueError, msg='A missing row should raise'):
+            self.populated_db_manager.get_cell_value('posts', 'body', 'id', 999)
+
+    def test_search_special_characters(self):
+        self.populated_db_manager.insert_row('posts', {'user_id': 1, 'title': 'Discount (50%)', 'body': 'x_y'})
+        self.populated_db_manager.insert_row('posts', {'user_id': 1, 'title': 'Discount 500', 'body': 'xzy'})
+
+        def search(column, text, match_type='CONTAINS'):
+            filters = {'columns': [{'condition': (column, text), 'type': match_type}]}
+            return [row[2] for row in self.populated_db_manager.get_table_data_paginated('posts', filters=filters)['rows']]
+
+        self.assertEqual(['Discount (50%)'], search('title', '(50%'), 'Parentheses and % should match literally')
+        self.assertEqual(['Discount (50%)'], search('body', 'x_'), '_ should not match any character')
+        self.assertEqual([], search('title', '.'), '. should not match any character')
+        self.assertEqual(['Discount (50%)'], search('title', 'discount (', 'PREFIX'))
+
+    def test_count_table_rows(self):
+        self.assertEqual(10, self.populated_db_manager.count_table_rows('posts'), 'Expected 10 rows')
+
+        filters = {
+            'columns': [
+                {
+                    'condition': ('body', 'Ydob'),
+                    'type': 'LIKE'
+                }
+            ]
+        }
+        self.assertEqual(5, self.populated_db_manager.count_table_rows('posts', filters), 'Expected 5 matching rows')
+
+        # search index matches are counted without a query
+        filters = {'keys': {'column': 'id', 'values': [1, 2, 3]}}
+        self.assertEqual(3, self.populated_db_manager.count_table_rows('posts', filters), 'Expected 3 matching keys')
+
     # Test CUD ops
     def test_insert_row(self):
         data = self.populated_db_manager.get_table_data_paginated('users')
@@ -299,13 +390,16 @@ class TestDatabaseManager(unittest.TestCase):
 
         self.assertTrue(initial_view_count - 1 == final_view_count, 'View should have been deleted')
 
+    @patch('src.core.database_manager.time.perf_counter_ns')
     @patch('src.core.database_manager.time.time')
     def test_execute_query(
             self,
-            mock_time
+            mock_time,
+            mock_perf_counter
     ):
-        # 10 ms execution time
-        mock_time.side_effect = time_side_effect
+        mock_time.return_value = 1000
+        # connect 1 ms, execute 10 ms, first row 1 ms, fetch 10 ms
+        mock_perf_counter.side_effect = perf_counter_side_effect
         # Select query, with max rows condition
         # This mocks the real case where a user does a blind SELECT query
         # and too many rows are returned, forcing the manager to truncate
@@ -317,9 +411,14 @@ class TestDatabaseManager(unittest.TestCase):
         self.assertEqual(9, len(result['rows']), 'Expected 9 rows to be returned')
         self.assertEqual(9, result['total_rows'], 'Expected 9 as total row count')
         self.assertTrue(result['truncated'], 'Data should be truncated')
-        # test mock execution time
-        self.assertEqual(10, result['execution_time'])
+        # test mock execution time, execute and fetch are both counted
+        self.assertEqual(0.021, result['execution_time'])
         self.assertEqual(1000, result['execution_timestamp'])
+        self.assertEqual(
+            {'connect': 1, 'execute': 10, 'first_row': 1, 'fetch': 11, 'total': 22},
+            result['timings'],
+            'Expected timing breakdown in ms'
+        )
 
         # Select query, with max rows but no truncation
         # This is due to max_rows being equal to the total number
@@ -360,14 +459,141 @@ class TestDatabaseManager(unittest.TestCase):
         result = self.populated_db_manager.execute_query(query)
         self.assertEqual(0, result['rows_affected'], 'Expected 0 rows to be affected')
 
-
-real_time = time.time
-calls = iter([1000, 1010])
-def time_side_effect():
+    def test_execute_script(self):
+        script = """
+            -- add a user then read it back
+            INSERT INTO users(name, email, age) VALUES ('Script User', 'script@email.com', 70);
+            SELECT name FROM users WHERE age = 70;
+            SELECT * FROM missing_table;
+            SELECT COUNT(*) FROM users;
+        """
+
+        result = self.populated_db_manager.execute_script(script, stop_on_error=False)
+        results = result['results']
+        self.assertEqual(4, len(results), 'Every statement should run')
+        self.assertEqual(1, result['failed'], 'Expected 1 failed statement')
+        self.assertEqual(1, results[0]['rows_affected'], 'Expected 1 row to be inserted')
+        self.assertEqual([('Script User',)], results[1]['rows'], 'Inserted row should be visible')
+        self.assertIsNotNone(results[2]['error'], 'Missing table should be reported')
+        self.assertEqual([(11,)], results[3]['rows'])
+        self.assertGreater(results[1]['execute_time'], 0, 'Execute should be timed')
+        self.assertGreater(results[1]['fetch_time'], 0, 'Fetch should be timed')
+
+        # stop on error inside a transaction rolls the script back
+        script = """
+            INSERT INTO users(name, email, age) VALUES ('Rolled Back', 'rollback@email.com', 80);
+            SELECT * FROM missing_table;
+            INSERT INTO users(name, email, age) VALUES ('Never Run', 'never@email.com', 90);
+        """
+        result = self.populated_db_manager.execute_script(script, use_transaction=True)
+        self.assertEqual(2, len(result['results']), 'Script should stop at the failing statement')
+        self.assertTrue(result['rolled_back'], 'Transaction should be rolled back')
+        self.assertEqual(11, self.populated_db_manager.count_table_rows('users'), 'Insert should be rolled back')
+
+    def test_get_table_sample(self):
+        sample = self.populated_db_manager.get_table_sample('users', 4, seed=1)
+        self.assertEqual('pk_range', sample['sample_method'], 'Integer primary keys should be sampled by range')
+        self.assertEqual(4, len(sample['rows']))
+        self.assertEqual(10, sample['total_rows'])
+        self.assertEqual(4, len({row[0] for row in sample['rows']}), 'Rows should not repeat')
+        self.assertEqual(sample['rows'], self.populated_db_manager.get_table_sample('users', 4, seed=1)['rows'],
+                         'The same seed should return the same rows')
+
+        # deleted keys leave gaps that are drawn again
+        self.populated_db_manager.execute_query('DELETE FROM users WHERE id > 5')
+        sample = self.populated_db_manager.get_table_sample('users', 10, seed=2)
+        self.assertEqual([1, 2, 3, 4, 5], [row[0] for row in sample['rows']], 'A sample larger than the table returns every row')
+
+    def test_get_table_sample_reservoir(self):
+        self.db_manager.execute_query('CREATE TABLE tags (name TEXT PRIMARY KEY, uses INTEGER)')
+        for idx in range(6):
+            self.db_manager.execute_query('INSERT INTO tags (name, uses) VALUES (?, ?)', params=(f'tag{idx}', idx))
+
+        sample = self.db_manager.get_table_sample('tags', 3, seed=1)
+        self.assertEqual('reservoir', sample['sample_method'], 'Text keys should fall back to a scan')
+        self.assertEqual(3, len(sample['rows']))
+        self.assertEqual(['name', 'uses'], sample['columns'])
+
+        # every key lookup scans the table, samples needing more than one are read with a scan
+        with patch('src.core.database_manager.SAMPLE_LOOKUP_SIZE', 3):
+            sample = self.populated_db_manager.get_table_sample('users', 4, seed=1)
+        self.assertEqual('reservoir', sample['sample_method'], 'Keys that do not fit one lookup should use a scan')
+        self.assertEqual(4, len(sample['rows']))
+
+    def test_execute_script_file(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'script.sql')
+            with open(path, 'w') as f:
+                for idx in range(3):
+                    f.write(f"INSERT INTO users(name, email, age) VALUES ('File {idx}', 'file{idx}@email.com', 61);\n")
+                f.write("SELECT COUNT(*) FROM users WHERE age = 61;\n")
+
+            result = self.populated_db_manager.execute_script_file(path, max_messages=1)
+
+        self.assertEqual(4, result['executed'], 'Every statement should run')
+        self.assertEqual(3, result['rows_affected'], 'Totals should cover omitted results')
+        self.assertEqual(2, result['omitted_results'], 'Row counts past max_messages are not kept')
+        self.assertEqual([(3,)], result['results'][-1]['rows'], 'Result sets are always kept')
+
+        # cancelled between statements
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'script.sql')
+            with open(path, 'w') as f:
+                f.write("SELECT 1; SELECT 2;")
+            result = self.populated_db_manager.execute_script_file(path, is_cancelled=lambda: True)
+
+        self.assertTrue(result['cancelled'])
+        self.assertEqual(0, result['executed'])
+
+    def test_execute_query_cache(self):
+        self.populated_db_manager.enable_result_cache()
+        cache = self.populated_db_manager.result_cache
+
+        result = self.populated_db_manager.execute_query('SELECT * FROM posts')
+        self.assertFalse(result['cached'], 'First run should execute')
+
+        # formatting differences share the cache entry
+        result = self.populated_db_manager.execute_query('SELECT *\n  FROM posts;')
+        self.assertTrue(result['cached'], 'Second run should be served from the cache')
+        self.assertEqual(10, len(result['rows']))
+        self.assertEqual(1, cache.hits)
+
+        # parameters are part of the key
+        result = self.populated_db_manager.execute_query('SELECT * FROM posts WHERE id = ?', params=(1,))
+        self.assertFalse(result['cached'])
+        result = self.populated_db_manager.execute_query('SELECT * FROM posts WHERE id = ?', params=(2,))
+        self.assertFalse(result['cached'], 'Different parameters should miss')
+        self.assertEqual(2, result['rows'][0][0])
+
+        # writes through the manager invalidate
+        self.populated_db_manager.insert_row('posts', {'user_id': 1, 'title': 'New', 'body': 'New'})
+        result = self.populated_db_manager.execute_query('SELECT * FROM posts')
+        self.assertFalse(result['cached'], 'Cache should be cleared by writes')
+        self.assertEqual(11, len(result['rows']))
+
+        # a hit only stats the file, reads in between don't make it hash
+        self.populated_db_manager.get_tables()
+        with patch('src.core.file_version.hashlib.blake2b') as hash_mock:
+            result = self.populated_db_manager.execute_query('SELECT * FROM posts')
+        self.assertTrue(result['cached'], 'Reads should not invalidate the cache')
+        hash_mock.assert_not_called()
+
+        # a write by another program changes the file stamp
+        stat = os.stat(self.populated_db_manager.db_path)
+        os.utime(self.populated_db_manager.db_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+        self.assertFalse(self.populated_db_manager.execute_query('SELECT * FROM posts')['cached'], 'Outside changes should miss')
+
+        self.populated_db_manager.disable_result_cache()
+        self.assertFalse(self.populated_db_manager.execute_query('SELECT * FROM posts')['cached'])
+
+
+real_perf_counter_ns = time.perf_counter_ns
+calls = iter([0, 1_000_000, 11_000_000, 12_000_000, 22_000_000])
+def perf_counter_side_effect():
     try:
         return next(calls)
     except StopIteration:
-        return real_time()
+        return real_perf_counter_ns()
 
 
 
@@ -0,0 +1,73 @@
+from src.core.db_lock import database_lock, lock_path
+from src.core.database_manager import DatabaseManager
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
+import threading
+import unittest
+import pytest
+
+
+def try_lock(db_path: str) -> bool:
+    lock = database_lock(db_path)
+    if not lock.acquire(blocking=False):
+        return False
+    lock.release()
+    return True
+
+
+def busy_elsewhere(db_manager: DatabaseManager) -> bool:
+    """is_busy from another thread, the lock is re-entrant for its holder"""
+    result = []
+    thread = threading.Thread(target=lambda: result.append(db_manager.is_busy()))
+    thread.start()
+    thread.join()
+    return result[0]
+
+
+@pytest.mark.usefixtures("db_manager", "populated_db_manager")
+class TestDatabaseLock(unittest.TestCase):
+    populated_db_manager: DatabaseManager
+
+    def test_reader_does_not_overlap_writer(self):
+        db_manager = self.populated_db_manager
+        reader = db_manager._get_connection()
+        reader.cursor().execute("SELECT * FROM users").fetchall()
+
+        writer = threading.Thread(target=db_manager.insert_row, args=('users', {'name': 'Late', 'age': 1}))
+        writer.start()
+        writer.join(0.5)
+        self.assertTrue(writer.is_alive(), 'The write should wait for the open reader')
+        self.assertTrue(busy_elsewhere(db_manager))
+
+        # closing a reader that opened before the write used to orphan its pages
+        reader.close()
+        writer.join(10)
+        self.assertFalse(writer.is_alive())
+        self.assertEqual(11, db_manager.count_table_rows('users'), 'The write should not be lost')
+        self.assertFalse(busy_elsewhere(db_manager))
+
+    def test_lock_released_on_error(self):
+        db_manager = self.populated_db_manager
+        with self.assertRaises(Exception):
+            db_manager.execute_query("SELECT * FROM missing")
+        with self.assertRaises(Exception):
+            db_manager.get_table_data_paginated('missing')
+
+        self.assertFalse(busy_elsewhere(db_manager), 'Failed queries should close their connection')
+
+        # iterators don't keep the database locked between batches
+        batches = db_manager.iter_table_rows('users', ['id'], batch_size=2)
+        next(batches)
+        self.assertFalse(busy_elsewhere(db_manager))
+        batches.close()
+
+    def test_lock_across_processes(self):
+        db_path = self.populated_db_manager.db_path
+        lock = database_lock(db_path)
+
+        with ProcessPoolExecutor(1, mp_context=multiprocessing.get_context('spawn')) as pool:
+            with lock:
+                self.assertFalse(pool.submit(try_lock, db_path).result(), 'Other processes should wait for the lock')
+            self.assertTrue(pool.submit(try_lock, db_path).result())
+
+        lock_path(db_path).unlink(missing_ok=True)
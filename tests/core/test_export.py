@@ -0,0 +1,32 @@
+from src.core import export
+import unittest
+import io
+
+
+class TestExport(unittest.TestCase):
+    batches = [
+        (['id', 'name'], [(1, 'a'), (2, None)]),
+        (['id', 'name'], [(3, 'c' * 50)]),
+    ]
+
+    def test_write_csv(self):
+        out = io.StringIO()
+        self.assertEqual(3, export.write_rows(self.batches, out, 'csv'), 'Expected 3 rows written')
+        self.assertEqual(['id,name', '1,a', '2,', f"3,{'c' * 50}"], out.getvalue().splitlines())
+
+    def test_write_jsonl(self):
+        out = io.StringIO()
+        export.write_rows(self.batches, out, 'jsonl')
+        self.assertEqual('{"id": 2, "name": null}', out.getvalue().splitlines()[1])
+
+    def test_write_table(self):
+        out = io.StringIO()
+        export.write_rows(self.batches, out, 'table')
+        lines = out.getvalue().splitlines()
+
+        self.assertEqual('id | name', lines[0])
+        self.assertEqual('2  | NULL', lines[3], 'NULL should be shown')
+        self.assertTrue(lines[4].endswith('...'), 'Long cells should be cut')
+
+        with self.assertRaises(ValueError):
+            export.write_rows(self.batches, out, 'xml')
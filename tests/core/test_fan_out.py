@@ -0,0 +1,58 @@
+from src.core.fan_out import run_on_all, SOURCE_COLUMN
+from src.core.database_manager import DatabaseManager
+from pathlib import Path
+import unittest
+import tempfile
+import shutil
+import pytest
+
+
+@pytest.mark.usefixtures("db_manager", "populated_db_manager")
+class TestFanOut(unittest.TestCase):
+    populated_db_manager: DatabaseManager
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.shards = [self.populated_db_manager]
+        for idx in range(2):
+            path = Path(self.tmp.name) / f"shard_{idx}.rbx"
+            shutil.copyfile(self.populated_db_manager.db_path, path)
+            self.shards.append(DatabaseManager(str(path)))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_select(self):
+        batches = []
+        data = run_on_all(self.shards, "SELECT id, name FROM users WHERE age < 30", batch_size=1, progress_callback=batches.append)
+
+        self.assertEqual([SOURCE_COLUMN, 'id', 'name'], data['columns'], 'Rows should be tagged with their database')
+        self.assertEqual(6, data['total_rows'], 'Expected 2 rows from each of 3 databases')
+        self.assertEqual(6, len(batches), 'Batches should stream as they are fetched')
+        self.assertEqual({'shard_0.rbx', 'shard_1.rbx', self.populated_db_manager.db_name}, {row[0] for row in data['rows']})
+        self.assertEqual([2, 2, 2], [result['rows'] for result in data['results']])
+        self.assertEqual(0, data['failed'])
+
+    def test_max_rows(self):
+        data = run_on_all(self.shards, "SELECT id FROM users", max_rows=3, batch_size=2, keep_rows=False)
+
+        self.assertEqual(9, data['total_rows'])
+        self.assertEqual([], data['rows'], 'Rows are only counted without keep_rows')
+        self.assertTrue(all(result['truncated'] for result in data['results']))
+
+    def test_failures(self):
+        self.shards[1].execute_query("DROP TABLE posts")
+        data = run_on_all(self.shards, "SELECT title FROM posts", max_workers=1)
+
+        self.assertEqual(1, data['failed'], 'Only the database without the table should fail')
+        self.assertIsNotNone(data['results'][1]['error'])
+        self.assertEqual(20, data['total_rows'], 'The other databases still return rows')
+
+    def test_write(self):
+        data = run_on_all(self.shards, "UPDATE users SET age = 1 WHERE id = 1")
+        self.assertEqual(3, data['rows_affected'], 'Expected one row updated per database')
+
+    def test_cancel(self):
+        data = run_on_all(self.shards, "SELECT id FROM users", is_cancelled=lambda: True)
+        self.assertTrue(data['cancelled'])
+        self.assertEqual(0, data['total_rows'])
@@ -0,0 +1,37 @@
+from src.core.file_version import database_version, database_generation
+from unittest.mock import patch
+import os
+import unittest
+import pytest
+
+
+@pytest.mark.usefixtures("populated_db_manager")
+class TestFileVersion(unittest.TestCase):
+    def test_database_version(self):
+        version = database_version(self.populated_db_manager.db_path)
+
+        # reads rewrite the metadata page but not the content
+        self.populated_db_manager.get_tables()
+        self.assertEqual(version, database_version(self.populated_db_manager.db_path), 'Reads should not change the version')
+
+        self.populated_db_manager.execute_query('UPDATE users SET age = 99 WHERE id = 1')
+        self.assertNotEqual(version, database_version(self.populated_db_manager.db_path), 'Writes should change the version')
+
+    def test_database_generation(self):
+        db_path = self.populated_db_manager.db_path
+        generation = database_generation(db_path)
+        version = database_version(db_path)
+
+        self.populated_db_manager.get_table_data_paginated('users')
+        self.assertEqual(generation, database_generation(db_path), 'Reads through the manager should not count')
+        with patch('src.core.file_version.hashlib.blake2b') as hash_mock:
+            self.assertEqual(version, database_version(db_path))
+        hash_mock.assert_not_called()
+
+        self.populated_db_manager.insert_row('users', {'name': 'New', 'age': 1})
+        self.assertGreater(database_generation(db_path), generation, 'Commits should count')
+
+        generation = database_generation(db_path)
+        stat = os.stat(db_path)
+        os.utime(db_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+        self.assertGreater(database_generation(db_path), generation, 'Outside touches should count')
@@ -0,0 +1,22 @@
+from pathlib import Path
+import subprocess
+import unittest
+import sys
+
+ROOT = Path(__file__).resolve().parents[2]
+
+
+class TestImports(unittest.TestCase):
+    def test_core_without_qt(self):
+        # a fresh interpreter, the test session itself already loaded Qt
+        code = (
+            "import sys\n"
+            "import src.core, src.core.database_manager, src.core.viewer_db, src.core.export\n"
+            "import src.core.query_builder, src.core.query_plan, src.core.search_index\n"
+            "import src.utils, src.cli\n"
+            "print(','.join(sorted(m for m in sys.modules if m.split('.')[0] == 'PySide6')))\n"
+        )
+        result = subprocess.run([sys.executable, '-c', code], cwd=ROOT, capture_output=True, text=True)
+
+        self.assertEqual(0, result.returncode, result.stderr)
+        self.assertEqual('', result.stdout.strip(), 'Core imports should not load PySide6')
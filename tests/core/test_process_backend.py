@@ -0,0 +1,135 @@
+from src.core.process_backend import ProcessBackend, pack_rows, unpack_rows
+from src.core.column_profile import profile_column, clear_profile_cache
+from src.core.database_manager import DatabaseManager
+from src.core.fan_out import run_on_all
+from src.core.table_diff import TableDiff
+from src.core.file_version import database_generation
+from array import array
+import threading
+import os
+import unittest
+import pytest
+
+
+def count_rows(db_manager, table_name, progress_callback=None, is_cancelled=None):
+    progress_callback('counting')
+    return db_manager.count_table_rows(table_name), is_cancelled()
+
+
+def exit_worker(db_manager):
+    # a worker killed mid task, e.g. when out of memory
+    os._exit(1)
+
+
+class TestPacking(unittest.TestCase):
+    def test_pack_rows(self):
+        rows = [(1, 1.5, 'a', None), (2, 2.5, 'b', 3), (2 ** 70, 0.0, 'c', 'x')]
+        packed = pack_rows(rows[:2])
+
+        self.assertIsInstance(packed[0], array, 'Integer columns should be packed into arrays')
+        self.assertIsInstance(packed[1], array, 'Float columns should be packed into arrays')
+        self.assertIsInstance(packed[2], list)
+        self.assertIsInstance(packed[3], list, 'Columns with NULLs stay lists')
+        self.assertEqual(rows[:2], unpack_rows(packed))
+
+        self.assertIsInstance(pack_rows(rows)[0], list, 'Integers beyond 64 bits stay lists')
+        self.assertEqual(rows, unpack_rows(pack_rows(rows)))
+        self.assertEqual([], unpack_rows(pack_rows([])))
+
+
+@pytest.mark.usefixtures("db_manager", "populated_db_manager")
+class TestProcessBackend(unittest.TestCase):
+    populated_db_manager: DatabaseManager
+
+    @classmethod
+    def setUpClass(cls):
+        cls.backend = ProcessBackend(2)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.backend.close()
+
+    def test_iter_query(self):
+        batches = list(self.backend.iter_query(self.populated_db_manager.db_path, "SELECT id, name FROM users", batch_size=3))
+        rows = [row for _, batch in batches for row in batch]
+
+        self.assertEqual(4, len(batches), 'Expected 10 rows in batches of 3')
+        self.assertEqual(['id', 'name'], batches[0][0])
+        self.assertEqual(self.populated_db_manager.execute_query("SELECT id, name FROM users")['rows'], rows)
+
+        # stopping early leaves the backend usable
+        batches = self.backend.iter_query(self.populated_db_manager.db_path, "SELECT id FROM users", batch_size=1)
+        next(batches)
+        batches.close()
+
+        with self.assertRaises(RuntimeError, msg='Query errors should be raised in the caller'):
+            list(self.backend.iter_query(self.populated_db_manager.db_path, "SELECT * FROM missing"))
+
+    def test_call(self):
+        progress = []
+        count, cancelled = self.backend.call(
+            count_rows, self.populated_db_manager.db_path, 'users', progress_callback=progress.append
+        )
+
+        self.assertEqual(10, count)
+        self.assertFalse(cancelled)
+        self.assertEqual(['counting'], progress, 'Progress should be passed back to the caller')
+        self.assertEqual(['users', 'posts'], self.backend.call(DatabaseManager.get_tables, self.populated_db_manager.db_path))
+
+    def test_fan_out(self):
+        data = run_on_all([self.populated_db_manager], "SELECT id FROM users", batch_size=4, backend=self.backend)
+
+        self.assertEqual(10, data['total_rows'])
+        self.assertEqual(0, data['failed'])
+
+        data = run_on_all([self.populated_db_manager], "UPDATE users SET age = 1 WHERE id = 1", backend=self.backend)
+        self.assertEqual(1, data['rows_affected'], 'Writes should run through the backend too')
+
+    def test_profile_and_diff(self):
+        clear_profile_cache()
+        profile = profile_column(self.populated_db_manager, 'users', 'age', use_cache=False, backend=self.backend)
+        expected = profile_column(self.populated_db_manager, 'users', 'age', use_cache=False)
+        for key in ('row_count', 'null_count', 'min', 'max', 'distinct_count', 'top_values'):
+            self.assertEqual(expected[key], profile[key], 'Profiles should not depend on where they are computed')
+
+        data = TableDiff(self.populated_db_manager, self.populated_db_manager, 'users', backend=self.backend).run()
+        self.assertEqual([], data['rows'], 'A table should not differ from itself')
+        self.assertEqual(10, data['unchanged'])
+
+    def test_diff_single_process(self):
+        # the merge needs both sides while one process serves them, the first
+        # side mustn't wait for its reader while the second waits for the process
+        backend = ProcessBackend(1)
+        result = []
+        diff = TableDiff(self.populated_db_manager, self.populated_db_manager, 'users', batch_size=1, backend=backend)
+        thread = threading.Thread(target=lambda: result.append(diff.run()), daemon=True)
+        try:
+            thread.start()
+            thread.join(60)
+            self.assertFalse(thread.is_alive(), 'Diff should not deadlock on a single process')
+            self.assertEqual(10, result[0]['unchanged'])
+        finally:
+            backend.close()
+
+    def test_lost_tasks(self):
+        db_path = self.populated_db_manager.db_path
+        with self.assertRaises(RuntimeError, msg='Tasks the pool can not send should fail'):
+            self.backend.call(lambda db_manager: 1, db_path)
+
+        with self.assertRaises(RuntimeError, msg='Tasks of a worker that died should fail'):
+            self.backend.call(exit_worker, db_path)
+
+        self.assertEqual(0, self.backend._pending.value, 'Lost tasks should not count as waiting')
+        self.assertEqual(10, self.backend.call(DatabaseManager.count_table_rows, db_path, 'users'),
+                         'The pool should replace the dead worker')
+
+    def test_worker_reads_are_not_changes(self):
+        db_path = self.populated_db_manager.db_path
+        generation = database_generation(db_path)
+
+        list(self.backend.iter_query(db_path, "SELECT id FROM users"))
+        self.backend.call(DatabaseManager.count_table_rows, db_path, 'users')
+        self.assertEqual(generation, database_generation(db_path), 'Reads in worker processes should not count')
+
+        self.backend.call(DatabaseManager.execute_query, db_path, "UPDATE users SET age = 1 WHERE id = 1")
+        self.assertGreater(database_generation(db_path), generation, 'Writes in worker processes should count')
@@ -0,0 +1,107 @@
+from src.core.profiling import Profiler, profiler, profiled
+from src.core.database_manager import DatabaseManager
+from pathlib import Path
+import unittest
+import tempfile
+import pytest
+import json
+
+
+class TestProfiler(unittest.TestCase):
+    def test_disabled_span_records_nothing(self):
+        instance = Profiler()
+        with instance.span('idle'):
+            pass
+
+        self.assertEqual([], instance.recent_spans(), 'A disabled profiler should not record')
+        self.assertEqual([], instance.summary())
+
+    def test_span_and_summary(self):
+        instance = Profiler()
+        instance.enable()
+
+        for _ in range(3):
+            with instance.span('load', 'database', rows=10):
+                pass
+        with instance.span('block', 'highlighter', keep=False):
+            pass
+
+        spans = instance.recent_spans()
+        self.assertEqual(3, len(spans), 'Spans with keep=False only update the statistics')
+        self.assertEqual({'rows': 10}, spans[0]['args'])
+
+        summary = {row['name']: row for row in instance.summary()}
+        self.assertEqual(3, summary['load']['count'])
+        self.assertEqual(1, summary['block']['count'])
+
+    def test_histogram(self):
+        instance = Profiler()
+        for duration_ms in (0.5, 2, 2, 5000):
+            instance.record('op', 'app', 0, int(duration_ms * 1e6))
+
+        buckets = dict(instance.histogram('op'))
+        self.assertEqual(1, buckets['< 1 ms'])
+        self.assertEqual(2, buckets['< 4 ms'])
+        self.assertEqual(1, buckets['>= 1024 ms'], 'Long spans go to the last bucket')
+
+    def test_chrome_trace(self):
+        instance = Profiler()
+        instance.enable()
+        with instance.span('load', 'database', table='users'):
+            pass
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / 'trace.json'
+            instance.write_chrome_trace(str(path))
+            trace = json.loads(path.read_text())
+
+        event = trace['traceEvents'][0]
+        self.assertEqual('X', event['ph'], 'Spans are complete events')
+        self.assertEqual('users', event['args']['table'])
+
+    def test_cprofile(self):
+        instance = Profiler()
+        instance.start_cprofile()
+        self.assertTrue(instance.cprofile_running)
+        with self.assertRaises(RuntimeError):
+            instance.start_cprofile()
+
+        self.assertIsNotNone(instance.stop_cprofile())
+        self.assertFalse(instance.cprofile_running)
+
+    def test_profiled_decorator(self):
+        @profiled('double', 'app')
+        def double(x):
+            return x * 2
+
+        profiler.clear()
+        self.assertEqual(4, double(2))
+        self.assertEqual([], profiler.summary(), 'Decorated calls are free while disabled')
+
+        profiler.enable()
+        try:
+            double(2)
+        finally:
+            profiler.disable()
+
+        self.assertEqual('double', profiler.summary()[0]['name'])
+        profiler.clear()
+
+
+@pytest.mark.usefixtures("db_manager", "populated_db_manager")
+class TestDatabaseManagerSpans(unittest.TestCase):
+    db_manager: DatabaseManager
+
+    def test_execute_query_spans(self):
+        profiler.clear()
+        profiler.enable()
+        try:
+            self.db_manager.execute_query('SELECT * FROM users')
+        finally:
+            profiler.disable()
+
+        names = {row['name'] for row in profiler.summary()}
+        self.assertIn('DatabaseManager.execute_query', names)
+        self.assertIn('engine.execute', names, 'Engine time should be split from the call')
+        self.assertIn('engine.fetch', names)
+        profiler.clear()
@@ -0,0 +1,42 @@
+from src.core.projection import CellPreview, preview_rows, project_result
+import unittest
+
+
+class TestProjection(unittest.TestCase):
+    def test_preview_rows(self):
+        rows = [(1, 'short', None), (2, 'x' * 50, b'\x00' * 40)]
+
+        self.assertIs(rows, preview_rows(rows, 0), 'preview_chars 0 should keep every value')
+
+        result = preview_rows(rows, 10)
+        self.assertIs(rows[0], result[0], 'Rows without large values should not be copied')
+        self.assertEqual(2, result[1][0])
+
+        text, data = result[1][1], result[1][2]
+        self.assertIsInstance(text, CellPreview)
+        self.assertEqual('x' * 10, text.value)
+        self.assertEqual(50, text.size)
+        self.assertEqual('x' * 10 + '…', str(text))
+        self.assertFalse(text.is_bytes)
+
+        self.assertTrue(data.is_bytes)
+        self.assertEqual(40, data.size)
+        self.assertEqual('00 ' * 9 + '00…', str(data), 'Bytes should be shown as hex')
+
+    def test_project_result(self):
+        data = {
+            'columns': ['id', 'name', 'body'],
+            'rows': [(1, 'a', 'y' * 20), (2, 'b', None)],
+            'total_rows': 2,
+            'seed': 7
+        }
+
+        result = project_result(data, ['body', 'id'])
+        self.assertEqual(['id', 'body'], result['columns'], 'Columns should keep their result order')
+        self.assertEqual([(1, 'y' * 20), (2, None)], result['rows'])
+        self.assertEqual(7, result['seed'], 'Other keys should be kept')
+        self.assertEqual(['id', 'name', 'body'], data['columns'], 'The result should not be changed in place')
+
+        result = project_result(data, None, preview_chars=5)
+        self.assertEqual(['id', 'name', 'body'], result['columns'])
+        self.assertIsInstance(result['rows'][0][2], CellPreview)
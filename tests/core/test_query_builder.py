@@ -0,0 +1,110 @@
+from src.core import query_builder
+import unittest
+
+
+class TestQueryBuilder(unittest.TestCase):
+    def test_validate_identifier(self):
+        self.assertEqual('users', query_builder.validate_identifier('users'))
+
+        with self.assertRaises(ValueError, msg='Injected identifier should be rejected'):
+            query_builder.validate_identifier('users; DROP TABLE users')
+
+    def test_build_search_clause(self):
+        where, params = query_builder.build_search_clause([
+            {'condition': ('body', "it's"), 'type': 'LIKE'},
+            {'condition': ('id', 1), 'type': 'EQUALS'},
+            {'condition': ('name', 'Te'), 'type': 'PREFIX'},
+            {'condition': ('age', (20, None)), 'type': 'RANGE'},
+        ])
+
+        # equality first, then prefix, contains and range
+        self.assertEqual('(id = ? OR name LIKE ? OR body LIKE ? OR (age >= ?))', where)
+        self.assertEqual([1, 'Te%', "%it's%", 20], params, 'Values should be bound, not interpolated')
+
+        with self.assertRaises(ValueError, msg='Invalid filter type should raise'):
+            query_builder.build_search_clause([{'condition': ('id', 1), 'type': 'LESS'}])
+
+    def test_escape_like(self):
+        self.assertEqual('plain', query_builder.escape_like('plain'))
+        self.assertEqual(r'50\x25a\x5fb', query_builder.escape_like('50%a_b'), 'Wildcards should match themselves')
+        self.assertEqual(r'a\(b\.', query_builder.escape_like('a(b.'), 'Regex metacharacters should be escaped')
+
+        where, params = query_builder.build_search_clause([{'condition': ('name', '1_(x'), 'type': 'CONTAINS'}])
+        self.assertEqual([r'%1\x5f\(x%'], params)
+
+    def test_build_paginated_select(self):
+        query, params = query_builder.build_paginated_select(
+            'users',
+            {
+                'columns': [{'condition': ('name', 'Test'), 'type': 'CONTAINS'}],
+                'sorting': {'column': 'name', 'order': 'DESC'}
+            },
+            50,
+            100
+        )
+
+        self.assertEqual('SELECT * FROM users WHERE (name LIKE ?) ORDER BY name DESC LIMIT ? OFFSET ?', query)
+        self.assertEqual(['%Test%', 50, 100], params)
+
+        # empty search columns shouldn't add a WHERE
+        query, params = query_builder.build_paginated_select('users', {'columns': []}, 25, 0)
+        self.assertEqual('SELECT * FROM users LIMIT ? OFFSET ?', query)
+
+        # projected columns, sorting may use a column that isn't selected
+        query, params = query_builder.build_paginated_select(
+            'users', {'sorting': {'column': 'age', 'order': 'ASC'}}, 25, 0, ['id', 'name']
+        )
+        self.assertEqual('SELECT id, name FROM users ORDER BY age ASC LIMIT ? OFFSET ?', query)
+
+        query, params = query_builder.build_paginated_select(
+            'users', {'keys': {'column': 'id', 'values': [1, 2]}}, 25, 0, ['id', 'email']
+        )
+        self.assertTrue(query.startswith('SELECT id, email FROM users WHERE id IN'), 'Key lookups should be projected too')
+
+        with self.assertRaises(ValueError, msg='Projected columns should be validated'):
+            query_builder.build_paginated_select('users', None, 25, 0, ['name; DROP TABLE users'])
+
+    def test_build_count_select(self):
+        query, params = query_builder.build_count_select(
+            'users',
+            {
+                'columns': [{'condition': ('age', 20), 'type': 'EQUALS'}],
+                'sorting': {'column': 'name', 'order': 'DESC'}
+            }
+        )
+
+        self.assertEqual('SELECT COUNT(*) FROM users WHERE (age = ?)', query, 'Sorting should not be in a count')
+        self.assertEqual([20], params)
+
+        query, params = query_builder.build_count_select('users')
+        self.assertEqual('SELECT COUNT(*) FROM users', query)
+
+    def test_build_column_filter(self):
+        # indexed text column prefers prefix
+        column_filter = query_builder.build_column_filter('email', 'TEXT', 'email1', indexed=True)
+        self.assertEqual('PREFIX', column_filter['type'])
+
+        column_filter = query_builder.build_column_filter('body', 'TEXT', 'Ydob')
+        self.assertEqual('CONTAINS', column_filter['type'])
+
+        # numeric columns only take converted values
+        column_filter = query_builder.build_column_filter('age', 'INTEGER', '25')
+        self.assertEqual({'condition': ('age', 25), 'type': 'EXACT'}, column_filter)
+        self.assertIsNone(query_builder.build_column_filter('age', 'INTEGER', 'abc'))
+
+        column_filter = query_builder.build_column_filter('age', 'INTEGER', '20..30')
+        self.assertEqual({'condition': ('age', (20, 30)), 'type': 'RANGE'}, column_filter)
+
+        column_filter = query_builder.build_column_filter('amount', 'REAL', '1.5..', query_builder.RANGE)
+        self.assertEqual(('amount', (1.5, None)), column_filter['condition'])
+
+        # contains on a number falls back to exact
+        column_filter = query_builder.build_column_filter('age', 'INTEGER', '25', query_builder.CONTAINS)
+        self.assertEqual('EXACT', column_filter['type'])
+
+        # words are looked up in the search index, never in SQL
+        column_filter = query_builder.build_column_filter('body', 'TEXT', 'hel', query_builder.WORDS)
+        self.assertEqual({'condition': ('body', 'hel'), 'type': 'WORDS'}, column_filter)
+        self.assertIsNone(query_builder.build_column_filter('age', 'INTEGER', '25', query_builder.WORDS))
+        with self.assertRaises(ValueError, msg='Word filters have no SQL predicate'):
+            query_builder.build_search_clause([column_filter])
@@ -0,0 +1,62 @@
+from src.core import query_plan
+import unittest
+import pytest
+
+
+def _operations(node):
+    return [node['operation']] + [op for child in node['children'] for op in _operations(child)]
+
+
+@pytest.mark.usefixtures("db_manager", "populated_db_manager")
+class TestQueryPlan(unittest.TestCase):
+    def test_explain_select(self):
+        plan = self.populated_db_manager.explain_query(
+            "SELECT name, age FROM users WHERE age >= 20 ORDER BY age DESC LIMIT 5"
+        )
+
+        self.assertEqual(
+            ['Limit', 'Project', 'Sort', 'Filter', 'Full Table Scan'],
+            _operations(plan),
+            'Plan should follow execution stages'
+        )
+
+        scan = plan['children'][0]['children'][0]['children'][0]['children'][0]
+        self.assertTrue(scan['full_scan'], 'Table reads should be flagged as full scans')
+        self.assertEqual(10, scan['estimated_rows'], 'Scan estimate should be the table row count')
+        self.assertLessEqual(plan['estimated_rows'], 5, 'Limit should cap the estimate')
+        self.assertIsNone(plan['actual_rows'], 'Explain should not run the query')
+
+    def test_explain_index_candidate(self):
+        plan = self.populated_db_manager.explain_query("SELECT * FROM users WHERE email = 'email1@email.com'")
+
+        filter_node = plan['children'][0]
+        scan = filter_node['children'][0]
+        self.assertEqual(1, filter_node['estimated_rows'], 'Unique lookup should match one row')
+        self.assertIn('email', scan['index'], 'Unique column should be an index candidate')
+
+        plan = self.populated_db_manager.explain_query("SELECT * FROM users WHERE name LIKE '%User%'")
+        self.assertIsNone(plan['children'][0]['children'][0]['index'], 'Contains search cannot use an index')
+
+    def test_explain_write(self):
+        plan = self.populated_db_manager.explain_query("DELETE FROM users WHERE age > 30")
+        self.assertEqual(['Delete', 'Filter', 'Full Table Scan'], _operations(plan))
+
+    def test_analyze(self):
+        plan = self.populated_db_manager.explain_query(
+            "SELECT COUNT(*) FROM users WHERE age > 25 GROUP BY age", analyze=True
+        )
+
+        filter_node = plan['children'][0]['children'][0]
+        scan = filter_node['children'][0]
+        self.assertEqual(10, scan['actual_rows'], 'Scan should read every row')
+        self.assertEqual(8, filter_node['actual_rows'], 'Expected 8 users older than 25')
+        self.assertIsNotNone(filter_node['time_ms'], 'Each step should be timed')
+
+        with self.assertRaises(ValueError, msg='Analyze should never run writes'):
+            self.populated_db_manager.explain_query("DELETE FROM users", analyze=True)
+
+        self.assertEqual(10, self.populated_db_manager.count_table_rows('users'))
+
+    def test_format_condition(self):
+        plan = self.populated_db_manager.explain_query("SELECT * FROM users WHERE age > 20 OR name = 'Test'")
+        self.assertEqual("(age > 20 OR name = 'Test')", plan['children'][0]['detail'])
@@ -0,0 +1,34 @@
+from src.core.result_cache import ResultCache, normalize_sql, estimate_size
+import unittest
+
+
+class TestResultCache(unittest.TestCase):
+    def test_normalize_sql(self):
+        self.assertEqual(
+            "SELECT * FROM users WHERE name = 'a  b'",
+            normalize_sql("  SELECT *\n  FROM users\tWHERE name = 'a  b' ; "),
+            'Whitespace outside strings should collapse'
+        )
+
+    def test_lru_eviction(self):
+        result = {'columns': ['id'], 'rows': [(1,), (2,)]}
+        size = estimate_size(result)
+        cache = ResultCache(max_bytes=size * 2)
+
+        cache.put('a', result)
+        cache.put('b', result)
+        self.assertIsNotNone(cache.get('a'), 'a should be cached')
+
+        # b is now the least recently used entry
+        cache.put('c', result)
+        self.assertIsNone(cache.get('b'), 'b should be evicted')
+        self.assertIsNotNone(cache.get('c'))
+        self.assertEqual(2, len(cache))
+        self.assertEqual({'hits': 2, 'misses': 1, 'entries': 2, 'size': size * 2}, cache.stats())
+
+        # results larger than the cache are not stored
+        cache.put('big', {'columns': ['id'], 'rows': [(x,) for x in range(100)]})
+        self.assertIsNone(cache.get('big'))
+
+        cache.clear()
+        self.assertEqual(0, cache.size)
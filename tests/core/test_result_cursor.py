@@ -0,0 +1,58 @@
+from src.core.database_manager import DatabaseManager
+from src.core.result_cursor import ResultCursor
+import unittest
+import pytest
+
+
+@pytest.mark.usefixtures("db_manager", "populated_db_manager")
+class TestResultCursor(unittest.TestCase):
+    populated_db_manager: DatabaseManager
+
+    def test_fetch_more(self):
+        data = self.populated_db_manager.execute_query("SELECT id FROM users", max_rows=4, keep_cursor=True)
+        cursor = data['cursor']
+
+        self.assertTrue(data['truncated'])
+        self.assertEqual(4, len(data['rows']))
+        self.assertIsInstance(cursor, ResultCursor, 'A truncated result should keep its cursor')
+        self.assertEqual(10, cursor.total_rows)
+        self.assertEqual(6, cursor.remaining_rows)
+
+        self.assertEqual([(5,), (6,), (7,)], cursor.fetch(3), 'Rows should continue after the first batch')
+        self.assertFalse(cursor.closed)
+        self.assertEqual([(8,), (9,), (10,)], cursor.fetch(0), 'Zero fetches the rest')
+        self.assertTrue(cursor.closed, 'The cursor should close after the last row')
+        self.assertEqual(0, cursor.remaining_rows)
+
+        with self.assertRaises(RuntimeError):
+            cursor.fetch(1)
+
+    def test_no_cursor(self):
+        data = self.populated_db_manager.execute_query("SELECT id FROM users", max_rows=10, keep_cursor=True)
+        self.assertNotIn('cursor', data, 'Complete results have nothing left to fetch')
+
+        data = self.populated_db_manager.execute_query("SELECT id FROM users", max_rows=4)
+        self.assertNotIn('cursor', data, 'Cursors are only kept when asked for')
+
+        # a cached result can't be continued, the query runs again
+        self.populated_db_manager.enable_result_cache()
+        self.populated_db_manager.execute_query("SELECT id FROM users", max_rows=4)
+        data = self.populated_db_manager.execute_query("SELECT id FROM users", max_rows=4, keep_cursor=True)
+        self.assertFalse(data['cached'])
+        self.assertEqual(6, len(data['cursor'].fetch(0)))
+
+    def test_writes_while_open(self):
+        cursor = self.populated_db_manager.execute_query("SELECT id FROM users", max_rows=2, keep_cursor=True)['cursor']
+        self.populated_db_manager.execute_query("DELETE FROM users WHERE id > 5")
+
+        self.assertEqual(8, len(cursor.fetch(0)), 'The cursor reads the result as it was executed')
+        cursor.close()
+        self.assertEqual(5, self.populated_db_manager.count_table_rows('users'), 'An open cursor must not undo writes')
+
+    def test_expired(self):
+        cursor = self.populated_db_manager.execute_query("SELECT id FROM users", max_rows=2, keep_cursor=True)['cursor']
+
+        self.assertFalse(cursor.expired())
+        self.assertTrue(cursor.expired(cursor.last_used + cursor.max_idle + 1), 'Unused cursors should expire')
+        cursor.close()
+        self.assertTrue(cursor.closed)
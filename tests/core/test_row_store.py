@@ -0,0 +1,85 @@
+from src.core.row_store import RowStore, sorted_by_column, numeric_key, text_key
+from src.core.result_cache import estimate_size
+from unittest import mock
+import unittest
+import random
+
+
+def make_rows(count: int, seed: int = 1):
+    rng = random.Random(seed)
+    return [(idx, rng.random() if idx % 7 else None, f"name {rng.randint(0, 1000)}") for idx in range(count)]
+
+
+@mock.patch('src.core.row_store.MIN_RUN_ROWS', 500)
+class TestRowStore(unittest.TestCase):
+    def setUp(self):
+        self.rows = make_rows(5000)
+        # a few hundred rows fit, the rest spill
+        self.spill_bytes = estimate_size({'rows': self.rows[:300]})
+
+    def spilled_store(self) -> RowStore:
+        store = RowStore(spill_bytes=self.spill_bytes)
+        for start in range(0, len(self.rows), 777):
+            store.extend(self.rows[start:start + 777])
+        self.addCleanup(store.close)
+        return store
+
+    def test_in_memory(self):
+        store = RowStore(list(self.rows), spill_bytes=0)
+
+        self.assertFalse(store.spilled, 'A zero budget should never spill')
+        self.assertEqual(self.rows[10:20], store[10:20])
+        self.assertGreater(store.memory_bytes, 0)
+        self.assertEqual(0, store.disk_bytes)
+
+    def test_spill(self):
+        store = self.spilled_store()
+
+        self.assertTrue(store.spilled, 'Rows past the budget should go to disk')
+        self.assertGreater(store.disk_bytes, 0)
+        self.assertLess(store.memory_bytes, self.spill_bytes, 'Memory should stay within the budget')
+        self.assertEqual(len(self.rows), len(store))
+        self.assertEqual(self.rows, store[:], 'Rows should read back in order')
+        self.assertEqual(self.rows[995:2010], store[995:2010], 'Pages may span blocks and the in-memory tail')
+        self.assertEqual(self.rows[-3:], store[-3:])
+        self.assertEqual(self.rows[-1], store[-1])
+        self.assertEqual(self.rows[5:50:7], store[5:50:7])
+        self.assertEqual(self.rows, list(store))
+        self.assertEqual(len(self.rows), sum(len(batch) for batch in store.iter_batches(1234)))
+
+        with self.assertRaises(IndexError):
+            store[len(self.rows)]
+
+    def test_sort(self):
+        store = self.spilled_store()
+
+        for column in range(3):
+            for reverse in (False, True):
+                result = sorted_by_column(store, column, reverse)
+                try:
+                    expected = sorted(self.rows, key=numeric_key(column), reverse=reverse)
+                except (ValueError, TypeError):
+                    expected = sorted(self.rows, key=text_key(column), reverse=reverse)
+
+                self.assertTrue(result.spilled, 'Sorted spilled rows should stay on disk')
+                self.assertEqual(expected, result[:], f'Column {column} sorted wrong, reverse={reverse}')
+                result.close()
+
+        self.assertEqual(self.rows, store[:], 'Sorting a copy should leave the store unchanged')
+
+        store.sort(text_key(2))
+        self.assertEqual(sorted(self.rows, key=text_key(2)), store[:])
+
+    def test_sort_cancel(self):
+        store = self.spilled_store()
+
+        with self.assertRaises(RuntimeError):
+            store.sorted(numeric_key(0), is_cancelled=lambda: True)
+        self.assertEqual(self.rows, store[:], 'A cancelled sort should leave the store intact')
+
+    def test_close(self):
+        store = self.spilled_store()
+        store.close()
+
+        self.assertFalse(store.spilled, 'Closing should delete the spill file')
+        self.assertEqual(0, len(store))
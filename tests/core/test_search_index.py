@@ -0,0 +1,120 @@
+from src.core.search_index import SearchIndex, load_indexes, save_indexes, index_path, tokenize, search_words
+from src.core.query_builder import PREFIX
+from pathlib import Path
+import unittest
+import pytest
+
+
+@pytest.mark.usefixtures("populated_db_manager")
+class TestSearchIndex(unittest.TestCase):
+    def setUp(self):
+        self.index = SearchIndex(self.populated_db_manager.db_path, 'posts', 'id', ['title', 'body'])
+        self.index.build(self.populated_db_manager, batch_size=3)
+
+    def tearDown(self):
+        index_path(self.populated_db_manager.db_path).unlink(missing_ok=True)
+
+    def test_tokenize(self):
+        self.assertEqual(['test', 'body', '2'], tokenize('Test Body 2'))
+        self.assertEqual([], tokenize(None), 'NULL values have no tokens')
+
+    def test_build(self):
+        progress = []
+        index = SearchIndex(self.populated_db_manager.db_path, 'posts', 'id', ['body'])
+        index.build(self.populated_db_manager, batch_size=4, progress_callback=progress.append)
+
+        self.assertEqual(10, index.row_count, 'All rows should be indexed')
+        self.assertEqual([4, 8, 10], progress, 'Progress should be reported per batch')
+        self.assertFalse(index.is_stale(), 'Freshly built index should not be stale')
+
+        # cancelled builds are never fresh
+        index.build(self.populated_db_manager, is_cancelled=lambda: True)
+        self.assertTrue(index.is_stale(), 'Cancelled build should be stale')
+
+    def test_search(self):
+        # term search
+        keys = self.index.search('Ydob')
+        self.assertEqual(5, len(keys), 'Expected 5 rows containing Ydob')
+        self.assertEqual(sorted(keys), keys, 'Keys should be sorted')
+
+        # every term has to match, last term is a prefix
+        self.assertEqual(1, len(self.index.search('ydob 3')), 'Expected 1 row for ydob 3')
+        self.assertEqual(5, len(self.index.search('Yd')), 'Prefix should match Ydob')
+        self.assertEqual(0, len(self.index.search('Yd', prefix=False)), 'Yd is not a whole term')
+        self.assertEqual(0, len(self.index.search('missing')), 'Unknown term should match nothing')
+
+        # only the given columns are searched, all terms in one of them
+        self.assertEqual(0, len(self.index.search('Ydob', ['title'])), 'Ydob is only in body')
+        self.assertEqual(5, len(self.index.search('Ydob', ['title', 'body'])), 'Expected 5 rows over both columns')
+        self.assertEqual(1, len(self.index.search('title 3', ['title'])), 'Expected 1 row for title 3')
+        self.assertEqual(0, len(self.index.search('title ydob')), 'Terms should match in the same column')
+
+    def test_stale_on_change(self):
+        self.assertFalse(self.index.is_stale())
+
+        self.populated_db_manager.insert_row('posts', {'user_id': 1, 'title': 'New', 'body': 'New body'})
+        self.assertTrue(self.index.is_stale(), 'Index should be stale after a write')
+
+    def test_save_and_load(self):
+        save_indexes(self.populated_db_manager.db_path, {'posts': self.index})
+        self.assertTrue(index_path(self.populated_db_manager.db_path).exists(), 'Sidecar file should be written')
+
+        indexes = load_indexes(self.populated_db_manager.db_path)
+        loaded = indexes.get('posts')
+        self.assertIsNotNone(loaded, 'Posts index should be loaded')
+        self.assertEqual(self.index.search('body'), loaded.search('body'), 'Loaded index should match')
+        self.assertFalse(loaded.is_stale(), 'Version should be restored')
+        self.assertTrue(loaded.covers(['body']))
+        self.assertFalse(loaded.covers(['body', 'user_id']))
+
+        # broken sidecar is ignored
+        Path(index_path(self.populated_db_manager.db_path)).write_text('{not json')
+        self.assertEqual({}, load_indexes(self.populated_db_manager.db_path))
+
+    def test_paginated_by_keys(self):
+        keys = self.index.search('Ydob')
+        data = self.populated_db_manager.get_table_data_paginated(
+            'posts',
+            page_size=2,
+            filters={'keys': {'column': 'id', 'values': keys}}
+        )
+
+        self.assertEqual(2, data['displayed_rows'], 'Expected a page of 2 rows')
+        self.assertEqual(keys[:2], [row[0] for row in data['rows']], 'Page should follow key order')
+
+        data = self.populated_db_manager.get_table_data_paginated(
+            'posts',
+            filters={'keys': {'column': 'id', 'values': []}}
+        )
+        self.assertEqual(0, data['displayed_rows'], 'No keys should match no rows')
+
+    def test_search_words(self):
+        db_manager = self.populated_db_manager
+        db_manager.execute_query("CREATE TABLE notes (id INTEGER PRIMARY KEY, body TEXT)")
+        for idx, body in enumerate(['hello world', 'say hello', 'help']):
+            db_manager.insert_row('notes', {'id': idx + 1, 'body': body})
+        index = SearchIndex(db_manager.db_path, 'notes', 'id', ['body']).build(db_manager)
+
+        def like_prefix(text):
+            filters = {'columns': [{'condition': ('body', text), 'type': PREFIX}]}
+            return [row[0] for row in db_manager.get_table_data_paginated('notes', filters=filters)['rows']]
+
+        # a prefix match is on the whole value, word search finds words anywhere
+        for text, prefix_keys, word_keys in (
+            ('hel', [1, 3], [1, 2, 3]),
+            ('hello wor', [1], [1]),
+            ('world hello', [], [1]),
+            ('hello', [1], [1, 2]),
+        ):
+            self.assertEqual(prefix_keys, like_prefix(text), f'Prefix search for {text!r}')
+            self.assertEqual((word_keys, None), search_words(db_manager, 'notes', 'id', ['body'], text, index),
+                             f'Word search for {text!r} from the index')
+            self.assertEqual((word_keys, None), search_words(db_manager, 'notes', 'id', ['body'], text),
+                             f'Word search for {text!r} without an index should match the same rows')
+
+        # a stale index is rebuilt to answer
+        db_manager.insert_row('notes', {'id': 4, 'body': 'hello again'})
+        keys, rebuilt = search_words(db_manager, 'notes', 'id', ['body'], 'hello', index)
+        self.assertEqual([1, 2, 4], keys)
+        self.assertIsNotNone(rebuilt, 'The rebuilt index should replace the stale one')
+        self.assertFalse(rebuilt.is_stale())
@@ -0,0 +1,42 @@
+from src.core.sql_lexer import (
+    tokenize_line, KEYWORD, FUNCTION, STRING, NUMBER, COMMENT,
+    STATE_NORMAL, STATE_BLOCK_COMMENT, STATE_SINGLE_QUOTE
+)
+import unittest
+
+
+class TestSqlLexer(unittest.TestCase):
+    def test_tokens(self):
+        text = "select count(id) FROM users WHERE age > 25.5 AND name = 'o''neil -- x' -- note"
+        tokens, state = tokenize_line(text)
+        kinds = [(text[start:start + length], kind) for start, length, kind in tokens]
+
+        self.assertEqual([
+            ('select', KEYWORD), ('count', FUNCTION), ('FROM', KEYWORD), ('WHERE', KEYWORD),
+            ('25.5', NUMBER), ('AND', KEYWORD), ("'o''neil -- x'", STRING), ('-- note', COMMENT),
+        ], kinds, 'Keywords are case insensitive, comments inside strings are part of the string')
+        self.assertEqual(STATE_NORMAL, state)
+
+    def test_identifiers_are_not_keywords_or_numbers(self):
+        tokens, _ = tokenize_line("SELECT user_id, col2 FROM t1")
+        self.assertEqual([(0, 6, KEYWORD), (21, 4, KEYWORD)], tokens)
+
+    def test_block_comment_state(self):
+        tokens, state = tokenize_line("SELECT 1 /* start")
+        self.assertEqual(STATE_BLOCK_COMMENT, state, 'An open block comment carries to the next line')
+        self.assertEqual((9, 8, COMMENT), tokens[-1])
+
+        tokens, state = tokenize_line("SELECT still comment", state)
+        self.assertEqual([(0, 20, COMMENT)], tokens, 'A line inside a comment is all comment')
+
+        tokens, state = tokenize_line("end */ SELECT", state)
+        self.assertEqual([(0, 6, COMMENT), (7, 6, KEYWORD)], tokens)
+        self.assertEqual(STATE_NORMAL, state)
+
+    def test_multi_line_string_state(self):
+        _, state = tokenize_line("INSERT INTO t VALUES ('first")
+        self.assertEqual(STATE_SINGLE_QUOTE, state)
+
+        tokens, state = tokenize_line("second SELECT', 2)", state)
+        self.assertEqual([(0, 14, STRING), (16, 1, NUMBER)], tokens, 'Keywords inside the string are not highlighted')
+        self.assertEqual(STATE_NORMAL, state)
@@ -0,0 +1,61 @@
+from src.core import sql_script
+import unittest
+import tempfile
+import os
+
+
+class TestSqlScript(unittest.TestCase):
+    def test_split_statements(self):
+        statements = sql_script.split_statements(
+            "SELECT * FROM users; INSERT INTO users (name) VALUES ('a;b');\n\nSELECT 1"
+        )
+        self.assertEqual(
+            ['SELECT * FROM users', "INSERT INTO users (name) VALUES ('a;b')", 'SELECT 1'],
+            statements,
+            'Semicolons in strings should not split'
+        )
+
+        # escaped quotes and quoted identifiers
+        statements = sql_script.split_statements("""SELECT 'it''s; fine' FROM "a;b"; DELETE FROM users""")
+        self.assertEqual(["SELECT 'it''s; fine' FROM \"a;b\"", 'DELETE FROM users'], statements)
+
+    def test_split_comments(self):
+        statements = sql_script.split_statements(
+            "-- first; statement\nSELECT * FROM users; /* block; comment */ SELECT/**/1;\n-- trailing"
+        )
+        self.assertEqual(['SELECT * FROM users', 'SELECT 1'], statements, 'Comments should be dropped')
+
+        # comment markers inside strings are kept
+        statements = sql_script.split_statements("SELECT '--not a comment' FROM users")
+        self.assertEqual(["SELECT '--not a comment' FROM users"], statements)
+
+        self.assertEqual([], sql_script.split_statements(' ;; -- only a comment'), 'Empty statements are skipped')
+
+    def test_splitter_chunks(self):
+        script = "SELECT 'a;''b' FROM users; -- c;d\nSELECT/* x;y */1; SELECT \"e;f\""
+        expected = sql_script.split_statements(script)
+
+        # every chunk size cuts quotes and comment markers somewhere
+        for size in range(1, len(script) + 1):
+            splitter = sql_script.StatementSplitter()
+            statements = []
+            for start in range(0, len(script), size):
+                statements.extend(splitter.feed(script[start:start + size]))
+            statements.extend(splitter.finish())
+            self.assertEqual(expected, statements, f'Chunks of {size} should split like the whole script')
+
+    def test_iter_file_statements(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'script.sql')
+            sql_script.write_script(path, "SELECT 1;\nSELECT 'two;';\nSELECT 3")
+
+            progress = []
+            statements = list(sql_script.iter_file_statements(path, chunk_size=4, progress_callback=progress.append))
+
+        self.assertEqual(['SELECT 1', "SELECT 'two;'", 'SELECT 3'], statements)
+        self.assertEqual(progress[-1][0], progress[-1][1], 'Progress should end at the file size')
+
+    def test_returns_rows(self):
+        self.assertTrue(sql_script.returns_rows('select * from users'))
+        self.assertTrue(sql_script.returns_rows('PRAGMA table_info(users)'))
+        self.assertFalse(sql_script.returns_rows('DELETE FROM users'))
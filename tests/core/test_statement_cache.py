@@ -0,0 +1,51 @@
+from src.core.statement_cache import StatementCache
+from ribbitxdb.query.parser import SQLParser
+import unittest
+import pytest
+
+
+@pytest.mark.usefixtures("db_manager", "populated_db_manager")
+class TestStatementCache(unittest.TestCase):
+    def test_template_reuse(self):
+        parser = SQLParser()
+        cache = StatementCache()
+        sql = "SELECT * FROM users WHERE (name LIKE ?) ORDER BY name DESC LIMIT ? OFFSET ?"
+
+        first = cache.get(parser, sql, ('%Test%', 50, 0))
+        second = cache.get(parser, sql, ("%it's%", 25, 100))
+
+        self.assertEqual(parser.parse("SELECT * FROM users WHERE (name LIKE '%Test%') ORDER BY name DESC LIMIT 50 OFFSET 0"), first)
+        self.assertEqual(
+            parser.parse("SELECT * FROM users WHERE (name LIKE '%it''s%') ORDER BY name DESC LIMIT 25 OFFSET 100"),
+            second,
+            'Cached template should be filled with the new parameters'
+        )
+        self.assertEqual(1, cache.hits, 'Second call should reuse the parsed template')
+        self.assertEqual(1, cache.misses)
+
+        # NULL parameters are parsed as usual
+        self.assertIsNone(cache.get(parser, sql, (None, 50, 0)))
+
+    def test_eviction(self):
+        parser = SQLParser()
+        cache = StatementCache(max_size=2)
+
+        for table in ('users', 'posts', 'users_view'):
+            cache.get(parser, f"SELECT * FROM {table}")
+
+        self.assertEqual(2, len(cache), 'Least recently used statement should be evicted')
+
+    def test_manager_queries(self):
+        cache = self.populated_db_manager.statement_cache
+        cache.clear()
+
+        for page in (1, 2, 1):
+            data = self.populated_db_manager.get_table_data_paginated('users', page=page, page_size=4)
+            self.assertEqual(4, data['displayed_rows'])
+
+        self.assertEqual(
+            [5, 6, 7, 8],
+            [row[0] for row in self.populated_db_manager.get_table_data_paginated('users', page=2, page_size=4)['rows']],
+            'Cached page query should bind the new offset'
+        )
+        self.assertGreaterEqual(cache.stats()['hits'], 6, 'Page loads should reuse parsed statements')
@@ -0,0 +1,99 @@
+from src.core.table_diff import (
+    TableDiff, merge_diff, diff_batches, diff_columns, ADDED, REMOVED, CHANGED, UNCHANGED
+)
+from src.core.database_manager import DatabaseManager
+from pathlib import Path
+import unittest
+import tempfile
+import shutil
+import pytest
+
+
+class TestMergeDiff(unittest.TestCase):
+    def test_merge(self):
+        left = [(1, 'a', 10), (2, 'b', 20), (4, 'd', 40)]
+        right = [(1, 'a', 10), (2, 'b', 21), (3, 'c', 30)]
+        rows = list(merge_diff(left, right, 1))
+
+        self.assertEqual(
+            [(CHANGED, (2, 'b', 20), (2, 'b', 21), [2]), (ADDED, None, (3, 'c', 30), []), (REMOVED, (4, 'd', 40), None, [])],
+            rows,
+            'Expected one change, one addition and one removal in key order'
+        )
+
+        statuses = [row[0] for row in merge_diff(left, right, 1, include_unchanged=True)]
+        self.assertEqual([UNCHANGED, CHANGED, ADDED, REMOVED], statuses)
+
+    def test_composite_key(self):
+        left = [(1, 1, 'x'), (1, 2, 'y')]
+        right = [(1, 2, 'z'), (2, 1, 'x')]
+        statuses = [row[0] for row in merge_diff(left, right, 2)]
+        self.assertEqual([REMOVED, CHANGED, ADDED], statuses, 'Rows should be matched on both key columns')
+
+    def test_empty_sides(self):
+        self.assertEqual([], list(merge_diff([], [], 1)))
+        self.assertEqual([ADDED, ADDED], [row[0] for row in merge_diff([], [(1,), (2,)], 1)])
+        self.assertEqual([REMOVED], [row[0] for row in merge_diff([(1,)], [], 1)])
+
+    def test_diff_batches(self):
+        columns = ['id', 'name', 'age']
+        rows = merge_diff([(1, 'a', 10), (2, 'b', 20)], [(1, 'a', 11), (3, 'c', 30)], 1)
+        batches = list(diff_batches(rows, columns, 1, batch_size=2))
+
+        header = diff_columns(columns, 1)
+        self.assertEqual(['status', 'id', 'changed_columns', 'name (left)', 'name (right)', 'age (left)', 'age (right)'], header)
+        self.assertEqual([2, 1], [len(batch) for _, batch in batches], 'Rows should be split into batches')
+        self.assertEqual((CHANGED, 1, 'age', 'a', 'a', 10, 11), batches[0][1][0])
+        self.assertEqual((ADDED, 3, '', None, 'c', None, 30), batches[1][1][0])
+
+        self.assertEqual([(header, [])], list(diff_batches([], columns, 1)), 'The header is kept without differences')
+
+
+@pytest.mark.usefixtures("db_manager", "populated_db_manager")
+class TestTableDiff(unittest.TestCase):
+    populated_db_manager: DatabaseManager
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        path = Path(self.tmp.name) / 'copy.rbx'
+        shutil.copyfile(self.populated_db_manager.db_path, path)
+        self.copy = DatabaseManager(str(path))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_diff(self):
+        self.copy.execute_query("DELETE FROM users WHERE id = 2")
+        self.copy.execute_query("UPDATE users SET age = 99 WHERE id = 5")
+        self.copy.execute_query("INSERT INTO users (id, name, email, age) VALUES (20, 'New', 'new@email.com', 1)")
+
+        progress = []
+        diff = TableDiff(self.populated_db_manager, self.copy, 'users', batch_size=3)
+        result = diff.run(progress_callback=progress.append)
+
+        self.assertEqual('id', diff.columns[0], 'Key columns come first')
+        self.assertEqual((1, 1, 1, 8), (result['added'], result['removed'], result['changed'], result['unchanged']))
+        self.assertEqual((10, 10), (result['left_rows'], result['right_rows']))
+        self.assertEqual([REMOVED, CHANGED, ADDED], [row[0] for row in result['rows']])
+        self.assertEqual(['age'], [diff.columns[idx] for idx in result['rows'][1][3]], 'Only age should be marked')
+        self.assertEqual((10, 10), progress[-1], 'Progress should count the rows read on each side')
+
+        limited = diff.run(max_rows=1)
+        self.assertEqual(1, len(limited['rows']), 'Kept rows should be limited')
+        self.assertEqual(1, limited['added'], 'Counts should cover every row')
+
+    def test_identical(self):
+        summary = TableDiff(self.populated_db_manager, self.copy, 'posts').run()
+        self.assertEqual(10, summary['unchanged'])
+        self.assertEqual([], summary['rows'])
+
+    def test_invalid(self):
+        with self.assertRaises(ValueError):
+            TableDiff(self.populated_db_manager, self.copy, 'missing')
+        with self.assertRaises(ValueError):
+            TableDiff(self.populated_db_manager, self.copy, 'users', key_columns=['nope'])
+
+    def test_cancel(self):
+        diff = TableDiff(self.populated_db_manager, self.copy, 'users', batch_size=2)
+        with self.assertRaises(RuntimeError):
+            diff.run(is_cancelled=lambda: True)
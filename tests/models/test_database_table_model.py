@@ -1,4 +1,5 @@
 from src.models.database_table_model import DatabaseTableModel, Qt
+from src.core.projection import CellPreview
 from PySide6.QtGui import QColor
 from unittest.mock import patch
 import unittest
@@ -94,6 +95,16 @@ class TestDatabaseTableModel(unittest.TestCase):
         result = self.model.data(self.model.index(2, 3), Qt.ItemDataRole.TextAlignmentRole)
         self.assertIsNone(result, 'No text alignment for none type')
 
+    def test_cell_preview(self):
+        model = DatabaseTableModel()
+        model.set_data({'columns': ['id', 'body'], 'rows': [(1, CellPreview('abc', 5000)), (2, 'abc')]})
+
+        self.assertEqual(['id', 'body'], model.columns)
+        self.assertIsInstance(model.value(0, 1), CellPreview, 'value should return the fetched value')
+        self.assertEqual('abc…', model.data(model.index(0, 1)), 'Previews should be shown with an ellipsis')
+        self.assertIn('5,000 characters', model.data(model.index(0, 1), Qt.ItemDataRole.ToolTipRole))
+        self.assertIsNone(model.data(model.index(1, 1), Qt.ItemDataRole.ToolTipRole), 'Whole values have no tooltip')
+
     def test_headerData_override(self):
         self.model.set_data(self.data)
 
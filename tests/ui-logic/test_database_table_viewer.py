@@ -0,0 +1,59 @@
+from src.ui.database_table_viewer import DatabaseTableViewer
+from src.core.database_manager import DatabaseManager
+from src.core.query_builder import CONTAINS
+from PySide6.QtWidgets import QApplication
+from PySide6.QtCore import QThreadPool
+import unittest
+import pytest
+import sys
+
+
+@pytest.mark.usefixtures("populated_db_manager")
+class TestDatabaseTableViewer(unittest.TestCase):
+    populated_db_manager: DatabaseManager
+
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QApplication.instance() or QApplication(sys.argv)
+
+    def setUp(self):
+        self.viewer = DatabaseTableViewer()
+        self.viewer.load_table(self.populated_db_manager, 'users')
+        self.wait()
+        self.viewer.match_type_combo.setCurrentIndex(self.viewer.match_type_combo.findData(CONTAINS))
+
+    def tearDown(self):
+        self.viewer._cancel_search()
+        self.wait()
+        self.viewer.deleteLater()
+
+    def wait(self):
+        for _ in range(20):
+            QThreadPool.globalInstance().waitForDone()
+            self.app.processEvents()
+
+    def search(self, text: str):
+        self.viewer.search_input.setText(text)
+        self.viewer.search()
+
+    def test_superseded_search_is_dropped(self):
+        self.search('Test User 1')
+        superseded = self.viewer.search_worker
+        QThreadPool.globalInstance().waitForDone()
+
+        self.search('Test User 5')
+        self.wait()
+        self.assertEqual(1, self.viewer.data_model.rowCount())
+
+        # a result emitted before the second search started is still delivered
+        stale = self.viewer._run_search(
+            self.populated_db_manager, 'users', 10,
+            {'columns': [{'condition': ('name', 'Test User'), 'type': CONTAINS}]},
+            self.viewer.page_options(), 'Test User', 'id', None
+        )
+        superseded.signals.finished.emit(stale)
+        self.wait()
+
+        self.assertEqual(1, self.viewer.data_model.rowCount(), 'Superseded results should not replace the page')
+        self.assertEqual(('name', 'Test User 5'), self.viewer.filters['columns'][0]['condition'])
+        self.assertEqual('1 matching rows', self.viewer.status_label.text())
@@ -19,6 +19,11 @@ class TestHelperUtils(unittest.TestCase):
         parsed = helpers.parse_timestamp(timestamp.strftime("%Y-%m-%dT%H:%M:%S.%f"))
         self.assertEqual(timestamp.strftime("%Y-%m-%d %H:%M:%S"), parsed, 'Timestamp should be parsed correctly')
 
+    def test_format_timings(self):
+        formatted = helpers.format_timings({'total': 12.5, 'connect': 1, 'first_row': 0.256})
+        self.assertEqual('connect 1.00 ms | first row 0.26 ms | total 12.50 ms', formatted, 'Timings should keep stage order')
+        self.assertEqual('', helpers.format_timings(None), 'Old history rows have no timings')
+
     def test_try_convert_float(self):
         with patch('src.utils.helpers.float') as mock_float:
             mock_float.side_effect = [1.0, ValueError]
@@ -43,7 +48,7 @@ class TestHelperUtils(unittest.TestCase):
         self.assertEqual(0.0, helpers.get_dummy_data('REAL', 'amount'))
         self.assertEqual("'column'", helpers.get_dummy_data('STRING', 'column'))
 
-    @patch('src.utils.helpers.QApplication.clipboard')
+    @patch('PySide6.QtWidgets.QApplication.clipboard')
     def test_copy_to_clipboard(
             self,
             mock_clipboard
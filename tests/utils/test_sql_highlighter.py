@@ -0,0 +1,68 @@
+from src.utils.sql_highlighter import SQLHighlighter
+from src.core.sql_lexer import STATE_BLOCK_COMMENT, STATE_NORMAL
+from PySide6.QtWidgets import QApplication, QPlainTextEdit
+from PySide6.QtGui import QTextCursor
+import unittest
+import sys
+
+
+class TestSQLHighlighter(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        if not QApplication.instance():
+            cls.app = QApplication(sys.argv)
+        else:
+            cls.app = QApplication.instance()
+
+    def setUp(self):
+        self.editor = QPlainTextEdit()
+        self.highlighter = SQLHighlighter(self.editor.document())
+
+    def tearDown(self):
+        self.editor.deleteLater()
+
+    def _formats(self, block_number: int):
+        block = self.editor.document().findBlockByNumber(block_number)
+        return [(r.start, r.length) for r in block.layout().formats()]
+
+    def test_block_state(self):
+        self.editor.setPlainText("SELECT 1 /* open\nstill open\nclosed */ SELECT")
+        document = self.editor.document()
+
+        self.assertEqual(STATE_BLOCK_COMMENT, document.findBlockByNumber(0).userState())
+        self.assertEqual(STATE_BLOCK_COMMENT, document.findBlockByNumber(1).userState())
+        self.assertEqual(STATE_NORMAL, document.findBlockByNumber(2).userState())
+        self.assertEqual([(0, 10)], self._formats(1), 'The middle line should be formatted as a comment')
+
+        # closing the comment early restyles the following lines
+        cursor = QTextCursor(document.findBlockByNumber(0))
+        cursor.movePosition(QTextCursor.MoveOperation.EndOfBlock)
+        cursor.insertText(" */")
+        self.assertEqual(STATE_NORMAL, document.findBlockByNumber(1).userState())
+        self.assertEqual([], self._formats(1), 'Plain words have no format')
+
+    def test_large_text_is_deferred(self):
+        lines = 20000
+        self.editor.setPlainText('\n'.join(f"SELECT {x} FROM users -- line {x}" for x in range(lines)))
+        self.assertTrue(self.highlighter.is_pending(), 'Highlighting a long script should continue in chunks')
+
+        while self.highlighter.is_pending():
+            QApplication.processEvents()
+
+        for block_number in (0, lines // 2, lines - 1):
+            self.assertEqual(4, len(self._formats(block_number)), f'Line {block_number} should be highlighted')
+
+    def test_lazy_mode(self):
+        self.highlighter.lazy = True
+        lines = 5000
+        self.editor.setPlainText('\n'.join(f"SELECT {x} FROM users" for x in range(lines)))
+        for _ in range(100):
+            QApplication.processEvents()
+
+        self.assertTrue(self.highlighter.is_pending(), 'Lines past the target should wait')
+        self.assertEqual(0, len(self._formats(lines - 1)), 'The last line has not been scrolled into view')
+
+        self.highlighter.highlight_until(lines - 1)
+        while self.highlighter.is_pending():
+            QApplication.processEvents()
+        self.assertEqual(3, len(self._formats(lines - 1)), 'The last line should be highlighted once requested')